@@ -4,8 +4,11 @@ from audit_logger.adapter import (  # noqa: F401
     get_audit_logger_adapter,
     target_return,
 )
-from audit_logger.data import AuditMessage, ModelWithId  # noqa: F401
-from audit_logger.db_log_handler import AuditLogHandler  # noqa: F401
+from audit_logger.data import AuditMessage, ModelIds, ModelWithId  # noqa: F401
+from audit_logger.db_log_handler import (  # noqa: F401
+    AuditLogHandler,
+    BufferedAuditLogHandler,
+)
 from audit_logger.enums import (  # noqa: F401
     AuditType,
     EventType,
@@ -1,8 +1,11 @@
 import copy
 import functools
+import inspect
 import logging
 from collections.abc import Callable
 
+from asgiref.sync import sync_to_async
+
 from audit_logger.data import AuditMessage
 from audit_logger.enums import Status
 
@@ -98,20 +101,73 @@ class AuditLoggerAdapter(logging.LoggerAdapter):
             if msg.status is None and autostatus:
                 msg.status = status
 
+        def _make_msg(kwargs):
+            msg = copy.copy(base_msg)
+            # the base message is shared by the concurrent calls
+            msg.extra = copy.deepcopy(base_msg.extra)
+
+            # Add kwarg to kwargs, if applicable.
+            if add_kwarg:
+                if isinstance(add_kwarg, str):
+                    kwargs[add_kwarg] = msg
+                else:
+                    kwargs[kwarg_name] = msg
+            return msg
+
+        def _log(msg, return_value, exc, args, kwargs):
+            # Replacing with nothing creates a new AuditMessage,
+            # re-initializing date_time.
+            msg = msg.replace()
+
+            # Perform target processing (if target not set)
+            if msg.target is None and autotarget:
+                msg.target = autotarget(return_value, *args, **kwargs)
+
+            # Perform actor processing (if actor not set)
+            if msg.actor is None and autoactor:
+                msg.actor = autoactor(*args, **kwargs)
+
+            # Perform additional custom post-processing.
+            if post_process:
+                post_process(msg, return_value, *args, **kwargs)
+
+            if exc:
+                self.exception(msg, exc_info=exc)
+            elif msg.status == Status.FAILURE:
+                self.error(msg)
+            else:
+                self.info(msg)
+
         def decorator_autolog(f):
+            if inspect.iscoroutinefunction(f):
+
+                @functools.wraps(f)
+                async def async_wrapper_autolog(*args, **kwargs):
+                    msg = _make_msg(kwargs)
+                    return_value = None
+                    exc = None
+
+                    try:
+                        return_value = await f(*args, **kwargs)
+                        _autostatus(msg, Status.SUCCESS)
+                    except Exception as e:
+                        exc = e
+                        _autostatus(msg, Status.FAILURE)
+                        raise
+                    finally:
+                        # the handlers write to the database
+                        await sync_to_async(_log)(msg, return_value, exc, args, kwargs)
+
+                    return return_value
+
+                return async_wrapper_autolog
+
             @functools.wraps(f)
             def wrapper_autolog(*args, **kwargs):
-                msg = copy.copy(base_msg)
+                msg = _make_msg(kwargs)
                 return_value = None
                 exc = None
 
-                # Add kwarg to kwargs, if applicable.
-                if add_kwarg:
-                    if isinstance(add_kwarg, str):
-                        kwargs[add_kwarg] = msg
-                    else:
-                        kwargs[kwarg_name] = msg
-
                 try:
                     return_value = f(*args, **kwargs)
                     _autostatus(msg, Status.SUCCESS)
@@ -120,28 +176,7 @@ class AuditLoggerAdapter(logging.LoggerAdapter):
                     _autostatus(msg, Status.FAILURE)
                     raise
                 finally:
-                    # Replacing with nothing creates a new AuditMessage,
-                    # re-initializing date_time.
-                    msg = msg.replace()
-
-                    # Perform target processing (if target not set)
-                    if msg.target is None and autotarget:
-                        msg.target = autotarget(return_value, *args, **kwargs)
-
-                    # Perform actor processing (if actor not set)
-                    if msg.actor is None and autoactor:
-                        msg.actor = autoactor(*args, **kwargs)
-
-                    # Perform additional custom post-processing.
-                    if post_process:
-                        post_process(msg, return_value, *args, **kwargs)
-
-                    if exc:
-                        self.exception(msg)
-                    elif msg.status == Status.FAILURE:
-                        self.error(msg)
-                    else:
-                        self.info(msg)
+                    _log(msg, return_value, exc, args, kwargs)
 
                 return return_value
 
@@ -24,6 +24,25 @@ class ModelWithId:
     id: Any
 
 
+@dataclass
+class ModelIds:
+    """
+    Defines a collection of model instances by their class and ids,
+    encoded like the instances without loading them.
+    """
+
+    model: type[models.Model]
+    ids: list
+
+    @classmethod
+    def from_queryset(cls, queryset: models.QuerySet) -> "ModelIds":
+        if queryset._result_cache is not None:
+            ids = [obj.pk for obj in queryset]
+        else:
+            ids = list(queryset.values_list("pk", flat=True))
+        return cls(queryset.model, ids)
+
+
 class AuditMessageEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, datetime.datetime):
@@ -34,10 +53,45 @@ class AuditMessageEncoder(json.JSONEncoder):
             return o.value
         elif isinstance(o, ModelWithId) and issubclass(o.model, models.Model):
             return generate_model_id_string_from_class(o.model, o.id)
+        elif isinstance(o, ModelIds) and issubclass(o.model, models.Model):
+            return [generate_model_id_string_from_class(o.model, id_) for id_ in o.ids]
         elif isinstance(o, models.QuerySet):
             return [generate_model_id_string_from_instance(obj) for obj in o]
         return super().default(o)
 
+    def to_json_compatible(self, o):
+        """Returns the value as it would be after encoding and decoding it,
+        without the intermediate JSON string."""
+        # bool before int, and the enums mixed with the basic types are
+        # encoded as their base type, as by the JSON encoder
+        if o is None or isinstance(o, bool):
+            return o
+        if isinstance(o, str):
+            return str.__str__(o)
+        if isinstance(o, int):
+            return int.__int__(o)
+        if isinstance(o, float):
+            return float.__float__(o)
+        if isinstance(o, dict):
+            return {self._key(k): self.to_json_compatible(v) for k, v in o.items()}
+        if isinstance(o, list | tuple):
+            return [self.to_json_compatible(v) for v in o]
+        return self.to_json_compatible(self.default(o))
+
+    @staticmethod
+    def _key(key):
+        if isinstance(key, str):
+            return str.__str__(key)
+        if key is None:
+            return "null"
+        if isinstance(key, bool):
+            return "true" if key else "false"
+        if isinstance(key, int):
+            return int.__repr__(key)
+        if isinstance(key, float):
+            return json.dumps(float.__float__(key))
+        raise TypeError(f"keys must be str, int, float, bool or None, not {key!r}")
+
 
 @dataclass
 class AuditMessage:
@@ -72,8 +126,7 @@ class AuditMessage:
         return d
 
     def safe_asdict(self) -> dict:
-        s = AuditMessageEncoder().encode(self.asdict())
-        return json.loads(s)
+        return AuditMessageEncoder().to_json_compatible(self.asdict())
 
     def replace(self, **changes):
         return replace(self, **changes)
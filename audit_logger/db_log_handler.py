@@ -1,10 +1,32 @@
 import copy
+import dataclasses
+import glob
+import json
 import logging
+import os
+import threading
+import uuid
+import weakref
+
+from django.core.signals import request_finished
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+from logger_extra.logger_context import get_logger_context
 
 from audit_logger.data import AuditMessage
 
 db_default_formatter = logging.Formatter()
 
+# buffered handlers of the process, flushed at the end of each request
+_buffered_handlers = weakref.WeakSet()
+
+
+def get_request_id():
+    """Returns the id of the current request, set by XRequestIdMiddleware
+    in the context of the thread or task handling the request."""
+    request_id = get_logger_context().get("request_id")
+    return str(request_id) if request_id is not None else None
+
 
 class AuditLogHandler(logging.Handler):
     @staticmethod
@@ -21,8 +43,10 @@ class AuditLogHandler(logging.Handler):
         return audit_msg
 
     @staticmethod
-    def create_audit_log_from_record(record):
-        from resilient_logger.sources import ResilientLogSource
+    def make_log_entry_data(record):
+        from resilient_logger.sources.resilient_log_source import (
+            StructuredResilientLogEntryData,
+        )
 
         msg = AuditLogHandler.make_audit_message(record)
 
@@ -33,7 +57,7 @@ class AuditLogHandler(logging.Handler):
 
         json = msg.safe_asdict()
 
-        return ResilientLogSource.create_structured(
+        return StructuredResilientLogEntryData(
             message=msg.message,
             level=msg.log_level,
             operation=json["operation"],
@@ -48,11 +72,168 @@ class AuditLogHandler(logging.Handler):
                 "audit_type": json["audit_type"],
                 "origin": json["origin"],
                 "version": json["version"],
+                "request_id": get_request_id(),
             },
         )
 
+    @staticmethod
+    def create_audit_log_from_record(record):
+        from resilient_logger.sources import ResilientLogSource
+
+        data = AuditLogHandler.make_log_entry_data(record)
+        return ResilientLogSource.create_structured(**dataclasses.asdict(data))
+
     def emit(self, record):
         try:
             self.create_audit_log_from_record(record)
         except Exception:
             self.handleError(record)
+
+
+class BufferedAuditLogHandler(AuditLogHandler):
+    """Buffers the audit log entries in memory and inserts them in batches
+    when the buffer is full, when the flush interval has passed, at the end
+    of each request and when the process exits.
+
+    The entries of a failed insert, e.g. when the database is unavailable,
+    are written to a new spill file in spill_dir. The spill files of all
+    processes are replayed by the first successful flush of a process,
+    i.e. after a restart, and after the database recovers.
+    """
+
+    def __init__(
+        self,
+        level=logging.NOTSET,
+        max_batch_size=100,
+        flush_interval=2.0,
+        spill_dir="/tmp/parking-permits-audit-log",
+    ):
+        super().__init__(level)
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.spill_dir = spill_dir
+        self.buffer = []
+        # the handler lock is held in emit, which may flush, so the flushes
+        # from the other threads must not take it
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._replay_pending = True
+        self._stopped = threading.Event()
+        self._timer_pid = None
+        _buffered_handlers.add(self)
+
+    def _start_timer(self):
+        # started in the worker process, the thread doesn't survive a fork
+        if self._timer_pid == os.getpid() or self.flush_interval <= 0:
+            return
+        self._timer_pid = os.getpid()
+        threading.Thread(
+            target=self._flush_periodically, name="audit-log-flush", daemon=True
+        ).start()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+            close_old_connections()
+
+    def emit(self, record):
+        try:
+            data = self.make_log_entry_data(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._buffer_lock:
+            self.buffer.append(data)
+            is_full = len(self.buffer) >= self.max_batch_size
+        self._start_timer()
+        if is_full:
+            self.flush()
+
+    def _write(self, entries):
+        from resilient_logger.sources import ResilientLogSource
+
+        ResilientLogSource.bulk_create_structured(entries)
+
+    def _spill(self, entries):
+        # each spill gets a file of its own, written under a name the
+        # replays don't match, so that a replaying process only claims
+        # complete files that no process writes to anymore
+        os.makedirs(self.spill_dir, exist_ok=True)
+        name = f"audit-log-{os.getpid()}-{uuid.uuid4().hex}"
+        partial_path = os.path.join(self.spill_dir, f"{name}.partial")
+        with open(partial_path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(dataclasses.asdict(entry)) + "\n")
+        os.rename(partial_path, os.path.join(self.spill_dir, f"{name}.jsonl"))
+
+    def replay_spill_files(self):
+        """Inserts the entries of the spill files, claiming each file by
+        renaming it so that concurrent processes don't insert them twice.
+        The batches of a file are inserted in one transaction so that a
+        file put back after a failure is replayed without duplicates."""
+        from resilient_logger.sources.resilient_log_source import (
+            StructuredResilientLogEntryData,
+        )
+
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, "*.jsonl"))):
+            claimed_path = f"{path}.{os.getpid()}.replay"
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue
+            with open(claimed_path) as f:
+                entries = [
+                    StructuredResilientLogEntryData(**json.loads(line))
+                    for line in f
+                    if line.strip()
+                ]
+            try:
+                with transaction.atomic():
+                    for start in range(0, len(entries), self.max_batch_size):
+                        self._write(entries[start : start + self.max_batch_size])
+            except Exception:
+                os.rename(claimed_path, path)
+                raise
+            os.remove(claimed_path)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._buffer_lock:
+                entries, self.buffer = self.buffer, []
+            if not entries and not self._replay_pending:
+                return
+
+            try:
+                if entries:
+                    self._write(entries)
+            except Exception:
+                try:
+                    self._spill(entries)
+                except Exception:
+                    logging.getLogger("db").exception(
+                        f"Writing {len(entries)} audit log entries failed"
+                    )
+                self._replay_pending = True
+                return
+
+            if self._replay_pending:
+                try:
+                    self.replay_spill_files()
+                    self._replay_pending = False
+                except Exception:
+                    logging.getLogger("db").exception(
+                        "Replaying the audit log spill files failed"
+                    )
+
+    def close(self):
+        self._stopped.set()
+        self.flush()
+        _buffered_handlers.discard(self)
+        super().close()
+
+
+@receiver(request_finished)
+def flush_buffered_audit_logs(**kwargs):
+    for handler in list(_buffered_handlers):
+        handler.flush()
@@ -3,10 +3,12 @@ from json import JSONDecoder
 from unittest import mock
 
 import freezegun
+import pytest
+from django.contrib.auth.models import Group
 from django.utils import timezone
 
 from audit_logger import AuditMessage, AuditType, EventType, Operation, Reason, Status
-from audit_logger.data import AuditMessageEncoder, ModelWithId
+from audit_logger.data import AuditMessageEncoder, ModelIds, ModelWithId
 from audit_logger.tests.utils import make_mock_model
 
 MockModel = make_mock_model()
@@ -147,3 +149,77 @@ def test_json_encoder_with_multiple_models(*_):
         )
         == output
     )
+
+
+def test_to_json_compatible_is_equivalent_to_encoding_and_decoding():
+    class MyEnum(enum.Enum):
+        FOO = "Foo"
+
+    class MyStrEnum(enum.StrEnum):
+        BAR = "Bar"
+
+    class MyIntEnum(enum.IntEnum):
+        ONE = 1
+
+    d = {
+        "datetime": timezone.now(),
+        "enums": (MyEnum.FOO, MyStrEnum.BAR, MyIntEnum.ONE, Operation.READ),
+        "nested": {"list": [1, 2.5, None, True, {"tuple": ("a", "b")}]},
+        1: "int key",
+        2.5: "float key",
+        None: "none key",
+        False: "bool key",
+        MyStrEnum.BAR: "enum key",
+        "float": float("inf"),
+    }
+
+    output = AuditMessageEncoder().to_json_compatible(d)
+
+    assert output == JSONDecoder().decode(AuditMessageEncoder().encode(d))
+    assert type(output["enums"][1]) is str
+    assert type(output["enums"][2]) is int
+
+
+def test_to_json_compatible_raises_on_unsupported_types():
+    with pytest.raises(TypeError):
+        AuditMessageEncoder().to_json_compatible({"set": {1, 2}})
+
+
+def test_safe_asdict_is_equivalent_to_encoding_and_decoding():
+    msg = AuditMessage(
+        "My message",
+        actor=MockModel(id=1),
+        target=[MockModel(id=2), MockModel(id=3)],
+        operation=Operation.CREATE,
+        reason=Reason.SELF_SERVICE,
+        status=Status.SUCCESS,
+        extra={"page_info": {"page": 1}, "search_params": None},
+    )
+    with mock.patch(
+        "audit_logger.data.generate_model_id_string_from_instance",
+        side_effect=lambda obj: f"mock__id__{obj.id}",
+    ):
+        assert msg.safe_asdict() == JSONDecoder().decode(
+            AuditMessageEncoder().encode(msg.asdict())
+        )
+
+
+@pytest.mark.django_db
+def test_model_ids_are_encoded_like_the_queryset(django_assert_num_queries):
+    for name in ("a", "b", "c"):
+        Group.objects.create(name=name)
+    queryset = Group.objects.order_by("name")[:2]
+    expected = AuditMessageEncoder().to_json_compatible(queryset)
+
+    with django_assert_num_queries(1):
+        model_ids = ModelIds.from_queryset(queryset)
+    assert AuditMessageEncoder().to_json_compatible(model_ids) == expected
+
+    # the instances of an evaluated queryset are used
+    queryset = Group.objects.order_by("name")
+    list(queryset)
+    with django_assert_num_queries(0):
+        model_ids = ModelIds.from_queryset(queryset)
+    assert AuditMessageEncoder().encode(model_ids) == AuditMessageEncoder().encode(
+        queryset
+    )
@@ -1,12 +1,15 @@
 import logging
+from unittest import mock
 
 import pytest
+from django.core.signals import request_finished
+from django.db import OperationalError
 from resilient_logger.models import ResilientLogEntry
 from resilient_logger.sources.resilient_log_source_entry import ResilientLogSourceEntry
 
 from audit_logger import enums
 from audit_logger.data import AuditMessage
-from audit_logger.db_log_handler import AuditLogHandler
+from audit_logger.db_log_handler import AuditLogHandler, BufferedAuditLogHandler
 from audit_logger.tests.utils import make_mock_model, mock_log_record
 
 Actor = make_mock_model(name="Actor")
@@ -77,3 +80,123 @@ def test_should_create_audit_log_from_record(make_audit_msg):
         == created_document
     )
     assert "ZeroDivisionError" in created_document["audit_event"]["extra"]["trace"]
+
+
+def make_record(msg):
+    record = mock_log_record(msg=msg, levelno=logging.INFO, exc_info=None)
+    record.name = "audit"
+    return record
+
+
+@pytest.fixture
+def buffered_handler(tmp_path):
+    handler = BufferedAuditLogHandler(
+        max_batch_size=3, flush_interval=0, spill_dir=str(tmp_path)
+    )
+    yield handler
+    handler.close()
+
+
+@pytest.mark.django_db
+class TestBufferedAuditLogHandler:
+    def test_should_write_entries_in_batches(
+        self, buffered_handler, make_audit_msg, django_assert_num_queries
+    ):
+        for _i in range(2):
+            buffered_handler.emit(make_record(make_audit_msg()))
+        assert ResilientLogEntry.objects.count() == 0
+
+        with django_assert_num_queries(1):
+            buffered_handler.emit(make_record(make_audit_msg()))
+        assert ResilientLogEntry.objects.count() == 3
+        assert buffered_handler.buffer == []
+
+    def test_should_flush_at_the_end_of_the_request(
+        self, buffered_handler, make_audit_msg
+    ):
+        buffered_handler.emit(make_record(make_audit_msg()))
+        request_finished.send(sender=None)
+        assert ResilientLogEntry.objects.count() == 1
+
+    def test_should_spill_and_replay_when_the_database_is_unavailable(
+        self, buffered_handler, make_audit_msg, tmp_path
+    ):
+        buffered_handler.emit(make_record(make_audit_msg(message="spilled")))
+        with mock.patch.object(
+            BufferedAuditLogHandler,
+            "_write",
+            side_effect=OperationalError("the database is unavailable"),
+        ):
+            buffered_handler.flush()
+        assert ResilientLogEntry.objects.count() == 0
+        assert len(list(tmp_path.glob("*.jsonl"))) == 1
+
+        # a restarted process replays the spill files of the earlier processes
+        handler = BufferedAuditLogHandler(flush_interval=0, spill_dir=str(tmp_path))
+        handler.flush()
+        handler.close()
+        entry = ResilientLogEntry.objects.get()
+        assert entry.message == "spilled"
+        assert entry.context["operation"] == "READ"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_should_spill_each_failed_batch_to_a_new_file(
+        self, buffered_handler, make_audit_msg, tmp_path
+    ):
+        with mock.patch.object(
+            BufferedAuditLogHandler,
+            "_write",
+            side_effect=OperationalError("the database is unavailable"),
+        ):
+            for message in ["first", "second"]:
+                buffered_handler.emit(make_record(make_audit_msg(message=message)))
+                buffered_handler.flush()
+
+            # a file replayed by another process is never appended to
+            spill_files = sorted(tmp_path.iterdir())
+            assert len(spill_files) == 2
+            assert all(path.suffix == ".jsonl" for path in spill_files)
+
+        buffered_handler.flush()
+        messages = ResilientLogEntry.objects.values_list("message", flat=True)
+        assert sorted(messages) == ["first", "second"]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_should_replay_a_file_again_without_duplicates_after_a_failed_batch(
+        self, buffered_handler, make_audit_msg, tmp_path
+    ):
+        messages = ["first", "second", "third"]
+        with mock.patch.object(
+            BufferedAuditLogHandler,
+            "_write",
+            side_effect=OperationalError("the database is unavailable"),
+        ):
+            for message in messages:
+                buffered_handler.emit(make_record(make_audit_msg(message=message)))
+        assert len(list(tmp_path.glob("*.jsonl"))) == 1
+
+        # the file is replayed in two batches, of which the second one fails
+        handler = BufferedAuditLogHandler(
+            max_batch_size=2, flush_interval=0, spill_dir=str(tmp_path)
+        )
+        write = BufferedAuditLogHandler._write
+        written_batches = []
+
+        def write_first_batch(instance, entries):
+            if written_batches:
+                raise OperationalError("the database is unavailable")
+            written_batches.append(entries)
+            write(instance, entries)
+
+        with mock.patch.object(BufferedAuditLogHandler, "_write", write_first_batch):
+            with pytest.raises(OperationalError):
+                handler.replay_spill_files()
+        assert len(written_batches) == 1
+        assert ResilientLogEntry.objects.count() == 0
+        assert len(list(tmp_path.glob("*.jsonl"))) == 1
+
+        handler.replay_spill_files()
+        handler.close()
+        replayed = ResilientLogEntry.objects.values_list("message", flat=True)
+        assert sorted(replayed) == sorted(messages)
+        assert list(tmp_path.iterdir()) == []
@@ -304,6 +304,23 @@ class AdapterAutologTest(TestCase):
         assert base_msg.message == "The Original"
         assert base_msg.date_time == base_datetime
 
+    def test_decorated_calls_do_not_share_the_extra_of_the_base_message(self):
+        base_msg = AuditMessage("The Original", extra={"ids": []})
+
+        @self.adapter.autolog(base_msg, add_kwarg=True)
+        def decorated_func(audit_msg, id_):
+            audit_msg.extra["ids"].append(id_)
+
+        with self.default_cm() as cm:
+            decorated_func(id_=1)
+            decorated_func(id_=2)
+
+        assert [record.msg.extra for record in cm.records] == [
+            {"ids": [1]},
+            {"ids": [2]},
+        ]
+        assert base_msg.extra == {"ids": []}
+
     def test_add_kwarg_bool(self):
         expected_message = "Hello, world!"
 
@@ -1,10 +1,19 @@
 # https://docs.gunicorn.org/en/stable/settings.html
+import os
+
 from logger_extra.extras.gunicorn import JsonErrorFormatter, JsonFormatter
 
 wsgi_app = "project.wsgi"
 bind = "0.0.0.0:8888"
 limit_request_field_size = 65536
 
+# Threaded workers, so that a worker keeps serving requests while some of
+# its threads wait for the external services. The number of workers is
+# taken from WEB_CONCURRENCY. DATABASE_POOL_MAX_SIZE should cover the
+# threads of a worker when the connections are pooled.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
 logconfig_dict = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -0,0 +1,250 @@
+"""Load test scenarios, run against an app configured with loadtest.env:
+
+    locust -f loadtest/locustfile.py --host http://127.0.0.1:8000 \
+        --headless -u 200 -r 20 -t 10m --csv loadtest-results
+
+The scenarios are weighted to a renewal day, when the Talpa renewal
+webhooks dominate the traffic. Use --class-picker or the user classes
+as arguments to run a single scenario.
+"""
+
+import datetime
+import json
+import os
+import random
+import uuid
+
+import requests
+from locust import HttpUser, between, events, task
+
+MOCK_HOST = os.environ.get("LOADTEST_MOCK_HOST", "http://127.0.0.1")
+TALPA_MOCK_URL = f"{MOCK_HOST}:9101"
+TRAFICOM_MOCK_URL = f"{MOCK_HOST}:9102"
+OIDC_MOCK_URL = f"{MOCK_HOST}:9107"
+FIXTURES_PATH = os.environ.get("LOADTEST_FIXTURES", "loadtest-fixtures.json")
+HETU_CHECK_CHARS = "0123456789ABCDEFHJKLMNPRSTUVWXY"
+
+PROFILE_QUERY = """
+    query Profile {
+        profile { id primaryAddress { id } }
+    }
+"""
+GET_PERMITS_QUERY = """
+    query GetPermits {
+        getPermits { id status vehicle { registrationNumber } }
+    }
+"""
+VEHICLE_INFORMATION_MUTATION = """
+    mutation GetVehicleInformation($registration: String!) {
+        getVehicleInformation(registration: $registration) { registrationNumber }
+    }
+"""
+CREATE_PERMIT_MUTATION = """
+    mutation CreateParkingPermit($addressId: ID!, $registration: String!) {
+        createParkingPermit(addressId: $addressId, registration: $registration) {
+            id
+        }
+    }
+"""
+CREATE_ORDER_MUTATION = """
+    mutation CreateOrder {
+        createOrder { checkoutUrl }
+    }
+"""
+ADMIN_PERMITS_QUERY = """
+    query Permits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {
+        permits(pageInput: $pageInput, searchParams: $searchParams) {
+            objects {
+                id
+                status
+                customer { firstName lastName }
+                vehicle { registrationNumber }
+            }
+            pageInfo { numPages page next prev count }
+        }
+    }
+"""
+
+fixtures = {}
+
+
+@events.init.add_listener
+def load_fixtures(environment, **kwargs):
+    with open(FIXTURES_PATH) as f:
+        fixtures.update(json.load(f))
+
+
+def get_token(sub):
+    response = requests.post(f"{OIDC_MOCK_URL}/token", json={"sub": sub}, timeout=10)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def generate_hetu(rng):
+    birth_date = datetime.date(1950, 1, 1) + datetime.timedelta(
+        days=rng.randrange(50 * 365)
+    )
+    individual_number = rng.randrange(2, 900)
+    digits = f"{birth_date:%d%m%y}{individual_number:03d}"
+    century_sign = "-" if birth_date.year < 2000 else "A"
+    return (
+        f"{birth_date:%d%m%y}{century_sign}{individual_number:03d}"
+        f"{HETU_CHECK_CHARS[int(digits) % 31]}"
+    )
+
+
+class GraphQLUser(HttpUser):
+    abstract = True
+    graphql_path = "/graphql/"
+
+    def graphql(self, name, query, variables=None, headers=None):
+        with self.client.post(
+            self.graphql_path,
+            json={"query": query, "variables": variables or {}},
+            headers={**self.headers, **(headers or {})},
+            name=name,
+            catch_response=True,
+        ) as response:
+            data = response.json() if response.ok else {}
+            if errors := data.get("errors"):
+                response.failure(errors[0].get("message"))
+            return data.get("data") or {}
+
+
+class CustomerPurchaseUser(GraphQLUser):
+    """A new resident buying an open ended permit: profile creation with
+    Helsinki Profile, DVV and Kami, the Traficom vehicle and licence
+    checks, the Talpa order and the payment webhook."""
+
+    weight = 2
+    wait_time = between(1, 5)
+
+    def on_start(self):
+        self.rng = random.Random()
+        self.hetu = generate_hetu(self.rng)
+        self.headers = {
+            "Authorization": f"Bearer {get_token(str(uuid.uuid4()))}",
+            "X-Authorization": f"Bearer {self.hetu}",
+        }
+
+    @task
+    def purchase_permit(self):
+        profile = self.graphql("profile", PROFILE_QUERY).get("profile")
+        if not profile or not profile.get("primaryAddress"):
+            return
+
+        registration = f"LT-{uuid.uuid4().hex[:6].upper()}"
+        requests.put(
+            f"{TRAFICOM_MOCK_URL}/__mock/vehicles/{registration}",
+            json={"owner": self.hetu},
+            timeout=10,
+        )
+        self.graphql(
+            "getVehicleInformation",
+            VEHICLE_INFORMATION_MUTATION,
+            {"registration": registration},
+        )
+        permit = self.graphql(
+            "createParkingPermit",
+            CREATE_PERMIT_MUTATION,
+            {
+                "addressId": profile["primaryAddress"]["id"],
+                "registration": registration,
+            },
+        )
+        if not permit:
+            return
+        order = self.graphql("createOrder", CREATE_ORDER_MUTATION).get("createOrder")
+        if order and order.get("checkoutUrl"):
+            talpa_order_id = order["checkoutUrl"].split("/")[-2]
+            self.client.post(
+                "/api/talpa/payment/",
+                json={"orderId": talpa_order_id, "eventType": "PAYMENT_PAID"},
+                name="talpa payment webhook",
+            )
+        self.graphql("getPermits", GET_PERMITS_QUERY)
+
+
+class RenewalWebhookUser(HttpUser):
+    """Talpa posting subscription renewal orders on a renewal day."""
+
+    weight = 5
+    wait_time = between(0.1, 0.5)
+
+    @task
+    def renew_subscription(self):
+        subscription = random.choice(fixtures["subscriptions"])
+        order_id = str(uuid.uuid4())
+        start_date = datetime.datetime.now() + datetime.timedelta(days=1)
+        requests.put(
+            f"{TALPA_MOCK_URL}/__mock/orders/{order_id}",
+            json={
+                "orderId": order_id,
+                "user": subscription["user_uuid"],
+                "checkoutUrl": f"https://checkout.invalid/{order_id}",
+                "items": [
+                    {
+                        "orderItemId": str(uuid.uuid4()),
+                        "productId": subscription["talpa_product_id"],
+                        "startDate": start_date.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+                        "priceGross": subscription["unit_price"],
+                        "rowPriceTotal": subscription["unit_price"],
+                        "vatPercentage": subscription["vat_percentage"],
+                        "quantity": 1,
+                    }
+                ],
+            },
+            timeout=10,
+        )
+        self.client.post(
+            "/api/talpa/order/",
+            json={
+                "orderId": order_id,
+                "subscriptionId": subscription["subscription_id"],
+                "eventType": "SUBSCRIPTION_RENEWAL_ORDER_CREATED",
+            },
+            name="talpa renewal webhook",
+        )
+        self.client.post(
+            "/api/talpa/payment/",
+            json={"orderId": order_id, "eventType": "PAYMENT_PAID"},
+            name="talpa payment webhook",
+        )
+
+
+class AdminSearchUser(GraphQLUser):
+    """Customer service searching permits in the admin UI."""
+
+    weight = 1
+    wait_time = between(2, 8)
+    graphql_path = "/admin-graphql/"
+
+    def on_start(self):
+        self.headers = {
+            "Authorization": f"Bearer {get_token(fixtures['admin_uuid'])}",
+        }
+
+    @task(3)
+    def search_permits(self):
+        self.graphql(
+            "admin permits search",
+            ADMIN_PERMITS_QUERY,
+            {
+                "pageInput": {"page": 1},
+                "searchParams": {
+                    "q": random.choice(fixtures["search_terms"]),
+                    "status": "ALL",
+                },
+            },
+        )
+
+    @task(1)
+    def browse_permits(self):
+        self.graphql(
+            "admin permits browse",
+            ADMIN_PERMITS_QUERY,
+            {
+                "pageInput": {"page": random.randint(1, 20)},
+                "searchParams": {"q": "", "status": "VALID"},
+            },
+        )
@@ -0,0 +1,434 @@
+"""Local stand-ins for the external services the app integrates with.
+
+Every service listens on its own port, see SERVICE_PORTS and
+loadtest.env. Latency and errors are injected per request:
+
+    python -m loadtest.mock_services --latency 80 --jitter 40 \
+        --error-rate 0.01 --service-latency traficom=400
+
+Scenarios register state that the app later reads back from the
+services, e.g. vehicle owners and renewal orders, under /__mock/.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import pathlib
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from jose import jwt
+
+from parking_permits.tests.keys import rsa_key
+
+logger = logging.getLogger("loadtest")
+
+SERVICE_PORTS = {
+    "talpa": 9101,
+    "traficom": 9102,
+    "dvv": 9103,
+    "kami": 9104,
+    "profile": 9105,
+    "parkkihubi": 9106,
+    "oidc": 9107,
+}
+TRAFICOM_MOCKS_DIR = (
+    pathlib.Path(__file__).parent.parent
+    / "parking_permits"
+    / "tests"
+    / "services"
+    / "mocks"
+    / "traficom"
+)
+DEFAULT_ADDRESS = {
+    "street_name": "Mannerheimintie",
+    "street_name_sv": "Mannerheimvägen",
+    "street_number": "5",
+    "postal_code": "00100",
+    "location": [24.9402, 60.1689],
+}
+TOKEN_LIFETIME = datetime.timedelta(hours=12)
+
+
+class Response:
+    def __init__(self, status=200, body=None, content_type="application/json"):
+        self.status = status
+        self.content_type = content_type
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        self.body = (body or "").encode("utf-8")
+
+
+class Fault:
+    """Latency and error injection of a service."""
+
+    def __init__(self, latency=0, jitter=0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    def apply(self, rng):
+        delay = max(self.latency + rng.uniform(-self.jitter, self.jitter), 0)
+        time.sleep(delay / 1000)
+        return rng.random() < self.error_rate
+
+
+class MockService:
+    name = None
+
+    def __init__(self, state, fault):
+        self.state = state
+        self.fault = fault
+        self.rng = random.Random()
+
+    def handle(self, method, path, query, body, headers):
+        raise NotImplementedError
+
+
+class TalpaService(MockService):
+    """Order, product and merchant experience APIs, all under one port."""
+
+    name = "talpa"
+
+    def handle(self, method, path, query, body, headers):
+        if method == "GET" and path.startswith("/merchant/list/merchants/"):
+            return Response(body={"0": {"merchantId": str(uuid.uuid4())}})
+        if method == "POST" and path == "/product/":
+            return Response(201, {"productId": str(uuid.uuid4())})
+        if method == "POST" and path.endswith("/accounting/"):
+            return Response(201, {})
+        if method == "POST" and path == "/order/":
+            return self.create_order(json.loads(body))
+        if match := re.fullmatch(r"/order/admin/([\w-]+)", path):
+            order = self.state.talpa_orders.get(match[1])
+            return Response(body=order) if order else Response(404, {})
+        if path.startswith("/order/subscriptions/get-by-order-id/"):
+            return Response(body={"subscriptions": []})
+        if method == "POST" and re.fullmatch(
+            r"/order/(subscription/)?[\w-]+/(cancel|flowSteps)", path
+        ):
+            return Response(body={})
+        return Response(404, {"error": f"Unknown Talpa path {path}"})
+
+    def create_order(self, data):
+        order_id = str(uuid.uuid4())
+        order = {
+            "orderId": order_id,
+            "subscriptionId": None,
+            "checkoutUrl": f"https://checkout.invalid/{order_id}",
+            "loggedInCheckoutUrl": f"https://checkout.invalid/{order_id}/logged-in",
+            "receiptUrl": f"https://checkout.invalid/{order_id}/receipt",
+            "items": [
+                {"orderItemId": str(uuid.uuid4()), "meta": item.get("meta", [])}
+                for item in data.get("items", [])
+            ],
+        }
+        self.state.talpa_orders[order_id] = order
+        return Response(body=order)
+
+
+class TraficomService(MockService):
+    name = "traficom"
+
+    def __init__(self, state, fault):
+        super().__init__(state, fault)
+        self.vehicle_xml = (TRAFICOM_MOCKS_DIR / "vehicle_ok.xml").read_text(
+            encoding="latin-1"
+        )
+        self.licence_xml = (TRAFICOM_MOCKS_DIR / "licence_ok.xml").read_text(
+            encoding="latin-1"
+        )
+
+    def handle(self, method, path, query, body, headers):
+        if hetu := re.search(r"<hetu>(.*?)</hetu>", body):
+            return Response(
+                body=self.licence_xml.replace("290200A905H", hetu[1]),
+                content_type="application/xml",
+            )
+        registration = re.search(r"<rekisteritunnus>(.*?)</rekisteritunnus>", body)
+        registration = registration[1] if registration else ""
+        owner = self.state.vehicle_owners.get(registration, "290200A905H")
+        xml = self.vehicle_xml.replace("BCI-707", registration).replace(
+            "290200A905H", owner
+        )
+        return Response(body=xml, content_type="application/xml")
+
+
+class DVVService(MockService):
+    name = "dvv"
+
+    def handle(self, method, path, query, body, headers):
+        hetu = json.loads(body).get("Henkilotunnus", "")
+        address = self.state.address
+        return Response(
+            body={
+                "Henkilo": {
+                    "Henkilotunnus": hetu,
+                    "NykyinenSukunimi": {"Sukunimi": "Kuormitus"},
+                    "NykyisetEtunimet": {"Etunimet": "Testi"},
+                    "VakinainenKotimainenLahiosoite": {
+                        "LahiosoiteS": f"{address['street_name']} "
+                        f"{address['street_number']} A {hetu[-3:]}",
+                        "LahiosoiteR": f"{address['street_name_sv']} "
+                        f"{address['street_number']} A {hetu[-3:]}",
+                        "PostitoimipaikkaS": "HELSINKI",
+                        "PostitoimipaikkaR": "HELSINGFORS",
+                        "Postinumero": address["postal_code"],
+                    },
+                    "TilapainenKotimainenLahiosoite": None,
+                }
+            }
+        )
+
+
+class KamiService(MockService):
+    name = "kami"
+
+    def handle(self, method, path, query, body, headers):
+        address = self.state.address
+        return Response(
+            body={
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "Point",
+                            "coordinates": address["location"],
+                        },
+                        "properties": {
+                            "katunimi": address["street_name"],
+                            "gatan": address["street_name_sv"],
+                            "osoitenumero": int(address["street_number"]),
+                            "osoitenumero_teksti": address["street_number"],
+                            "postinumero": address["postal_code"],
+                            "kaupunki": "Helsinki",
+                            "staden": "Helsingfors",
+                        },
+                    }
+                ],
+            }
+        )
+
+
+class ProfileService(MockService):
+    """Helsinki Profile GraphQL API. The national id number of the
+    profile is read from the API token, "Bearer <national id number>"."""
+
+    name = "profile"
+
+    def handle(self, method, path, query, body, headers):
+        hetu = headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        return Response(
+            body={
+                "data": {
+                    "myProfile": {
+                        "id": str(uuid.uuid5(uuid.NAMESPACE_OID, hetu)),
+                        "language": "FINNISH",
+                        "verifiedPersonalInformation": {
+                            "firstName": "Testi",
+                            "lastName": "Kuormitus",
+                            "nationalIdentificationNumber": hetu,
+                        },
+                        "primaryPhone": {"phone": "+358401234567"},
+                        "primaryEmail": {"email": f"{hetu.lower()}@example.com"},
+                    }
+                }
+            }
+        )
+
+
+class ParkkihubiService(MockService):
+    name = "parkkihubi"
+
+    def handle(self, method, path, query, body, headers):
+        return Response(201 if method == "POST" else 200, json.loads(body or "{}"))
+
+
+class OIDCService(MockService):
+    """Token issuer whose tokens the app accepts with the loadtest.env
+    settings. POST /token with {"sub": ..., "claims": {...}} mints one."""
+
+    name = "oidc"
+
+    def handle(self, method, path, query, body, headers):
+        issuer = self.state.issuer
+        if path == "/.well-known/openid-configuration":
+            return Response(body={"issuer": issuer, "jwks_uri": f"{issuer}/jwks"})
+        if path == "/jwks":
+            return Response(body={"keys": [rsa_key.public_key_jwk]})
+        if method == "POST" and path == "/token":
+            data = json.loads(body)
+            now = datetime.datetime.now(datetime.UTC)
+            claims = {
+                "iss": issuer,
+                "aud": "parking-permits-loadtest",
+                "sub": data["sub"],
+                "iat": int(now.timestamp()),
+                "exp": int((now + TOKEN_LIFETIME).timestamp()),
+                **data.get("claims", {}),
+            }
+            token = jwt.encode(
+                claims, key=rsa_key.private_key_pem, algorithm=rsa_key.jose_algorithm
+            )
+            return Response(body={"access_token": token})
+        return Response(404, {})
+
+
+SERVICES = [
+    TalpaService,
+    TraficomService,
+    DVVService,
+    KamiService,
+    ProfileService,
+    ParkkihubiService,
+    OIDCService,
+]
+
+
+class State:
+    """State shared by the services and registered by the scenarios."""
+
+    def __init__(self, address, issuer):
+        self.address = address
+        self.issuer = issuer
+        self.talpa_orders = {}
+        self.vehicle_owners = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def count(self, service, status):
+        key = f"{service}:{status}"
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def handle_control(self, method, path, body):
+        if method == "PUT" and (match := re.fullmatch(r"/__mock/vehicles/(.+)", path)):
+            self.vehicle_owners[match[1]] = json.loads(body)["owner"]
+            return Response(body={})
+        if method == "PUT" and (match := re.fullmatch(r"/__mock/orders/(.+)", path)):
+            self.talpa_orders[match[1]] = json.loads(body)
+            return Response(body={})
+        if method == "GET" and path == "/__mock/stats":
+            return Response(body=self.counters)
+        return Response(404, {})
+
+
+def make_handler(service, state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug(f"{service.name}: {format % args}")
+
+        def _handle(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8") if length else ""
+
+            if url.path.startswith("/__mock/"):
+                response = state.handle_control(self.command, url.path, body)
+            elif service.fault.apply(service.rng):
+                response = Response(503, {"error": "Injected error"})
+            else:
+                try:
+                    response = service.handle(
+                        self.command,
+                        url.path,
+                        parse_qs(url.query),
+                        body,
+                        self.headers,
+                    )
+                except Exception as e:
+                    logger.exception(f"{service.name} mock failed")
+                    response = Response(500, {"error": repr(e)})
+                state.count(service.name, response.status)
+
+            self.send_response(response.status)
+            self.send_header("Content-Type", response.content_type)
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle  # noqa: N815
+
+    return Handler
+
+
+def _parse_overrides(values):
+    overrides = {}
+    for value in values or []:
+        name, _sep, amount = value.partition("=")
+        if name not in SERVICE_PORTS:
+            raise SystemExit(f"Unknown service {name}")
+        overrides[name] = float(amount)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=50, help="Mean latency ms.")
+    parser.add_argument("--jitter", type=float, default=20, help="Latency jitter ms.")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--service-latency", action="append", metavar="SERVICE=MS", default=[]
+    )
+    parser.add_argument(
+        "--service-error-rate", action="append", metavar="SERVICE=RATE", default=[]
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=pathlib.Path,
+        help="Fixtures file written by the prepare_load_test command, "
+        "its address is returned by DVV and Kami.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    address = DEFAULT_ADDRESS
+    if args.fixtures:
+        address = json.loads(args.fixtures.read_text())["address"]
+    state = State(address, f"http://{args.host}:{SERVICE_PORTS['oidc']}")
+
+    latencies = _parse_overrides(args.service_latency)
+    error_rates = _parse_overrides(args.service_error_rate)
+    servers = []
+    for service_class in SERVICES:
+        name = service_class.name
+        # the token issuer is not one of the measured integrations
+        fault = (
+            Fault()
+            if name == "oidc"
+            else Fault(
+                latencies.get(name, args.latency),
+                args.jitter,
+                error_rates.get(name, args.error_rate),
+            )
+        )
+        service = service_class(state, fault)
+        server = ThreadingHTTPServer(
+            (args.host, SERVICE_PORTS[name]), make_handler(service, state)
+        )
+        server.daemon_threads = True
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"{name} mock listening on {args.host}:{SERVICE_PORTS[name]}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+        logger.info(f"Requests served: {json.dumps(state.counters, indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Summarizes the throughput and tail latency of a Locust run from its
+--csv statistics, and fails when the run misses the given targets:
+
+    python -m loadtest.report loadtest-results --max-p99 2000 --max-failure-rate 0.01
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+
+def load_stats(prefix):
+    with open(f"{prefix}_stats.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def summarize(rows):
+    summary = []
+    for row in rows:
+        request_count = int(row["Request Count"])
+        summary.append(
+            {
+                "name": row["Name"] if row["Type"] else "Aggregated",
+                "method": row["Type"],
+                "requests": request_count,
+                "failure_rate": (
+                    int(row["Failure Count"]) / request_count if request_count else 0
+                ),
+                "rps": float(row["Requests/s"]),
+                "p50": float(row["50%"]),
+                "p95": float(row["95%"]),
+                "p99": float(row["99%"]),
+                "max": float(row["Max Response Time"]),
+            }
+        )
+    return summary
+
+
+def get_violations(summary, max_p99=None, max_failure_rate=None):
+    violations = []
+    for entry in summary:
+        if max_p99 is not None and entry["p99"] > max_p99:
+            violations.append(
+                f"{entry['name']}: p99 {entry['p99']:.0f} ms > {max_p99:.0f} ms"
+            )
+        if max_failure_rate is not None and entry["failure_rate"] > max_failure_rate:
+            violations.append(
+                f"{entry['name']}: failure rate {entry['failure_rate']:.2%} "
+                f"> {max_failure_rate:.2%}"
+            )
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("prefix", help="The --csv prefix of the Locust run.")
+    parser.add_argument("--max-p99", type=float, help="p99 target in ms.")
+    parser.add_argument("--max-failure-rate", type=float)
+    parser.add_argument("--json", help="Also write the summary to this file.")
+    args = parser.parse_args()
+
+    summary = summarize(load_stats(args.prefix))
+    sys.stdout.write(
+        f"{'request':<40} {'reqs':>8} {'fail':>7} {'rps':>8} "
+        f"{'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}\n"
+    )
+    for entry in summary:
+        sys.stdout.write(
+            f"{entry['name'][:40]:<40} {entry['requests']:>8} "
+            f"{entry['failure_rate']:>7.2%} {entry['rps']:>8.1f} "
+            f"{entry['p50']:>7.0f} {entry['p95']:>7.0f} "
+            f"{entry['p99']:>7.0f} {entry['max']:>7.0f}\n"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    violations = get_violations(summary, args.max_p99, args.max_failure_rate)
+    for violation in violations:
+        sys.stderr.write(f"{violation}\n")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
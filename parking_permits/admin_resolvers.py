@@ -10,20 +10,26 @@ from ariadne import (
     QueryType,
     ScalarType,
     UnionType,
+    convert_camel_case_to_snake,
 )
+from asgiref.sync import sync_to_async
 from dateutil.parser import isoparse
 from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from django.utils import timezone as tz
 from django.utils.translation import gettext_lazy as _
 
 import audit_logger as audit
-from audit_logger import AuditMsg
+from audit_logger import AuditMsg, ModelIds
 from parking_permits.models import (
     Address,
     Announcement,
     Customer,
+    DailyRefundRollup,
+    DailyRevenueRollup,
+    ExportJob,
     LowEmissionCriteria,
     Order,
     ParkingPermit,
@@ -41,6 +47,7 @@ from users.models import ParkingPermitGroups
 
 from .constants import DEFAULT_VAT, EventFields, Origin
 from .decorators import (
+    decorator_stack,
     is_customer_service,
     is_inspectors,
     is_preparators,
@@ -61,6 +68,7 @@ from .exceptions import (
     TraficomFetchVehicleError,
     UpdatePermitError,
 )
+from .export_jobs import create_export_job, get_download_url
 from .forms import (
     AddressSearchForm,
     AnnouncementSearchForm,
@@ -71,6 +79,19 @@ from .forms import (
     ProductSearchForm,
     RefundSearchForm,
 )
+from .loaders import (
+    get_loaders,
+    resolve_address_zone,
+    resolve_customer_other_address,
+    resolve_customer_primary_address,
+    resolve_permit_active_temporary_vehicle,
+    resolve_permit_address,
+    resolve_permit_customer,
+    resolve_permit_parking_zone,
+    resolve_permit_vehicle,
+    resolve_vehicle_power_type,
+    resolve_zone_resident_products,
+)
 from .models.order import OrderPaymentType, OrderStatus, OrderType
 from .models.parking_permit import (
     ContractType,
@@ -82,7 +103,7 @@ from .models.refund import RefundStatus
 from .models.vehicle import VehiclePowerType
 from .resolver_utils import create_refund, end_permits
 from .services import kami
-from .services.dvv import get_person_info
+from .services.dvv import async_get_person_info, get_person_info
 from .services.mail import (
     PermitEmailType,
     RefundEmailType,
@@ -116,16 +137,39 @@ audit_logger = audit.get_audit_logger_adapter(
 
 query = QueryType()
 mutation = MutationType()
+# the resolvers of the I/O-bound operations run as coroutines under ASGI,
+# replacing the resolvers of the same fields in the async schema
+async_query = QueryType()
+async_mutation = MutationType()
 PermitDetail = ObjectType("PermitDetailNode")
+export_job_node = ObjectType("ExportJobNode")
+paged_permits = ObjectType("PagedPermits")
+limited_paged_permits = ObjectType("LimitedPagedPermits")
+permit_node = ObjectType("PermitNode")
+limited_permit_node = ObjectType("LimitedPermitNode")
+customer_node = ObjectType("CustomerNode")
+address_node = ObjectType("AddressNode")
+vehicle_node = ObjectType("VehicleNode")
+zone_node = ObjectType("ZoneNode")
 parking_permit_event_gfk = UnionType("ParkingPermitEventGFK")
 datetime_range_scalar = ScalarType("DateTimeRange")
 schema_bindables = [
     query,
     mutation,
     PermitDetail,
+    export_job_node,
+    paged_permits,
+    limited_paged_permits,
+    permit_node,
+    limited_permit_node,
+    customer_node,
+    address_node,
+    vehicle_node,
+    zone_node,
     parking_permit_event_gfk,
     datetime_range_scalar,
 ]
+async_schema_bindables = [*schema_bindables, async_query, async_mutation]
 
 
 def _audit_post_process_paged_search(
@@ -152,7 +196,13 @@ def _audit_post_process_paged_search(
         msg.extra["search_params"] = search_params
         if return_val:
             msg.extra["page_info"] = return_val.get("page_info")
-            msg.target = return_val.get("objects")
+            objects = return_val.get("objects")
+            # the ids are encoded like the objects without loading them
+            msg.target = (
+                ModelIds.from_queryset(objects)
+                if isinstance(objects, QuerySet)
+                else objects
+            )
     except Exception as e:
         logger.error(
             "Something went wrong during audit message post processing", exc_info=e
@@ -220,15 +270,44 @@ def resolve_permit_detail(obj, info, permit_id):
 
 @PermitDetail.field("changeLogs")
 def resolve_permit_detail_history(permit, info):
-    return ParkingPermitEvent.objects.filter(parking_permit=permit).order_by(
-        "-created_at"
+    return (
+        ParkingPermitEvent.objects.filter(parking_permit=permit)
+        .select_related("created_by")
+        .prefetch_related("related_object")
+        .order_by("-created_at")
+    )
+
+
+@paged_permits.field("objects")
+@limited_paged_permits.field("objects")
+def resolve_paged_permit_objects(paged, info):
+    permits = list(paged["objects"])
+    get_loaders(info).prepare_permits(permits)
+    return permits
+
+
+for permit_type in (permit_node, limited_permit_node, PermitDetail):
+    permit_type.set_field("vehicle", resolve_permit_vehicle)
+    permit_type.set_field("address", resolve_permit_address)
+    permit_type.set_field("parkingZone", resolve_permit_parking_zone)
+    permit_type.set_field(
+        "activeTemporaryVehicle", resolve_permit_active_temporary_vehicle
     )
+permit_node.set_field("customer", resolve_permit_customer)
+PermitDetail.set_field("customer", resolve_permit_customer)
+customer_node.set_field("primaryAddress", resolve_customer_primary_address)
+customer_node.set_field("otherAddress", resolve_customer_other_address)
+address_node.set_field("zone", resolve_address_zone)
+vehicle_node.set_field("powerType", resolve_vehicle_power_type)
+zone_node.set_field("residentProducts", resolve_zone_resident_products)
 
 
 @query.field("zones")
 @is_customer_service
 def resolve_zones(obj, info):
-    return ParkingZone.objects.all().order_by("name")
+    zones = list(ParkingZone.objects.all().order_by("name"))
+    get_loaders(info).prepare_zones(zones)
+    return zones
 
 
 @query.field("zoneByLocation")
@@ -252,17 +331,37 @@ def resolve_customer(obj, info, **data):
     if national_id_number := query_params.get("national_id_number"):
         logger.info("Searching customer from DVV...")
         if customer := get_person_info(national_id_number):
-            if primary_address := customer.get("primary_address"):
-                customer["primary_address"] = update_or_create_address(primary_address)
-            if other_address := customer.get("other_address"):
-                customer["other_address"] = update_or_create_address(other_address)
+            update_customer_addresses(customer)
 
-    if not customer:
-        logger.info("Searching customer from DB...")
-        customer = Customer.objects.filter(**query_params).first()
-        if not customer:
-            raise ObjectNotFoundError(_("Customer not found"))
+    return customer or find_customer(query_params)
+
+
+@async_query.field("customer")
+@is_customer_service
+async def async_resolve_customer(obj, info, **data):
+    query_params = data.get("query")
+    customer = None
+
+    if national_id_number := query_params.get("national_id_number"):
+        logger.info("Searching customer from DVV...")
+        if customer := await async_get_person_info(national_id_number):
+            await sync_to_async(update_customer_addresses)(customer)
 
+    return customer or await sync_to_async(find_customer)(query_params)
+
+
+def update_customer_addresses(customer):
+    if primary_address := customer.get("primary_address"):
+        customer["primary_address"] = update_or_create_address(primary_address)
+    if other_address := customer.get("other_address"):
+        customer["other_address"] = update_or_create_address(other_address)
+
+
+def find_customer(query_params):
+    logger.info("Searching customer from DB...")
+    customer = Customer.objects.filter(**query_params).first()
+    if not customer:
+        raise ObjectNotFoundError(_("Customer not found"))
     return customer
 
 
@@ -282,24 +381,46 @@ def resolve_customers(obj, info, page_input, order_by=None, search_params=None):
     return form.get_paged_queryset()
 
 
-@query.field("vehicle")
-@is_customer_service
-@audit_logger.autolog(
-    AuditMsg(
-        "Admin retrieved vehicle.",
-        operation=audit.Operation.READ,
-        event_type=audit.EventType.TRAFICOM,
+vehicle_resolver = decorator_stack(
+    is_customer_service,
+    audit_logger.autolog(
+        AuditMsg(
+            "Admin retrieved vehicle.",
+            operation=audit.Operation.READ,
+            event_type=audit.EventType.TRAFICOM,
+        ),
+        autotarget=audit.target_return,
     ),
-    autotarget=audit.target_return,
 )
+
+
+@query.field("vehicle")
+@vehicle_resolver
 def resolve_vehicle(obj, info, reg_number: str, national_id_number: str):
     customer, _created = Customer.objects.get_or_create(
         national_id_number=national_id_number.upper()
     )
 
     vehicle = customer.fetch_vehicle_detail(reg_number)
+    check_customer_vehicle(customer, vehicle)
+    return vehicle
+
+
+@async_query.field("vehicle")
+@vehicle_resolver
+async def async_resolve_vehicle(obj, info, reg_number: str, national_id_number: str):
+    customer, _created = await sync_to_async(Customer.objects.get_or_create)(
+        national_id_number=national_id_number.upper()
+    )
+
+    vehicle = await Traficom().async_fetch_vehicle_details(reg_number)
+    await sync_to_async(check_customer_vehicle)(customer, vehicle)
+    return vehicle
+
+
+def check_customer_vehicle(customer, vehicle):
     if not settings.TRAFICOM_CHECK:
-        return vehicle
+        return
 
     is_user_of_vehicle = customer.is_user_of_vehicle(vehicle)
     if not is_user_of_vehicle:
@@ -307,8 +428,6 @@ def resolve_vehicle(obj, info, reg_number: str, national_id_number: str):
             _("Owner/holder data of a vehicle could not be verified")
         )
 
-    return vehicle
-
 
 def update_or_create_address(address_info):
     if not address_info:
@@ -448,6 +567,11 @@ def resolve_address_search(obj, info, search_input):
     return kami.search_address(search_text=search_input)
 
 
+@async_query.field("addressSearch")
+async def async_resolve_address_search(obj, info, search_input):
+    return await kami.async_search_address(search_text=search_input)
+
+
 @mutation.field("createResidentPermit")
 @is_customer_service
 @audit_logger.autolog(
@@ -1139,17 +1263,13 @@ def resolve_refunds(obj, info, page_input, order_by=None, search_params=None):
 @is_sanctions
 def resolve_request_for_approval(obj, info, ids):
     qs = Refund.objects.filter(id__in=ids, status=RefundStatus.OPEN)
-    qs.update(status=RefundStatus.REQUEST_FOR_APPROVAL)
+    qs.update(status=RefundStatus.REQUEST_FOR_APPROVAL, modified_at=tz.now())
     # send emails to customers
     refunds = Refund.objects.filter(
         id__in=ids, status=RefundStatus.REQUEST_FOR_APPROVAL
     ).prefetch_related("orders__customer")
     for refund in refunds:
-        send_refund_email(
-            RefundEmailType.CREATED,
-            refund.orders.first().customer,
-            [refund],
-        )
+        send_refund_email(RefundEmailType.CREATED, refund.customer, [refund])
     return qs.count()
 
 
@@ -1158,18 +1278,18 @@ def resolve_request_for_approval(obj, info, ids):
 def resolve_accept_refunds(obj, info, ids):
     request = info.context["request"]
     qs = Refund.objects.filter(id__in=ids, status=RefundStatus.REQUEST_FOR_APPROVAL)
+    now = tz.now()
     qs.update(
         status=RefundStatus.ACCEPTED,
-        accepted_at=tz.now(),
+        accepted_at=now,
         accepted_by=request.user,
+        modified_at=now,
     )
     accepted_refunds = Refund.objects.filter(
         id__in=ids, status=RefundStatus.ACCEPTED
     ).prefetch_related("orders__customer")
     for refund in accepted_refunds:
-        send_refund_email(
-            RefundEmailType.ACCEPTED, refund.orders.first().customer, [refund]
-        )
+        send_refund_email(RefundEmailType.ACCEPTED, refund.customer, [refund])
     return qs.count()
 
 
@@ -1222,6 +1342,46 @@ def resolve_orders(obj, info, page_input, order_by=None, search_params=None):
     return form.get_paged_queryset()
 
 
+@query.field("financialRollups")
+@is_sanctions_and_refunds
+def resolve_financial_rollups(obj, info, start_date, end_date):
+    date_range = (isoparse(start_date).date(), isoparse(end_date).date())
+    return {
+        "revenue": DailyRevenueRollup.objects.filter(date__range=date_range).order_by(
+            "date", "parking_zone_name", "product_type", "vat"
+        ),
+        "refunds": DailyRefundRollup.objects.filter(date__range=date_range).order_by(
+            "date", "status", "vat"
+        ),
+    }
+
+
+@query.field("exportJob")
+@is_preparators
+def resolve_export_job(obj, info, job_id):
+    # the jobs carry the exported search of the admin who created them
+    request = info.context["request"]
+    try:
+        return ExportJob.objects.get(id=job_id, created_by=request.user)
+    except ExportJob.DoesNotExist:
+        raise ObjectNotFoundError(_("Export job not found"))
+
+
+@mutation.field("createExportJob")
+@is_preparators
+def resolve_create_export_job(obj, info, file_format, data_type, params=None):
+    request = info.context["request"]
+    params = {convert_camel_case_to_snake(k): v for k, v in (params or {}).items()}
+    return create_export_job(request.user, file_format, data_type, params)
+
+
+@export_job_node.field("downloadUrl")
+def resolve_export_job_download_url(job, info):
+    if download_url := get_download_url(job):
+        return info.context["request"].build_absolute_uri(download_url)
+    return None
+
+
 @query.field("addresses")
 @is_super_admin
 def resolve_addresses(obj, info, page_input, order_by=None, search_params=None):
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ParkingPermitsAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "parking_permits"
+
+    def ready(self):
+        from django.conf import settings
+
+        from parking_permits import signals  # noqa: F401
+
+        if settings.GRAPHQL_TRACING_SAMPLE_RATE > 0:
+            from parking_permits.tracing import install_http_tracing
+
+            install_http_tracing()
@@ -0,0 +1,124 @@
+"""Async GraphQL views for the ASGI deployment.
+
+The operations whose root fields all have async resolvers in the async
+schema, i.e. the lookups that spend their time waiting for the external
+services, are executed in the event loop, so that a process serves many
+of them concurrently. Their nested fields are resolved in the thread of
+the sync code, as they may use the database. The other operations are
+executed with the sync schema in that thread, as the sync views are
+under ASGI.
+"""
+
+import inspect
+
+from ariadne.graphql import graphql, graphql_sync
+from ariadne.resolvers import is_default_resolver
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import JsonResponse
+from graphql import FieldNode, GraphQLError, OperationDefinitionNode
+
+from parking_permits.persisted_queries import PersistedQueryGraphQLView
+
+
+def get_async_root_fields(schema):
+    """Returns the names of the root fields with async resolvers by the
+    operation type."""
+    return {
+        operation: {
+            name
+            for name, field in root_type.fields.items()
+            if inspect.iscoroutinefunction(field.resolve)
+        }
+        for operation, root_type in (
+            ("query", schema.query_type),
+            ("mutation", schema.mutation_type),
+        )
+        if root_type
+    }
+
+
+def _evaluate(value):
+    # the execution in the event loop can't evaluate the querysets
+    return list(value) if isinstance(value, QuerySet) else value
+
+
+def resolve_in_thread(next_, obj, info, **kwargs):
+    """Resolves the nested fields of the async operations in the thread of
+    the sync code, except the fields of dicts without resolvers."""
+    if info.parent_type in (info.schema.query_type, info.schema.mutation_type):
+        return next_(obj, info, **kwargs)
+    field = info.parent_type.fields[info.field_name]
+    if isinstance(obj, dict) and is_default_resolver(field.resolve):
+        value = next_(obj, info, **kwargs)
+        if isinstance(value, QuerySet):
+            return sync_to_async(list)(value)
+        return value
+    return sync_to_async(lambda: _evaluate(next_(obj, info, **kwargs)))()
+
+
+class AsyncPersistedQueryGraphQLView(PersistedQueryGraphQLView):
+    async_schema = None
+    # the names of the root fields of the async schema by operation type
+    async_root_fields = None
+    # the extensions of the async operations, which are executed outside
+    # the thread of the database connection
+    async_extensions = None
+
+    async def get(self, request, *args, **kwargs):
+        return self._get(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        data, error_response = await sync_to_async(self.get_request_data)(request)
+        if error_response:
+            return error_response
+        if self.is_async_operation(data):
+            success, result = await graphql(
+                self.async_schema, data, **self.get_async_kwargs_graphql(request)
+            )
+        else:
+            success, result = await sync_to_async(graphql_sync)(
+                self.schema, data, **self.get_kwargs_graphql(request)
+            )
+        return JsonResponse(result, status=200 if success else 400)
+
+    def get_async_kwargs_graphql(self, request):
+        return {
+            **self.get_kwargs_graphql(request),
+            "extensions": self.async_extensions,
+            "middleware": [resolve_in_thread],
+        }
+
+    def get_operation(self, data):
+        query = data.get("query") if isinstance(data, dict) else None
+        if not isinstance(query, str):
+            return None
+        try:
+            document = self.persisted_queries.get_document(query)
+        except GraphQLError:
+            return None
+        operations = [
+            definition
+            for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+        ]
+        if operation_name := data.get("operationName"):
+            operations = [
+                operation
+                for operation in operations
+                if operation.name and operation.name.value == operation_name
+            ]
+        return operations[0] if len(operations) == 1 else None
+
+    def is_async_operation(self, data):
+        """Returns whether all the root fields of the operation have async
+        resolvers. The invalid operations are executed as sync to report
+        their errors."""
+        operation = self.get_operation(data)
+        if operation is None:
+            return False
+        async_fields = self.async_root_fields.get(operation.operation.value, set())
+        return all(
+            isinstance(selection, FieldNode) and selection.name.value in async_fields
+            for selection in operation.selection_set.selections
+        )
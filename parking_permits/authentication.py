@@ -0,0 +1,222 @@
+"""JWT authentication with cached key sets and verified claims.
+
+The key sets of the OIDC issuers are cached per process and refreshed in
+the background, and refetched when a token is signed with an unknown key
+after a key rotation. The claims of a verified token are cached by the
+hash of the token until the token expires, so only the user lookup of
+helusers is repeated for the following requests with the same token.
+Whether the session of the token has been terminated by a back-channel
+logout is checked on every request, as in helusers, and only an active
+session is cached, for SESSION_CHECK_CACHE_TIMEOUT seconds.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from helusers import oidc
+from helusers.authz import UserAuthorization
+from helusers.jwt import JWT, ValidationError
+from helusers.models import OIDCBackChannelLogoutEvent
+from helusers.user_utils import get_or_create_user
+from jose import jwt as jose_jwt
+
+from parking_permits.services.http import get_session
+
+logger = logging.getLogger("db")
+
+# seconds after which the key set is fetched again synchronously, if the
+# background refreshes have failed
+JWKS_MAX_AGE = 24 * 60 * 60
+# minimum seconds between the fetches caused by unknown key ids
+JWKS_MIN_REFETCH_INTERVAL = 60
+CLAIMS_CACHE_MAX_SIZE = 10000
+# seconds a session found active is not checked again; a logout event
+# clears the cached result of its session in the process receiving it
+SESSION_CHECK_CACHE_TIMEOUT = 10
+
+
+def fetch_jwks(issuer):
+    session = get_session()
+    config = session.get(issuer + "/.well-known/openid-configuration").json()
+    return session.get(config["jwks_uri"]).json()
+
+
+def get_key_ids(jwks):
+    return {key.get("kid") for key in jwks.get("keys", [])}
+
+
+class JWKSCache:
+    def __init__(self, fetch=fetch_jwks):
+        self.fetch = fetch
+        # issuer -> (key set, fetched at)
+        self._jwks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._jwks.clear()
+
+    def _fetch(self, issuer):
+        jwks = self.fetch(issuer)
+        with self._lock:
+            self._jwks[issuer] = (jwks, time.monotonic())
+        return jwks
+
+    def _refresh(self, issuer):
+        try:
+            self._fetch(issuer)
+        except Exception:
+            logger.exception(f"Refreshing the key set of {issuer} failed")
+        finally:
+            with self._lock:
+                self._refreshing.discard(issuer)
+
+    def _refresh_in_background(self, issuer):
+        with self._lock:
+            if issuer in self._refreshing:
+                return
+            self._refreshing.add(issuer)
+        threading.Thread(target=self._refresh, args=(issuer,), daemon=True).start()
+
+    def get_keys(self, issuer, key_id=None):
+        """Returns the key set of the issuer, fetching it again if it
+        doesn't contain the key the token is signed with."""
+        jwks, fetched_at = self._jwks.get(issuer, (None, None))
+        if jwks is None:
+            return self._fetch(issuer)
+
+        age = time.monotonic() - fetched_at
+        if key_id is not None and key_id not in get_key_ids(jwks):
+            if age < JWKS_MIN_REFETCH_INTERVAL:
+                return jwks
+            return self._fetch(issuer)
+        if age > JWKS_MAX_AGE:
+            return self._fetch(issuer)
+        if age > settings.OIDC_JWKS_REFRESH_INTERVAL:
+            self._refresh_in_background(issuer)
+        return jwks
+
+
+class ClaimsCache:
+    """The claims of the verified tokens by the hash of the token."""
+
+    def __init__(self, max_size=CLAIMS_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._claims = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+
+    def get(self, token_hash):
+        with self._lock:
+            cached = self._claims.get(token_hash)
+            if cached is None:
+                return None
+            claims, expires_at = cached
+            if expires_at <= time.time():
+                del self._claims[token_hash]
+                return None
+            self._claims.move_to_end(token_hash)
+            return claims
+
+    def set(self, token_hash, claims):
+        with self._lock:
+            self._claims[token_hash] = (claims, claims["exp"])
+            while len(self._claims) > self.max_size:
+                self._claims.popitem(last=False)
+
+
+jwks_cache = JWKSCache()
+claims_cache = ClaimsCache()
+
+
+@receiver(setting_changed)
+def _clear_caches(setting, **kwargs):
+    if setting == "OIDC_API_TOKEN_AUTH":
+        jwks_cache.clear()
+        claims_cache.clear()
+
+
+def _get_session_cache_key(iss, sid):
+    session_hash = hashlib.sha256(f"{iss} {sid}".encode()).hexdigest()
+    return f"oidc-session-active:{session_hash}"
+
+
+@receiver(post_save, sender=OIDCBackChannelLogoutEvent)
+def _clear_session_check(sender, instance, **kwargs):
+    cache.delete(_get_session_cache_key(instance.iss, instance.sid))
+
+
+def _is_session_terminated(claims):
+    sid = claims.get("sid")
+    if not sid:
+        return False
+    cache_key = _get_session_cache_key(claims["iss"], sid)
+    if cache.get(cache_key):
+        return False
+    terminated = OIDCBackChannelLogoutEvent.objects.filter(
+        iss=claims["iss"], sid=sid
+    ).exists()
+    if not terminated:
+        cache.set(cache_key, True, SESSION_CHECK_CACHE_TIMEOUT)
+    return terminated
+
+
+class RequestJWTAuthentication(oidc.RequestJWTAuthentication):
+    def verify(self, encoded_jwt):
+        """Returns the claims of the token, or None if the value isn't a
+        JWT. Raises an AuthenticationError if the token isn't valid."""
+        token_hash = hashlib.sha256(encoded_jwt.encode()).hexdigest()
+        if claims := claims_cache.get(token_hash):
+            return claims
+
+        try:
+            token = JWT(encoded_jwt)
+        except Exception:
+            return None
+        try:
+            token.validate_issuer()
+        except ValidationError as e:
+            raise oidc.AuthenticationError(str(e)) from e
+
+        try:
+            key_id = jose_jwt.get_unverified_header(encoded_jwt).get("kid")
+            keys = jwks_cache.get_keys(token.issuer, key_id)
+            token.validate(keys, oidc.accepted_audience())
+            token.validate_api_scope()
+        except ValidationError as e:
+            raise oidc.AuthenticationError(str(e)) from e
+        except Exception:
+            raise oidc.AuthenticationError("JWT verification failed.")
+
+        claims_cache.set(token_hash, token.claims)
+        return token.claims
+
+    def authenticate(self, request):
+        try:
+            auth_scheme, encoded_jwt = request.headers["Authorization"].split()
+            if auth_scheme.lower() != "bearer":
+                return None
+        except Exception:
+            return None
+
+        claims = self.verify(encoded_jwt)
+        if claims is None:
+            return None
+        # checked on every request, the session can be terminated before
+        # the token expires
+        if _is_session_terminated(claims):
+            raise oidc.AuthenticationError("Session has been terminated.")
+        user = get_or_create_user(claims, oidc=True)
+        return UserAuthorization(user, claims)
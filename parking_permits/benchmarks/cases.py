@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+import pathlib
+import xml.etree.ElementTree as ET  # noqa: N817
+from unittest import mock
+
+from dateutil.relativedelta import relativedelta
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+from django.utils import timezone as tz
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits.benchmarks.runner import BenchmarkSkippedError, benchmark
+from parking_permits.customer_permit import CustomerPermit
+from parking_permits.exporters import DataExporter
+from parking_permits.graphql import admin_view, view
+from parking_permits.models import (
+    Customer,
+    Order,
+    ParkingPermit,
+    ParkingZone,
+    PermitCountSnapshot,
+)
+from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
+from parking_permits.services.parkkihubi import Parkkihubi
+from parking_permits.services.traficom import TraficomVehicleDetailsSynchronizer
+from parking_permits.utils import get_permit_prices
+from users.models import ParkingPermitGroups, User
+
+TRAFICOM_XML_PATH = (
+    pathlib.Path(__file__).parent.parent
+    / "tests"
+    / "services"
+    / "mocks"
+    / "traficom"
+    / "vehicle_ok.xml"
+)
+EXPORT_ROW_COUNT = 2000
+
+ADMIN_PERMITS_QUERY = """
+    query Permits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {
+        permits(pageInput: $pageInput, searchParams: $searchParams) {
+            objects {
+                id
+                status
+                customer { firstName lastName }
+                vehicle { registrationNumber }
+            }
+            pageInfo { numPages page next prev count }
+        }
+    }
+"""
+CUSTOMER_PERMITS_QUERY = """
+    query GetPermits {
+        getPermits { id status vehicle { registrationNumber } }
+    }
+"""
+
+
+def _get_priced_permit(**filters):
+    """Returns a valid permit of the data set whose zone has a resident
+    product for the current date."""
+    today = tz.localdate()
+    permit = (
+        ParkingPermit.objects.filter(
+            status=ParkingPermitStatus.VALID,
+            vehicle__isnull=False,
+            parking_zone__products__start_date__lte=today,
+            parking_zone__products__end_date__gte=today,
+            **filters,
+        )
+        .select_related("customer", "vehicle__power_type", "parking_zone")
+        .order_by("pk")
+        .first()
+    )
+    if not permit:
+        raise BenchmarkSkippedError(
+            "No valid permits with current products, generate the data set "
+            "with generate_synthetic_data."
+        )
+    return permit
+
+
+def _execute_graphql(view, user, query, variables=None):
+    request = RequestFactory().post(
+        "/graphql",
+        json.dumps({"query": query, "variables": variables or {}}),
+        content_type="application/json",
+    )
+    # token verification is not part of the benchmarked query
+    with mock.patch.object(
+        parking_permits.decorators.RequestJWTAuthentication,
+        "authenticate",
+        return_value=UserAuthorization(user, {}),
+    ):
+        response = view(request)
+    data = json.loads(response.content)
+    if data.get("errors"):
+        raise RuntimeError(data["errors"])
+    return data
+
+
+@benchmark("pricing.get_permit_prices")
+def bench_get_permit_prices():
+    permit = _get_priced_permit()
+    start_date = tz.localdate()
+    end_date = start_date + relativedelta(months=12, days=-1)
+    return lambda: get_permit_prices(
+        permit.parking_zone, False, False, start_date, end_date
+    )
+
+
+@benchmark("pricing.get_price_change_list")
+def bench_get_price_change_list():
+    permit = _get_priced_permit(contract_type=ContractType.FIXED_PERIOD)
+    new_zone = (
+        ParkingZone.objects.filter(products__start_date__lte=tz.localdate())
+        .exclude(pk=permit.parking_zone_id)
+        .first()
+    ) or permit.parking_zone
+    return lambda: permit.get_price_change_list(new_zone, True)
+
+
+@benchmark("orders.create_for_permits")
+def bench_create_order():
+    permit = _get_priced_permit()
+    return lambda: Order.objects.create_for_permits([permit])
+
+
+@benchmark("refunds.total_refund_amount")
+def bench_refund_amount():
+    permit = _get_priced_permit(order_items__isnull=False)
+    return lambda: permit.total_refund_amount
+
+
+@benchmark("customer_permit.get")
+def bench_customer_permit_get():
+    permit = _get_priced_permit()
+    return lambda: CustomerPermit(permit.customer_id).get()
+
+
+@benchmark("parkkihubi.get_payload_data")
+def bench_parkkihubi_payload():
+    permit = _get_priced_permit()
+    return lambda: Parkkihubi(permit).get_payload_data()
+
+
+@benchmark("traficom.parse_vehicle_details")
+def bench_traficom_parse():
+    xml = TRAFICOM_XML_PATH.read_text(encoding="latin-1")
+    synchronizer = TraficomVehicleDetailsSynchronizer("BCI-707")
+    return lambda: synchronizer._serialize(ET.fromstring(xml))
+
+
+@benchmark("export.permits_csv")
+def bench_permits_csv_export():
+    permit_ids = list(
+        ParkingPermit.objects.order_by("-pk").values_list("pk", flat=True)[
+            :EXPORT_ROW_COUNT
+        ]
+    )
+    if not permit_ids:
+        raise BenchmarkSkippedError("No permits in the data set.")
+
+    def export():
+        exporter = DataExporter(
+            "permits", ParkingPermit.objects.filter(pk__in=permit_ids)
+        )
+        writer = csv.writer(io.StringIO())
+        for row in exporter.iter_rows():
+            writer.writerow(row)
+
+    return export
+
+
+@benchmark("reporting.build_daily_snapshot")
+def bench_build_daily_snapshot():
+    return PermitCountSnapshot.build_daily_snapshot
+
+
+@benchmark("graphql.admin_permits")
+def bench_admin_permits_query():
+    """Searches the valid permits by the last name of a customer, as the
+    admins do, which goes through the trigram indexes of the search
+    documents."""
+    customer = _get_priced_permit().customer
+    user = User.objects.create(username="benchmark-admin")
+    user.groups.get_or_create(name=ParkingPermitGroups.SUPER_ADMIN)
+    variables = {
+        "pageInput": {"page": 1},
+        "searchParams": {
+            "q": customer.last_name,
+            "status": ParkingPermitStatus.VALID,
+        },
+    }
+
+    def query():
+        data = _execute_graphql(admin_view, user, ADMIN_PERMITS_QUERY, variables)
+        if not data["data"]["permits"]["objects"]:
+            raise RuntimeError(f"No permits found with {customer.last_name!r}.")
+
+    return query
+
+
+@benchmark("graphql.customer_get_permits")
+def bench_customer_permits_query():
+    customer = Customer.objects.get(pk=_get_priced_permit().customer_id)
+    customer.user = User.objects.create(username="benchmark-customer")
+    customer.save(update_fields=["user"])
+    return lambda: _execute_graphql(view, customer.user, CUSTOMER_PERMITS_QUERY)
+
+
+def _request_connection(**settings):
+    """Returns a callable running a query the way a request does, on a
+    connection of its own with the settings, to time the connection setup
+    saved by persistent or pooled connections."""
+    wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+    wrapper.settings_dict = {**wrapper.settings_dict, **settings}
+
+    def request():
+        # as on request_started and request_finished
+        wrapper.close_if_unusable_or_obsolete()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close_if_unusable_or_obsolete()
+
+    return request
+
+
+@benchmark("db.request_connection")
+def bench_request_connection():
+    """A new connection per request, or a pooled one with DATABASE_POOL."""
+    return _request_connection(CONN_MAX_AGE=0)
+
+
+@benchmark("db.request_persistent_connection")
+def bench_request_persistent_connection():
+    if connections[DEFAULT_DB_ALIAS].settings_dict["OPTIONS"].get("pool"):
+        raise BenchmarkSkippedError("The connections are pooled.")
+    return _request_connection(CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True)
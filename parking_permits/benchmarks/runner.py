@@ -0,0 +1,118 @@
+import json
+import platform
+import statistics
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone as tz
+
+# name -> setup function returning the callable that is timed
+BENCHMARKS = {}
+
+
+class BenchmarkSkippedError(Exception):
+    """Raised by a benchmark setup when the data set lacks the data
+    the benchmark needs."""
+
+
+def benchmark(name):
+    """Registers a benchmark. The decorated function does the setup and
+    returns the callable to time; both run in a transaction that is
+    rolled back, so benchmarks may write to the database."""
+
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def _percentile(timings, percentile):
+    ordered = sorted(timings)
+    index = min(round(percentile / 100 * (len(ordered) - 1)), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_benchmark(setup, rounds=10, warmup=2):
+    """Times the benchmark and returns its statistics in milliseconds."""
+    timings = []
+    with transaction.atomic():
+        func = setup()
+        for index in range(warmup + rounds):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    func()
+                    elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            if index >= warmup:
+                timings.append(elapsed * 1000)
+        transaction.set_rollback(True)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "p95": _percentile(timings, 95),
+        "max": max(timings),
+        "queries": len(queries),
+    }
+
+
+def run_benchmarks(names, rounds=10, warmup=2, on_result=None):
+    results = {}
+    for name in names:
+        try:
+            result = run_benchmark(BENCHMARKS[name], rounds=rounds, warmup=warmup)
+        except BenchmarkSkippedError as e:
+            result = {"skipped": str(e)}
+        except Exception as e:
+            # a broken benchmark must not stop the others from running
+            result = {"error": repr(e)}
+        results[name] = result
+        if on_result:
+            on_result(name, result)
+    return results
+
+
+def get_environment():
+    from parking_permits.models import Customer, ParkingPermit
+
+    return {
+        "created_at": tz.now().isoformat(),
+        "python": platform.python_version(),
+        "database": connection.settings_dict["NAME"],
+        "customers": Customer.objects.count(),
+        "permits": ParkingPermit.objects.count(),
+    }
+
+
+def save_results(path, results):
+    with open(path, "w") as f:
+        json.dump({"environment": get_environment(), "results": results}, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(baseline, current, threshold):
+    """Compares the medians of the benchmarks run in both result sets.
+
+    Returns (name, baseline median, current median, relative change)
+    tuples sorted by the change, and the names of the benchmarks that
+    are slower than the baseline by more than the threshold."""
+    rows = []
+    for name, result in current.items():
+        baseline_result = baseline.get(name)
+        if not baseline_result or "median" not in baseline_result:
+            continue
+        if "median" not in result:
+            continue
+        change = result["median"] / baseline_result["median"] - 1
+        rows.append((name, baseline_result["median"], result["median"], change))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    regressions = [name for name, _before, _after, change in rows if change > threshold]
+    return rows, regressions
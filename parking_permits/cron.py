@@ -6,6 +6,10 @@ from django.utils import timezone as tz
 
 from parking_permits.customer_permit import CustomerPermit
 from parking_permits.exceptions import CustomerCannotBeAnonymizedError
+from parking_permits.export_jobs import (
+    delete_expired_export_jobs,
+    process_export_jobs,
+)
 from parking_permits.models import (
     Announcement,
     Customer,
@@ -17,6 +21,8 @@ from parking_permits.models.parking_permit import (
     ParkingPermitEndType,
     ParkingPermitStatus,
 )
+from parking_permits.models.reporting import refresh_financial_rollups
+from parking_permits.partitioning import maintain_partitions
 from parking_permits.services.mail import (
     PermitEmailType,
     send_announcement_emails,
@@ -45,15 +51,19 @@ def handle_announcement_emails():
         logger.info(f"Announcement {announcement.pk} emails handled")
 
 
-def automatic_expiration_of_permits():
-    logger.info("Automatically ending permits started...")
-    now = tz.localtime(tz.now())
-    ending_permits = ParkingPermit.objects.filter(
+def get_ending_permits(now):
+    return ParkingPermit.objects.filter(
         Q(end_time__lt=now)
         | Q(vehicle_changed=True, vehicle_changed_date__lt=now.date())
         | Q(address_changed=True, address_changed_date__lt=now.date()),
         status=ParkingPermitStatus.VALID,
     )
+
+
+def automatic_expiration_of_permits():
+    logger.info("Automatically ending permits started...")
+    now = tz.localtime(tz.now())
+    ending_permits = get_ending_permits(now)
     for permit in ending_permits:
         CustomerPermit(permit.customer_id).end(
             [permit.id],
@@ -74,16 +84,20 @@ def automatic_expiration_of_permits():
     logger.info("Automatically ending permits completed.")
 
 
-def automatic_expiration_remind_notification_of_permits():
-    logger.info("Automatically sending remind notifications for permits started...")
-    count = 0
-    current_date = tz.localdate(tz.now())
-    expiring_permits = ParkingPermit.objects.filter(
+def get_expiring_permits(current_date):
+    return ParkingPermit.objects.filter(
         Q(end_time__date=current_date + relativedelta(weeks=1))
         | Q(end_time__date=current_date + relativedelta(days=1)),
         status=ParkingPermitStatus.VALID,
         contract_type=ContractType.FIXED_PERIOD,
     )
+
+
+def automatic_expiration_remind_notification_of_permits():
+    logger.info("Automatically sending remind notifications for permits started...")
+    count = 0
+    current_date = tz.localdate(tz.now())
+    expiring_permits = get_expiring_permits(current_date)
     for permit in expiring_permits:
         success = send_permit_email(PermitEmailType.EXPIRATION_REMIND, permit)
         if success:
@@ -138,6 +152,16 @@ def automatic_remove_obsolete_customer_data():
     )
 
 
+def get_permits_to_sync():
+    statuses_to_sync = [
+        ParkingPermitStatus.CLOSED,
+        ParkingPermitStatus.VALID,
+    ]
+    return ParkingPermit.objects.filter(
+        synced_with_parkkihubi=False, status__in=statuses_to_sync
+    )
+
+
 def automatic_syncing_of_permits_to_parkkihubi():
     logger.info("Automatically syncing permits to Parkkihubi started...")
 
@@ -157,13 +181,7 @@ def automatic_syncing_of_permits_to_parkkihubi():
             f"because it is in the past."
         )
 
-    statuses_to_sync = [
-        ParkingPermitStatus.CLOSED,
-        ParkingPermitStatus.VALID,
-    ]
-    permits = ParkingPermit.objects.filter(
-        synced_with_parkkihubi=False, status__in=statuses_to_sync
-    )
+    permits = get_permits_to_sync()
     permit_count = permits.count()
     for permit in permits:
         sync_with_parkkihubi(permit)
@@ -172,3 +190,32 @@ def automatic_syncing_of_permits_to_parkkihubi():
         "Automatically syncing permits to Parkkihubi completed. "
         f"{permit_count} permits synced."
     )
+
+
+def automatic_refresh_of_financial_rollups():
+    logger.info("Automatically refreshing financial rollups started...")
+    dates = refresh_financial_rollups()
+    logger.info(
+        "Automatically refreshing financial rollups completed. "
+        f"{len(dates)} dates refreshed."
+    )
+
+
+def automatic_processing_of_export_jobs():
+    count = process_export_jobs()
+    if count:
+        logger.info(f"Automatically processed {count} export jobs.")
+
+
+def automatic_removal_of_expired_export_jobs():
+    count = delete_expired_export_jobs()
+    logger.info(f"Automatically removed {count} expired export jobs.")
+
+
+def automatic_maintenance_of_partitions():
+    logger.info("Automatically maintaining partitions started...")
+    created, dropped = maintain_partitions()
+    logger.info(
+        "Automatically maintaining partitions completed. "
+        f"{len(created)} partitions created, {len(dropped)} partitions dropped."
+    )
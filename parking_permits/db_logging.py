@@ -0,0 +1,219 @@
+"""Non-blocking handler of the "db" logger.
+
+The records are put to a bounded queue and written to the StatusLog table
+of django-db-logger in batches by a background thread, so that logging
+doesn't wait for the database. Identical records, by logger, level and
+message, are written once per window and the repeats are summarized in
+one record at the end of the window, and the records over the limit of a
+window are dropped, so that an error storm during an integration outage
+doesn't multiply the load of the database.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import Counter
+from logging.handlers import QueueHandler
+
+from django.db import close_old_connections
+from django_db_logger.config import DJANGO_DB_LOGGER_ENABLE_FORMATTER
+from django_db_logger.db_log_handler import DatabaseLogHandler, db_default_formatter
+
+# the handlers of this process, for the metrics
+_handlers = weakref.WeakSet()
+
+
+class QueuedDatabaseLogHandler(QueueHandler):
+    def __init__(
+        self,
+        level=logging.NOTSET,
+        queue_size=10000,
+        batch_size=100,
+        flush_interval=1.0,
+        window=60.0,
+        max_records_per_window=1000,
+    ):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.setLevel(level)
+        self.batch_size = batch_size
+        # seconds the writer waits for records, 0 writes them immediately
+        self.flush_interval = flush_interval
+        self.window = window
+        self.max_records_per_window = max_records_per_window
+        # written, dropped and aggregated, i.e. not written as repeats
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        # the first record and the number of repeats by the key of a record
+        self._repeats = {}
+        self._stopped = threading.Event()
+        self._writer_pid = None
+        _handlers.add(self)
+
+    def prepare(self, record):
+        """Formats the message and the traceback of the record in the
+        logging thread, as the writer stores them as text."""
+        record = copy.copy(record)
+        if DJANGO_DB_LOGGER_ENABLE_FORMATTER:
+            record.msg = DatabaseLogHandler.format(self, record)
+        else:
+            record.msg = record.getMessage()
+        record.trace = (
+            db_default_formatter.formatException(record.exc_info)
+            if record.exc_info
+            else None
+        )
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+    def emit(self, record):
+        try:
+            record = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        key = (record.name, record.levelno, record.msg)
+        with self._lock:
+            self._roll_window()
+            if key in self._repeats:
+                self._repeats[key][1] += 1
+                self.counters["aggregated"] += 1
+                return
+            if len(self._repeats) >= self.max_records_per_window:
+                self.counters["dropped"] += 1
+                return
+            self._repeats[key] = [record, 0]
+        self.enqueue(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.counters["dropped"] += 1
+        if self.flush_interval <= 0:
+            # the database can't be used in the event loop of an async
+            # view, the records are written by the next flush outside it
+            if not _in_event_loop():
+                self.flush()
+        else:
+            self._start_writer()
+
+    def _roll_window(self):
+        """Starts a new window when the current one has passed, enqueuing
+        the summaries of the repeated records. Called with the lock held."""
+        now = time.monotonic()
+        if now - self._window_start < self.window:
+            return
+        repeats, self._repeats = self._repeats, {}
+        self._window_start = now
+        for record, count in repeats.values():
+            if count:
+                summary = copy.copy(record)
+                summary.msg = (
+                    f"{record.msg} (repeated {count} times in {self.window:g} seconds)"
+                )
+                summary.trace = None
+                try:
+                    self.queue.put_nowait(summary)
+                except queue.Full:
+                    self.counters["dropped"] += 1
+
+    def _start_writer(self):
+        # started in the worker process, the thread doesn't survive a fork
+        if self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+        threading.Thread(target=self._write_batches, name="db-log", daemon=True).start()
+
+    def _write_batches(self):
+        while not self._stopped.is_set():
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            batch += self._get_queued(self.batch_size - len(batch))
+            with self._lock:
+                self._roll_window()
+            if batch:
+                self._write(batch)
+            close_old_connections()
+
+    def _get_queued(self, max_count):
+        records = []
+        while len(records) < max_count:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _write(self, records):
+        try:
+            from django_db_logger.models import StatusLog
+
+            StatusLog.objects.bulk_create(
+                [
+                    StatusLog(
+                        logger_name=record.name,
+                        level=record.levelno,
+                        msg=record.msg,
+                        trace=record.trace,
+                    )
+                    for record in records
+                ]
+            )
+        except Exception:
+            # not logged to the "db" logger, which would only add to the queue
+            logging.getLogger("django").exception(
+                f"Writing {len(records)} db log records failed"
+            )
+            with self._lock:
+                self.counters["dropped"] += len(records)
+            return
+        with self._lock:
+            self.counters["written"] += len(records)
+
+    def flush(self):
+        """Writes the queued records in the calling thread."""
+        while records := self._get_queued(self.batch_size):
+            self._write(records)
+
+    def close(self):
+        self._stopped.set()
+        self.flush()
+        _handlers.discard(self)
+        super().close()
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def render_metrics():
+    """Renders the counters of the handlers in the Prometheus text format."""
+    totals = Counter()
+    for handler in list(_handlers):
+        with handler._lock:
+            totals.update(handler.counters)
+    lines = []
+    for name in ("written", "dropped", "aggregated"):
+        metric = f"db_log_records_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {totals[name]}")
+    return "\n".join(lines) + "\n"
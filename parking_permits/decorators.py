@@ -1,29 +1,70 @@
+import inspect
 from functools import wraps
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import PermissionDenied
-from helusers.oidc import AuthenticationError, RequestJWTAuthentication
+from helusers.oidc import AuthenticationError
+
+from parking_permits.authentication import RequestJWTAuthentication
+
+
+def authenticate(request):
+    """Authenticates the request once, as the user is checked for every
+    resolved field, so that the same user instance with its roles loaded
+    is used for the whole request."""
+    if not hasattr(request, "_authorization"):
+        try:
+            request._authorization = RequestJWTAuthentication().authenticate(request)
+        except AuthenticationError as e:
+            request._authorization = e
+    if isinstance(request._authorization, AuthenticationError):
+        raise PermissionDenied(request._authorization)
+    return request._authorization
 
 
 def user_passes_test(test_func):
+    def get_user(request):
+        auth = authenticate(request)
+        if auth and test_func(auth.user):
+            return auth.user
+        raise PermissionDenied()
+
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+
+            @wraps(f)
+            async def async_wrapper(obj, info, *args, **kwargs):
+                request = info.context["request"]
+                # the user and its roles are loaded from the database
+                request.user = await sync_to_async(get_user)(request)
+                return await f(obj, info, *args, **kwargs)
+
+            return async_wrapper
+
         @wraps(f)
         def wrapper(obj, info, *args, **kwargs):
             request = info.context["request"]
-            try:
-                auth = RequestJWTAuthentication().authenticate(request)
-            except AuthenticationError as e:
-                raise PermissionDenied(e)
-
-            if auth and test_func(auth.user):
-                request.user = auth.user
-                return f(obj, info, *args, **kwargs)
-            raise PermissionDenied()
+            request.user = get_user(request)
+            return f(obj, info, *args, **kwargs)
 
         return wrapper
 
     return decorator
 
 
+def decorator_stack(*decorators):
+    """Returns a decorator that applies the decorators as if they were
+    stacked in the given order, so that the sync and the async resolvers of
+    a field share their permission and audit configuration."""
+
+    def decorator(f):
+        for d in reversed(decorators):
+            f = d(f)
+        return f
+
+    return decorator
+
+
 is_authenticated = user_passes_test(lambda u: u.is_authenticated)
 is_super_admin = user_passes_test(lambda u: u.is_super_admin)
 is_sanctions_and_refunds = user_passes_test(lambda u: u.is_sanctions_and_refunds)
@@ -37,11 +78,7 @@ def require_user_passes_test(test_func):
     def decorator(f):
         @wraps(f)
         def wrapper(request, *args, **kwargs):
-            try:
-                auth = RequestJWTAuthentication().authenticate(request)
-            except AuthenticationError as e:
-                raise PermissionDenied(e)
-
+            auth = authenticate(request)
             if auth and test_func(auth.user):
                 request.user = auth.user
                 return f(request, *args, **kwargs)
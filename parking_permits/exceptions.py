@@ -124,3 +124,7 @@ class DeletionNotAllowedError(ParkingPermitBaseError):
 
 class CustomerCannotBeAnonymizedError(ParkingPermitBaseError):
     pass
+
+
+class ExportJobError(ParkingPermitBaseError):
+    pass
@@ -0,0 +1,221 @@
+import csv
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone as tz
+from django.utils.translation import gettext_lazy as _
+
+from .exceptions import ExportJobError
+from .forms import CSV_EXPORT_FORM_MAPPING, PdfExportForm
+from .models.export_job import ExportFileFormat, ExportJob, ExportJobStatus
+
+logger = logging.getLogger("db")
+
+DOWNLOAD_TOKEN_SALT = "parking_permits.export_jobs.download"
+
+
+def _get_export_form(file_format, data_type, params):
+    if file_format == ExportFileFormat.CSV:
+        form_class = CSV_EXPORT_FORM_MAPPING.get(data_type)
+        if not form_class:
+            raise ExportJobError(_("Unknown export data type"))
+        return form_class(params)
+    if file_format == ExportFileFormat.PDF:
+        return PdfExportForm({**params, "data_type": data_type})
+    raise ExportJobError(_("Unknown export file format"))
+
+
+def get_params_hash(file_format, data_type, params):
+    payload = json.dumps(
+        [file_format, data_type, params], sort_keys=True, cls=DjangoJSONEncoder
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _get_running_timeout_limit(now):
+    return now - timedelta(minutes=settings.EXPORT_JOB_RUNNING_TIMEOUT_MINUTES)
+
+
+def create_export_job(user, file_format, data_type, params):
+    """Enqueues an export job for the worker, or returns the pending or
+    running job of the user with the same parameters. A job running for
+    longer than the running timeout is not returned, as its worker has
+    most likely died."""
+    params = params or {}
+    form = _get_export_form(file_format, data_type, params)
+    if not form.is_valid():
+        logger.error(f"Export job parameters error: {form.errors}")
+        raise ExportJobError(_("Invalid export parameters"))
+
+    params_hash = get_params_hash(file_format, data_type, params)
+    existing_job = (
+        ExportJob.objects.filter(
+            Q(status=ExportJobStatus.PENDING)
+            | Q(
+                status=ExportJobStatus.RUNNING,
+                started_at__gte=_get_running_timeout_limit(tz.now()),
+            ),
+            params_hash=params_hash,
+            created_by=user,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if existing_job:
+        return existing_job
+
+    return ExportJob.objects.create(
+        file_format=file_format,
+        data_type=data_type,
+        params=params,
+        params_hash=params_hash,
+        created_by=user,
+        modified_by=user,
+    )
+
+
+def _write_csv_file(job, form, path):
+    # the exporters load fpdf, which the resolvers creating the jobs don't need
+    from .exporters import DataExporter
+
+    data_exporter = DataExporter(job.data_type, form.get_queryset())
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(data_exporter.get_headers())
+        writer.writerows(data_exporter.iter_rows())
+
+
+def _write_pdf_file(job, form, path):
+    from .exporters import PdfExporter
+
+    pdf = PdfExporter(job.data_type, form.cleaned_data["object_id"]).get_pdf()
+    if not pdf:
+        raise ExportJobError(_("Export object not found"))
+    path.write_bytes(pdf.output(dest="S").encode("latin-1"))
+
+
+def run_export_job(job):
+    """Generates the export file of the job into the export storage
+    directory and marks the job completed or failed."""
+    form = _get_export_form(job.file_format, job.data_type, job.params)
+    storage_dir = Path(settings.EXPORT_JOB_STORAGE_DIR)
+    storage_dir.mkdir(parents=True, exist_ok=True)
+    file_name = f"{job.id}_{job.params_hash[:16]}.{job.file_format.lower()}"
+    path = storage_dir / file_name
+
+    try:
+        if not form.is_valid():
+            raise ExportJobError(_("Invalid export parameters"))
+        if job.file_format == ExportFileFormat.CSV:
+            _write_csv_file(job, form, path)
+        else:
+            _write_pdf_file(job, form, path)
+    except Exception as e:
+        logger.error(f"Export job {job.id} failed", exc_info=e)
+        path.unlink(missing_ok=True)
+        job.status = ExportJobStatus.FAILED
+        job.error = str(e)
+    else:
+        job.status = ExportJobStatus.COMPLETED
+        job.file_name = file_name
+
+    now = tz.now()
+    job.finished_at = now
+    job.expires_at = now + timedelta(hours=settings.EXPORT_JOB_RETENTION_HOURS)
+    job.save()
+    return job
+
+
+def _claim_next_export_job():
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ExportJobStatus.PENDING)
+            .order_by("created_at")
+            .first()
+        )
+        if job:
+            job.status = ExportJobStatus.RUNNING
+            job.started_at = tz.now()
+            job.save()
+        return job
+
+
+def fail_stale_export_jobs():
+    """Fails the jobs that have been running for longer than the running
+    timeout, left behind by a worker that died, and returns their number."""
+    now = tz.now()
+    return ExportJob.objects.filter(
+        status=ExportJobStatus.RUNNING,
+        started_at__lt=_get_running_timeout_limit(now),
+    ).update(
+        status=ExportJobStatus.FAILED,
+        error="Export job timed out",
+        finished_at=now,
+        expires_at=now + timedelta(hours=settings.EXPORT_JOB_RETENTION_HOURS),
+        modified_at=now,
+    )
+
+
+def process_export_jobs(limit=None):
+    """Fails the stale running jobs and runs pending export jobs one at a
+    time until there are none left or the limit is reached. Jobs are
+    claimed with row locks, so several workers can process the queue at
+    the same time.
+
+    Returns the number of processed jobs."""
+    fail_stale_export_jobs()
+    count = 0
+    while limit is None or count < limit:
+        job = _claim_next_export_job()
+        if not job:
+            break
+        run_export_job(job)
+        count += 1
+    return count
+
+
+def delete_expired_export_jobs():
+    """Deletes the expired export jobs and their files."""
+    now = tz.now()
+    expired_jobs = ExportJob.objects.filter(expires_at__lte=now)
+    for job in expired_jobs:
+        if path := job.file_path:
+            path.unlink(missing_ok=True)
+    return expired_jobs.delete()[0]
+
+
+def get_download_url(job):
+    if not job.is_completed or job.is_expired:
+        return None
+    token = signing.dumps({"job_id": job.id}, salt=DOWNLOAD_TOKEN_SALT)
+    return reverse("parking_permits:export-job-download", args=[token])
+
+
+def get_export_job_for_download(token):
+    """Returns the completed job of a signed download token, or None
+    if the token is invalid, has expired or the job is gone."""
+    try:
+        data = signing.loads(
+            token,
+            salt=DOWNLOAD_TOKEN_SALT,
+            max_age=settings.EXPORT_JOB_DOWNLOAD_URL_MAX_AGE_SECONDS,
+        )
+    except signing.BadSignature:
+        return None
+
+    job = ExportJob.objects.filter(
+        id=data.get("job_id"), status=ExportJobStatus.COMPLETED
+    ).first()
+    if not job or job.is_expired or not job.file_path.exists():
+        return None
+    return job
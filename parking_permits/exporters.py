@@ -1,8 +1,16 @@
 import abc
+import collections
+import functools
+import itertools
+import multiprocessing
+import os
+import zipfile
 from datetime import date
 
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone as tz
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 from fpdf import FPDF
 
@@ -44,6 +52,8 @@ def _get_permit_row(permit):
     vehicle = permit.vehicle
     name = f"{customer.last_name}, {customer.first_name}"
     end_time = _get_permit_end_time(permit)
+    # Compare the address ids so that the customer addresses
+    # don't need to be fetched for every row.
     return [
         name,
         customer.national_id_number,
@@ -51,12 +61,12 @@ def _get_permit_row(permit):
         getattr(permit, "active_temporary_vehicle_registration_number", None) or "-",
         (
             str(permit.full_address)
-            if permit.address and permit.address == customer.primary_address
+            if permit.address_id and permit.address_id == customer.primary_address_id
             else "-"
         ),
         (
             str(permit.full_address)
-            if permit.address and permit.address == customer.other_address
+            if permit.address_id and permit.address_id == customer.other_address_id
             else "-"
         ),
         permit.parking_zone.name,
@@ -123,6 +133,32 @@ def _get_product_row(product):
     ]
 
 
+def _prepare_permit_queryset(qs):
+    return qs.select_related("customer", "vehicle", "address", "parking_zone")
+
+
+def _prepare_order_queryset(qs):
+    return qs.select_related("customer").prefetch_related("permits", "order_items")
+
+
+def _prepare_product_queryset(qs):
+    return qs.select_related("zone", "modified_by")
+
+
+def _prepare_refund_queryset(qs):
+    # the rows only read the fields of the refund itself, so neither the
+    # orders and permits of the refund nor the other columns are fetched
+    return qs.only("name", "amount", "iban", "status", "created_at")
+
+
+QUERYSET_PREPARER_MAPPING = {
+    "permits": _prepare_permit_queryset,
+    "limited_permits": _prepare_permit_queryset,
+    "orders": _prepare_order_queryset,
+    "refunds": _prepare_refund_queryset,
+    "products": _prepare_product_queryset,
+}
+
 ROW_GETTER_MAPPING = {
     "permits": _get_permit_row,
     "orders": _get_order_row,
@@ -195,6 +231,9 @@ HEADERS_MAPPING = {
 
 
 class DataExporter:
+    # number of rows fetched from the database at a time
+    chunk_size = 2000
+
     def __init__(self, data_type, queryset):
         self.data_type = data_type
         self.queryset = queryset
@@ -214,16 +253,44 @@ class DataExporter:
         headers.append(self.get_metadata())
         return headers
 
-    def get_rows(self):
+    def get_queryset(self):
+        prepare_queryset = QUERYSET_PREPARER_MAPPING.get(self.data_type)
+        if prepare_queryset:
+            return prepare_queryset(self.queryset)
+        return self.queryset
+
+    def iter_rows(self):
+        """Yields the rows one at a time, fetching the objects and their
+        related objects from the database in chunks, so that the whole
+        export never needs to be held in memory."""
         row_getter = ROW_GETTER_MAPPING[self.data_type]
-        return [row_getter(item) for item in self.queryset]
+        for item in self.get_queryset().iterator(chunk_size=self.chunk_size):
+            yield row_getter(item)
+
+    def get_rows(self):
+        return list(self.iter_rows())
+
+
+def _get_header_image_path():
+    return str(settings.STATIC_ROOT) + "/parking_permits/img/helsinki.png"
+
+
+@functools.cache
+def _get_header_image_info(image_path):
+    # Parsing the PNG is the costliest part of rendering a page, so it
+    # is done once per process and the result shared by all documents.
+    return FPDF()._parsepng(image_path)
 
 
 class BasePDF(FPDF, metaclass=abc.ABCMeta):
     def header(self):
-        self.image(
-            str(settings.STATIC_ROOT) + "/parking_permits/img/helsinki.png", 10, 8, 33
-        )
+        image_path = _get_header_image_path()
+        if image_path not in self.images:
+            self.images[image_path] = {
+                **_get_header_image_info(image_path),
+                "i": len(self.images) + 1,
+            }
+        self.image(image_path, 10, 8, 33)
         self.set_font("Arial", "B", 15)
         self.cell(55)
         self.cell(20, 10, self.get_title(), 0, 0, "C")
@@ -245,6 +312,10 @@ class BasePDF(FPDF, metaclass=abc.ABCMeta):
     def get_source_object(self, object_id):
         pass
 
+    @abc.abstractmethod
+    def get_source_objects(self, object_ids):
+        pass
+
     @abc.abstractmethod
     def set_content(self, obj):
         pass
@@ -260,6 +331,13 @@ class ParkingPermitPDF(BasePDF):
             return None
         return permit_qs.first()
 
+    def get_source_objects(self, object_ids):
+        return (
+            ParkingPermit.objects.filter(pk__in=object_ids)
+            .select_related("customer", "vehicle", "address", "parking_zone")
+            .order_by("pk")
+        )
+
     def get_permit_content(self, permit):
         customer_name = (
             f"{permit.customer.first_name} {permit.customer.last_name}"
@@ -304,9 +382,16 @@ class RefundPDF(ParkingPermitPDF):
             return None
         return refund_qs.first()
 
+    def get_source_objects(self, object_ids):
+        return (
+            Refund.objects.filter(pk__in=object_ids)
+            .prefetch_related("orders__customer")
+            .order_by("pk")
+        )
+
     @staticmethod
     def get_refund_content(refund):
-        customer = refund.orders.first().customer
+        customer = refund.customer
         return [
             _("Refund ID") + ": " + f"{refund.id}",
             _("Customer") + ": " + f"{customer.first_name} {customer.last_name}",
@@ -382,3 +467,87 @@ class PdfExporter:
         pdf.add_page()
         pdf.set_content(obj)
         return pdf
+
+
+def _init_bulk_pdf_worker(language):
+    translation.activate(language)
+    # Warm up the per-process caches: the header image and the font
+    # metrics used by the documents.
+    _get_header_image_info(_get_header_image_path())
+    pdf = FPDF()
+    for style in ("", "B"):
+        pdf.set_font("Arial", style, 12)
+
+
+def _render_pdf_chunk(data_type, object_ids):
+    pdf_class = PDF_MODEL_MAPPING[data_type]
+    rendered = []
+    for obj in pdf_class().get_source_objects(object_ids):
+        pdf = pdf_class()
+        pdf.add_page()
+        pdf.set_content(obj)
+        rendered.append((obj.pk, pdf.output(dest="S").encode("latin-1")))
+    return rendered
+
+
+class BulkPdfExporter:
+    """Renders the PDFs of many objects of the same data type, either
+    into a ZIP archive with a worker process pool, or into a single
+    document with one page per object."""
+
+    def __init__(self, data_type, object_ids, processes=None, chunk_size=50):
+        self.data_type = data_type
+        self.object_ids = list(object_ids)
+        self.processes = processes
+        self.chunk_size = chunk_size
+
+    def get_chunks(self):
+        ids = iter(self.object_ids)
+        while chunk := list(itertools.islice(ids, self.chunk_size)):
+            yield chunk
+
+    def iter_pdfs(self):
+        """Yields (object id, PDF bytes) pairs. The chunks are rendered
+        in worker processes unless processes is 1. At most two chunks per
+        process are submitted ahead of the one being yielded, so that only
+        those are held in memory however slowly the PDFs are consumed."""
+        render_chunk = functools.partial(_render_pdf_chunk, self.data_type)
+        if self.processes == 1:
+            for chunk in self.get_chunks():
+                yield from render_chunk(chunk)
+            return
+
+        # The forked workers must not share the database connections of
+        # the parent process, so close them and let workers open their own.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(
+            self.processes,
+            initializer=_init_bulk_pdf_worker,
+            initargs=(translation.get_language(),),
+        ) as pool:
+            max_in_flight = 2 * (self.processes or os.cpu_count() or 1)
+            in_flight = collections.deque()
+            for chunk in self.get_chunks():
+                if len(in_flight) == max_in_flight:
+                    yield from in_flight.popleft().get()
+                in_flight.append(pool.apply_async(render_chunk, (chunk,)))
+            while in_flight:
+                yield from in_flight.popleft().get()
+
+    def write_zip(self, fileobj):
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            count = 0
+            for object_id, content in self.iter_pdfs():
+                zip_file.writestr(f"{self.data_type}_{object_id}.pdf", content)
+                count += 1
+        return count
+
+    def get_merged_pdf(self):
+        pdf_class = PDF_MODEL_MAPPING[self.data_type]
+        pdf = pdf_class()
+        for chunk in self.get_chunks():
+            for obj in pdf.get_source_objects(chunk):
+                pdf.add_page()
+                pdf.set_content(obj)
+        return pdf
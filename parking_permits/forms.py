@@ -52,6 +52,9 @@ class OrderDirection(models.TextChoices):
 
 class SearchFormBase(forms.Form):
     page = forms.IntegerField(min_value=1, required=False)
+    page_size = forms.IntegerField(min_value=1, required=False)
+    after = forms.CharField(required=False)
+    exact_count = forms.BooleanField(required=False)
     order_field = forms.CharField(required=False)
     order_direction = forms.ChoiceField(choices=OrderDirection.choices, required=False)
 
@@ -136,17 +139,13 @@ class PermitSearchForm(SearchFormBase):
         if not q:
             return self.get_empty_queryset()
 
-        fields = [
-            "vehicle__registration_number",
-            "temp_vehicles__vehicle__registration_number",
-        ]
+        # the search document holds the registration numbers of the
+        # permit vehicle and temporary vehicles, and the customer names
+        # and national id number, with trigram indexes for icontains
+        fields = ["search_document__vehicle_text"]
 
         if self.cleaned_data.get("user_role") != ParkingPermitGroups.INSPECTORS:
-            fields += [
-                "customer__first_name",
-                "customer__last_name",
-                "customer__national_id_number",
-            ]
+            fields += ["search_document__customer_text"]
 
         query = functools.reduce(
             operator.and_,
@@ -176,7 +175,13 @@ class PermitSearchForm(SearchFormBase):
         if status != "ALL":
             qs = qs.filter(status=status)
 
-        return qs.select_related("customer", "vehicle").distinct()
+        return qs.select_related("customer", "vehicle")
+
+    def get_queryset(self):
+        # the search document is one-to-one with the permit, so the
+        # filtered rows need no distinct
+        qs = self.filter_queryset(ParkingPermit.objects.all())
+        return self.order_queryset(qs)
 
 
 class RefundSearchForm(SearchFormBase):
@@ -355,7 +360,9 @@ class OrderSearchForm(SearchFormBase):
 
         if has_filters:
             model_class = self.get_model_class()
-            return model_class.objects.filter(id__in=qs.distinct("id"))
+            return model_class.objects.filter(id__in=qs.distinct("id")).select_related(
+                "customer"
+            )
         return self.get_empty_queryset()
 
 
@@ -363,6 +370,9 @@ class ProductSearchForm(SearchFormBase):
     def get_model_class(self):
         return Product
 
+    def filter_queryset(self, qs):
+        return qs.select_related("zone")
+
     def get_order_fields_mapping(self):
         return {
             "productType": ["type"],
@@ -437,6 +447,9 @@ class AnnouncementSearchForm(SearchFormBase):
     def get_model_class(self):
         return Announcement
 
+    def filter_queryset(self, qs):
+        return qs.prefetch_related("_parking_zones")
+
     def get_order_fields_mapping(self):
         return {
             "createdAt": ["created_at"],
@@ -481,3 +494,11 @@ class CustomerSearchForm(SearchFormBase):
             has_filters = True
 
         return qs if has_filters else self.get_empty_queryset()
+
+
+CSV_EXPORT_FORM_MAPPING = {
+    "permits": PermitSearchForm,
+    "refunds": RefundSearchForm,
+    "orders": OrderSearchForm,
+    "products": ProductSearchForm,
+}
@@ -1,23 +1,142 @@
+"""The GraphQL endpoints of the customer and the admin UIs.
+
+The schemas are built, and their resolvers imported, on the first request
+of an endpoint rather than when the URLconf is loaded, so that the workers
+boot and the management commands start without them.
+"""
+
+import functools
+
 from ariadne import load_schema_from_path
 from ariadne.contrib.federation import make_federated_schema
-from ariadne_django.views import GraphQLView
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
 
-from parking_permits import admin_resolvers, resolvers
+from parking_permits.async_graphql import (
+    AsyncPersistedQueryGraphQLView,
+    get_async_root_fields,
+)
 from parking_permits.error_formatter import error_formatter
-from project.settings import BASE_DIR
-
-type_defs = load_schema_from_path(
-    BASE_DIR / "parking_permits" / "schema" / "parking_permit.graphql"
+from parking_permits.loaders import get_context_value
+from parking_permits.persisted_queries import (
+    PersistedQueries,
+    PersistedQueryGraphQLView,
 )
-schema = make_federated_schema(
-    type_defs, resolvers.schema_bindables, convert_names_case=True
+from parking_permits.query_cost import (
+    ADMIN_QUERY_LIMITS,
+    CUSTOMER_QUERY_LIMITS,
+    QueryCostExtension,
+    get_validation_rules,
 )
-view = GraphQLView.as_view(schema=schema, error_formatter=error_formatter)
+from parking_permits.tracing import get_tracing_extensions
+from project.settings import BASE_DIR
 
-admin_type_defs = load_schema_from_path(
-    BASE_DIR / "parking_permits" / "schema" / "parking_permit_admin.graphql"
-)
-schema = make_federated_schema(
-    admin_type_defs, admin_resolvers.schema_bindables, convert_names_case=True
-)
-admin_view = GraphQLView.as_view(schema=schema, error_formatter=error_formatter)
+SCHEMA_DIR = BASE_DIR / "parking_permits" / "schema"
+
+
+def get_extensions(request, context):
+    return [QueryCostExtension, *get_tracing_extensions(request, context)]
+
+
+@functools.cache
+def get_type_defs():
+    return load_schema_from_path(SCHEMA_DIR / "parking_permit.graphql")
+
+
+@functools.cache
+def get_admin_type_defs():
+    return load_schema_from_path(SCHEMA_DIR / "parking_permit_admin.graphql")
+
+
+def make_schema(type_defs, bindables):
+    return make_federated_schema(type_defs, bindables, convert_names_case=True)
+
+
+@functools.cache
+def get_schema():
+    from parking_permits import resolvers
+
+    return make_schema(get_type_defs(), resolvers.schema_bindables)
+
+
+@functools.cache
+def get_async_schema():
+    """Returns the schema with the async resolvers of the async views."""
+    from parking_permits import resolvers
+
+    return make_schema(get_type_defs(), resolvers.async_schema_bindables)
+
+
+@functools.cache
+def get_admin_schema():
+    from parking_permits import admin_resolvers
+
+    return make_schema(get_admin_type_defs(), admin_resolvers.schema_bindables)
+
+
+@functools.cache
+def get_async_admin_schema():
+    """Returns the admin schema with the async resolvers of the async views."""
+    from parking_permits import admin_resolvers
+
+    return make_schema(get_admin_type_defs(), admin_resolvers.async_schema_bindables)
+
+
+def get_view(schema, persisted_queries, query_limits, async_schema=None):
+    kwargs = {
+        "schema": schema,
+        "persisted_queries": persisted_queries,
+        "context_value": get_context_value,
+        "validation_rules": get_validation_rules(query_limits),
+        "extensions": get_extensions,
+        "error_formatter": error_formatter,
+    }
+    if async_schema is None:
+        return PersistedQueryGraphQLView.as_view(**kwargs)
+    return AsyncPersistedQueryGraphQLView.as_view(
+        async_schema=async_schema,
+        async_root_fields=get_async_root_fields(async_schema),
+        # the traces time the resolvers in the thread of the request
+        async_extensions=[QueryCostExtension],
+        **kwargs,
+    )
+
+
+@functools.cache
+def get_customer_view():
+    return get_view(
+        get_schema(),
+        PersistedQueries("graphql"),
+        CUSTOMER_QUERY_LIMITS,
+        get_async_schema() if settings.GRAPHQL_ASYNC else None,
+    )
+
+
+@functools.cache
+def get_admin_view():
+    return get_view(
+        get_admin_schema(),
+        PersistedQueries("admin-graphql"),
+        ADMIN_QUERY_LIMITS,
+        get_async_admin_schema() if settings.GRAPHQL_ASYNC else None,
+    )
+
+
+def lazy_view(get_view):
+    """Returns a view that passes the requests to the view returned by
+    get_view, which is called on the first request."""
+    if settings.GRAPHQL_ASYNC:
+
+        async def view(request, *args, **kwargs):
+            return await get_view()(request, *args, **kwargs)
+
+    else:
+
+        def view(request, *args, **kwargs):
+            return get_view()(request, *args, **kwargs)
+
+    return csrf_exempt(view)
+
+
+view = lazy_view(get_customer_view)
+admin_view = lazy_view(get_admin_view)
@@ -0,0 +1,288 @@
+"""Request-scoped data loaders for the GraphQL field resolvers.
+
+Ariadne resolves the items of a list one after another, so a loader
+cannot wait for the loads of the sibling items by itself. Instead, the
+resolver returning a list announces the keys its items are going to
+load with `enqueue()`, and the first `load()` fetches all of them in
+one query. The loaders announce the keys of the next relation in the
+same way when a batch is loaded, so that resolving
+permit → customer → address → zone → products for a whole page of
+permits takes one query per relation.
+"""
+
+import functools
+from collections import defaultdict
+
+from ariadne import resolve_to
+from dateutil.relativedelta import relativedelta
+from django.db import models
+from django.utils import timezone
+
+from .models import Address, Customer, ParkingPermit, ParkingZone, Product, Vehicle
+from .models.vehicle import VehiclePowerType
+
+
+def load_by_pk(queryset):
+    def batch_load(keys):
+        return queryset.in_bulk(keys)
+
+    return batch_load
+
+
+def load_by_fk(queryset, field_name):
+    def batch_load(keys):
+        results = defaultdict(list)
+        for obj in queryset.filter(**{f"{field_name}__in": keys}):
+            results[getattr(obj, field_name)].append(obj)
+        return results
+
+    return batch_load
+
+
+class DataLoader:
+    """Loads objects by key in batches and caches them for the request.
+
+    The batch load function is called with a list of keys and returns a
+    mapping from key to the object, or to a list of objects when `many`
+    is set. `on_load` is called with the newly loaded objects."""
+
+    def __init__(self, batch_load_fn, many=False, on_load=None):
+        self.batch_load_fn = batch_load_fn
+        self.many = many
+        self.on_load = on_load
+        self._cache = {}
+        self._queue = {}
+
+    @property
+    def empty_value(self):
+        return [] if self.many else None
+
+    def enqueue(self, keys):
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._queue[key] = None
+
+    def prime(self, key, value):
+        if key not in self._cache:
+            self._cache[key] = value
+            if self.on_load and value is not None:
+                self.on_load(value if self.many else [value])
+
+    def clear(self, key=None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def dispatch(self):
+        keys = [key for key in self._queue if key not in self._cache]
+        self._queue.clear()
+        if not keys:
+            return
+        results = self.batch_load_fn(keys)
+        loaded = []
+        for key in keys:
+            value = results.get(key, self.empty_value)
+            self._cache[key] = value
+            if self.many:
+                loaded.extend(value)
+            elif value is not None:
+                loaded.append(value)
+        if self.on_load and loaded:
+            self.on_load(loaded)
+
+    def load(self, key):
+        if key is None:
+            return self.empty_value
+        if key not in self._cache:
+            self.enqueue([key])
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.enqueue(keys)
+        self.dispatch()
+        return [self.load(key) for key in keys]
+
+
+class Loaders:
+    """The data loaders of one GraphQL request."""
+
+    def __init__(self):
+        self.customer = DataLoader(
+            load_by_pk(Customer.objects.all()), on_load=self._customers_loaded
+        )
+        self.address = DataLoader(
+            load_by_pk(Address.objects.all()), on_load=self._addresses_loaded
+        )
+        self.zone = DataLoader(load_by_pk(ParkingZone.objects.all()))
+        self.resident_products_by_zone = DataLoader(
+            self._load_resident_products, many=True
+        )
+        self.vehicle = DataLoader(
+            load_by_pk(Vehicle.objects.all()), on_load=self._vehicles_loaded
+        )
+        self.power_type = DataLoader(load_by_pk(VehiclePowerType.objects.all()))
+        self.active_temporary_vehicle_by_permit = DataLoader(
+            self._load_active_temporary_vehicles
+        )
+
+    def _load_resident_products(self, zone_ids):
+        # the same period as ParkingZone.resident_products
+        start_date = timezone.localdate(timezone.now())
+        end_date = start_date + relativedelta(months=12, days=-1)
+        return load_by_fk(
+            Product.objects.for_resident().for_date_range(start_date, end_date),
+            "zone_id",
+        )(zone_ids)
+
+    def _load_active_temporary_vehicles(self, permit_ids):
+        permit_temporary_vehicles = (
+            ParkingPermit.temp_vehicles.through.objects.filter(
+                parkingpermit_id__in=permit_ids, temporaryvehicle__is_active=True
+            )
+            .select_related("temporaryvehicle__vehicle")
+            .order_by("temporaryvehicle_id")
+        )
+        results = {}
+        for permit_temporary_vehicle in permit_temporary_vehicles:
+            # the first one like ParkingPermit.active_temporary_vehicle
+            results.setdefault(
+                permit_temporary_vehicle.parkingpermit_id,
+                permit_temporary_vehicle.temporaryvehicle,
+            )
+        return results
+
+    def _customers_loaded(self, customers):
+        self.enqueue_related(self.address, customers, "primary_address")
+        self.enqueue_related(self.address, customers, "other_address")
+
+    def _addresses_loaded(self, addresses):
+        self.enqueue_related(self.zone, addresses, "_zone")
+
+    def _vehicles_loaded(self, vehicles):
+        self.enqueue_related(self.power_type, vehicles, "power_type")
+
+    def enqueue_related(self, loader, instances, field_name):
+        """Announces the related objects the instances are going to load.
+        Objects already fetched with select_related are primed instead."""
+        for instance in instances:
+            field = instance._meta.get_field(field_name)
+            if field.is_cached(instance):
+                related = field.get_cached_value(instance)
+                if related is not None:
+                    loader.prime(related.pk, related)
+            else:
+                loader.enqueue([getattr(instance, field.attname)])
+
+    def load_related(self, loader, instance, field_name):
+        """Returns the related object of the instance through the loader
+        and caches it on the instance like attribute access would."""
+        field = instance._meta.get_field(field_name)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        related = loader.load(getattr(instance, field.attname))
+        field.set_cached_value(instance, related)
+        return related
+
+    def prepare_permits(self, permits):
+        """Announces the relations resolved for a list of permits."""
+        self.enqueue_related(self.customer, permits, "customer")
+        self.enqueue_related(self.vehicle, permits, "vehicle")
+        self.enqueue_related(self.address, permits, "address")
+        self.enqueue_related(self.zone, permits, "parking_zone")
+        self.active_temporary_vehicle_by_permit.enqueue(permit.pk for permit in permits)
+
+    def prepare_zones(self, zones):
+        self.resident_products_by_zone.enqueue(zone.pk for zone in zones)
+
+
+def get_context_value(request):
+    return {"request": request, "loaders": Loaders()}
+
+
+def get_loaders(info):
+    # resolvers called outside of a view get the loaders on first use,
+    # setdefault would build a discarded Loaders on every call
+    if "loaders" not in info.context:
+        info.context["loaders"] = Loaders()
+    return info.context["loaders"]
+
+
+def default_to(attr_name):
+    """Resolves the field of a parent that isn't a model instance, like
+    the address dicts from Kami or the customer dicts from DVV, as the
+    default resolver would."""
+    default_resolver = resolve_to(attr_name)
+
+    def decorator(resolver):
+        @functools.wraps(resolver)
+        def wrapper(obj, info, **kwargs):
+            if not isinstance(obj, models.Model):
+                return default_resolver(obj, info, **kwargs)
+            return resolver(obj, info, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@default_to("customer")
+def resolve_permit_customer(permit, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.customer, permit, "customer")
+
+
+@default_to("vehicle")
+def resolve_permit_vehicle(permit, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.vehicle, permit, "vehicle")
+
+
+@default_to("address")
+def resolve_permit_address(permit, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.address, permit, "address")
+
+
+@default_to("parking_zone")
+def resolve_permit_parking_zone(permit, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.zone, permit, "parking_zone")
+
+
+@default_to("active_temporary_vehicle")
+def resolve_permit_active_temporary_vehicle(permit, info):
+    return get_loaders(info).active_temporary_vehicle_by_permit.load(permit.pk)
+
+
+@default_to("primary_address")
+def resolve_customer_primary_address(customer, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.address, customer, "primary_address")
+
+
+@default_to("other_address")
+def resolve_customer_other_address(customer, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.address, customer, "other_address")
+
+
+@default_to("zone")
+def resolve_address_zone(address, info):
+    if address._zone_id is None:
+        # looks up the zone by the location and stores it on the address
+        return address.zone
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.zone, address, "_zone")
+
+
+@default_to("power_type")
+def resolve_vehicle_power_type(vehicle, info):
+    loaders = get_loaders(info)
+    return loaders.load_related(loaders.power_type, vehicle, "power_type")
+
+
+@default_to("resident_products")
+def resolve_zone_resident_products(zone, info):
+    return get_loaders(info).resident_products_by_zone.load(zone.pk)
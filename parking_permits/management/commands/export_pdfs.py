@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from parking_permits.exporters import PDF_MODEL_MAPPING, BulkPdfExporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the PDFs of the given permits or refunds into a ZIP archive "
+        "or into a single merged PDF document."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("data_type", choices=sorted(PDF_MODEL_MAPPING))
+        parser.add_argument("output", help="Path of the ZIP or PDF file to write.")
+        parser.add_argument("--ids", nargs="*", type=int, default=[])
+        parser.add_argument(
+            "--ids-file",
+            help="Path of a file with one object id per line.",
+        )
+        parser.add_argument(
+            "--merged",
+            action="store_true",
+            help="Write a single PDF document instead of a ZIP archive.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Number of worker processes, defaults to the number of CPUs.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        object_ids = list(options["ids"])
+        if ids_file := options["ids_file"]:
+            with open(ids_file) as f:
+                object_ids += [int(line) for line in f if line.strip()]
+        if not object_ids:
+            raise CommandError("No object ids given.")
+
+        exporter = BulkPdfExporter(
+            options["data_type"],
+            object_ids,
+            processes=options["processes"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["merged"]:
+            exporter.get_merged_pdf().output(options["output"], "F")
+            self.stdout.write(
+                self.style.SUCCESS(f"Merged PDF written to {options['output']}.")
+            )
+        else:
+            with open(options["output"], "wb") as f:
+                count = exporter.write_zip(f)
+            self.stdout.write(
+                self.style.SUCCESS(f"{count} PDFs written to {options['output']}.")
+            )
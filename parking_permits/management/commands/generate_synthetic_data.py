@@ -0,0 +1,600 @@
+import datetime
+import io
+import json
+import logging
+import random
+import time
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.gis.geos import GEOSGeometry, Point
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone as tz
+
+from audit_logger.models import AuditLog
+from parking_permits.models import (
+    Address,
+    Customer,
+    Order,
+    OrderItem,
+    ParkingPermit,
+    ParkingPermitSearchDocument,
+    ParkingZone,
+    Product,
+    Refund,
+    TemporaryVehicle,
+    Vehicle,
+)
+from parking_permits.models.order import OrderPaymentType, OrderStatus, OrderType
+from parking_permits.models.parking_permit import (
+    ContractType,
+    ParkingPermitEvent,
+    ParkingPermitStatus,
+)
+from parking_permits.models.product import ProductType
+from parking_permits.models.refund import RefundStatus
+from parking_permits.models.vehicle import VehiclePowerType
+
+logger = logging.getLogger("db")
+
+FIRST_NAMES = [
+    "Aino", "Eino", "Helmi", "Juhani", "Kaisa", "Lauri", "Maria", "Mikko",
+    "Noora", "Olli", "Pirjo", "Sami", "Sofia", "Timo", "Veera", "Ville",
+]  # fmt: skip
+LAST_NAMES = [
+    "Heikkinen", "Hämäläinen", "Korhonen", "Koskinen", "Laine", "Lehtonen",
+    "Mäkinen", "Nieminen", "Virtanen", "Järvinen", "Lindqvist", "Salminen",
+]  # fmt: skip
+STREET_NAMES = [
+    "Aleksanterinkatu", "Bulevardi", "Fredrikinkatu", "Hämeentie",
+    "Helsinginkatu", "Kalevankatu", "Mannerheimintie", "Mechelininkatu",
+    "Pohjoisesplanadi", "Runeberginkatu", "Sturenkatu", "Topeliuksenkatu",
+]  # fmt: skip
+MANUFACTURERS = {
+    "Toyota": ["Corolla", "Yaris", "RAV4"],
+    "Volkswagen": ["Golf", "Passat", "ID.4"],
+    "Skoda": ["Octavia", "Fabia", "Enyaq"],
+    "Tesla": ["Model 3", "Model Y"],
+    "Volvo": ["V60", "XC40", "XC60"],
+}
+PERMIT_STATUS_WEIGHTS = {
+    ParkingPermitStatus.VALID: 55,
+    ParkingPermitStatus.CLOSED: 35,
+    ParkingPermitStatus.DRAFT: 4,
+    ParkingPermitStatus.PAYMENT_IN_PROGRESS: 3,
+    ParkingPermitStatus.CANCELLED: 2,
+    ParkingPermitStatus.PRELIMINARY: 1,
+}
+ORDER_STATUS_BY_PERMIT_STATUS = {
+    ParkingPermitStatus.VALID: OrderStatus.CONFIRMED,
+    ParkingPermitStatus.CLOSED: OrderStatus.CONFIRMED,
+    ParkingPermitStatus.PAYMENT_IN_PROGRESS: OrderStatus.DRAFT,
+    ParkingPermitStatus.CANCELLED: OrderStatus.CANCELLED,
+}
+SECOND_PERMIT_RATIO = 0.15
+TEMPORARY_VEHICLE_RATIO = 0.02
+REFUND_RATIO = 0.05
+CUSTOMERS_PER_ADDRESS = 3
+
+
+def _escape_copy_text(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _format_copy_value(value):
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, GEOSGeometry):
+        return value.ewkt
+    if isinstance(value, dict):
+        return _escape_copy_text(json.dumps(value, cls=DjangoJSONEncoder))
+    if isinstance(value, list):
+        items = ",".join('"{}"'.format(str(item).replace('"', '\\"')) for item in value)
+        return _escape_copy_text(f"{{{items}}}")
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return _escape_copy_text(str(value))
+
+
+class CopyWriter:
+    """Buffers rows of a model as COPY text and loads them with a single
+    COPY FROM STDIN. Columns that are not given get the field default,
+    so every concrete column of the model is written."""
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model._meta.concrete_fields
+        self.defaults = {
+            field.attname: field.get_default() if field.has_default() else None
+            for field in self.fields
+        }
+        self.buffer = io.StringIO()
+        self.row_count = 0
+
+    def add(self, **values):
+        self.buffer.write(
+            "\t".join(
+                _format_copy_value(
+                    values.get(field.attname, self.defaults[field.attname])
+                )
+                for field in self.fields
+            )
+        )
+        self.buffer.write("\n")
+        self.row_count += 1
+
+    def flush(self, cursor):
+        if not self.row_count:
+            return 0
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        with cursor.copy(
+            f"COPY {quote_name(self.model._meta.db_table)} ({columns}) FROM STDIN"
+        ) as copy:
+            copy.write(self.buffer.getvalue())
+        row_count = self.row_count
+        self.buffer = io.StringIO()
+        self.row_count = 0
+        return row_count
+
+
+class SyntheticDataGenerator:
+    def __init__(self, *, seed, reference_time, stdout):
+        self.rng = random.Random(seed)
+        self.now = reference_time
+        self.stdout = stdout
+
+        self.zones = list(ParkingZone.objects.order_by("name"))
+        if not self.zones:
+            raise CommandError(
+                "No parking zones found, run import_parking_zones first."
+            )
+        self.prepared_zones = {zone.pk: zone.location.prepared for zone in self.zones}
+        self.products_by_zone = {}
+        for product in Product.objects.filter(type=ProductType.RESIDENT).order_by(
+            "start_date"
+        ):
+            self.products_by_zone.setdefault(product.zone_id, []).append(product)
+        self.power_type, _created = VehiclePowerType.objects.get_or_create(
+            identifier="01", defaults={"name": "Bensiini"}
+        )
+
+        self.through_models = [
+            ParkingPermit.temp_vehicles.through,
+            Order.permits.through,
+            Refund.orders.through,
+            Refund.permits.through,
+        ]
+        self.models = [
+            Address,
+            Customer,
+            Vehicle,
+            TemporaryVehicle,
+            ParkingPermit,
+            ParkingPermitSearchDocument,
+            ParkingPermitEvent,
+            Order,
+            OrderItem,
+            Refund,
+            AuditLog,
+            *self.through_models,
+        ]
+        self.writers = {model: CopyWriter(model) for model in self.models}
+        self.next_ids = {}
+        with connection.cursor() as cursor:
+            for model in self.models:
+                if model is ParkingPermitSearchDocument:
+                    continue
+                cursor.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM "
+                    f"{connection.ops.quote_name(model._meta.db_table)}"
+                )
+                self.next_ids[model] = cursor.fetchone()[0] + 1
+        # keeps the generated street addresses unique over repeated runs
+        self.address_offset = self.next_ids[Address]
+
+    def _next_id(self, model):
+        next_id = self.next_ids[model]
+        self.next_ids[model] += 1
+        return next_id
+
+    def _random_time(self, start, end):
+        return start + (end - start) * self.rng.random()
+
+    def _random_location(self, zone):
+        prepared = self.prepared_zones[zone.pk]
+        xmin, ymin, xmax, ymax = zone.location.extent
+        for _i in range(100):
+            point = Point(
+                self.rng.uniform(xmin, xmax),
+                self.rng.uniform(ymin, ymax),
+                srid=zone.location.srid,
+            )
+            if prepared.contains(point):
+                return point
+        return zone.location.point_on_surface
+
+    def _add_address(self):
+        address_id = self._next_id(Address)
+        index = address_id - self.address_offset
+        zone = self.rng.choice(self.zones)
+        street_name = STREET_NAMES[index % len(STREET_NAMES)]
+        self.writers[Address].add(
+            id=address_id,
+            street_name=street_name,
+            street_name_sv=street_name,
+            street_number=str(self.address_offset + index // len(STREET_NAMES)),
+            city="Helsinki",
+            city_sv="Helsingfors",
+            postal_code=f"00{self.zones.index(zone):03d}"[-5:],
+            location=self._random_location(zone),
+            _zone_id=zone.pk,
+            created_at=self.now,
+            modified_at=self.now,
+        )
+        return address_id, zone
+
+    def _add_vehicle(self, created_at):
+        vehicle_id = self._next_id(Vehicle)
+        manufacturer = self.rng.choice(list(MANUFACTURERS))
+        letters = "".join(self.rng.choices("ABCEFGHIJKLMNOPRSTUVXYZ", k=3))
+        registration_number = f"{letters}-{vehicle_id}"
+        self.writers[Vehicle].add(
+            id=vehicle_id,
+            power_type_id=self.power_type.pk,
+            manufacturer=manufacturer,
+            model=self.rng.choice(MANUFACTURERS[manufacturer]),
+            registration_number=registration_number,
+            weight=self.rng.randint(900, 2500),
+            euro_class=6,
+            emission=self.rng.randint(0, 200),
+            created_at=created_at,
+            modified_at=created_at,
+        )
+        return vehicle_id, registration_number
+
+    def _add_customer(self, address_id, zone):
+        customer_id = self._next_id(Customer)
+        birth_date = datetime.date(1940, 1, 1) + datetime.timedelta(
+            days=self.rng.randint(0, 60 * 365)
+        )
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        national_id_number = f"{birth_date:%d%m%y}-S{customer_id:07d}"
+        created_at = self._random_time(self.now - relativedelta(years=5), self.now)
+        self.writers[Customer].add(
+            id=customer_id,
+            first_name=first_name,
+            last_name=last_name,
+            national_id_number=national_id_number,
+            primary_address_id=address_id,
+            primary_address_apartment=f"A {self.rng.randint(1, 40)}",
+            email=f"customer{customer_id}@example.com",
+            phone_number=f"+35840{customer_id % 10**7:07d}",
+            zone_id=zone.pk,
+            created_at=created_at,
+            modified_at=created_at,
+        )
+        self.writers[AuditLog].add(
+            id=self._next_id(AuditLog),
+            logger_name="audit",
+            level=logging.INFO,
+            message={
+                "audit_event": {
+                    "origin": "parking-permits",
+                    "status": "SUCCESS",
+                    "date_time": created_at,
+                    "actor": {"role": "USER"},
+                    "operation": "CREATE",
+                    "target": {"id": str(customer_id), "type": "Customer"},
+                    "message": "Customer created.",
+                }
+            },
+            created_at=created_at,
+        )
+        return customer_id, f"{first_name} {last_name} {national_id_number}"
+
+    def _add_permit(self, customer_id, customer_text, address_id, zone, primary):
+        permit_id = self._next_id(ParkingPermit)
+        status = self.rng.choices(
+            list(PERMIT_STATUS_WEIGHTS), weights=PERMIT_STATUS_WEIGHTS.values()
+        )[0]
+        contract_type = (
+            ContractType.OPEN_ENDED
+            if self.rng.random() < 0.7
+            else ContractType.FIXED_PERIOD
+        )
+        month_count = 1 if contract_type == ContractType.OPEN_ENDED else 12
+        if status == ParkingPermitStatus.VALID:
+            start_time = self._random_time(
+                self.now - relativedelta(months=month_count), self.now
+            )
+        elif status == ParkingPermitStatus.CLOSED:
+            start_time = self._random_time(
+                self.now - relativedelta(years=3),
+                self.now - relativedelta(months=month_count),
+            )
+        else:
+            start_time = self._random_time(self.now - relativedelta(days=7), self.now)
+        end_time = start_time + relativedelta(months=month_count)
+        vehicle_id, registration_number = self._add_vehicle(start_time)
+        registration_numbers = [registration_number]
+
+        self.writers[ParkingPermit].add(
+            id=permit_id,
+            customer_id=customer_id,
+            vehicle_id=vehicle_id,
+            parking_zone_id=zone.pk,
+            status=status,
+            start_time=start_time,
+            end_time=end_time,
+            primary_vehicle=primary,
+            synced_with_parkkihubi=status
+            in (ParkingPermitStatus.VALID, ParkingPermitStatus.CLOSED),
+            contract_type=contract_type,
+            month_count=month_count,
+            address_id=address_id,
+            created_at=start_time,
+            modified_at=start_time,
+        )
+        self.writers[ParkingPermitEvent].add(
+            id=self._next_id(ParkingPermitEvent),
+            type=ParkingPermitEvent.EventType.CREATED,
+            key=ParkingPermitEvent.EventKey.CREATE_PERMIT,
+            message="Permit #%(permit_id)s created",
+            context={"permit_id": permit_id},
+            parking_permit_id=permit_id,
+            created_at=start_time,
+            modified_at=start_time,
+        )
+
+        if (
+            status == ParkingPermitStatus.VALID
+            and self.rng.random() < TEMPORARY_VEHICLE_RATIO
+        ):
+            registration_numbers.append(
+                self._add_temporary_vehicle(permit_id, start_time)
+            )
+
+        if status == ParkingPermitStatus.CLOSED:
+            self.writers[ParkingPermitEvent].add(
+                id=self._next_id(ParkingPermitEvent),
+                type=ParkingPermitEvent.EventType.ENDED,
+                key=ParkingPermitEvent.EventKey.END_PERMIT,
+                message="Permit #%(permit_id)s ended",
+                context={"permit_id": permit_id},
+                parking_permit_id=permit_id,
+                created_at=end_time,
+                modified_at=end_time,
+            )
+
+        if order_status := ORDER_STATUS_BY_PERMIT_STATUS.get(status):
+            order_id = self._add_order(
+                permit_id,
+                customer_id,
+                zone,
+                order_status,
+                start_time,
+                end_time,
+                month_count,
+                registration_number,
+            )
+            if (
+                status == ParkingPermitStatus.CLOSED
+                and self.rng.random() < REFUND_RATIO
+            ):
+                self._add_refund(permit_id, order_id, customer_text, end_time)
+
+        self.writers[ParkingPermitSearchDocument].add(
+            permit_id=permit_id,
+            vehicle_text=" ".join(registration_numbers),
+            customer_text=customer_text,
+        )
+
+    def _add_temporary_vehicle(self, permit_id, start_time):
+        vehicle_id, registration_number = self._add_vehicle(start_time)
+        temp_vehicle_id = self._next_id(TemporaryVehicle)
+        temp_start_time = self._random_time(start_time, self.now)
+        self.writers[TemporaryVehicle].add(
+            id=temp_vehicle_id,
+            vehicle_id=vehicle_id,
+            start_time=temp_start_time,
+            end_time=temp_start_time + relativedelta(days=self.rng.randint(1, 14)),
+            is_active=False,
+            created_at=temp_start_time,
+            modified_at=temp_start_time,
+        )
+        self.writers[ParkingPermit.temp_vehicles.through].add(
+            id=self._next_id(ParkingPermit.temp_vehicles.through),
+            parkingpermit_id=permit_id,
+            temporaryvehicle_id=temp_vehicle_id,
+        )
+        return registration_number
+
+    def _add_order(
+        self,
+        permit_id,
+        customer_id,
+        zone,
+        order_status,
+        start_time,
+        end_time,
+        month_count,
+        registration_number,
+    ):
+        order_id = self._next_id(Order)
+        paid_time = start_time if order_status == OrderStatus.CONFIRMED else None
+        self.writers[Order].add(
+            id=order_id,
+            payment_type=(
+                OrderPaymentType.ONLINE_PAYMENT
+                if self.rng.random() < 0.8
+                else OrderPaymentType.CASHIER_PAYMENT
+            ),
+            customer_id=customer_id,
+            status=order_status,
+            paid_time=paid_time,
+            parking_zone_name=zone.name,
+            vehicles=[registration_number],
+            type=OrderType.CREATED,
+            created_at=start_time,
+            modified_at=start_time,
+        )
+        self.writers[Order.permits.through].add(
+            id=self._next_id(Order.permits.through),
+            order_id=order_id,
+            parkingpermit_id=permit_id,
+        )
+        if products := self.products_by_zone.get(zone.pk):
+            product = products[-1]
+            for candidate in products:
+                if candidate.start_date <= start_time.date() <= candidate.end_date:
+                    product = candidate
+                    break
+            self.writers[OrderItem].add(
+                id=self._next_id(OrderItem),
+                order_id=order_id,
+                product_id=product.pk,
+                permit_id=permit_id,
+                unit_price=product.unit_price,
+                payment_unit_price=product.unit_price,
+                vat=product.vat,
+                quantity=month_count,
+                start_time=start_time,
+                end_time=end_time,
+                created_at=start_time,
+                modified_at=start_time,
+            )
+        return order_id
+
+    def _add_refund(self, permit_id, order_id, customer_text, created_at):
+        refund_id = self._next_id(Refund)
+        status = self.rng.choice(list(RefundStatus))
+        self.writers[Refund].add(
+            id=refund_id,
+            name=customer_text.rsplit(" ", 1)[0],
+            amount=Decimal(self.rng.randint(10, 300)),
+            iban="FI2112345600000785",
+            status=status,
+            accepted_at=created_at if status == RefundStatus.ACCEPTED else None,
+            vat=Decimal("0.255"),
+            created_at=created_at,
+            modified_at=created_at,
+        )
+        self.writers[Refund.orders.through].add(
+            id=self._next_id(Refund.orders.through),
+            refund_id=refund_id,
+            order_id=order_id,
+        )
+        self.writers[Refund.permits.through].add(
+            id=self._next_id(Refund.permits.through),
+            refund_id=refund_id,
+            parkingpermit_id=permit_id,
+        )
+
+    def generate_batch(self, customer_count):
+        addresses = [
+            self._add_address()
+            for _i in range(max(customer_count // CUSTOMERS_PER_ADDRESS, 1))
+        ]
+        for _i in range(customer_count):
+            address_id, zone = self.rng.choice(addresses)
+            customer_id, customer_text = self._add_customer(address_id, zone)
+            self._add_permit(customer_id, customer_text, address_id, zone, True)
+            if self.rng.random() < SECOND_PERMIT_RATIO:
+                self._add_permit(customer_id, customer_text, address_id, zone, False)
+
+        row_counts = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model in self.models:
+                row_counts[model] = self.writers[model].flush(cursor)
+        return row_counts
+
+    def finish(self):
+        with connection.cursor() as cursor:
+            models = [
+                model
+                for model in self.models
+                if model is not ParkingPermitSearchDocument
+            ]
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+            for model in self.models:
+                cursor.execute(
+                    f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}"
+                )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic production-scale data set of customers, "
+        "addresses, permits, orders, refunds, events, temporary vehicles "
+        "and audit logs. The data is loaded with COPY and is the same for "
+        "the same seed and reference date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--customers",
+            type=int,
+            default=10000,
+            help="Number of customers to generate, each has one or two permits.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed of the data set."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="Number of customers generated and loaded per transaction.",
+        )
+        parser.add_argument(
+            "--reference-date",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Date the generated permit periods are relative to, "
+            "defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        reference_date = options["reference_date"] or tz.localdate()
+        reference_time = tz.make_aware(
+            datetime.datetime.combine(reference_date, datetime.time(12))
+        )
+        generator = SyntheticDataGenerator(
+            seed=options["seed"], reference_time=reference_time, stdout=self.stdout
+        )
+
+        started = time.monotonic()
+        remaining = options["customers"]
+        totals = {}
+        while remaining > 0:
+            batch_size = min(options["batch_size"], remaining)
+            for model, count in generator.generate_batch(batch_size).items():
+                totals[model] = totals.get(model, 0) + count
+            remaining -= batch_size
+            self.stdout.write(
+                f"{options['customers'] - remaining} customers, "
+                f"{totals[ParkingPermit]} permits generated "
+                f"in {time.monotonic() - started:.0f}s"
+            )
+        generator.finish()
+
+        for model, count in totals.items():
+            self.stdout.write(f"{model._meta.db_table}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Synthetic data generated in {time.monotonic() - started:.0f}s."
+            )
+        )
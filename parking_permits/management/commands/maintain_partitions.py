@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.partitioning import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the audit logs and the permit events "
+        "for the coming months and drop the partitions past their retention."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions to drop without creating or dropping any.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("Maintaining partitions..."))
+        created, dropped = maintain_partitions(dry_run=options["dry_run"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        action = "Would drop" if options["dry_run"] else "Dropped"
+        for name in dropped:
+            self.stdout.write(f"{action} {name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partitions maintained: {len(created)} created, "
+                f"{len(dropped)} dropped."
+            )
+        )
@@ -0,0 +1,141 @@
+import json
+import uuid
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from parking_permits.models import Address, ParkingPermit, Product
+from parking_permits.models.order import Subscription, SubscriptionStatus
+from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
+from users.models import ParkingPermitGroups, User
+
+LOAD_TEST_ADMIN_UUID = uuid.UUID("5f0b2a0e-3c1d-4d8e-9a52-6f0f2e8c1a01")
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare the database for the load test scenarios in loadtest/ and "
+        "write the ids the scenarios use to a fixtures file. Run it after "
+        "generate_synthetic_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--subscriptions",
+            type=int,
+            default=1000,
+            help="Number of open ended permits to attach Talpa subscriptions to.",
+        )
+        parser.add_argument(
+            "--search-terms",
+            type=int,
+            default=200,
+            help="Number of registration numbers and names used in admin searches.",
+        )
+        parser.add_argument("--output", default="loadtest-fixtures.json")
+
+    def get_address(self):
+        address = (
+            Address.objects.filter(_zone__isnull=False, street_number__regex=r"^\d+$")
+            .order_by("pk")
+            .first()
+        )
+        if not address:
+            raise CommandError(
+                "No addresses within parking zones, run generate_synthetic_data first."
+            )
+        return {
+            "street_name": address.street_name,
+            "street_name_sv": address.street_name_sv or address.street_name,
+            "street_number": address.street_number,
+            "postal_code": address.postal_code,
+            "location": list(address.location.coords),
+        }
+
+    def get_admin_user(self):
+        admin, _created = User.objects.get_or_create(
+            uuid=LOAD_TEST_ADMIN_UUID, defaults={"username": "loadtest-admin"}
+        )
+        group, _created = Group.objects.get_or_create(
+            name=ParkingPermitGroups.SUPER_ADMIN
+        )
+        admin.groups.add(group)
+        return admin
+
+    def create_subscriptions(self, count):
+        permits = (
+            ParkingPermit.objects.filter(
+                status=ParkingPermitStatus.VALID,
+                contract_type=ContractType.OPEN_ENDED,
+                vehicle__isnull=False,
+                order_items__isnull=False,
+            )
+            .select_related("customer__user")
+            .distinct()
+            .order_by("pk")[:count]
+        )
+        subscriptions = []
+        for permit in permits:
+            customer = permit.customer
+            if not customer.user:
+                customer.user = User.objects.create(
+                    username=f"loadtest-customer-{customer.pk}", uuid=uuid.uuid4()
+                )
+                customer.save(update_fields=["user"])
+
+            order_item = permit.order_items.select_related("product").first()
+            product = order_item.product
+            if not product.talpa_product_id:
+                product.talpa_product_id = uuid.uuid4()
+                Product.objects.filter(pk=product.pk).update(
+                    talpa_product_id=product.talpa_product_id
+                )
+            if not order_item.subscription_id:
+                order_item.subscription = Subscription.objects.create(
+                    talpa_subscription_id=uuid.uuid4(),
+                    status=SubscriptionStatus.CONFIRMED,
+                )
+                order_item.save(update_fields=["subscription"])
+
+            subscriptions.append(
+                {
+                    "subscription_id": str(
+                        order_item.subscription.talpa_subscription_id
+                    ),
+                    "user_uuid": str(customer.user.uuid),
+                    "talpa_product_id": str(product.talpa_product_id),
+                    "unit_price": str(order_item.unit_price),
+                    "vat_percentage": str(order_item.vat * 100),
+                }
+            )
+        return subscriptions
+
+    def get_search_terms(self, count):
+        permits = ParkingPermit.objects.select_related("customer", "vehicle").order_by(
+            "?"
+        )[:count]
+        terms = set()
+        for permit in permits:
+            if permit.vehicle:
+                terms.add(permit.vehicle.registration_number)
+            if permit.customer.last_name:
+                terms.add(permit.customer.last_name)
+        return sorted(terms)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        fixtures = {
+            "address": self.get_address(),
+            "admin_uuid": str(self.get_admin_user().uuid),
+            "subscriptions": self.create_subscriptions(options["subscriptions"]),
+            "search_terms": self.get_search_terms(options["search_terms"]),
+        }
+        with open(options["output"], "w") as f:
+            json.dump(fixtures, f, indent=2)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Load test fixtures with {len(fixtures['subscriptions'])} "
+                f"subscriptions written to {options['output']}."
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.export_jobs import delete_expired_export_jobs, process_export_jobs
+
+
+class Command(BaseCommand):
+    help = "Generate the files of pending export jobs and remove expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of export jobs to process.",
+        )
+
+    def handle(self, *args, **options):
+        removed_count = delete_expired_export_jobs()
+        self.stdout.write(
+            self.style.SUCCESS(f"{removed_count} expired export jobs removed.")
+        )
+        processed_count = process_export_jobs(limit=options["limit"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{processed_count} export jobs processed.")
+        )
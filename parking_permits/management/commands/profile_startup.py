@@ -0,0 +1,115 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs the startup phases in order in a fresh interpreter and prints the
+# seconds each of them took as JSON.
+PHASES_SCRIPT = """
+import json
+import time
+
+timings = {}
+start = time.perf_counter()
+
+
+def phase(name):
+    global start
+    now = time.perf_counter()
+    timings[name] = now - start
+    start = now
+
+
+import django
+
+django.setup()
+phase("django.setup")
+
+import parking_permits.cron
+
+phase("cron jobs")
+
+from django.urls import get_resolver
+
+get_resolver().url_patterns
+phase("URLconf")
+
+from parking_permits.graphql import get_admin_schema, get_schema
+
+get_schema()
+phase("customer schema")
+get_admin_schema()
+phase("admin schema")
+print(json.dumps(timings))
+"""
+
+
+def parse_import_times(output):
+    """Returns the cumulative import times in microseconds of the modules
+    imported at the top level by the output of python -X importtime."""
+    import_times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        __, cumulative, name = line.split(":", 1)[1].split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            # nested imports are included in the cumulative time of their
+            # importer, the header has no numbers
+            continue
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile the startup of a worker or a management command: the time "
+        "of django.setup, of the imports of the cron jobs and the URLconf "
+        "and of the lazily built GraphQL schemas, each measured in a fresh "
+        "interpreter, and the slowest imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Number of the slowest top-level imports to list.",
+        )
+
+    def handle(self, *args, **options):
+        rounds = []
+        for __ in range(options["rounds"]):
+            timings, import_times = self.run_phases()
+            rounds.append(timings)
+
+        self.stdout.write(f"Median of {len(rounds)} rounds:")
+        total = 0
+        for name in rounds[0]:
+            median = statistics.median(timings[name] for timings in rounds) * 1000
+            total += median
+            self.stdout.write(f"{name:<20} {median:9.1f} ms")
+        self.stdout.write(f"{'total':<20} {total:9.1f} ms")
+
+        self.stdout.write("Slowest imports of the last round:")
+        slowest = sorted(import_times.items(), key=lambda item: -item[1])
+        for name, microseconds in slowest[: options["top"]]:
+            self.stdout.write(f"{name:<40} {microseconds / 1000:9.1f} ms")
+
+    def run_phases(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PHASES_SCRIPT],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+        if result.returncode:
+            raise CommandError(f"Starting up failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.splitlines()[-1]), parse_import_times(
+            result.stderr
+        )
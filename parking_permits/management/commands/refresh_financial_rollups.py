@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.models.reporting import refresh_financial_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the daily revenue and refund rollups for the dates "
+        "touched by order and refund changes since the previous refresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild the rollups for all the dates.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("Refreshing financial rollups..."))
+        dates = refresh_financial_rollups(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Financial rollups refreshed for {len(dates)} dates.")
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import ParkingPermitSearchDocument
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents used by the admin UI permit search."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of permits to rebuild per batch.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("Refreshing permit search documents..."))
+        count = ParkingPermitSearchDocument.refresh_all(
+            chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} permit search documents refreshed.")
+        )
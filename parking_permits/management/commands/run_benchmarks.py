@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from parking_permits.benchmarks import cases  # noqa: F401, registers the benchmarks
+from parking_permits.benchmarks.runner import (
+    BENCHMARKS,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the hot path benchmarks against the current database, "
+        "preferably a data set created with generate_synthetic_data, "
+        "and optionally compare the results to a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Benchmarks to run, matched by prefix. Defaults to all.",
+        )
+        parser.add_argument("--rounds", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--output",
+            default="benchmark-results.json",
+            help="JSON file the results are written to.",
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="JSON results file to compare the results against.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Relative median slowdown reported as a regression.",
+        )
+        parser.add_argument("--list", action="store_true", help="List benchmarks.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name in BENCHMARKS:
+                self.stdout.write(name)
+            return
+
+        names = [
+            name
+            for name in BENCHMARKS
+            if not options["names"]
+            or any(name.startswith(prefix) for prefix in options["names"])
+        ]
+        if not names:
+            raise CommandError("No benchmarks match the given names.")
+
+        results = run_benchmarks(
+            names,
+            rounds=options["rounds"],
+            warmup=options["warmup"],
+            on_result=self.write_result,
+        )
+        save_results(options["output"], results)
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(load_results(options["compare"]), results, options)
+
+    def write_result(self, name, result):
+        if "median" in result:
+            self.stdout.write(
+                f"{name:<40} median {result['median']:9.2f} ms  "
+                f"p95 {result['p95']:9.2f} ms  {result['queries']:4d} queries"
+            )
+        elif "skipped" in result:
+            self.stdout.write(
+                self.style.WARNING(f"{name:<40} skipped: {result['skipped']}")
+            )
+        else:
+            self.stdout.write(self.style.ERROR(f"{name:<40} failed: {result['error']}"))
+
+    def compare(self, baseline, results, options):
+        rows, regressions = compare_results(baseline, results, options["threshold"])
+        for name, before, after, change in rows:
+            line = f"{name:<40} {before:9.2f} ms -> {after:9.2f} ms  {change:+7.1%}"
+            if name in regressions:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmarks regressed by more than "
+                f"{options['threshold']:.0%}: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions."))
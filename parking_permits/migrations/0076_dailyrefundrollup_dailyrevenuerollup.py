@@ -0,0 +1,118 @@
+# Generated by Django 5.2.15 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parking_permits", "0075_alter_parkingpermit_vehicle"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRefundRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("OPEN", "Open"),
+                            ("REQUEST_FOR_APPROVAL", "Request for approval"),
+                            ("ACCEPTED", "Accepted"),
+                            ("REJECTED", "Rejected"),
+                        ],
+                        max_length=32,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "vat",
+                    models.DecimalField(
+                        decimal_places=4, max_digits=6, verbose_name="VAT"
+                    ),
+                ),
+                ("refund_count", models.IntegerField(verbose_name="Refund count")),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=14, verbose_name="Total amount"
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField(verbose_name="Refreshed at")),
+            ],
+            options={
+                "verbose_name": "Daily refund rollup",
+                "verbose_name_plural": "Daily refund rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "status", "vat"),
+                        name="unique_daily_refund_rollup",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyRevenueRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "parking_zone_name",
+                    models.CharField(max_length=128, verbose_name="Parking zone name"),
+                ),
+                (
+                    "product_type",
+                    models.CharField(
+                        choices=[("COMPANY", "Company"), ("RESIDENT", "Resident")],
+                        max_length=20,
+                        verbose_name="Product type",
+                    ),
+                ),
+                (
+                    "vat",
+                    models.DecimalField(
+                        decimal_places=4, max_digits=6, verbose_name="VAT"
+                    ),
+                ),
+                ("order_count", models.IntegerField(verbose_name="Order count")),
+                ("item_count", models.IntegerField(verbose_name="Order item count")),
+                (
+                    "total_payment_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=14,
+                        verbose_name="Total payment price",
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField(verbose_name="Refreshed at")),
+            ],
+            options={
+                "verbose_name": "Daily revenue rollup",
+                "verbose_name_plural": "Daily revenue rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "parking_zone_name", "product_type", "vat"),
+                        name="unique_daily_revenue_rollup",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.15 on 2026-10-18 12:40
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+POPULATE_SEARCH_DOCUMENTS_SQL = """
+INSERT INTO parking_permits_parkingpermitsearchdocument
+    (permit_id, vehicle_text, customer_text)
+SELECT
+    permit.id,
+    concat_ws(
+        ' ',
+        vehicle.registration_number,
+        (
+            SELECT string_agg(temp_vehicle_vehicle.registration_number, ' ')
+            FROM parking_permits_parkingpermit_temp_vehicles permit_temp_vehicle
+            JOIN parking_permits_temporaryvehicle temp_vehicle
+                ON temp_vehicle.id = permit_temp_vehicle.temporaryvehicle_id
+            JOIN parking_permits_vehicle temp_vehicle_vehicle
+                ON temp_vehicle_vehicle.id = temp_vehicle.vehicle_id
+            WHERE permit_temp_vehicle.parkingpermit_id = permit.id
+        )
+    ),
+    concat_ws(
+        ' ', customer.first_name, customer.last_name, customer.national_id_number
+    )
+FROM parking_permits_parkingpermit permit
+JOIN parking_permits_customer customer ON customer.id = permit.customer_id
+LEFT JOIN parking_permits_vehicle vehicle ON vehicle.id = permit.vehicle_id
+ON CONFLICT (permit_id) DO NOTHING;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parking_permits", "0077_exportjob"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name="ParkingPermitSearchDocument",
+            fields=[
+                (
+                    "permit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="parking_permits.parkingpermit",
+                        verbose_name="Parking permit",
+                    ),
+                ),
+                (
+                    "vehicle_text",
+                    models.TextField(blank=True, verbose_name="Vehicle text"),
+                ),
+                (
+                    "customer_text",
+                    models.TextField(blank=True, verbose_name="Customer text"),
+                ),
+            ],
+            options={
+                "verbose_name": "Parking permit search document",
+                "verbose_name_plural": "Parking permit search documents",
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("vehicle_text"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="permit_search_vehicle_trgm",
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("customer_text"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="permit_search_customer_trgm",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(POPULATE_SEARCH_DOCUMENTS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.15 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parking_permits", "0078_parkingpermitsearchdocument"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["created_at"], name="order_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="parkingpermit",
+            index=models.Index(
+                fields=["status", "end_time"], name="permit_status_end_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="parkingpermit",
+            index=models.Index(
+                condition=models.Q(("synced_with_parkkihubi", False)),
+                fields=["status"],
+                name="permit_unsynced_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="refund",
+            index=models.Index(fields=["created_at"], name="refund_created_at_idx"),
+        ),
+    ]
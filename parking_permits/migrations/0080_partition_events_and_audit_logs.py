@@ -0,0 +1,53 @@
+# Generated by Django 5.2.15 on 2026-10-18 14:05
+
+# Converting the tables takes an ACCESS EXCLUSIVE lock on each of them until
+# the migration commits: the table is renamed and all its rows are copied
+# to the partitions, so neither reads nor writes of the permit events, the
+# audit log entries or the resilient log entries are served meanwhile, and
+# the migration runs for as long as the copying of the rows takes. Run it in
+# a maintenance window with the application and the cron jobs stopped.
+
+from django.db import migrations, models
+
+from parking_permits.partitioning import PartitionedTable
+
+# the tables as of this migration, whatever the tables partitioned later
+PARTITIONED_TABLES = [
+    ("parking_permits_parkingpermitevent", "created_at"),
+    ("resilient_logger_resilientlogentry", "created_at"),
+    ("audit_logger_auditlog", "created_at"),
+]
+
+
+def partition_tables(apps, schema_editor):
+    for table, column in PARTITIONED_TABLES:
+        PartitionedTable(table, column, retention_setting=None).partition(schema_editor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parking_permits", "0079_query_plan_indexes"),
+        ("audit_logger", "0001_initial"),
+        ("resilient_logger", "0004_remove_explicit_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="parkingpermitevent",
+            index=models.Index(
+                fields=["parking_permit", "-created_at"],
+                name="permit_event_history_idx",
+            ),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX resilient_log_unsent_idx "
+            "ON resilient_logger_resilientlogentry (created_at) WHERE NOT is_sent",
+            "DROP INDEX resilient_log_unsent_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX audit_log_unsent_idx "
+            "ON audit_logger_auditlog (created_at) WHERE NOT is_sent",
+            "DROP INDEX audit_log_unsent_idx",
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.15 on 2026-10-18 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parking_permits", "0080_partition_events_and_audit_logs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FinancialRollupRefresh",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(verbose_name="Started at")),
+            ],
+            options={
+                "verbose_name": "Financial rollup refresh",
+                "verbose_name_plural": "Financial rollup refreshes",
+            },
+        ),
+    ]
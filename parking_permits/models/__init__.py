@@ -4,13 +4,20 @@ from .company import Company
 from .customer import Customer
 from .driving_class import DrivingClass
 from .driving_licence import DrivingLicence
+from .export_job import ExportJob
 from .order import Order, OrderItem, Subscription
 from .parking_permit import ParkingPermit
 from .parking_zone import ParkingZone
 from .permit_extension_request import ParkingPermitExtensionRequest
+from .permit_search_document import ParkingPermitSearchDocument
 from .product import Product
 from .refund import Refund
-from .reporting import PermitCountSnapshot
+from .reporting import (
+    DailyRefundRollup,
+    DailyRevenueRollup,
+    FinancialRollupRefresh,
+    PermitCountSnapshot,
+)
 from .temporary_vehicle import TemporaryVehicle
 from .vehicle import LowEmissionCriteria, Vehicle
 
@@ -21,9 +28,11 @@ __all__ = [
     "Customer",
     "DrivingClass",
     "DrivingLicence",
+    "ExportJob",
     "LowEmissionCriteria",
     "ParkingPermit",
     "ParkingPermitExtensionRequest",
+    "ParkingPermitSearchDocument",
     "ParkingZone",
     "Vehicle",
     "Refund",
@@ -33,4 +42,7 @@ __all__ = [
     "Subscription",
     "TemporaryVehicle",
     "PermitCountSnapshot",
+    "DailyRevenueRollup",
+    "DailyRefundRollup",
+    "FinancialRollupRefresh",
 ]
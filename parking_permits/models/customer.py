@@ -22,6 +22,7 @@ from .common import SourceSystem
 from .driving_licence import DrivingLicence
 from .mixins import TimestampedModelMixin
 from .parking_permit import ParkingPermit, ParkingPermitEvent, ParkingPermitStatus
+from .permit_search_document import ParkingPermitSearchDocument
 from .refund import Refund
 from .vehicle import VehicleUser
 
@@ -413,6 +414,10 @@ class Customer(SerializableMixin, TimestampedModelMixin):
                 vehicle=None,
                 next_vehicle=None,
             )
+            # Bulk updates and cascades bypass the search document signals
+            ParkingPermitSearchDocument.refresh_for_permits(
+                list(self.permits.values_list("pk", flat=True))
+            )
 
             # Anonymize orders
             self.orders.update(
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.gis.db import models
+from django.utils import timezone as tz
+from django.utils.translation import gettext_lazy as _
+
+from .mixins import TimestampedModelMixin, UserStampedModelMixin
+
+
+class ExportFileFormat(models.TextChoices):
+    CSV = "CSV", _("CSV")
+    PDF = "PDF", _("PDF")
+
+
+class ExportJobStatus(models.TextChoices):
+    PENDING = "PENDING", _("Pending")
+    RUNNING = "RUNNING", _("Running")
+    COMPLETED = "COMPLETED", _("Completed")
+    FAILED = "FAILED", _("Failed")
+
+
+class ExportJob(TimestampedModelMixin, UserStampedModelMixin):
+    """An admin export that is generated outside of the request by
+    the export job worker and downloaded afterwards."""
+
+    file_format = models.CharField(
+        _("File format"), max_length=8, choices=ExportFileFormat
+    )
+    data_type = models.CharField(_("Data type"), max_length=32)
+    params = models.JSONField(_("Parameters"), default=dict, blank=True)
+    params_hash = models.CharField(_("Parameters hash"), max_length=64, db_index=True)
+    status = models.CharField(
+        _("Status"),
+        max_length=16,
+        choices=ExportJobStatus,
+        default=ExportJobStatus.PENDING,
+    )
+    file_name = models.CharField(_("File name"), max_length=255, blank=True)
+    error = models.TextField(_("Error"), blank=True)
+    started_at = models.DateTimeField(_("Started at"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    expires_at = models.DateTimeField(_("Expires at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Export job")
+        verbose_name_plural = _("Export jobs")
+
+    def __str__(self):
+        return f"Export job: {self.id} ({self.status})"
+
+    @property
+    def is_completed(self):
+        return self.status == ExportJobStatus.COMPLETED
+
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= tz.now()
+
+    @property
+    def file_path(self):
+        if not self.file_name:
+            return None
+        return Path(settings.EXPORT_JOB_STORAGE_DIR) / self.file_name
+
+    @property
+    def download_file_name(self):
+        if self.file_format == ExportFileFormat.PDF:
+            return f"{self.data_type}_{self.params.get('object_id')}.pdf"
+        return f"{self.data_type}.csv"
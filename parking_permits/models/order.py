@@ -2,7 +2,6 @@ import logging
 from decimal import Decimal
 from urllib.parse import urljoin
 
-import requests
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models, transaction
@@ -10,6 +9,7 @@ from django.utils import timezone as tz
 from django.utils.translation import gettext_lazy as _
 from helsinki_gdpr.models import SerializableMixin
 
+from parking_permits.services.http import get_session
 from parking_permits.services.mail import (
     PermitEmailType,
     send_permit_email,
@@ -54,7 +54,7 @@ class OrderValidator:
             "namespace": settings.NAMESPACE,
             "Content-Type": "application/json",
         }
-        response = requests.get(
+        response = get_session().get(
             urljoin(settings.TALPA_ORDER_EXPERIENCE_API, f"admin/{order_id}"),
             headers=headers,
         )
@@ -134,7 +134,7 @@ class SubscriptionValidator:
             "user": user_id,
             "Content-Type": "application/json",
         }
-        response = requests.get(
+        response = get_session().get(
             urljoin(
                 settings.TALPA_ORDER_EXPERIENCE_API,
                 f"subscriptions/get-by-order-id/{order_id}",
@@ -487,6 +487,9 @@ class Order(SerializableMixin, TimestampedModelMixin, UserStampedModelMixin):
     class Meta:
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
+        indexes = [
+            models.Index(fields=["created_at"], name="order_created_at_idx"),
+        ]
 
     def __str__(self):
         return f"Order: {self.id} ({self.status})"
@@ -547,7 +550,7 @@ class Order(SerializableMixin, TimestampedModelMixin, UserStampedModelMixin):
             "user": str(self.customer.user.uuid),
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             urljoin(
                 settings.TALPA_ORDER_EXPERIENCE_API, f"{self.talpa_order_id}/cancel"
             ),
@@ -675,7 +678,7 @@ class Subscription(SerializableMixin, TimestampedModelMixin, UserStampedModelMix
             "user": str(customer_id),
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             urljoin(
                 settings.TALPA_ORDER_EXPERIENCE_API,
                 f"subscription/{self.talpa_subscription_id}/cancel",
@@ -230,6 +230,16 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin):
         ordering = ["-id"]
         verbose_name = _("Parking permit")
         verbose_name_plural = _("Parking permits")
+        indexes = [
+            models.Index(
+                fields=["status", "end_time"], name="permit_status_end_time_idx"
+            ),
+            models.Index(
+                fields=["status"],
+                condition=Q(synced_with_parkkihubi=False),
+                name="permit_unsynced_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return str(self.id)
@@ -1210,6 +1220,14 @@ class ParkingPermitEvent(TimestampedModelMixin, UserStampedModelMixin):
     object_id = models.PositiveBigIntegerField(null=True)
     related_object = GenericForeignKey("content_type", "object_id")
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["parking_permit", "-created_at"],
+                name="permit_event_history_idx",
+            ),
+        ]
+
     @property
     def translated_message(self):
         return _(self.message) % self.context
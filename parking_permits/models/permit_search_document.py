@@ -0,0 +1,100 @@
+import itertools
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.db.models.functions import Upper
+from django.utils.translation import gettext_lazy as _
+
+from parking_permits.models.parking_permit import ParkingPermit
+
+
+class ParkingPermitSearchDocument(models.Model):
+    """Denormalized text of the permit fields the admin UI permit
+    search matches against, kept in one row per permit so that the
+    search does not need to join customers, vehicles and temporary
+    vehicles. The texts are indexed with trigram GIN indexes over
+    UPPER(), which is what Django uses for icontains lookups."""
+
+    permit = models.OneToOneField(
+        ParkingPermit,
+        verbose_name=_("Parking permit"),
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    vehicle_text = models.TextField(_("Vehicle text"), blank=True)
+    customer_text = models.TextField(_("Customer text"), blank=True)
+
+    class Meta:
+        verbose_name = _("Parking permit search document")
+        verbose_name_plural = _("Parking permit search documents")
+        indexes = [
+            GinIndex(
+                OpClass(Upper("vehicle_text"), name="gin_trgm_ops"),
+                name="permit_search_vehicle_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("customer_text"), name="gin_trgm_ops"),
+                name="permit_search_customer_trgm",
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.permit_id)
+
+    @staticmethod
+    def _join_text(values):
+        # search tokens never contain whitespace, so a token cannot
+        # match across two joined values
+        return " ".join(value for value in values if value)
+
+    @classmethod
+    def from_permit(cls, permit):
+        registration_numbers = [
+            temp_vehicle.vehicle.registration_number
+            for temp_vehicle in permit.temp_vehicles.all()
+        ]
+        if permit.vehicle:
+            registration_numbers.insert(0, permit.vehicle.registration_number)
+        customer = permit.customer
+        return cls(
+            permit=permit,
+            vehicle_text=cls._join_text(registration_numbers),
+            customer_text=cls._join_text(
+                [customer.first_name, customer.last_name, customer.national_id_number]
+            ),
+        )
+
+    @classmethod
+    def refresh_for_permits(cls, permit_ids):
+        """Rebuilds the search documents of the given permits.
+
+        Returns the number of documents written."""
+        permits = (
+            ParkingPermit.objects.filter(pk__in=permit_ids)
+            .select_related("customer", "vehicle")
+            .prefetch_related("temp_vehicles__vehicle")
+        )
+        documents = [cls.from_permit(permit) for permit in permits]
+        cls.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["permit"],
+            update_fields=["vehicle_text", "customer_text"],
+        )
+        return len(documents)
+
+    @classmethod
+    def refresh_all(cls, chunk_size=2000):
+        """Rebuilds the search documents of all permits in chunks.
+
+        Returns the number of documents written."""
+        permit_ids = (
+            ParkingPermit.objects.order_by("pk")
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        count = 0
+        for chunk in itertools.batched(permit_ids, chunk_size):
+            count += cls.refresh_for_permits(chunk)
+        return count
@@ -3,13 +3,13 @@ import logging
 from decimal import Decimal
 from urllib.parse import urljoin
 
-import requests
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from parking_permits.exceptions import CreateTalpaProductError, ProductCatalogError
+from parking_permits.services.http import get_session
 from parking_permits.talpa.pricing import Pricing
 
 from ..utils import diff_months_ceil, find_next_date, format_local_time
@@ -254,7 +254,7 @@ class Product(TimestampedModelMixin, UserStampedModelMixin):
             "api-key": settings.TALPA_API_KEY,
             "Content-Type": "application/json",
         }
-        response = requests.get(
+        response = get_session().get(
             urljoin(
                 settings.TALPA_MERCHANT_EXPERIENCE_API,
                 f"list/merchants/{settings.NAMESPACE}/",
@@ -293,7 +293,7 @@ class Product(TimestampedModelMixin, UserStampedModelMixin):
             "api-key": settings.TALPA_API_KEY,
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             settings.TALPA_PRODUCT_EXPERIENCE_API,
             data=json.dumps(data, default=str),
             headers=headers,
@@ -347,7 +347,7 @@ class Product(TimestampedModelMixin, UserStampedModelMixin):
             "namespace": settings.NAMESPACE,
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             urljoin(
                 settings.TALPA_PRODUCT_EXPERIENCE_API,
                 f"{self.talpa_product_id}/accounting/",
@@ -417,7 +417,7 @@ class Product(TimestampedModelMixin, UserStampedModelMixin):
             "namespace": settings.NAMESPACE,
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             urljoin(
                 settings.TALPA_PRODUCT_EXPERIENCE_API,
                 f"{self.talpa_product_id}/accounting/",
@@ -50,6 +50,9 @@ class Refund(TimestampedModelMixin, UserStampedModelMixin):
     class Meta:
         verbose_name = _("Refund")
         verbose_name_plural = _("Refunds")
+        indexes = [
+            models.Index(fields=["created_at"], name="refund_created_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.iban})"
@@ -63,6 +66,15 @@ class Refund(TimestampedModelMixin, UserStampedModelMixin):
         """Calculate the VAT amount."""
         return calc_vat_price(self.amount, self.vat)
 
+    @property
+    def customer(self):
+        """The customer of the first order, taken from the prefetched
+        orders when they have been prefetched."""
+        orders = self.orders.all()
+        if not orders:
+            return None
+        return min(orders, key=lambda order: order.pk).customer
+
     @property
     def refund_orders(self):
         return self.orders.all().order_by("created_at")
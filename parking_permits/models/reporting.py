@@ -2,15 +2,20 @@ import datetime
 import itertools
 
 from django.db import models, transaction
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from parking_permits.models.order import Order, OrderItem, OrderStatus
 from parking_permits.models.parking_permit import (
     ContractType,
     ParkingPermit,
     ParkingPermitStatus,
 )
 from parking_permits.models.parking_zone import ParkingZone
+from parking_permits.models.product import ProductType
+from parking_permits.models.refund import Refund, RefundStatus
+from parking_permits.utils import calc_net_price, calc_vat_price
 
 
 class PermitCountSnapshot(models.Model):
@@ -210,3 +215,241 @@ class PermitCountSnapshot(models.Model):
             fields=fields_to_update,
             batch_size=5000,
         )
+
+
+class DailyRevenueRollup(models.Model):
+    """Represents the confirmed order revenue of a single day grouped
+    by parking zone, product type and VAT rate. Rows are rebuilt per
+    date with refresh_for_dates() whenever orders of that date change."""
+
+    date = models.DateField(_("Date"))
+    parking_zone_name = models.CharField(_("Parking zone name"), max_length=128)
+    product_type = models.CharField(
+        _("Product type"),
+        max_length=20,
+        choices=ProductType.choices,
+    )
+    vat = models.DecimalField(_("VAT"), max_digits=6, decimal_places=4)
+    order_count = models.IntegerField(_("Order count"))
+    item_count = models.IntegerField(_("Order item count"))
+    total_payment_price = models.DecimalField(
+        _("Total payment price"), max_digits=14, decimal_places=2
+    )
+    refreshed_at = models.DateTimeField(_("Refreshed at"))
+
+    class Meta:
+        verbose_name = _("Daily revenue rollup")
+        verbose_name_plural = _("Daily revenue rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("date", "parking_zone_name", "product_type", "vat"),
+                name="unique_daily_revenue_rollup",
+            )
+        ]
+
+    @property
+    def vat_percentage(self):
+        return self.vat * 100
+
+    @property
+    def total_payment_price_net(self):
+        return calc_net_price(self.total_payment_price, self.vat)
+
+    @property
+    def total_payment_price_vat(self):
+        return calc_vat_price(self.total_payment_price, self.vat)
+
+    @staticmethod
+    def get_changed_dates(*, since):
+        """Returns the paid dates of the orders whose order or order
+        items have been modified after the given time."""
+        changed_orders = Order.objects.filter(
+            models.Q(modified_at__gt=since)
+            | models.Q(order_items__modified_at__gt=since),
+            paid_time__isnull=False,
+        )
+        return set(
+            changed_orders.annotate(paid_date=TruncDate("paid_time"))
+            .values_list("paid_date", flat=True)
+            .distinct()
+        )
+
+    @staticmethod
+    def refresh_for_dates(dates, *, refreshed_at):
+        revenue_data = (
+            OrderItem.objects.filter(
+                order__status=OrderStatus.CONFIRMED,
+                order__paid_time__isnull=False,
+            )
+            .annotate(paid_date=TruncDate("order__paid_time"))
+            .filter(paid_date__in=dates)
+            # values() groups the rows, see PermitCountSnapshot
+            .values("paid_date", "product__zone__name", "product__type", "vat")
+            .annotate(
+                order_count=models.Count("order", distinct=True),
+                item_count=models.Count("id"),
+                total_payment_price=models.Sum(
+                    models.F("quantity") * models.F("payment_unit_price")
+                ),
+            )
+        )
+
+        DailyRevenueRollup.objects.filter(date__in=dates).delete()
+        DailyRevenueRollup.objects.bulk_create(
+            [
+                DailyRevenueRollup(
+                    date=entry["paid_date"],
+                    parking_zone_name=entry["product__zone__name"],
+                    product_type=entry["product__type"],
+                    vat=entry["vat"],
+                    order_count=entry["order_count"],
+                    item_count=entry["item_count"],
+                    total_payment_price=entry["total_payment_price"],
+                    refreshed_at=refreshed_at,
+                )
+                for entry in revenue_data
+            ],
+            batch_size=5000,
+        )
+
+
+class DailyRefundRollup(models.Model):
+    """Represents the refunds created on a single day grouped by
+    refund status and VAT rate. Rows are rebuilt per date with
+    refresh_for_dates() whenever refunds of that date change."""
+
+    date = models.DateField(_("Date"))
+    status = models.CharField(
+        _("Status"),
+        max_length=32,
+        choices=RefundStatus.choices,
+    )
+    vat = models.DecimalField(_("VAT"), max_digits=6, decimal_places=4)
+    refund_count = models.IntegerField(_("Refund count"))
+    total_amount = models.DecimalField(
+        _("Total amount"), max_digits=14, decimal_places=2
+    )
+    refreshed_at = models.DateTimeField(_("Refreshed at"))
+
+    class Meta:
+        verbose_name = _("Daily refund rollup")
+        verbose_name_plural = _("Daily refund rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("date", "status", "vat"),
+                name="unique_daily_refund_rollup",
+            )
+        ]
+
+    @property
+    def vat_percentage(self):
+        return self.vat * 100
+
+    @property
+    def total_amount_net(self):
+        return calc_net_price(self.total_amount, self.vat)
+
+    @property
+    def total_amount_vat(self):
+        return calc_vat_price(self.total_amount, self.vat)
+
+    @staticmethod
+    def get_changed_dates(*, since):
+        """Returns the creation dates of the refunds that have been
+        modified or accepted after the given time."""
+        changed_refunds = Refund.objects.filter(
+            models.Q(modified_at__gt=since) | models.Q(accepted_at__gt=since)
+        )
+        return set(
+            changed_refunds.annotate(created_date=TruncDate("created_at"))
+            .values_list("created_date", flat=True)
+            .distinct()
+        )
+
+    @staticmethod
+    def refresh_for_dates(dates, *, refreshed_at):
+        refund_data = (
+            Refund.objects.annotate(created_date=TruncDate("created_at"))
+            .filter(created_date__in=dates)
+            .values("created_date", "status", "vat")
+            .annotate(
+                refund_count=models.Count("id"),
+                total_amount=models.Sum("amount"),
+            )
+        )
+
+        DailyRefundRollup.objects.filter(date__in=dates).delete()
+        DailyRefundRollup.objects.bulk_create(
+            [
+                DailyRefundRollup(
+                    date=entry["created_date"],
+                    status=entry["status"],
+                    vat=entry["vat"],
+                    refund_count=entry["refund_count"],
+                    total_amount=entry["total_amount"],
+                    refreshed_at=refreshed_at,
+                )
+                for entry in refund_data
+            ],
+            batch_size=5000,
+        )
+
+
+class FinancialRollupRefresh(models.Model):
+    """Represents the watermark of the financial rollups, a single row
+    holding the start time of the latest refresh. The next refresh
+    rebuilds the dates of the changes made after it."""
+
+    started_at = models.DateTimeField(_("Started at"))
+
+    class Meta:
+        verbose_name = _("Financial rollup refresh")
+        verbose_name_plural = _("Financial rollup refreshes")
+
+
+FINANCIAL_ROLLUP_EPOCH = datetime.datetime.min.replace(tzinfo=datetime.UTC)
+# changes are read from this much before the start of the previous
+# refresh, to include the transactions that were still open during it
+FINANCIAL_ROLLUP_REFRESH_OVERLAP = datetime.timedelta(minutes=10)
+
+
+def _get_financial_rollup_refresh_since():
+    # locked until the end of the refresh, concurrent refreshes wait
+    watermark = FinancialRollupRefresh.objects.select_for_update().first()
+    if watermark is None:
+        return FINANCIAL_ROLLUP_EPOCH
+    return watermark.started_at - FINANCIAL_ROLLUP_REFRESH_OVERLAP
+
+
+@transaction.atomic
+def refresh_financial_rollups(*, since=None, dates=None, full=False):
+    """Rebuilds the daily revenue and refund rollups for the dates
+    touched by order and refund changes made after `since`. When
+    `since` is not given the changes are read from shortly before the
+    start of the previous refresh, and if there is none, or `full` is
+    set, all the dates are rebuilt.
+    Extra dates to rebuild can be given with `dates`.
+
+    Returns the rebuilt dates."""
+    now = timezone.now()
+
+    if full:
+        since = FINANCIAL_ROLLUP_EPOCH
+        DailyRevenueRollup.objects.all().delete()
+        DailyRefundRollup.objects.all().delete()
+    elif since is None:
+        since = _get_financial_rollup_refresh_since()
+
+    revenue_dates = DailyRevenueRollup.get_changed_dates(since=since)
+    refund_dates = DailyRefundRollup.get_changed_dates(since=since)
+    if dates:
+        revenue_dates |= set(dates)
+        refund_dates |= set(dates)
+
+    if revenue_dates:
+        DailyRevenueRollup.refresh_for_dates(revenue_dates, refreshed_at=now)
+    if refund_dates:
+        DailyRefundRollup.refresh_for_dates(refund_dates, refreshed_at=now)
+    FinancialRollupRefresh.objects.update_or_create(pk=1, defaults={"started_at": now})
+
+    return sorted(revenue_dates | refund_dates)
@@ -1,35 +1,200 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import datetime
+import functools
+import json
+import math
+
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+
+def get_estimated_count(qs):
+    """Returns the planner's row estimate for the queryset. This avoids
+    running an exact COUNT(*) over large filtered queries, but can be
+    off by orders of magnitude with stale statistics."""
+    try:
+        sql, params = qs.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # keep the microseconds DjangoJSONEncoder drops, the cursor must
+        # compare exactly against the stored value
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _get_path_field(model, path):
+    """Returns the field at the end of the lookup path, or None if the
+    path may produce nulls or multiple rows, or isn't a path of model
+    fields, e.g. an annotation, and cannot be used as a keyset pagination
+    key."""
+    opts = model._meta
+    names = path.split("__")
+    for index, name in enumerate(names):
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.null or field.many_to_many or field.one_to_many:
+            return None
+        if not field.is_relation:
+            return field if index == len(names) - 1 else None
+        opts = field.related_model._meta
+    return None
+
+
+def _get_path_value(obj, path):
+    for name in path.split("__"):
+        obj = getattr(obj, name)
+    return obj
 
 
 class QuerySetPaginator:
+    """Pages a queryset by page number.
+
+    When the previous page's end cursor is passed in the page input as
+    `after`, the page is fetched by seeking past the cursor on the sort
+    keys instead of with OFFSET. The total count is the planner estimate
+    when it exceeds the threshold, unless an exact count is requested."""
+
     default_page_size = 10
+    max_page_size = 100
+    # planner estimates above this are not counted exactly
+    estimated_count_threshold = 10000
 
     def __init__(self, qs, page_input):
-        page_size = page_input.get("page_size", self.default_page_size)
-        self.paginator = Paginator(qs, page_size)
-        page_index = page_input.get("page", 1)
-        self.page = self.paginator.page(page_index)
+        self.page_size = self.get_page_size(page_input.get("page_size"))
+        self.page_number = page_input.get("page") or 1
+        self.exact_count = page_input.get("exact_count") or False
+
+        self.keyset_paths = self._get_keyset_paths(qs)
+        self.keyset_fields = [
+            _get_path_field(qs.model, path.removeprefix("-"))
+            for path in self.keyset_paths
+        ]
+        if self.keyset_paths:
+            qs = qs.order_by(*self.keyset_paths)
+        self.qs = qs
+
+        self.start_offset = (self.page_number - 1) * self.page_size
+        seek_query = self._get_seek_query(page_input.get("after"))
+        if seek_query is not None:
+            page_qs = qs.filter(seek_query)
+            page_offset = 0
+        else:
+            page_qs = qs
+            page_offset = self.start_offset
+        page_end = page_offset + self.page_size
+        self.object_list = page_qs[page_offset:page_end]
+        self._next_qs = page_qs[page_end : page_end + 1]
+
+    @classmethod
+    def get_page_size(cls, page_size):
+        """Returns the page size applied for the requested page size."""
+        return min(page_size or cls.default_page_size, cls.max_page_size)
+
+    def _get_keyset_paths(self, qs):
+        ordering = list(qs.query.order_by) or list(qs.model._meta.ordering)
+        paths = []
+        for order_field in ordering:
+            if not isinstance(order_field, str):
+                return []
+            path = order_field.removeprefix("-")
+            if path == "?" or not _get_path_field(qs.model, path):
+                return []
+            paths.append(order_field)
+        # a unique tiebreaker keeps the order stable between pages
+        if not {path.removeprefix("-") for path in paths} & {"pk", "id"}:
+            paths.append("pk")
+        return paths
+
+    def _get_seek_query(self, cursor):
+        if not cursor or not self.keyset_paths:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            ordering, values, page = data["o"], data["v"], data["p"]
+            if ordering != self.keyset_paths or page != self.page_number - 1:
+                return None
+            if not isinstance(values, list) or len(values) != len(ordering):
+                return None
+            # validated here, a value the field can't hold would fail when
+            # the query is built
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.keyset_fields, values, strict=True)
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            return None
 
-    @property
-    def next_page(self):
-        return self.page.next_page_number() if self.page.has_next() else None
+        query = Q()
+        for index, order_field in enumerate(self.keyset_paths):
+            path = order_field.removeprefix("-")
+            lookup = "lt" if order_field.startswith("-") else "gt"
+            condition = Q(**{f"{path}__{lookup}": values[index]})
+            for previous_index, previous_field in enumerate(self.keyset_paths[:index]):
+                condition &= Q(
+                    **{previous_field.removeprefix("-"): values[previous_index]}
+                )
+            query |= condition
+        return query
 
-    @property
-    def prev_page(self):
-        return self.page.previous_page_number() if self.page.has_previous() else None
+    def _get_end_cursor(self, objects):
+        if not self.keyset_paths or not objects:
+            return None
+        last = objects[-1]
+        values = [
+            _get_path_value(last, path.removeprefix("-")) for path in self.keyset_paths
+        ]
+        payload = json.dumps(
+            {"o": self.keyset_paths, "v": values, "p": self.page_number},
+            cls=CursorEncoder,
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
 
-    @property
-    def object_list(self):
-        return self.page.object_list
+    def _get_count(self, objects):
+        # a page that isn't full is the last one and gives the count without
+        # a query, unless it's an empty page past the end
+        if len(objects) < self.page_size and (objects or self.page_number == 1):
+            return self.start_offset + len(objects), False
+        if not self.exact_count:
+            estimated_count = get_estimated_count(self.qs)
+            if estimated_count > self.estimated_count_threshold:
+                return estimated_count, True
+        return self.qs.count(), False
 
-    @property
+    @functools.cached_property
     def page_info(self):
+        objects = list(self.object_list)
+        count, count_is_estimate = self._get_count(objects)
+        if count_is_estimate:
+            has_next = self._next_qs.exists()
+        else:
+            has_next = self.start_offset + len(objects) < count
+        num_pages = max(math.ceil(count / self.page_size), 1)
+        if has_next:
+            num_pages = max(num_pages, self.page_number + 1)
         return {
-            "next": self.next_page,
-            "prev": self.prev_page,
-            "page": self.page.number,
-            "num_pages": self.paginator.num_pages,
-            "start_index": self.page.start_index(),
-            "end_index": self.page.end_index(),
-            "count": self.paginator.count,
+            "next": self.page_number + 1 if has_next else None,
+            "prev": self.page_number - 1 if self.page_number > 1 else None,
+            "page": self.page_number,
+            "num_pages": num_pages,
+            "start_index": self.start_offset + 1 if objects else 0,
+            "end_index": self.start_offset + len(objects),
+            "count": count,
+            "count_is_estimate": count_is_estimate,
+            "end_cursor": self._get_end_cursor(objects),
         }
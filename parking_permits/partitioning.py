@@ -0,0 +1,268 @@
+"""Monthly range partitioning of the audit log and permit event tables.
+
+The tables are partitioned by their creation time into a partition per
+month, named <table>_pYYYYMM, and a default partition for the rows outside
+them. maintain_partitions creates the partitions of the coming months,
+moves the rows of the default partition to monthly partitions and drops
+the partitions older than the retention period of the table, instead of
+deleting the expired rows one by one.
+"""
+
+import datetime
+import logging
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger("db")
+
+# the number of months the partitions are created ahead
+MONTHS_AHEAD = 3
+
+
+def quote_name(name):
+    return connection.ops.quote_name(name)
+
+
+def get_month_start(value):
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.UTC)
+
+
+class PartitionedTable:
+    def __init__(self, table, column, retention_setting, keep_condition=None):
+        self.table = table
+        self.column = column
+        # the setting of the number of months the partitions are kept,
+        # 0 keeps them forever
+        self.retention_setting = retention_setting
+        # the partitions with rows matching the condition are not dropped
+        self.keep_condition = keep_condition
+
+    @property
+    def default_partition(self):
+        return f"{self.table}_default"
+
+    @property
+    def retention_months(self):
+        return getattr(settings, self.retention_setting)
+
+    def get_partition_name(self, month):
+        return f"{self.table}_p{month:%Y%m}"
+
+    def get_partitions(self, cursor):
+        """Returns the names of the monthly partitions by month."""
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [self.table],
+        )
+        prefix = f"{self.table}_p"
+        return {
+            datetime.datetime.strptime(name.removeprefix(prefix), "%Y%m").replace(
+                tzinfo=datetime.UTC
+            ): name
+            for (name,) in cursor.fetchall()
+            if name != self.default_partition
+        }
+
+    def get_months(self, cursor, source_table, months_ahead=MONTHS_AHEAD):
+        """Returns the months of the rows of the source table and the
+        current and coming months."""
+        current_month = get_month_start(timezone.now())
+        months = {
+            current_month + relativedelta(months=i) for i in range(months_ahead + 1)
+        }
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {quote_name(self.column)}, 'UTC') "
+            f"FROM {quote_name(source_table)}"
+        )
+        months.update(get_month_start(month) for (month,) in cursor.fetchall())
+        return sorted(months)
+
+    def create_partition(self, cursor, month):
+        """Creates the partition of the month, moving its rows from the
+        default partition, and returns its name."""
+        table = quote_name(self.table)
+        column = quote_name(self.column)
+        name = self.get_partition_name(month)
+        bounds = [month, month + relativedelta(months=1)]
+        cursor.execute(
+            f"CREATE TABLE {quote_name(name)} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote_name(self.default_partition)} "
+            f"WHERE {column} >= %s AND {column} < %s RETURNING *) "
+            f"INSERT INTO {quote_name(name)} SELECT * FROM moved",
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {quote_name(name)} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        return name
+
+    def has_rows_to_keep(self, cursor, name):
+        if not self.keep_condition:
+            return False
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {quote_name(name)} "
+            f"WHERE {self.keep_condition})"
+        )
+        return cursor.fetchone()[0]
+
+    def drop_partition(self, cursor, name):
+        cursor.execute(
+            f"ALTER TABLE {quote_name(self.table)} DETACH PARTITION {quote_name(name)}"
+        )
+        cursor.execute(f"DROP TABLE {quote_name(name)}")
+
+    @transaction.atomic
+    def ensure_partitions(self, months_ahead=MONTHS_AHEAD):
+        """Creates the missing partitions of the current and the coming
+        months and of the rows in the default partition, and returns their
+        names."""
+        with connection.cursor() as cursor:
+            partitions = self.get_partitions(cursor)
+            return [
+                self.create_partition(cursor, month)
+                for month in self.get_months(
+                    cursor, self.default_partition, months_ahead
+                )
+                if month not in partitions
+            ]
+
+    @transaction.atomic
+    def drop_expired_partitions(self, dry_run=False):
+        """Drops the partitions of the months before the retention period
+        and returns their names."""
+        if not self.retention_months:
+            return []
+        cutoff = get_month_start(timezone.now()) - relativedelta(
+            months=self.retention_months
+        )
+        dropped = []
+        with connection.cursor() as cursor:
+            for month, name in sorted(self.get_partitions(cursor).items()):
+                if month >= cutoff:
+                    continue
+                if self.has_rows_to_keep(cursor, name):
+                    logger.warning(f"Partition {name} has rows to keep, not dropped")
+                    continue
+                if not dry_run:
+                    self.drop_partition(cursor, name)
+                dropped.append(name)
+        return dropped
+
+    def partition(self, schema_editor):
+        """Converts the table to a partitioned table, copying its rows to
+        the monthly partitions.
+
+        The primary key becomes (id, created_at), as it has to contain the
+        partition key, and the ids are taken from a sequence, as identity
+        columns can't be copied to a partitioned table."""
+        table = quote_name(self.table)
+        old_table = f"{self.table}_unpartitioned"
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype = 'f'
+                """,
+                [self.table],
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT indexdef
+                FROM pg_indexes
+                WHERE tablename = %s AND indexname NOT IN (
+                    SELECT conname FROM pg_constraint
+                    WHERE conrelid = %s::regclass AND contype = 'p'
+                )
+                """,
+                [self.table, self.table],
+            )
+            indexes = [indexdef for (indexdef,) in cursor.fetchall()]
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+            next_id = cursor.fetchone()[0]
+
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {quote_name(old_table)}")
+            cursor.execute(
+                f"CREATE TABLE {table} (LIKE {quote_name(old_table)} "
+                "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE ({quote_name(self.column)})"
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ADD PRIMARY KEY (id, {quote_name(self.column)})"
+            )
+            cursor.execute(
+                f"CREATE TABLE {quote_name(self.default_partition)} "
+                f"PARTITION OF {table} DEFAULT"
+            )
+            for month in self.get_months(cursor, old_table):
+                self.create_partition(cursor, month)
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {quote_name(old_table)}")
+            cursor.execute(f"DROP TABLE {quote_name(old_table)}")
+
+            sequence = f"{self.table}_id_seq"
+            cursor.execute(
+                f"CREATE SEQUENCE {quote_name(sequence)} START {int(next_id)} "
+                f"OWNED BY {table}.id"
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval(%s)",
+                [sequence],
+            )
+            for name, definition in foreign_keys:
+                cursor.execute(
+                    f"ALTER TABLE {table} "
+                    f"ADD CONSTRAINT {quote_name(name)} {definition}"
+                )
+            # the indexes of the partitioned table are created on every partition
+            for definition in indexes:
+                cursor.execute(definition)
+
+
+PARTITIONED_TABLES = [
+    PartitionedTable(
+        "parking_permits_parkingpermitevent",
+        "created_at",
+        "PERMIT_EVENT_RETENTION_MONTHS",
+    ),
+    # the entries not yet sent to the audit log service are kept
+    PartitionedTable(
+        "resilient_logger_resilientlogentry",
+        "created_at",
+        "AUDIT_LOG_RETENTION_MONTHS",
+        keep_condition="NOT is_sent",
+    ),
+    PartitionedTable(
+        "audit_logger_auditlog",
+        "created_at",
+        "AUDIT_LOG_RETENTION_MONTHS",
+        keep_condition="NOT is_sent",
+    ),
+]
+
+
+def maintain_partitions(dry_run=False):
+    """Creates the missing partitions and drops the expired partitions of
+    the partitioned tables. Returns the names of the created and the
+    dropped partitions."""
+    created = []
+    dropped = []
+    for partitioned_table in PARTITIONED_TABLES:
+        if not dry_run:
+            created += partitioned_table.ensure_partitions()
+        dropped += partitioned_table.drop_expired_partitions(dry_run=dry_run)
+    return created, dropped
@@ -0,0 +1,216 @@
+"""Persisted queries and the cache of parsed and validated documents.
+
+The documents are cached by the SHA-256 hash of the query text, so the
+same query is parsed and validated against the schema rules once per
+process. Clients can send only the hash, following the automatic
+persisted queries protocol of Apollo: the hash is sent in
+`extensions.persistedQuery.sha256Hash`, and when the server doesn't know
+it, the client retries with both the query and the hash, which stores
+the query. The clients, authenticated or not, can store queries of up
+to GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH characters, and at most
+GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES queries are stored per
+GRAPHQL_PERSISTED_QUERIES_TIMEOUT. Queries can also be registered at
+deploy time with a JSON manifest mapping the hashes to the queries, set
+with GRAPHQL_PERSISTED_QUERIES_MANIFEST.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from ariadne.exceptions import HttpBadRequestError
+from ariadne.graphql import graphql_sync
+from ariadne_django.views import GraphQLView
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseBadRequest, JsonResponse
+from graphql import parse, specified_rules, validate
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+PERSISTED_QUERY_HASH_MISMATCH = "provided sha does not match query"
+
+
+def get_query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class CachedDocument:
+    __slots__ = ("document", "validation_errors")
+
+    def __init__(self, document):
+        self.document = document
+        self.validation_errors = None
+
+
+class PersistedQueries:
+    """Queries by hash, and the parsed documents of the most recently
+    used queries with the results of their validation."""
+
+    def __init__(self, name, max_documents=500):
+        self.name = name
+        self.max_documents = max_documents
+        self._manifest = None
+        self._documents = OrderedDict()
+        self._documents_by_id = {}
+        self._lock = threading.Lock()
+
+    def _get_manifest(self):
+        if self._manifest is None:
+            manifest = {}
+            if path := settings.GRAPHQL_PERSISTED_QUERIES_MANIFEST:
+                with open(path) as f:
+                    manifest = json.load(f)
+            self._manifest = manifest
+        return self._manifest
+
+    def _get_cache_key(self, query_hash):
+        return f"persisted-query:{self.name}:{query_hash}"
+
+    def get_query(self, query_hash):
+        if query := self._get_manifest().get(query_hash):
+            return query
+        return cache.get(self._get_cache_key(query_hash))
+
+    def save_query(self, query_hash, query):
+        """Stores the query sent by a client, unless it is too long or the
+        clients have already stored the maximum number of queries. A query
+        that is not stored is still executed, the client just sends it
+        again the next time."""
+        if len(query) > settings.GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH or self.get_query(
+            query_hash
+        ):
+            return False
+        timeout = settings.GRAPHQL_PERSISTED_QUERIES_TIMEOUT
+        # counts the queries stored since the counter was created, the
+        # stored queries expire at most one timeout after it expires
+        count_key = f"persisted-query-count:{self.name}"
+        cache.add(count_key, 0, timeout)
+        try:
+            count = cache.incr(count_key)
+        except ValueError:
+            # expired after it was added
+            return False
+        if count > settings.GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES:
+            return False
+        cache.set(self._get_cache_key(query_hash), query, timeout)
+        return True
+
+    def resolve_data(self, data):
+        """Fills in the query of a request sending a persisted query hash,
+        or stores the query sent with its hash."""
+        if not isinstance(data, dict):
+            return data
+        persisted_query = (data.get("extensions") or {}).get("persistedQuery")
+        if not persisted_query:
+            return data
+        query_hash = persisted_query.get("sha256Hash")
+        if persisted_query.get("version") != 1 or not isinstance(query_hash, str):
+            raise PersistedQueryError(
+                PERSISTED_QUERY_NOT_SUPPORTED, "PERSISTED_QUERY_NOT_SUPPORTED"
+            )
+
+        if query := data.get("query"):
+            if not isinstance(query, str) or get_query_hash(query) != query_hash:
+                raise PersistedQueryError(
+                    PERSISTED_QUERY_HASH_MISMATCH, "BAD_USER_INPUT"
+                )
+            self.save_query(query_hash, query)
+            return data
+
+        query = self.get_query(query_hash)
+        if not query:
+            raise PersistedQueryError(
+                PERSISTED_QUERY_NOT_FOUND, "PERSISTED_QUERY_NOT_FOUND"
+            )
+        return {**data, "query": query}
+
+    def get_document(self, query):
+        query_hash = get_query_hash(query)
+        with self._lock:
+            cached = self._documents.get(query_hash)
+            if cached:
+                self._documents.move_to_end(query_hash)
+                return cached.document
+
+        # parse errors are raised and not cached
+        document = parse(query)
+        with self._lock:
+            if query_hash not in self._documents:
+                self._documents[query_hash] = CachedDocument(document)
+                self._documents_by_id[id(document)] = self._documents[query_hash]
+                while len(self._documents) > self.max_documents:
+                    _hash, evicted = self._documents.popitem(last=False)
+                    del self._documents_by_id[id(evicted.document)]
+            return self._documents[query_hash].document
+
+    def parse_query(self, context_value, data):
+        return self.get_document(data["query"])
+
+    def validate_query(self, schema, document, rules=None, **kwargs):
+        """Validates the document against the rules of the specification
+        once and against the custom rules on every request, as they may
+        depend on the variables."""
+        rules = list(rules or specified_rules)
+        custom_rules = [rule for rule in rules if rule not in specified_rules]
+        cached = self._documents_by_id.get(id(document))
+        if cached is None:
+            return validate(schema, document, rules, **kwargs)
+        if cached.validation_errors is None:
+            cached.validation_errors = validate(
+                schema, document, specified_rules, **kwargs
+            )
+        if cached.validation_errors or not custom_rules:
+            return cached.validation_errors
+        return validate(schema, document, custom_rules, **kwargs)
+
+
+class PersistedQueryGraphQLView(GraphQLView):
+    persisted_queries = None
+
+    def get_kwargs_graphql(self, request):
+        return {
+            **super().get_kwargs_graphql(request),
+            "query_parser": self.persisted_queries.parse_query,
+            "query_validator": self.persisted_queries.validate_query,
+        }
+
+    def get_request_data(self, request):
+        """Returns the data of the request with its persisted query filled
+        in, and the error response when it can't be executed."""
+        try:
+            data = self.persisted_queries.resolve_data(
+                self.extract_data_from_request(request)
+            )
+        except HttpBadRequestError as error:
+            return None, HttpResponseBadRequest(error.message)
+        except PersistedQueryError as error:
+            # as expected by the clients retrying with the query
+            return None, JsonResponse(
+                {
+                    "errors": [
+                        {
+                            "message": error.message,
+                            "extensions": {"code": error.code},
+                        }
+                    ]
+                }
+            )
+        return data, None
+
+    def post(self, request, *args, **kwargs):
+        data, error_response = self.get_request_data(request)
+        if error_response:
+            return error_response
+        success, result = graphql_sync(
+            self.schema, data, **self.get_kwargs_graphql(request)
+        )
+        return JsonResponse(result, status=200 if success else 400)
@@ -0,0 +1,231 @@
+"""Static depth and cost analysis of the GraphQL queries.
+
+Every object field costs its weight, one unless set otherwise, and the
+cost of a list field's selections is multiplied by the expected length
+of the list: the page size the paginator applies to the enclosing paged
+query, a fixed size for the known lists, or the default list size.
+Operations exceeding the depth or cost limits of the schema are rejected
+in validation, before any resolver runs, and the computed cost is
+returned in the "queryCost" response extension.
+"""
+
+from ariadne.types import Extension
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    get_named_type,
+    is_composite_type,
+    is_list_type,
+    is_non_null_type,
+    value_from_ast,
+)
+from graphql.validation import ValidationRule
+
+from .paginator import QuerySetPaginator
+
+
+class QueryLimits:
+    def __init__(
+        self,
+        max_depth,
+        max_cost,
+        default_list_size=10,
+        field_weights=None,
+        list_sizes=None,
+    ):
+        self.max_depth = max_depth
+        self.max_cost = max_cost
+        self.default_list_size = default_list_size
+        # "Type.field" -> the cost of resolving the field once
+        self.field_weights = field_weights or {}
+        # "Type.field" -> the expected length of the list field
+        self.list_sizes = list_sizes or {}
+
+
+CUSTOMER_QUERY_LIMITS = QueryLimits(
+    max_depth=8,
+    max_cost=500,
+    field_weights={
+        # DVV, Helsinki profile and Traficom lookups
+        "Query.profile": 10,
+        "Mutation.getVehicleInformation": 10,
+        "Mutation.createOrder": 10,
+    },
+    list_sizes={
+        "Query.getPermits": 2,
+        "PermitNode.products": 12,
+    },
+)
+
+ADMIN_QUERY_LIMITS = QueryLimits(
+    max_depth=10,
+    max_cost=5000,
+    field_weights={
+        # DVV, Kami and Traficom lookups
+        "Query.customer": 10,
+        "Query.vehicle": 10,
+        "Query.addressSearch": 10,
+    },
+    list_sizes={
+        "Query.zones": 50,
+        "PermitDetailNode.changeLogs": 50,
+    },
+)
+
+
+def get_page_size(field_args):
+    """Returns the page size the paginator applies to the paged query."""
+    page_input = field_args.get("pageInput")
+    if not isinstance(page_input, dict):
+        return QuerySetPaginator.get_page_size(None)
+    # variables keep the schema names, literals are converted to Python names
+    page_size = page_input.get("pageSize") or page_input.get("page_size")
+    return QuerySetPaginator.get_page_size(page_size)
+
+
+class QueryCostAnalysis:
+    def __init__(self, context, limits, variables):
+        self.context = context
+        self.limits = limits
+        self.variables = variables or {}
+
+    def get_field_args(self, field_def, node):
+        args = {}
+        for arg_node in node.arguments or []:
+            arg_def = field_def.args.get(arg_node.name.value)
+            if arg_def is None:
+                continue
+            value = value_from_ast(arg_node.value, arg_def.type, self.variables)
+            if value is not None:
+                args[arg_node.name.value] = value
+        return args
+
+    def get_fields(self, selection_set, parent_type, fragments_seen):
+        """Yields the fields of the selection set with their parent
+        types, with the fragments expanded."""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.context.schema.get_type(
+                        selection.type_condition.name.value
+                    )
+                if fragment_type:
+                    yield from self.get_fields(
+                        selection.selection_set, fragment_type, fragments_seen
+                    )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                if not fragment or name in fragments_seen:
+                    continue
+                fragment_type = self.context.schema.get_type(
+                    fragment.type_condition.name.value
+                )
+                if fragment_type:
+                    yield from self.get_fields(
+                        fragment.selection_set, fragment_type, fragments_seen | {name}
+                    )
+
+    def analyze(self, selection_set, parent_type, page_size=None, fragments_seen=()):
+        """Returns the cost and the depth of the selection set."""
+        cost = 0
+        depth = 0
+        for node, node_parent_type in self.get_fields(
+            selection_set, parent_type, frozenset(fragments_seen)
+        ):
+            name = node.name.value
+            fields = getattr(node_parent_type, "fields", None)
+            if name.startswith("__") or not fields or name not in fields:
+                continue
+            field_def = fields[name]
+            field_key = f"{node_parent_type.name}.{name}"
+            field_type = get_named_type(field_def.type)
+
+            weight = self.limits.field_weights.get(
+                field_key, 1 if is_composite_type(field_type) else 0
+            )
+            child_cost = child_depth = 0
+            if node.selection_set:
+                # the page size applies to the list of the paged result
+                child_page_size = None
+                if "pageInput" in field_def.args:
+                    child_page_size = get_page_size(
+                        self.get_field_args(field_def, node)
+                    )
+                child_cost, child_depth = self.analyze(
+                    node.selection_set, field_type, child_page_size, fragments_seen
+                )
+
+            multiplier = 1
+            return_type = field_def.type
+            if is_non_null_type(return_type):
+                return_type = return_type.of_type
+            if is_list_type(return_type):
+                multiplier = self.limits.list_sizes.get(
+                    field_key, page_size or self.limits.default_list_size
+                )
+            cost += (weight + child_cost) * multiplier
+            depth = max(depth, child_depth + 1)
+        return cost, depth
+
+
+def query_limits_validator(limits, context_value, data):
+    """Returns a validation rule enforcing the limits, storing the cost
+    of the executed operation in the context."""
+
+    variables = data.get("variables") if isinstance(data, dict) else None
+    operation_name = data.get("operationName") if isinstance(data, dict) else None
+
+    class QueryLimitsValidator(ValidationRule):
+        def enter_operation_definition(self, node, *_args):
+            root_type = self.context.schema.get_root_type(node.operation)
+            if root_type is None:
+                return
+            cost, depth = QueryCostAnalysis(self.context, limits, variables).analyze(
+                node.selection_set, root_type
+            )
+            name = node.name.value if node.name else None
+            if operation_name is None or operation_name == name:
+                context_value["query_cost"] = {
+                    "cost": cost,
+                    "maxCost": limits.max_cost,
+                    "depth": depth,
+                    "maxDepth": limits.max_depth,
+                }
+            if depth > limits.max_depth:
+                self.report_error(
+                    GraphQLError(
+                        f"The query depth {depth} exceeds the maximum depth "
+                        f"{limits.max_depth}.",
+                        node,
+                    )
+                )
+            if cost > limits.max_cost:
+                self.report_error(
+                    GraphQLError(
+                        f"The query cost {cost} exceeds the maximum cost "
+                        f"{limits.max_cost}.",
+                        node,
+                    )
+                )
+
+    return QueryLimitsValidator
+
+
+def get_validation_rules(limits):
+    def validation_rules(context_value, document, data):
+        return [query_limits_validator(limits, context_value, data)]
+
+    return validation_rules
+
+
+class QueryCostExtension(Extension):
+    def format(self, context):
+        if query_cost := context.get("query_cost"):
+            return {"queryCost": query_cost}
+        return None
@@ -1,13 +1,16 @@
+import functools
 import logging
 from collections import Counter
 from decimal import Decimal
 
 from ariadne import (
     MutationType,
+    ObjectType,
     QueryType,
     load_schema_from_path,
 )
 from ariadne.contrib.federation import FederatedObjectType
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
@@ -18,7 +21,7 @@ from project.settings import BASE_DIR
 
 from .constants import DEFAULT_VAT, EventFields, Origin
 from .customer_permit import CustomerPermit
-from .decorators import is_authenticated
+from .decorators import decorator_stack, is_authenticated
 from .exceptions import (
     AddressError,
     DuplicatePermitError,
@@ -26,6 +29,16 @@ from .exceptions import (
     ParkingZoneError,
     TraficomFetchVehicleError,
 )
+from .loaders import (
+    get_loaders,
+    resolve_address_zone,
+    resolve_customer_other_address,
+    resolve_customer_primary_address,
+    resolve_permit_active_temporary_vehicle,
+    resolve_permit_address,
+    resolve_permit_parking_zone,
+    resolve_permit_vehicle,
+)
 from .models import Address, Customer, Vehicle
 from .models.order import Order, OrderPaymentType, OrderStatus, OrderType
 from .models.parking_permit import (
@@ -35,7 +48,7 @@ from .models.parking_permit import (
     ParkingPermitStatus,
 )
 from .resolver_utils import create_refund
-from .services.dvv import get_addresses
+from .services.dvv import async_get_addresses, get_addresses
 from .services.hel_profile import HelsinkiProfile
 from .services.mail import (
     PermitEmailType,
@@ -67,10 +80,17 @@ helsinki_profile_query = load_schema_from_path(
 
 query = QueryType()
 mutation = MutationType()
+# the resolvers of the I/O-bound operations run as coroutines under ASGI,
+# replacing the resolvers of the same fields in the async schema
+async_query = QueryType()
+async_mutation = MutationType()
 address_node = FederatedObjectType("AddressNode")
 profile_node = FederatedObjectType("ProfileNode")
+customer_node = ObjectType("CustomerNode")
+permit_node = ObjectType("PermitNode")
 
-schema_bindables = [query, mutation, address_node]
+schema_bindables = [query, mutation, address_node, customer_node, permit_node]
+async_schema_bindables = [*schema_bindables, async_query, async_mutation]
 
 ACTIVE_PERMIT_STATUSES = [
     ParkingPermitStatus.DRAFT,
@@ -96,7 +116,9 @@ def resolve_customer_permits(_obj, info):
     request = info.context["request"]
     # NOTE: get() actually fetches a *list* of items... and more importantly, also
     # deletes items. And also updates vehicles. So this is not purely a read operation.
-    return CustomerPermit(request.user.customer.id).get()
+    permits = CustomerPermit(request.user.customer.id).get()
+    get_loaders(info).prepare_permits(permits)
+    return permits
 
 
 def save_profile_address(address):
@@ -117,18 +139,23 @@ def save_profile_address(address):
     return address_obj[0]
 
 
-@query.field("profile")
-@is_authenticated
-@audit_logger.autolog(
-    # Note: This resolver either updates or creates a profile,
-    # so it's a read operation until a certain point.
-    AuditMsg(
-        "User retrieved user profile.",
-        operation=audit.Operation.READ,
+user_profile_resolver = decorator_stack(
+    is_authenticated,
+    audit_logger.autolog(
+        # Note: This resolver either updates or creates a profile,
+        # so it's a read operation until a certain point.
+        AuditMsg(
+            "User retrieved user profile.",
+            operation=audit.Operation.READ,
+        ),
+        autotarget=audit.target_return,
+        add_kwarg=True,
     ),
-    autotarget=audit.target_return,
-    add_kwarg=True,
 )
+
+
+@query.field("profile")
+@user_profile_resolver
 @transaction.atomic
 def resolve_user_profile(_obj, info, *args, audit_msg: AuditMsg = None):
     request = info.context["request"]
@@ -136,15 +163,43 @@ def resolve_user_profile(_obj, info, *args, audit_msg: AuditMsg = None):
     customer = profile.get_customer()
 
     if not settings.DVV_UPDATE_USER_PROFILE_DATA:
-        audit_msg.operation = audit.Operation.READ
-        audit_msg.message = "User profile was read automatically."
-        return Customer.objects.get(
-            national_id_number=customer.get("national_id_number")
-        )
+        return get_profile_customer(customer, audit_msg)
 
     primary_address_data, other_address_data = get_addresses(
         customer.get("national_id_number")
     )
+    return save_profile_customer(
+        request.user, customer, primary_address_data, other_address_data, audit_msg
+    )
+
+
+@async_query.field("profile")
+@user_profile_resolver
+async def async_resolve_user_profile(_obj, info, *args, audit_msg: AuditMsg = None):
+    request = info.context["request"]
+    profile = HelsinkiProfile(request)
+    customer = await profile.async_get_customer()
+
+    if not settings.DVV_UPDATE_USER_PROFILE_DATA:
+        return await sync_to_async(get_profile_customer)(customer, audit_msg)
+
+    primary_address_data, other_address_data = await async_get_addresses(
+        customer.get("national_id_number")
+    )
+    return await sync_to_async(transaction.atomic(save_profile_customer))(
+        request.user, customer, primary_address_data, other_address_data, audit_msg
+    )
+
+
+def get_profile_customer(customer, audit_msg):
+    audit_msg.operation = audit.Operation.READ
+    audit_msg.message = "User profile was read automatically."
+    return Customer.objects.get(national_id_number=customer.get("national_id_number"))
+
+
+def save_profile_customer(
+    user, customer, primary_address_data, other_address_data, audit_msg
+):
     primary_address = (
         save_profile_address(primary_address_data)
         if is_valid_address(primary_address_data)
@@ -159,7 +214,7 @@ def resolve_user_profile(_obj, info, *args, audit_msg: AuditMsg = None):
     customer_obj, created = Customer.objects.update_or_create(
         national_id_number=customer.get("national_id_number"),
         defaults={
-            "user": request.user,
+            "user": user,
             **customer,
             "primary_address": primary_address,
             "other_address": other_address,
@@ -214,6 +269,15 @@ def resolve_update_language(_obj, info, lang):
     return customer
 
 
+customer_node.set_field("primaryAddress", resolve_customer_primary_address)
+customer_node.set_field("otherAddress", resolve_customer_other_address)
+address_node.set_field("zone", resolve_address_zone)
+permit_node.set_field("vehicle", resolve_permit_vehicle)
+permit_node.set_field("address", resolve_permit_address)
+permit_node.set_field("parkingZone", resolve_permit_parking_zone)
+permit_node.set_field("activeTemporaryVehicle", resolve_permit_active_temporary_vehicle)
+
+
 @address_node.field("primary")
 @transaction.atomic
 def resolve_address_primary(address, info):
@@ -396,20 +460,40 @@ def resolve_end_permit(
     )
 
 
-@mutation.field("getVehicleInformation")
-@is_authenticated
-@audit_logger.autolog(
-    AuditMsg(
-        "User retrieved vehicle information.",
-        operation=audit.Operation.READ,
+vehicle_information_resolver = decorator_stack(
+    is_authenticated,
+    audit_logger.autolog(
+        AuditMsg(
+            "User retrieved vehicle information.",
+            operation=audit.Operation.READ,
+        ),
+        autotarget=audit.target_return,
     ),
-    autotarget=audit.target_return,
 )
+
+
+@mutation.field("getVehicleInformation")
+@vehicle_information_resolver
 @transaction.atomic
 def resolve_get_vehicle_information(_obj, info, registration):
     request = info.context["request"]
     vehicle = Traficom().fetch_vehicle_details(registration_number=registration)
-    customer = request.user.customer
+    check_user_vehicle(request.user, vehicle)
+    return vehicle
+
+
+@async_mutation.field("getVehicleInformation")
+@vehicle_information_resolver
+async def async_resolve_get_vehicle_information(_obj, info, registration):
+    request = info.context["request"]
+    return await Traficom().async_fetch_vehicle_details(
+        registration_number=registration,
+        check_vehicle=functools.partial(check_user_vehicle, request.user),
+    )
+
+
+def check_user_vehicle(user, vehicle):
+    customer = user.customer
     is_user_of_vehicle = customer.is_user_of_vehicle(vehicle)
     if not is_user_of_vehicle:
         raise TraficomFetchVehicleError(
@@ -421,7 +505,6 @@ def resolve_get_vehicle_information(_obj, info, registration):
         raise TraficomFetchVehicleError(
             _("Customer does not have a valid driving licence")
         )
-    return vehicle
 
 
 @mutation.field("updatePermitVehicle")
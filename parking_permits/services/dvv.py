@@ -3,13 +3,18 @@ import json
 import logging
 from typing import Any, TypedDict
 
-import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from parking_permits.exceptions import ObjectNotFoundError
 from parking_permits.models import Customer, ParkingZone
-from parking_permits.services.kami import get_address_details, parse_street_data
+from parking_permits.services.http import get_async_client, get_session
+from parking_permits.services.kami import (
+    async_get_address_details,
+    get_address_details,
+    parse_street_data,
+)
 from parking_permits.utils import is_valid_city
 
 logger = logging.getLogger("db")
@@ -64,9 +69,20 @@ def get_request_data(hetu):
 
 
 def get_addresses(national_id_number):
+    customer = get_person_info(national_id_number) if national_id_number else None
+    return _get_customer_addresses(national_id_number, customer)
+
+
+async def async_get_addresses(national_id_number):
+    customer = (
+        await async_get_person_info(national_id_number) if national_id_number else None
+    )
+    return _get_customer_addresses(national_id_number, customer)
+
+
+def _get_customer_addresses(national_id_number, customer):
     primary_address, other_address = None, None
     if national_id_number:
-        customer = get_person_info(national_id_number)
         if not customer:
             raise ObjectNotFoundError(_("Person not found"))
         primary_address = _extract_address_data(customer.get("primary_address"))
@@ -104,6 +120,18 @@ def _extract_address_data(address) -> DvvAddressInfo | None:
 
 
 def format_address(address_data) -> DvvAddressInfo:
+    street_name, street_number, __ = parse_street_data(address_data["LahiosoiteS"])
+    address_detail = get_address_details(street_name, street_number)
+    return _format_address(address_data, address_detail)
+
+
+async def async_format_address(address_data) -> DvvAddressInfo:
+    street_name, street_number, __ = parse_street_data(address_data["LahiosoiteS"])
+    address_detail = await async_get_address_details(street_name, street_number)
+    return await sync_to_async(_format_address)(address_data, address_detail)
+
+
+def _format_address(address_data, address_detail) -> DvvAddressInfo:
     # DVV combines the street name, street number and apartment
     # building number together in a single string. We only need
     # to use the street name and street number
@@ -117,8 +145,6 @@ def format_address(address_data) -> DvvAddressInfo:
     else:
         street_name_sv, apartment_sv = "", ""
 
-    address_detail = get_address_details(street_name, street_number)
-
     try:
         zone = ParkingZone.objects.get_for_location(address_detail["location"])
     except ParkingZone.DoesNotExist:
@@ -147,12 +173,63 @@ def get_person_info(national_id_number) -> DvvPersonInfo | None:
     logger.info(f"Retrieving person info with national_id_number: {national_id_number}")
     data = get_request_data(national_id_number)
     headers = get_request_headers()
-    response = requests.post(
+    response = get_session().post(
         settings.DVV_PERSONAL_INFO_URL,
         json.dumps(data, default=str),
         headers=headers,
     )
-    if not response.ok:
+    person_info = _get_response_person_info(national_id_number, response, response.ok)
+    if not person_info:
+        return None
+
+    permanent_address = person_info["VakinainenKotimainenLahiosoite"]
+    temporary_address = person_info["TilapainenKotimainenLahiosoite"]
+    return _make_person_info(
+        national_id_number,
+        person_info,
+        format_address(permanent_address)
+        if is_valid_address(permanent_address)
+        else None,
+        format_address(temporary_address)
+        if is_valid_address(temporary_address)
+        else None,
+    )
+
+
+async def async_get_person_info(national_id_number) -> DvvPersonInfo | None:
+    logger.info(f"Retrieving person info with national_id_number: {national_id_number}")
+    data = get_request_data(national_id_number)
+    headers = get_request_headers()
+    response = await get_async_client().post(
+        settings.DVV_PERSONAL_INFO_URL,
+        content=json.dumps(data, default=str),
+        headers=headers,
+    )
+    person_info = _get_response_person_info(
+        national_id_number, response, not response.is_error
+    )
+    if not person_info:
+        return None
+
+    permanent_address = person_info["VakinainenKotimainenLahiosoite"]
+    temporary_address = person_info["TilapainenKotimainenLahiosoite"]
+    primary_address = (
+        await async_format_address(permanent_address)
+        if is_valid_address(permanent_address)
+        else None
+    )
+    other_address = (
+        await async_format_address(temporary_address)
+        if is_valid_address(temporary_address)
+        else None
+    )
+    return await sync_to_async(_make_person_info)(
+        national_id_number, person_info, primary_address, other_address
+    )
+
+
+def _get_response_person_info(national_id_number, response, ok):
+    if not ok:
         logger.error(
             f"Invalid DVV response for {national_id_number}. Response: {response.text}"
         )
@@ -166,23 +243,16 @@ def get_person_info(national_id_number) -> DvvPersonInfo | None:
     if not person_info:
         logger.error(f"Person info not found: {national_id_number}")
         return None
+    return person_info
+
 
+def _make_person_info(
+    national_id_number, person_info, primary_address, other_address
+) -> DvvPersonInfo:
     last_name = person_info["NykyinenSukunimi"]["Sukunimi"]
     first_name = person_info["NykyisetEtunimet"]["Etunimet"]
-
-    primary_address, primary_apartment = None, ""
-    permanent_address = person_info["VakinainenKotimainenLahiosoite"]
-
-    if is_valid_address(permanent_address):
-        primary_address = format_address(permanent_address)
-        primary_apartment = primary_address.get("apartment", "")
-
-    other_address, other_apartment = None, ""
-    temporary_address = person_info["TilapainenKotimainenLahiosoite"]
-
-    if is_valid_address(temporary_address):
-        other_address = format_address(temporary_address)
-        other_apartment = other_address.get("apartment", "")
+    primary_apartment = primary_address.get("apartment", "") if primary_address else ""
+    other_apartment = other_address.get("apartment", "") if other_address else ""
 
     customer = Customer.objects.filter(national_id_number=national_id_number).first()
 
@@ -1,10 +1,10 @@
 import logging
 
-import requests
 from ariadne import load_schema_from_path
 from django.conf import settings
 
 from parking_permits.models.common import SourceSystem
+from parking_permits.services.http import get_async_client, get_session
 from project.settings import BASE_DIR
 
 logger = logging.getLogger("db")
@@ -27,7 +27,19 @@ class HelsinkiProfile:
     def get_customer(self):
         if not self.__profile:
             self._get_profile()
+        return self._get_profile_customer()
 
+    async def async_get_customer(self):
+        if not self.__profile:
+            response = await get_async_client().post(
+                settings.OPEN_CITY_PROFILE_GRAPHQL_API,
+                json={"query": helsinki_profile_query},
+                headers=self._get_request_headers(),
+            )
+            self._handle_response(response)
+        return self._get_profile_customer()
+
+    def _get_profile_customer(self):
         email_node = self.__profile.get("primaryEmail")
         phone_node = self.__profile.get("primaryPhone")
         verified_info = self.__profile.get("verifiedPersonalInformation")
@@ -46,13 +58,18 @@ class HelsinkiProfile:
             "national_id_number": national_id_number,
         }
 
+    def _get_request_headers(self):
+        return {"Authorization": self.request.headers.get("X-Authorization")}
+
     def _get_profile(self):
-        api_token = self.request.headers.get("X-Authorization")
-        response = requests.post(
+        response = get_session().post(
             settings.OPEN_CITY_PROFILE_GRAPHQL_API,
             json={"query": helsinki_profile_query},
-            headers={"Authorization": api_token},
+            headers=self._get_request_headers(),
         )
+        self._handle_response(response)
+
+    def _handle_response(self, response):
         data = response.json()
         if data.get("errors"):
             message = next(iter(data.get("errors"))).get("message")
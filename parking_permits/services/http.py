@@ -0,0 +1,55 @@
+"""HTTP sessions for the requests to the external services.
+
+A session keeps the connections to the services open between requests,
+so that the TCP and TLS handshakes aren't repeated for every request.
+Sessions aren't safe to share between threads, so each thread of a
+threaded worker has sessions of its own. As a session serves the requests
+of all the users, it doesn't keep the cookies set by the services. The
+async resolvers served under ASGI use httpx clients, kept per event loop
+in the same way.
+"""
+
+import asyncio
+import http.cookiejar
+import threading
+import weakref
+
+import requests
+from django.conf import settings
+
+_local = threading.local()
+# rejects all the cookies, allowed in no domain
+_cookie_policy = http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_session(name="default", adapter_class=None):
+    """Returns the session of the current thread by name, with an instance
+    of the adapter class mounted for HTTPS when given."""
+    sessions = getattr(_local, "sessions", None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    session = sessions.get(name)
+    if session is None:
+        session = requests.Session()
+        session.cookies.set_policy(_cookie_policy)
+        if adapter_class:
+            session.mount("https://", adapter_class())
+        sessions[name] = session
+    return session
+
+
+def get_async_client(name="default", verify=True):
+    """Returns the async client of the running event loop by name, verifying
+    the certificates with the SSL context given as verify."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(name)
+    if client is None:
+        import httpx
+
+        client = clients[name] = httpx.AsyncClient(
+            verify=verify,
+            timeout=settings.GRAPHQL_ASYNC_HTTP_TIMEOUT,
+            cookies=http.cookiejar.CookieJar(_cookie_policy),
+        )
+    return client
@@ -1,8 +1,7 @@
 import logging
 import re
 
-import requests
-import xmltodict
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry
 from django.db.models import Q
@@ -11,6 +10,7 @@ from django.utils.translation import gettext_lazy as _
 from parking_permits.exceptions import AddressError
 from parking_permits.models import ParkingZone
 from parking_permits.models.address import Address
+from parking_permits.services.http import get_async_client, get_session
 
 logger = logging.getLogger("db")
 
@@ -22,7 +22,7 @@ def cql_street_name(street_name):
     return street_name.replace("'", "''''")
 
 
-def get_wfs_result(street_name="", street_number_token=""):
+def get_wfs_params(street_name, street_number_token):
     street_number_first_part = re.search(r"^\d+", street_number_token)
     street_number = (
         int(street_number_first_part.group()) if street_number_first_part else 0
@@ -44,7 +44,7 @@ def get_wfs_result(street_name="", street_number_token=""):
         "avoindata:Helsinki_osoiteluettelo",
     ]
 
-    params = {
+    return {
         "CQL_FILTER": cql_filter,
         "OUTPUTFORMAT": "json",
         "REQUEST": "GetFeature",
@@ -54,9 +54,11 @@ def get_wfs_result(street_name="", street_number_token=""):
         "VERSION": "2.0.0",
     }
 
-    response = requests.get(settings.KAMI_URL, params=params)
 
+def get_response_result(response):
     if response.status_code != 200:
+        import xmltodict
+
         xml_response = xmltodict.parse(response.content)
 
         error_message = (
@@ -66,8 +68,10 @@ def get_wfs_result(street_name="", street_number_token=""):
         )
         raise Exception(error_message)
 
-    result = response.json()
+    return response.json()
 
+
+def get_wfs_features(result, street_name):
     result_features = [
         feature
         for feature in result.get("features")
@@ -80,17 +84,27 @@ def get_wfs_result(street_name="", street_number_token=""):
     return {**result, "features": result_features}
 
 
-def search_address(search_text):
-    if not search_text:
-        return []
-    street_name, street_number, __ = parse_street_data(search_text)
+def get_wfs_result(street_name="", street_number_token=""):
+    response = get_session().get(
+        settings.KAMI_URL, params=get_wfs_params(street_name, street_number_token)
+    )
+    return get_wfs_features(get_response_result(response), street_name)
 
+
+async def async_get_wfs_result(street_name="", street_number_token=""):
+    response = await get_async_client().get(
+        settings.KAMI_URL, params=get_wfs_params(street_name, street_number_token)
+    )
+    return get_wfs_features(get_response_result(response), street_name)
+
+
+def get_search_params(street_name, street_number):
     cql_filter = (
         f"katunimi ILIKE '{street_name}%' AND osoitenumero='{street_number}'"
         if street_number
         else f"katunimi ILIKE '{street_name}%'"
     )
-    params = {
+    return {
         "CQL_FILTER": cql_filter,
         "OUTPUTFORMAT": "json",
         "REQUEST": "GetFeature",
@@ -100,20 +114,34 @@ def search_address(search_text):
         "VERSION": "2.0.0",
         "COUNT": "8",
     }
-    response = requests.get(settings.KAMI_URL, params=params)
 
-    if response.status_code != 200:
-        xml_response = xmltodict.parse(response.content)
 
-        error_message = (
-            xml_response.get("ows:ExceptionReport", dict())
-            .get("ows:Exception", dict())
-            .get("ows:ExceptionText", "Unknown Error")
-        )
-        raise Exception(error_message)
+def search_address(search_text):
+    if not search_text:
+        return []
+    street_name, street_number, __ = parse_street_data(search_text)
+    response = get_session().get(
+        settings.KAMI_URL, params=get_search_params(street_name, street_number)
+    )
+    return get_search_addresses(
+        get_response_result(response), street_name, street_number
+    )
+
+
+async def async_search_address(search_text):
+    if not search_text:
+        return []
+    street_name, street_number, __ = parse_street_data(search_text)
+    response = await get_async_client().get(
+        settings.KAMI_URL, params=get_search_params(street_name, street_number)
+    )
+    result = get_response_result(response)
+    return await sync_to_async(
+        lambda: list(get_search_addresses(result, street_name, street_number))
+    )()
 
-    result = response.json()
 
+def get_search_addresses(result, street_name, street_number):
     if not result.get("features"):
         return Address.objects.filter(
             Q(street_name__icontains=street_name)
@@ -179,6 +207,17 @@ def get_address_from_db(street_name, street_number):
 
 def get_address_details(street_name, street_number):
     results = get_wfs_result(street_name, street_number)
+    return get_address_location(results, street_name, street_number)
+
+
+async def async_get_address_details(street_name, street_number):
+    results = await async_get_wfs_result(street_name, street_number)
+    return await sync_to_async(get_address_location)(
+        results, street_name, street_number
+    )
+
+
+def get_address_location(results, street_name, street_number):
     features = results.get("features")
     if not features:
         address = get_address_from_db(street_name, street_number)
@@ -10,6 +10,7 @@ from django.core.serializers.json import DjangoJSONEncoder
 
 from parking_permits.exceptions import ParkkihubiPermitError
 from parking_permits.models.parking_permit import ParkingPermit
+from parking_permits.services.http import get_session
 from parking_permits.utils import get_end_time, pairwise
 
 logger = logging.getLogger("db")
@@ -83,7 +84,7 @@ class Parkkihubi:
     def create(self):
         payload = self.get_payload_data()
 
-        response = requests.post(
+        response = get_session().post(
             settings.PARKKIHUBI_OPERATOR_ENDPOINT,
             data=payload,
             headers=self.get_headers(),
@@ -96,7 +97,7 @@ class Parkkihubi:
     def update(self) -> None:
         payload = self.get_payload_data()
 
-        response = requests.patch(
+        response = get_session().patch(
             f"{settings.PARKKIHUBI_OPERATOR_ENDPOINT}{str(self.permit.pk)}/",
             data=payload,
             headers=self.get_headers(),
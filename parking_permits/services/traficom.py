@@ -1,8 +1,9 @@
 import logging
 import ssl
-import xml.etree.ElementTree as ET  # noqa: N817
+from typing import TYPE_CHECKING
 
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone as tz
@@ -21,8 +22,12 @@ from parking_permits.models.vehicle import (
     VehiclePowerType,
     VehicleUser,
 )
+from parking_permits.services.http import get_async_client, get_session
 from parking_permits.utils import safe_cast
 
+if TYPE_CHECKING:
+    import httpx
+
 ssl.match_hostname = lambda cert, hostname: True
 
 logger = logging.getLogger("db")
@@ -87,17 +92,20 @@ VEHICLE_SUB_CLASS_MAPPER = {
 }
 
 
+def get_ssl_context():
+    context = ssl.create_default_context()  # NOSONAR(S5527)
+    # No SAN-validation
+    context.check_hostname = False
+
+    # Enforce certificate verification
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
 # Used to disable host name-verification.
 class SSLAdapter(HTTPAdapter):
     def init_poolmanager(self, *args, **kwargs):
-        context = ssl.create_default_context()  # NOSONAR(S5527)
-        # No SAN-validation
-        context.check_hostname = False
-
-        # Enforce certificate verification
-        context.verify_mode = ssl.CERT_REQUIRED
-
-        kwargs["ssl_context"] = context
+        kwargs["ssl_context"] = get_ssl_context()
         return super().init_poolmanager(*args, **kwargs)
 
 
@@ -418,13 +426,15 @@ class Traficom:
     url = settings.TRAFICOM_ENDPOINT
     headers = {"Content-type": "application/xml"}
 
+    def _get_synchronizer_class(self):
+        if settings.TRAFICOM_USE_LEGACY_VEHICLE_FETCH:
+            return TraficomVehicleDetailsLegacySynchronizer
+        return TraficomVehicleDetailsSynchronizer
+
     def fetch_vehicle_details(
         self, registration_number: str, permit: ParkingPermit | None = None
     ) -> Vehicle:
-        if settings.TRAFICOM_USE_LEGACY_VEHICLE_FETCH:
-            synchronizer_class = TraficomVehicleDetailsLegacySynchronizer
-        else:
-            synchronizer_class = TraficomVehicleDetailsSynchronizer
+        synchronizer_class = self._get_synchronizer_class()
 
         if self._bypass_traficom(permit):
             return self._fetch_vehicle_from_db(registration_number)
@@ -450,6 +460,47 @@ class Traficom:
         vehicle = synchronizer.synchronize(response=et)
         return vehicle
 
+    async def async_fetch_vehicle_details(
+        self,
+        registration_number: str,
+        permit: ParkingPermit | None = None,
+        check_vehicle=None,
+    ) -> Vehicle:
+        """Fetches the vehicle details without blocking the event loop.
+
+        The vehicle is stored and passed to check_vehicle in one transaction,
+        so that it is rolled back when the check raises, as in a resolver
+        running fetch_vehicle_details in a transaction."""
+        synchronizer_class = self._get_synchronizer_class()
+
+        et = None
+        if not self._bypass_traficom(permit):
+            registration_number = (
+                registration_number.strip().upper() if registration_number else ""
+            )
+            et = await self._async_fetch_info(
+                registration_number=registration_number, is_l_type_vehicle=False
+            )
+            vehicle_info = et.find(".//ajoneuvonTiedot")
+
+            if not vehicle_info:
+                et = await self._async_fetch_info(
+                    registration_number=registration_number, is_l_type_vehicle=True
+                )
+
+        @transaction.atomic
+        def store_vehicle():
+            if et is None:
+                vehicle = self._fetch_vehicle_from_db(registration_number)
+            else:
+                synchronizer = synchronizer_class(registration_number)
+                vehicle = synchronizer.synchronize(response=et)
+            if check_vehicle:
+                check_vehicle(vehicle)
+            return vehicle
+
+        return await sync_to_async(store_vehicle)()
+
     def fetch_driving_licence_details(self, hetu, permit=None):
         if self._bypass_traficom(permit):
             return self._fetch_driving_licence_details_from_db(hetu)
@@ -554,12 +605,11 @@ class Traficom:
         headers: dict[str, str],
         verify_ssl: bool = settings.TRAFICOM_VERIFY_SSL,
     ) -> requests.Response:
-        session = requests.Session()
-
         if verify_ssl:
             # SSL-check
-            adapter = SSLAdapter()
-            session.mount("https://", adapter)
+            session = get_session("traficom", adapter_class=SSLAdapter)
+        else:
+            session = get_session()
 
         response = session.post(
             url,
@@ -569,22 +619,29 @@ class Traficom:
         )
         return response
 
-    def _fetch_info_by_ssn(self, hetu):
+    async def _async_request(
+        self,
+        url: str,
+        *,
+        payload: str,
+        headers: dict[str, str],
+        verify_ssl: bool = settings.TRAFICOM_VERIFY_SSL,
+    ) -> "httpx.Response":
+        if verify_ssl:
+            # SSL-check
+            client = get_async_client("traficom", verify=get_ssl_context())
+        else:
+            client = get_async_client("traficom-unverified", verify=False)
+        return await client.post(url, content=payload, headers=headers)
+
+    def _build_ssn_payload(self, hetu):
         query_payload = f"<hetu>{hetu}</hetu>"
-        payload = self._build_payload(
+        return self._build_payload(
             query_type=DRIVING_LICENSE_SEARCH,
             query_payload=query_payload,
         )
 
-        response = self._request(
-            self.url,
-            payload=payload,
-            headers=self.headers,
-            verify_ssl=settings.TRAFICOM_VERIFY_SSL,
-        )
-        return response
-
-    def _fetch_info_by_registration_number(
+    def _build_registration_number_payload(
         self, registration_number, is_l_type_vehicle
     ):
         query_payload = f"""
@@ -593,14 +650,28 @@ class Traficom:
         }</laji>
             <rekisteritunnus>{registration_number}</rekisteritunnus>
         """
-        payload = self._build_payload(
+        return self._build_payload(
             query_type=VEHICLE_SEARCH,
             query_payload=query_payload,
         )
 
+    def _fetch_info_by_ssn(self, hetu):
         response = self._request(
             self.url,
-            payload=payload,
+            payload=self._build_ssn_payload(hetu),
+            headers=self.headers,
+            verify_ssl=settings.TRAFICOM_VERIFY_SSL,
+        )
+        return response
+
+    def _fetch_info_by_registration_number(
+        self, registration_number, is_l_type_vehicle
+    ):
+        response = self._request(
+            self.url,
+            payload=self._build_registration_number_payload(
+                registration_number, is_l_type_vehicle
+            ),
             headers=self.headers,
             verify_ssl=settings.TRAFICOM_VERIFY_SSL,
         )
@@ -613,9 +684,24 @@ class Traficom:
             )
         else:
             response = self._fetch_info_by_ssn(hetu)
+        return self._parse_response(response)
 
+    async def _async_fetch_info(self, registration_number, is_l_type_vehicle=False):
+        response = await self._async_request(
+            self.url,
+            payload=self._build_registration_number_payload(
+                registration_number, is_l_type_vehicle
+            ),
+            headers=self.headers,
+            verify_ssl=settings.TRAFICOM_VERIFY_SSL,
+        )
+        return self._parse_response(response)
+
+    def _parse_response(self, response):
         if response.status_code >= 300:
             logger.error(f"Fetching data from traficom failed. Error: {response.text}")
             raise TraficomFetchVehicleError(_("Failed to fetch data from traficom"))
 
+        import xml.etree.ElementTree as ET  # noqa: N817
+
         return ET.fromstring(response.text)
@@ -0,0 +1,89 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from parking_permits.models import (
+    Customer,
+    ParkingPermit,
+    ParkingPermitSearchDocument,
+    TemporaryVehicle,
+    Vehicle,
+)
+
+PERMIT_SEARCH_FIELDS = {"customer", "customer_id", "vehicle", "vehicle_id"}
+CUSTOMER_SEARCH_FIELDS = {"first_name", "last_name", "national_id_number"}
+VEHICLE_SEARCH_FIELDS = {"registration_number"}
+TEMPORARY_VEHICLE_SEARCH_FIELDS = {"vehicle", "vehicle_id"}
+
+
+def _affects_search(created, update_fields, search_fields):
+    return created or update_fields is None or bool(update_fields & search_fields)
+
+
+def _refresh_search_documents(permits):
+    ParkingPermitSearchDocument.refresh_for_permits(
+        list(permits.values_list("pk", flat=True).distinct())
+    )
+
+
+@receiver(post_save, sender=ParkingPermit)
+def refresh_permit_search_document(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    if _affects_search(created, update_fields, PERMIT_SEARCH_FIELDS):
+        ParkingPermitSearchDocument.refresh_for_permits([instance.pk])
+
+
+@receiver(post_save, sender=Customer)
+def refresh_customer_search_documents(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    if not created and _affects_search(created, update_fields, CUSTOMER_SEARCH_FIELDS):
+        _refresh_search_documents(ParkingPermit.objects.filter(customer=instance))
+
+
+@receiver(post_save, sender=Vehicle)
+def refresh_vehicle_search_documents(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    if not created and _affects_search(created, update_fields, VEHICLE_SEARCH_FIELDS):
+        _refresh_search_documents(
+            ParkingPermit.objects.filter(
+                Q(vehicle=instance) | Q(temp_vehicles__vehicle=instance)
+            )
+        )
+
+
+@receiver(post_save, sender=TemporaryVehicle)
+def refresh_temporary_vehicle_search_documents(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    if not created and _affects_search(
+        created, update_fields, TEMPORARY_VEHICLE_SEARCH_FIELDS
+    ):
+        _refresh_search_documents(ParkingPermit.objects.filter(temp_vehicles=instance))
+
+
+@receiver(m2m_changed, sender=ParkingPermit.temp_vehicles.through)
+def refresh_temp_vehicles_search_documents(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if reverse and action == "pre_clear":
+        # the permits of a temporary vehicle cleared from its side are not
+        # sent with post_clear, so they are taken before they are cleared
+        instance._cleared_permit_ids = list(
+            ParkingPermit.objects.filter(temp_vehicles=instance).values_list(
+                "pk", flat=True
+            )
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        ParkingPermitSearchDocument.refresh_for_permits([instance.pk])
+    elif action == "post_clear":
+        ParkingPermitSearchDocument.refresh_for_permits(
+            instance.__dict__.pop("_cleared_permit_ids", [])
+        )
+    elif pk_set:
+        ParkingPermitSearchDocument.refresh_for_permits(list(pk_set))
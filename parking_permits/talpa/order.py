@@ -1,8 +1,6 @@
 import json
 import logging
 
-import numpy as np
-import requests
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.db import transaction
@@ -11,6 +9,7 @@ from django.utils.translation import gettext_lazy as _
 
 from parking_permits.exceptions import OrderCreationFailedError, SetTalpaFlowStepsError
 from parking_permits.models.order import OrderPaymentType, OrderType
+from parking_permits.services.http import get_session
 from parking_permits.talpa.pricing import Pricing
 from parking_permits.utils import (
     DefaultOrderedDict,
@@ -233,6 +232,8 @@ class TalpaOrderManager:
 
     @classmethod
     def round_int(cls, v):
+        import numpy as np
+
         return f"{np.round(v):0.0f}"
 
     @classmethod
@@ -249,7 +250,7 @@ class TalpaOrderManager:
             "user": user_id,
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_session().post(
             f"{settings.TALPA_ORDER_EXPERIENCE_API}{order_id}/flowSteps",
             data=json.dumps(data, default=str),
             headers=headers,
@@ -283,7 +284,7 @@ class TalpaOrderManager:
         order_data = cls.create_order_data(order, ext_request)
         order_data_raw = json.dumps(order_data, default=str)
         logger.info(f"Order data sent to talpa: {order_data_raw}")
-        response = requests.post(cls.url, data=order_data_raw, headers=cls.headers)
+        response = get_session().post(cls.url, data=order_data_raw, headers=cls.headers)
         if response.status_code >= 300:
             logger.error(
                 f"Create talpa order failed for order {order}. Error: {response.text}"
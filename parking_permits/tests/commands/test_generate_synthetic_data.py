@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from parking_permits.models import (
+    Customer,
+    Order,
+    ParkingPermit,
+    ParkingPermitSearchDocument,
+)
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.zone import ParkingZoneFactory
+
+
+def _generate(seed):
+    call_command(
+        "generate_synthetic_data",
+        customers=50,
+        seed=seed,
+        batch_size=20,
+        reference_date=date(2024, 6, 1),
+    )
+
+
+@pytest.mark.django_db()
+def test_requires_parking_zones():
+    with pytest.raises(CommandError):
+        _generate(seed=1)
+
+
+@pytest.mark.django_db()
+def test_generates_synthetic_data():
+    zone = ParkingZoneFactory()
+    ProductFactory(zone=zone, start_date=date(2020, 1, 1), end_date=date(2025, 12, 31))
+
+    _generate(seed=1)
+
+    assert Customer.objects.count() == 50
+    permit_count = ParkingPermit.objects.count()
+    assert permit_count >= 50
+    assert ParkingPermitSearchDocument.objects.count() == permit_count
+    assert Order.objects.filter(order_items__isnull=False).exists()
+    customer = Customer.objects.first()
+    assert zone.location.contains(customer.primary_address.location)
+    # the sequences continue after the copied rows
+    assert Customer.objects.create(first_name="New").pk > customer.pk
+
+
+@pytest.mark.django_db()
+def test_generated_data_is_deterministic_by_seed():
+    zone = ParkingZoneFactory()
+    ProductFactory(zone=zone, start_date=date(2020, 1, 1), end_date=date(2025, 12, 31))
+
+    def get_snapshot(customers):
+        return list(
+            ParkingPermit.objects.filter(customer__in=customers)
+            .order_by("pk")
+            .values_list("status", "contract_type", "start_time", "end_time")
+        )
+
+    _generate(seed=7)
+    first_customers = list(Customer.objects.all())
+    _generate(seed=7)
+    second_customers = Customer.objects.exclude(pk__in=[c.pk for c in first_customers])
+
+    assert get_snapshot(second_customers) == get_snapshot(first_customers)
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
+from parking_permits.tests.factories.address import AddressFactory
+from parking_permits.tests.factories.order import OrderItemFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from users.models import ParkingPermitGroups, User
+
+
+@pytest.mark.django_db()
+def test_writes_load_test_fixtures(tmp_path):
+    AddressFactory(street_number="12")
+    permit = ParkingPermitFactory(
+        status=ParkingPermitStatus.VALID,
+        contract_type=ContractType.OPEN_ENDED,
+        customer__user=None,
+    )
+    OrderItemFactory(permit=permit, subscription=None)
+    output = tmp_path / "fixtures.json"
+
+    call_command("prepare_load_test", output=str(output))
+
+    fixtures = json.loads(output.read_text())
+    assert fixtures["address"]["street_number"] == "12"
+    admin = User.objects.get(uuid=fixtures["admin_uuid"])
+    assert admin.groups.filter(name=ParkingPermitGroups.SUPER_ADMIN).exists()
+    (subscription,) = fixtures["subscriptions"]
+    permit.customer.refresh_from_db()
+    assert subscription["user_uuid"] == str(permit.customer.user.uuid)
+    order_item = permit.order_items.get()
+    assert subscription["subscription_id"] == str(
+        order_item.subscription.talpa_subscription_id
+    )
+    assert permit.vehicle.registration_number in fixtures["search_terms"]
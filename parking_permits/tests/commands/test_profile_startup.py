@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+
+from parking_permits.management.commands.profile_startup import parse_import_times
+
+# numpy is not listed, GeoDjango imports it when it is installed
+DEFERRED_MODULES = ["fpdf", "xmltodict"]
+
+
+def test_parse_import_times():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       813 |       1169 |     json.scanner\n"
+        "import time:       748 |      14211 |   json.decoder\n"
+        "import time:       506 |      15593 | json\n"
+        "import time:       120 |        120 | decimal\n"
+    )
+    assert parse_import_times(output) == {"json": 15593, "decimal": 120}
+
+
+def test_startup_does_not_import_deferred_modules():
+    script = (
+        "import sys, django\n"
+        "django.setup()\n"
+        "import parking_permits.cron\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+        "from parking_permits.graphql import get_schema\n"
+        f"print([name for name in {DEFERRED_MODULES!r} if name in sys.modules])\n"
+        "print(get_schema.cache_info().currsize)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        check=True,
+    )
+    assert result.stdout.splitlines() == ["[]", "0"]
+
+
+def test_profile_startup():
+    out = StringIO()
+    call_command("profile_startup", "--rounds", "1", "--top", "3", stdout=out)
+    output = out.getvalue()
+    for phase in ["django.setup", "cron jobs", "URLconf", "admin schema", "total"]:
+        assert phase in output
+    assert "Slowest imports of the last round:" in output
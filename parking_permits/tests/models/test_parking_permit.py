@@ -1615,7 +1615,7 @@ class ParkingPermitTestCase(TestCase):
 
     @freeze_time("2024-03-15 9:00+02:00")
     @override_settings(TIME_ZONE="Europe/Helsinki", DEBUG_SKIP_PARKKIHUBI_SYNC=False)
-    @patch("requests.patch", return_value=MockResponse(200))
+    @patch("requests.Session.patch", return_value=MockResponse(200))
     def test_add_temporary_vehicle_limit_exceeded(self, mock_patch):
         start_time = now = timezone.now()
         end_time = start_time + timedelta(days=3)
@@ -65,11 +65,11 @@ class TestProduct(TestCase):
             self.assertEqual(self.product.name, f"{_('Parking zone')} A")
 
     @patch(
-        "requests.get",
+        "requests.Session.get",
         return_value=MockResponse(200, {"0": {"merchantId": uuid.uuid4()}}),
     )
     @patch(
-        "requests.post",
+        "requests.Session.post",
         return_value=MockResponse(201, {"productId": uuid.uuid4()}),
     )
     def test_should_save_talpa_product_id_when_creating_talpa_product_successfully(
@@ -81,10 +81,10 @@ class TestProduct(TestCase):
         self.assertIsNotNone(self.product.talpa_product_id)
 
     @patch(
-        "requests.get",
+        "requests.Session.get",
         return_value=MockResponse(200, {"0": {"merchantId": uuid.uuid4()}}),
     )
-    @patch("requests.post", return_value=MockResponse(401))
+    @patch("requests.Session.post", return_value=MockResponse(401))
     def test_should_raise_error_when_creating_talpa_product_failed(
         self, mock_post, mock_get
     ):
@@ -219,7 +219,7 @@ class TestProduct(TestCase):
         }
 
     @patch(
-        "requests.post",
+        "requests.Session.post",
         return_value=MockResponse(201),
     )
     def test_create_talpa_accounting(self, mock_post):
@@ -230,7 +230,7 @@ class TestProduct(TestCase):
         self.assertIsNotNone(self.product.accounting)
 
     @patch(
-        "requests.post",
+        "requests.Session.post",
         return_value=MockResponse(201),
     )
     def test_create_talpa_accounting_without_product_id(self, mock_post):
@@ -239,7 +239,7 @@ class TestProduct(TestCase):
         self.assertIsNone(self.product.accounting)
 
     @patch(
-        "requests.post",
+        "requests.Session.post",
         return_value=MockResponse(201),
     )
     def test_update_talpa_accounting(self, mock_post):
@@ -253,7 +253,7 @@ class TestProduct(TestCase):
         self.assertEqual(self.product.accounting.company_code, company_code)
 
     @patch(
-        "requests.post",
+        "requests.Session.post",
         return_value=MockResponse(201),
     )
     def test_update_talpa_accounting_without_product_id(self, mock_post):
@@ -263,7 +263,7 @@ class TestProduct(TestCase):
         self.product.update_talpa_accounting()
         mock_post.assert_not_called()
 
-    @patch("requests.post", return_value=MockResponse(401))
+    @patch("requests.Session.post", return_value=MockResponse(401))
     def test_should_raise_error_when_creating_talpa_accounting_failed(self, mock_post):
         with self.assertRaises(CreateTalpaProductError):
             self.product.talpa_product_id = uuid.uuid4()
@@ -0,0 +1,87 @@
+import re
+import traceback
+from collections import Counter, defaultdict
+from contextlib import ContextDecorator, ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# number of project stack frames shown per query origin
+ORIGIN_FRAME_COUNT = 3
+
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def normalize_sql(sql):
+    """Collapses the IN lists of different lengths so that the same query
+    with a different number of parameters is reported as one."""
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+def get_query_origin():
+    """Returns the innermost project frames of the current stack."""
+    base_dir = str(Path(settings.BASE_DIR).resolve())
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return " <- ".join(
+        f"{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}"
+        for frame in reversed(frames[-ORIGIN_FRAME_COUNT:])
+    )
+
+
+class query_budget(ContextDecorator):  # noqa: N801
+    """Fails the block or the decorated test if it runs more SQL queries
+    than the budget allows.
+
+    The failure message groups the executed queries by their SQL, most
+    repeated first, with the code locations the queries came from, which
+    makes N+1 queries stand out:
+
+        with query_budget(5):
+            self.client.post(url, data, content_type="application/json")
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+        self.queries = []
+
+    def _record_query(self, execute, sql, params, many, context):
+        self.queries.append((normalize_sql(sql), get_query_origin()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.queries = []
+        self._exit_stack = ExitStack()
+        self._exit_stack.enter_context(
+            connections[self.using].execute_wrapper(self._record_query)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._exit_stack.close()
+        if exc_type is None and len(self.queries) > self.max_queries:
+            raise AssertionError(self.get_report())
+        return False
+
+    def get_report(self):
+        counts = Counter(sql for sql, _origin in self.queries)
+        origins = defaultdict(Counter)
+        for sql, origin in self.queries:
+            origins[sql][origin] += 1
+
+        lines = [
+            f"{len(self.queries)} queries executed, the budget is "
+            f"{self.max_queries} ({len(counts)} distinct):"
+        ]
+        for sql, count in counts.most_common():
+            lines.append(f"\n{count}x {sql}")
+            for origin, origin_count in origins[sql].most_common():
+                lines.append(f"    {origin_count}x from {origin or '<unknown>'}")
+        return "\n".join(lines)
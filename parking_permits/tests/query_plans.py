@@ -0,0 +1,96 @@
+import json
+
+from django.db import connections
+
+
+def explain(qs):
+    """Returns the root plan node of EXPLAIN (FORMAT JSON) for the queryset.
+
+    The plans are only meaningful with tables large enough that the planner
+    picks the paths it picks for the production tables, so seed the tables
+    with generate_synthetic_data and analyze them first. A plan that still
+    scans a whole table has no usable index for the query."""
+    sql, params = qs.query.sql_with_params()
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def get_full_scan_cost(model):
+    """Returns the estimated cost of reading the table of the model in full."""
+    return explain(model._base_manager.all())["Total Cost"]
+
+
+def iter_plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def is_full_scan(node):
+    node_type = node["Node Type"]
+    if node_type == "Seq Scan":
+        return True
+    if node_type in ("Index Scan", "Index Only Scan"):
+        return "Index Cond" not in node
+    if node_type == "Bitmap Heap Scan":
+        return "Recheck Cond" not in node
+    return False
+
+
+def get_full_scans(plan):
+    """Returns the names of the tables read in full, either by a
+    sequential scan or by an index or bitmap heap scan without an index
+    or recheck condition."""
+    return {
+        node["Relation Name"]
+        for node in iter_plan_nodes(plan)
+        if "Relation Name" in node and is_full_scan(node)
+    }
+
+
+def get_used_indexes(plan):
+    return {
+        node["Index Name"] for node in iter_plan_nodes(plan) if "Index Name" in node
+    }
+
+
+class QueryPlanAssertionsMixin:
+    """Plan assertions for TestCase classes.
+
+    Index names can be given as prefixes, since the names of the
+    indexes Django creates for foreign keys end in a hash."""
+
+    def assert_no_full_scan(self, plan, tables):
+        full_scans = get_full_scans(plan) & set(tables)
+        self.assertFalse(
+            full_scans,
+            f"Full scan of {', '.join(sorted(full_scans))} in plan:\n"
+            f"{json.dumps(plan, indent=2)}",
+        )
+
+    def assert_uses_index(self, plan, index_name):
+        used_indexes = get_used_indexes(plan)
+        self.assertTrue(
+            any(name.startswith(index_name) for name in used_indexes),
+            f"Index {index_name} not used, used indexes: {sorted(used_indexes)}",
+        )
+
+    def assert_cost_under(self, plan, max_cost):
+        self.assertLessEqual(
+            plan["Total Cost"],
+            max_cost,
+            f"Estimated cost {plan['Total Cost']} exceeds the budget {max_cost}",
+        )
+
+    def assert_query_plan(self, qs, *, no_full_scan=(), indexes=(), max_cost=None):
+        plan = explain(qs)
+        self.assert_no_full_scan(plan, no_full_scan)
+        for index_name in indexes:
+            self.assert_uses_index(plan, index_name)
+        if max_cost is not None:
+            self.assert_cost_under(plan, max_cost)
+        return plan
@@ -19,14 +19,14 @@ class GetPersonInfoTestCase(TestCase):
         def json(self):
             return self.data
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_bad_response(self, mock_post):
         mock_post.return_value = self.MockResponse(ok=False, text="oops")
         customer = get_person_info("12345")
         self.assertEqual(customer, None)
 
     @patch("parking_permits.services.dvv.get_address_details")
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_get_customer_info(self, mock_post, mock_get_address_details):
         mock_post.return_value = self.MockResponse(data=self.get_mock_info())
         mock_get_address_details.return_value = {"location": generate_multi_polygon()}
@@ -41,7 +41,7 @@ class GetPersonInfoTestCase(TestCase):
         self.assertEqual(customer["other_address_apartment"], "B7")
 
     @patch("parking_permits.services.dvv.get_address_details")
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_get_customer_info_apartment_not_included(
         self, mock_post, mock_get_address_details
     ):
@@ -61,7 +61,7 @@ class GetPersonInfoTestCase(TestCase):
         self.assertEqual(customer["primary_address_apartment"], "")
 
     @patch("parking_permits.services.dvv.get_address_details")
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_get_customer_info_addresses_not_in_helsinki(
         self, mock_post, mock_get_address_details
     ):
@@ -83,7 +83,7 @@ class GetPersonInfoTestCase(TestCase):
         self.assertEqual(customer["other_address_apartment"], "")
 
     @patch("parking_permits.services.dvv.get_address_details")
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_mock_customer_info_null_swedish_address(
         self, mock_post, mock_get_address_details
     ):
@@ -103,7 +103,7 @@ class GetPersonInfoTestCase(TestCase):
         self.assertEqual(customer["primary_address_apartment"], "A6")
 
     @patch("parking_permits.services.dvv.get_address_details")
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_get_customer_info_with_empty_address_data(
         self, mock_post, mock_get_address_details
     ):
@@ -40,7 +40,7 @@ class TestParkkihubi:
         )
 
     @pytest.mark.django_db()
-    @patch("requests.patch", return_value=MockResponse(200))
+    @patch("requests.Session.patch", return_value=MockResponse(200))
     def test_sync_with_parkkihubi_debug(
         self,
         mock_patch,
@@ -55,8 +55,8 @@ class TestParkkihubi:
         assert not permit.synced_with_parkkihubi
 
     @pytest.mark.django_db()
-    @patch("requests.post", return_value=MockResponse(201))
-    @patch("requests.patch", return_value=MockResponse(404))
+    @patch("requests.Session.post", return_value=MockResponse(201))
+    @patch("requests.Session.patch", return_value=MockResponse(404))
     def test_sync_with_parkkihubi_is_new(
         self,
         mock_patch,
@@ -71,8 +71,8 @@ class TestParkkihubi:
         assert permit.synced_with_parkkihubi
 
     @pytest.mark.django_db()
-    @patch("requests.post", return_value=MockResponse(201))
-    @patch("requests.patch", return_value=MockResponse(200))
+    @patch("requests.Session.post", return_value=MockResponse(201))
+    @patch("requests.Session.patch", return_value=MockResponse(200))
     def test_sync_with_parkkihubi_exists(
         self,
         mock_patch,
@@ -87,7 +87,7 @@ class TestParkkihubi:
         assert permit.synced_with_parkkihubi
 
     @pytest.mark.django_db()
-    @patch("requests.post", return_value=MockResponse(201))
+    @patch("requests.Session.post", return_value=MockResponse(201))
     def test_create(
         self,
         mock_post,
@@ -100,7 +100,7 @@ class TestParkkihubi:
         assert permit.synced_with_parkkihubi
 
     @pytest.mark.django_db()
-    @patch("requests.post", return_value=MockResponse(400))
+    @patch("requests.Session.post", return_value=MockResponse(400))
     def test_create_error(
         self,
         mock_post,
@@ -114,7 +114,7 @@ class TestParkkihubi:
         assert not permit.synced_with_parkkihubi
 
     @pytest.mark.django_db()
-    @patch("requests.patch", return_value=MockResponse(400))
+    @patch("requests.Session.patch", return_value=MockResponse(400))
     def test_update_error(
         self,
         mock_patch,
@@ -8,7 +8,10 @@ from django.contrib.auth.models import Group
 from django.test import override_settings
 from django.utils import timezone
 
+from audit_logger import AuditMsg, ModelIds
+from audit_logger.data import AuditMessageEncoder
 from parking_permits.admin_resolvers import (
+    _audit_post_process_paged_search,
     add_temporary_vehicle,
     resolve_create_resident_permit,
     resolve_extend_parking_permit,
@@ -24,7 +27,7 @@ from parking_permits.exceptions import (
     PermitCanNotBeExtendedError,
     TraficomFetchVehicleError,
 )
-from parking_permits.models import ParkingPermitExtensionRequest
+from parking_permits.models import ParkingPermit, ParkingPermitExtensionRequest
 from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
 from parking_permits.models.product import ProductType
 from parking_permits.tests.factories.customer import CustomerFactory
@@ -74,7 +77,7 @@ def info(rf, admin_user):
 @pytest.fixture()
 def mock_jwt(admin_user):
     return unittest.mock.patch(
-        "helusers.oidc.RequestJWTAuthentication.authenticate",
+        "parking_permits.decorators.RequestJWTAuthentication.authenticate",
         return_value=Auth(user=admin_user),
     )
 
@@ -643,3 +646,29 @@ def test_update_resident_permit_sets_new_vehicle(
     permit.refresh_from_db()
     assert permit.vehicle is not None
     assert permit.vehicle == new_vehicle
+
+
+@pytest.mark.django_db
+def test_audit_post_process_paged_search_target(info):
+    permits = ParkingPermitFactory.create_batch(3)
+    objects = ParkingPermit.objects.filter(pk__in=[p.pk for p in permits])
+    msg = AuditMsg("Admin searched for permits.")
+
+    _audit_post_process_paged_search(
+        msg,
+        {"page_info": {"page": 1}, "objects": objects},
+        None,
+        info,
+        {"page": 1},
+        search_params={"q": "ABC"},
+    )
+
+    assert isinstance(msg.target, ModelIds)
+    assert msg.safe_asdict()["target"] == AuditMessageEncoder().to_json_compatible(
+        objects
+    )
+    assert msg.safe_asdict()["extra"] == {
+        "page_info": {"page": 1},
+        "order_by": None,
+        "search_params": {"q": "ABC"},
+    }
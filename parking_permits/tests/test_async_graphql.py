@@ -0,0 +1,186 @@
+import json
+from unittest.mock import patch
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import (
+    AsyncRequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits.graphql import (
+    get_admin_schema,
+    get_async_admin_schema,
+    get_async_schema,
+    get_schema,
+    get_view,
+)
+from parking_permits.models import Vehicle
+from parking_permits.persisted_queries import PersistedQueries
+from parking_permits.query_cost import ADMIN_QUERY_LIMITS, CUSTOMER_QUERY_LIMITS
+from parking_permits.services import kami
+from parking_permits.services.http import get_async_client
+from parking_permits.tests.factories.address import AddressFactory
+from parking_permits.tests.factories.customer import CustomerFactory
+from users.tests.factories.user import UserFactory
+
+from .services.test_traficom import get_mock_xml
+
+address_search_query = """
+    query AddressSearch($searchInput: String!) {
+        addressSearch(searchInput: $searchInput) { streetName streetNumber }
+    }
+"""
+
+
+class AsyncGraphQLViewMixin:
+    def setUp(self):
+        cache.clear()
+        self.view = get_view(
+            get_admin_schema(),
+            PersistedQueries("test"),
+            ADMIN_QUERY_LIMITS,
+            get_async_admin_schema(),
+        )
+
+    async def post(self, query, variables=None):
+        request = AsyncRequestFactory().post(
+            "/admin-graphql",
+            {"query": query, "variables": variables or {}},
+            content_type="application/json",
+        )
+        response = await self.view(request)
+        return json.loads(response.content)
+
+
+class AsyncGraphQLViewTestCase(AsyncGraphQLViewMixin, SimpleTestCase):
+    def test_root_fields_with_async_resolvers(self):
+        root_fields = self.view.view_initkwargs["async_root_fields"]
+        self.assertEqual(root_fields["query"], {"customer", "vehicle", "addressSearch"})
+        self.assertEqual(root_fields["mutation"], set())
+
+    async def test_async_operation_is_executed_in_the_event_loop(self):
+        with (
+            patch.object(httpx.AsyncClient, "get") as get,
+            patch.object(kami, "search_address") as search_address,
+        ):
+            result = await self.post(address_search_query, {"searchInput": ""})
+
+        get.assert_not_called()
+        search_address.assert_not_called()
+        self.assertEqual(result["data"], {"addressSearch": []})
+
+    async def test_mixed_operation_is_executed_with_the_sync_schema(self):
+        query = """
+            query AddressSearch {
+                addressSearch(searchInput: "Mannerheimintie") { streetName }
+                zones { name }
+            }
+        """
+        with (
+            patch.object(httpx.AsyncClient, "get") as get,
+            patch.object(kami, "search_address", return_value=[]) as search_address,
+        ):
+            await self.post(query)
+
+        get.assert_not_called()
+        search_address.assert_called_once_with(search_text="Mannerheimintie")
+
+    async def test_async_clients_do_not_keep_cookies(self):
+        client = get_async_client()
+        client.cookies.extract_cookies(
+            httpx.Response(
+                200,
+                headers={"Set-Cookie": "sessionid=1; Path=/"},
+                request=httpx.Request("GET", "https://service.test/"),
+            )
+        )
+        self.assertEqual(len(client.cookies), 0)
+        self.assertEqual(client.timeout.read, settings.GRAPHQL_ASYNC_HTTP_TIMEOUT)
+
+
+class AsyncGraphQLViewDatabaseTestCase(AsyncGraphQLViewMixin, TestCase):
+    async def test_async_operation_uses_the_database(self):
+        address = await sync_to_async(AddressFactory)()
+        kami_response = httpx.Response(
+            200,
+            json={"features": []},
+            request=httpx.Request("GET", "https://kami.test"),
+        )
+        with (
+            patch.object(httpx.AsyncClient, "get", return_value=kami_response),
+            patch.object(kami, "search_address") as search_address,
+        ):
+            result = await self.post(
+                address_search_query, {"searchInput": address.street_name}
+            )
+
+        search_address.assert_not_called()
+        self.assertNotIn("errors", result)
+        self.assertIn(
+            {
+                "streetName": address.street_name,
+                "streetNumber": address.street_number,
+            },
+            result["data"]["addressSearch"],
+        )
+
+
+class AsyncCustomerGraphQLViewDatabaseTestCase(TestCase):
+    def setUp(self):
+        self.view = get_view(
+            get_schema(),
+            PersistedQueries("test"),
+            CUSTOMER_QUERY_LIMITS,
+            get_async_schema(),
+        )
+
+    @override_settings(
+        TRAFICOM_MOCK=False,
+        TRAFICOM_CHECK=True,
+        TRAFICOM_USE_LEGACY_VEHICLE_FETCH=False,
+    )
+    async def test_vehicle_is_not_stored_when_the_customer_is_not_its_user(self):
+        customer = await sync_to_async(CustomerFactory)(user=UserFactory())
+        traficom_response = httpx.Response(
+            200,
+            text=get_mock_xml("vehicle_ok.xml"),
+            request=httpx.Request("POST", "https://traficom.test"),
+        )
+        request = AsyncRequestFactory().post(
+            "/graphql",
+            {
+                "query": """
+                    mutation GetVehicleInformation($registration: String!) {
+                        getVehicleInformation(registration: $registration) {
+                            registrationNumber
+                        }
+                    }
+                """,
+                "variables": {"registration": "BCI-707"},
+            },
+            content_type="application/json",
+        )
+        with (
+            patch.object(
+                httpx.AsyncClient, "post", return_value=traficom_response
+            ) as post,
+            patch.object(
+                parking_permits.decorators.RequestJWTAuthentication,
+                "authenticate",
+                return_value=UserAuthorization(customer.user, {}),
+            ),
+        ):
+            response = await self.view(request)
+
+        post.assert_called_once()
+        self.assertIn("errors", json.loads(response.content))
+        self.assertFalse(
+            await Vehicle.objects.filter(registration_number="BCI-707").aexists()
+        )
@@ -0,0 +1,163 @@
+import datetime
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import requests_mock
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from helusers.models import OIDCBackChannelLogoutEvent
+from helusers.oidc import AuthenticationError
+from helusers.settings import api_token_auth_settings
+from jose import jwt
+
+from parking_permits import authentication
+from parking_permits.authentication import (
+    ClaimsCache,
+    JWKSCache,
+    RequestJWTAuthentication,
+)
+from users.tests.factories.user import UserFactory
+
+from .keys import rsa_key
+
+ISSUER = "http://localhost/openid"
+
+
+@override_settings(
+    OIDC_API_TOKEN_AUTH={
+        "AUDIENCE": "test_audience",
+        "API_SCOPE_PREFIX": "testprefix",
+        "ISSUER": ISSUER,
+        "REQUIRE_API_SCOPE_FOR_AUTHENTICATION": False,
+    },
+)
+class RequestJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        authentication.jwks_cache.clear()
+        authentication.claims_cache.clear()
+        cache.clear()
+        self.user = UserFactory()
+
+    def get_request(self, expires_in=datetime.timedelta(minutes=5), **claims):
+        now = datetime.datetime.now()
+        encoded_jwt = jwt.encode(
+            {
+                "iss": ISSUER,
+                "aud": api_token_auth_settings.AUDIENCE,
+                "sub": str(self.user.uuid),
+                "iat": int(now.timestamp()),
+                "exp": int((now + expires_in).timestamp()),
+                **claims,
+            },
+            key=rsa_key.private_key_pem,
+            algorithm=rsa_key.jose_algorithm,
+        )
+        return RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {encoded_jwt}")
+
+    def mock_issuer(self, req_mock, keys):
+        req_mock.get(
+            f"{ISSUER}/.well-known/openid-configuration",
+            json={"issuer": ISSUER, "jwks_uri": f"{ISSUER}/jwks"},
+        )
+        req_mock.get(f"{ISSUER}/jwks", json={"keys": keys})
+
+    @requests_mock.Mocker()
+    def test_verified_claims_are_cached(self, req_mock):
+        self.mock_issuer(req_mock, [rsa_key.public_key_jwk])
+        request = self.get_request()
+
+        auth = RequestJWTAuthentication().authenticate(request)
+        self.assertEqual(auth.user, self.user)
+        self.assertEqual(req_mock.call_count, 2)
+
+        with patch("helusers.jwt.jwt.decode") as decode_mock:
+            auth = RequestJWTAuthentication().authenticate(request)
+        decode_mock.assert_not_called()
+        self.assertEqual(auth.user, self.user)
+        self.assertEqual(req_mock.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_token_of_a_terminated_session_is_rejected(self, req_mock):
+        self.mock_issuer(req_mock, [rsa_key.public_key_jwk])
+        request = self.get_request(sid="session-1")
+        auth = RequestJWTAuthentication().authenticate(request)
+        self.assertEqual(auth.user, self.user)
+
+        OIDCBackChannelLogoutEvent.objects.create(iss=ISSUER, sid="session-1")
+
+        # with the claims of the token cached
+        with self.assertRaises(AuthenticationError):
+            RequestJWTAuthentication().authenticate(request)
+
+    @requests_mock.Mocker()
+    def test_active_session_is_cached(self, req_mock):
+        self.mock_issuer(req_mock, [rsa_key.public_key_jwk])
+        request = self.get_request(sid="session-1")
+        RequestJWTAuthentication().authenticate(request)
+
+        with patch.object(OIDCBackChannelLogoutEvent.objects, "filter") as filter_mock:
+            RequestJWTAuthentication().authenticate(request)
+        filter_mock.assert_not_called()
+
+    @requests_mock.Mocker()
+    def test_invalid_token_is_not_cached(self, req_mock):
+        self.mock_issuer(req_mock, [])
+        request = self.get_request()
+
+        for _i in range(2):
+            with self.assertRaises(AuthenticationError):
+                RequestJWTAuthentication().authenticate(request)
+
+    def test_request_without_token(self):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION="Bearer invalid")
+        self.assertIsNone(RequestJWTAuthentication().authenticate(request))
+        self.assertIsNone(
+            RequestJWTAuthentication().authenticate(RequestFactory().get("/"))
+        )
+
+
+class JWKSCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.fetch = Mock(side_effect=lambda issuer: {"keys": [{"kid": "key-1"}]})
+        self.jwks_cache = JWKSCache(fetch=self.fetch)
+
+    def get_keys_at(self, seconds, key_id="key-1"):
+        with patch.object(authentication.time, "monotonic", return_value=seconds):
+            return self.jwks_cache.get_keys(ISSUER, key_id)
+
+    def test_keys_are_fetched_once(self):
+        self.get_keys_at(0)
+        self.get_keys_at(10)
+        self.fetch.assert_called_once_with(ISSUER)
+
+    def test_unknown_key_is_fetched_after_rotation(self):
+        self.get_keys_at(0)
+        self.fetch.side_effect = lambda issuer: {"keys": [{"kid": "key-2"}]}
+
+        # the key set isn't fetched again on every unknown key
+        self.assertEqual(self.get_keys_at(1, "key-2"), {"keys": [{"kid": "key-1"}]})
+        self.assertEqual(self.get_keys_at(120, "key-2"), {"keys": [{"kid": "key-2"}]})
+        self.assertEqual(self.fetch.call_count, 2)
+
+    @override_settings(OIDC_JWKS_REFRESH_INTERVAL=60)
+    def test_stale_keys_are_refreshed_in_the_background(self):
+        self.get_keys_at(0)
+        refreshed = threading.Event()
+        self.fetch.side_effect = lambda issuer: refreshed.set() or {"keys": []}
+
+        self.assertEqual(self.get_keys_at(120), {"keys": [{"kid": "key-1"}]})
+        self.assertTrue(refreshed.wait(5))
+
+
+class ClaimsCacheTestCase(SimpleTestCase):
+    def test_claims_are_cached_until_expiry(self):
+        claims_cache = ClaimsCache(max_size=1)
+        claims_cache.set("valid", {"exp": time.time() + 60})
+        claims_cache.set("expired", {"exp": time.time() - 1})
+        self.assertIsNone(claims_cache.get("expired"))
+        # evicted
+        self.assertIsNone(claims_cache.get("valid"))
+
+        claims_cache.set("valid", {"exp": time.time() + 60})
+        self.assertIsNotNone(claims_cache.get("valid"))
@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.test import TestCase
+from freezegun import freeze_time
+
+from parking_permits.benchmarks.cases import bench_admin_permits_query
+from parking_permits.benchmarks.runner import compare_results, run_benchmark
+from parking_permits.models import ParkingZone
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.tests.factories import ParkingZoneFactory
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+
+
+class BenchmarkRunnerTestCase(TestCase):
+    def test_run_benchmark_rolls_back_writes(self):
+        def setup():
+            ParkingZoneFactory()
+            return lambda: ParkingZoneFactory()
+
+        result = run_benchmark(setup, rounds=3, warmup=1)
+
+        self.assertEqual(result["rounds"], 3)
+        self.assertLessEqual(result["min"], result["median"])
+        self.assertLessEqual(result["median"], result["max"])
+        self.assertGreater(result["queries"], 0)
+        self.assertFalse(ParkingZone.objects.exists())
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {
+            "fast": {"median": 10.0},
+            "slow": {"median": 10.0},
+            "removed": {"median": 1.0},
+        }
+        current = {
+            "fast": {"median": 9.0},
+            "slow": {"median": 13.0},
+            "skipped": {"skipped": "No data."},
+        }
+
+        rows, regressions = compare_results(baseline, current, threshold=0.2)
+
+        self.assertEqual([row[0] for row in rows], ["slow", "fast"])
+        self.assertAlmostEqual(rows[0][3], 0.3)
+        self.assertEqual(regressions, ["slow"])
+
+    @freeze_time("2021-06-01")
+    def test_admin_permits_query_finds_the_searched_permits(self):
+        zone = ParkingZoneFactory()
+        ProductFactory(zone=zone, start_date=date(2021, 1, 1))
+        ParkingPermitFactory(
+            customer=CustomerFactory(last_name="Virtanen"),
+            parking_zone=zone,
+            status=ParkingPermitStatus.VALID,
+        )
+
+        result = run_benchmark(bench_admin_permits_query, rounds=1, warmup=0)
+
+        self.assertEqual(result["rounds"], 1)
@@ -0,0 +1,83 @@
+import logging
+import sys
+from unittest.mock import patch
+
+from django.test import TestCase
+from django_db_logger.models import StatusLog
+
+from parking_permits import db_logging
+from parking_permits.db_logging import QueuedDatabaseLogHandler
+
+
+def make_record(msg, *args, level=logging.ERROR, exc_info=None):
+    return logging.LogRecord("db", level, __file__, 1, msg, args, exc_info)
+
+
+class QueuedDatabaseLogHandlerTestCase(TestCase):
+    def make_handler(self, **kwargs):
+        handler = QueuedDatabaseLogHandler(**{"flush_interval": 0} | kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_records_are_written(self):
+        handler = self.make_handler()
+        try:
+            raise ValueError("invalid")
+        except ValueError:
+            exc_info = sys.exc_info()
+        handler.handle(make_record("Permit %s failed", 1, exc_info=exc_info))
+
+        status_log = StatusLog.objects.get()
+        self.assertEqual(status_log.msg, "Permit 1 failed")
+        self.assertEqual(status_log.level, logging.ERROR)
+        self.assertIn("ValueError: invalid", status_log.trace)
+        self.assertEqual(handler.counters["written"], 1)
+
+    def test_identical_records_are_aggregated(self):
+        with patch.object(db_logging.time, "monotonic", return_value=0):
+            handler = self.make_handler(window=60)
+            for _i in range(3):
+                handler.handle(make_record("Talpa is unavailable"))
+            handler.handle(make_record("Parkkihubi is unavailable"))
+        self.assertEqual(StatusLog.objects.count(), 2)
+        self.assertEqual(handler.counters["aggregated"], 2)
+
+        with patch.object(db_logging.time, "monotonic", return_value=61):
+            handler.handle(make_record("Talpa is unavailable"))
+        self.assertEqual(
+            list(StatusLog.objects.order_by("id").values_list("msg", flat=True)),
+            [
+                "Talpa is unavailable",
+                "Parkkihubi is unavailable",
+                "Talpa is unavailable (repeated 2 times in 60 seconds)",
+                "Talpa is unavailable",
+            ],
+        )
+
+    def test_records_over_the_limit_are_dropped(self):
+        handler = self.make_handler(max_records_per_window=2)
+        for i in range(3):
+            handler.handle(make_record("Permit %s failed", i))
+        self.assertEqual(StatusLog.objects.count(), 2)
+        self.assertEqual(handler.counters["dropped"], 1)
+
+    def test_records_are_dropped_when_the_queue_is_full(self):
+        handler = self.make_handler(queue_size=1, flush_interval=1)
+        with patch.object(handler, "_start_writer"):
+            handler.handle(make_record("Permit 1 failed"))
+            handler.handle(make_record("Permit 2 failed"))
+        self.assertEqual(StatusLog.objects.count(), 0)
+
+        handler.flush()
+        self.assertEqual(StatusLog.objects.get().msg, "Permit 1 failed")
+        self.assertEqual(handler.counters["dropped"], 1)
+
+    def test_failed_writes_are_counted(self):
+        handler = self.make_handler()
+        with patch.object(
+            StatusLog.objects, "bulk_create", side_effect=Exception("unavailable")
+        ):
+            handler.handle(make_record("Permit 1 failed"))
+        self.assertEqual(handler.counters["dropped"], 1)
+        with patch.object(db_logging, "_handlers", {handler}):
+            self.assertIn("db_log_records_dropped_total 1", db_logging.render_metrics())
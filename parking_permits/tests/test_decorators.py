@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.exceptions import PermissionDenied
+from django.test import RequestFactory, TestCase
+from helusers.authz import UserAuthorization
+from helusers.oidc import AuthenticationError
+
+import parking_permits.decorators
+from parking_permits.decorators import is_customer_service, is_super_admin
+from users.models import ParkingPermitGroups
+from users.tests.factories.user import GroupFactory, UserFactory
+
+
+@is_customer_service
+def resolve_customer_service(obj, info):
+    return info.context["request"].user
+
+
+@is_super_admin
+def resolve_super_admin(obj, info):
+    return info.context["request"].user
+
+
+class UserPassesTestTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.user.groups.add(GroupFactory(name=ParkingPermitGroups.CUSTOMER_SERVICE))
+        self.info = SimpleNamespace(context={"request": RequestFactory().post("/")})
+
+    def test_request_is_authenticated_once(self):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(self.user, {}),
+        ) as authenticate_mock:
+            user = resolve_customer_service(None, self.info)
+            with self.assertNumQueries(0):
+                self.assertIs(resolve_customer_service(None, self.info), user)
+                with self.assertRaises(PermissionDenied):
+                    resolve_super_admin(None, self.info)
+        authenticate_mock.assert_called_once()
+
+    def test_authentication_error_is_memoized(self):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            side_effect=AuthenticationError("Invalid token"),
+        ) as authenticate_mock:
+            for _i in range(2):
+                with self.assertRaises(PermissionDenied):
+                    resolve_customer_service(None, self.info)
+        authenticate_mock.assert_called_once()
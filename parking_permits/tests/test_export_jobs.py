@@ -0,0 +1,189 @@
+import json
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits.exceptions import ExportJobError
+from parking_permits.export_jobs import (
+    create_export_job,
+    delete_expired_export_jobs,
+    get_download_url,
+    process_export_jobs,
+)
+from parking_permits.models import ExportJob
+from parking_permits.models.export_job import ExportFileFormat, ExportJobStatus
+from parking_permits.tests.factories.refund import RefundFactory
+from users.tests.factories.user import GroupFactory, UserFactory
+
+
+class ExportJobTestCase(TestCase):
+    def setUp(self):
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_dir.cleanup)
+        settings_override = override_settings(
+            EXPORT_JOB_STORAGE_DIR=self.storage_dir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = UserFactory()
+
+    def test_create_export_job_is_deduplicated_by_params(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        same_job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        other_job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "OPEN"}
+        )
+        self.assertEqual(job.pk, same_job.pk)
+        self.assertNotEqual(job.pk, other_job.pk)
+        self.assertEqual(job.status, ExportJobStatus.PENDING)
+
+    def test_finished_and_other_users_jobs_are_not_reused(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        other_users_job = create_export_job(
+            UserFactory(), ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        self.assertNotEqual(job.pk, other_users_job.pk)
+
+        process_export_jobs()
+        new_job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        self.assertNotEqual(job.pk, new_job.pk)
+        self.assertEqual(new_job.status, ExportJobStatus.PENDING)
+
+    def test_export_job_of_another_user_is_not_found(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        query = "query ExportJob($jobId: ID!) { exportJob(jobId: $jobId) { id } }"
+        group = GroupFactory(name="preparators")
+        for user, found in [(self.user, True), (UserFactory(), False)]:
+            user.groups.add(group)
+            with patch.object(
+                parking_permits.decorators.RequestJWTAuthentication,
+                "authenticate",
+                return_value=UserAuthorization(user, {}),
+            ):
+                response = self.client.post(
+                    reverse("parking_permits:admin-graphql"),
+                    {"query": query, "variables": {"jobId": job.pk}},
+                    content_type="application/json",
+                )
+            response_data = json.loads(response.content)
+            self.assertEqual("errors" not in response_data, found)
+
+    def test_create_export_job_with_invalid_params_raises(self):
+        with self.assertRaises(ExportJobError):
+            create_export_job(self.user, ExportFileFormat.CSV, "unknown", {})
+        with self.assertRaises(ExportJobError):
+            create_export_job(
+                self.user, ExportFileFormat.PDF, "permit", {"object_id": "abc"}
+            )
+
+    def test_process_csv_export_job(self):
+        RefundFactory(name="Refund A")
+        RefundFactory(name="Refund B")
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL", "q": "Refund"}
+        )
+
+        self.assertEqual(process_export_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJobStatus.COMPLETED)
+        self.assertIsNotNone(job.expires_at)
+        content = job.file_path.read_text()
+        self.assertIn("Refund A", content)
+        self.assertIn("Refund B", content)
+
+    def test_process_export_job_for_missing_object_fails(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.PDF, "permit", {"object_id": 123456}
+        )
+
+        process_export_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJobStatus.FAILED)
+        self.assertIsNone(get_download_url(job))
+
+    def test_download_completed_export_job(self):
+        RefundFactory(name="Refund A")
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"q": "Refund"}
+        )
+        process_export_jobs()
+        job.refresh_from_db()
+
+        response = self.client.get(get_download_url(job))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Refund A", b"".join(response.streaming_content))
+        self.assertIn('filename="refunds.csv"', response["Content-Disposition"])
+
+    def test_download_with_expired_url_is_not_found(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        process_export_jobs()
+        job.refresh_from_db()
+        download_url = get_download_url(job)
+
+        with freeze_time(timezone.now() + timedelta(hours=1)):
+            response = self.client.get(download_url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_download_with_invalid_token_is_not_found(self):
+        response = self.client.get("/export_jobs/invalid-token")
+        self.assertEqual(response.status_code, 404)
+
+    def test_delete_expired_export_jobs(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        process_export_jobs()
+        job.refresh_from_db()
+        file_path = job.file_path
+        self.assertTrue(file_path.exists())
+
+        with freeze_time(job.expires_at + timedelta(minutes=1)):
+            self.assertEqual(delete_expired_export_jobs(), 1)
+
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertFalse(file_path.exists())
+
+    @override_settings(EXPORT_JOB_RUNNING_TIMEOUT_MINUTES=30)
+    def test_stale_running_job_is_failed_and_not_reused(self):
+        job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJobStatus.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=31),
+        )
+
+        new_job = create_export_job(
+            self.user, ExportFileFormat.CSV, "refunds", {"status": "ALL"}
+        )
+        self.assertNotEqual(new_job.pk, job.pk)
+
+        self.assertEqual(process_export_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJobStatus.FAILED)
+        self.assertEqual(job.error, "Export job timed out")
+        new_job.refresh_from_db()
+        self.assertEqual(new_job.status, ExportJobStatus.COMPLETED)
@@ -1,11 +1,20 @@
-from django.test import TestCase
+import io
+import zipfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from fpdf import FPDF
 
 from parking_permits.exporters import (
     ORDER_HEADERS,
     PERMIT_HEADERS,
     PRODUCT_HEADERS,
     REFUND_HEADERS,
+    BulkPdfExporter,
     DataExporter,
+    RefundPDF,
+    _get_header_image_info,
 )
 from parking_permits.models import Order, ParkingPermit, Product, Refund
 from parking_permits.tests.factories import ParkingZoneFactory
@@ -66,3 +75,90 @@ class DataExporterTestCase(TestCase):
         self.assertEqual(exporter.get_headers(), PRODUCT_HEADERS)
         rows = exporter.get_rows()
         self.assertEqual(len(rows), 3)
+
+    def test_export_permit_rows_are_fetched_in_constant_queries(self):
+        for _ in range(5):
+            ParkingPermitFactory(customer=self.customer_a, parking_zone=self.zone_a)
+        exporter = DataExporter("permits", ParkingPermit.objects.order_by("id"))
+        with self.assertNumQueries(1):
+            rows = list(exporter.iter_rows())
+        self.assertEqual(len(rows), 5)
+
+    def test_export_order_rows_are_fetched_in_constant_queries(self):
+        for _ in range(5):
+            OrderItemFactory(order=OrderFactory(customer=self.customer_a))
+        exporter = DataExporter("orders", Order.objects.order_by("id"))
+        # orders with customers, permits and order items
+        with self.assertNumQueries(3):
+            rows = list(exporter.iter_rows())
+        self.assertEqual(len(rows), 5)
+
+    def test_export_refund_rows_are_fetched_in_constant_queries(self):
+        for _ in range(5):
+            order = OrderFactory(customer=self.customer_a)
+            permit = ParkingPermitFactory(customer=self.customer_a)
+            RefundFactory(orders=[order]).permits.add(permit)
+        exporter = DataExporter("refunds", Refund.objects.order_by("id"))
+        with self.assertNumQueries(1):
+            rows = list(exporter.iter_rows())
+        self.assertEqual(len(rows), 5)
+
+
+@override_settings(STATIC_ROOT=settings.BASE_DIR / "parking_permits" / "static")
+class BulkPdfExporterTestCase(TestCase):
+    def setUp(self):
+        _get_header_image_info.cache_clear()
+        self.permits = ParkingPermitFactory.create_batch(3)
+        self.permit_ids = [permit.pk for permit in self.permits]
+
+    def test_write_zip(self):
+        exporter = BulkPdfExporter("permit", self.permit_ids, processes=1, chunk_size=2)
+        output = io.BytesIO()
+        self.assertEqual(exporter.write_zip(output), 3)
+
+        with zipfile.ZipFile(output) as zip_file:
+            self.assertEqual(
+                sorted(zip_file.namelist()),
+                sorted(f"permit_{permit_id}.pdf" for permit_id in self.permit_ids),
+            )
+            content = zip_file.read(f"permit_{self.permit_ids[0]}.pdf")
+        self.assertTrue(content.startswith(b"%PDF"))
+
+    def test_header_image_is_parsed_once(self):
+        exporter = BulkPdfExporter("permit", self.permit_ids, processes=1)
+        with mock.patch.object(
+            FPDF, "_parsepng", autospec=True, side_effect=FPDF._parsepng
+        ) as parse_png:
+            list(exporter.iter_pdfs())
+        self.assertEqual(parse_png.call_count, 1)
+
+    def test_get_merged_pdf(self):
+        exporter = BulkPdfExporter("permit", self.permit_ids, chunk_size=2)
+        pdf = exporter.get_merged_pdf()
+        self.assertEqual(pdf.page_no(), 3)
+
+    def test_refund_customers_are_prefetched(self):
+        refund_ids = [RefundFactory(orders=[OrderFactory()]).pk for _i in range(3)]
+        pdf = RefundPDF()
+        # refunds, their orders and the customers of the orders
+        with self.assertNumQueries(3):
+            for refund in pdf.get_source_objects(refund_ids):
+                pdf.get_refund_content(refund)
+
+
+@override_settings(STATIC_ROOT=settings.BASE_DIR / "parking_permits" / "static")
+class BulkPdfExporterPoolTestCase(TransactionTestCase):
+    # the worker processes read the objects with their own connections,
+    # so the objects are committed
+
+    def test_iter_pdfs_in_worker_processes(self):
+        refund_ids = [RefundFactory(orders=[OrderFactory()]).pk for _i in range(5)]
+        exporter = BulkPdfExporter("refund", refund_ids, processes=2, chunk_size=1)
+
+        pdfs = list(exporter.iter_pdfs())
+
+        self.assertEqual([object_id for object_id, _content in pdfs], refund_ids)
+        for _object_id, content in pdfs:
+            self.assertTrue(content.startswith(b"%PDF"))
+        # the connection closed for the fork is reopened
+        self.assertEqual(Refund.objects.count(), 5)
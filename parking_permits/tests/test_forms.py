@@ -2,6 +2,7 @@ from datetime import timedelta
 
 import freezegun
 import pytest
+from django.db.models import Q
 from django.test import TestCase
 from django.utils import timezone
 
@@ -12,6 +13,7 @@ from parking_permits.forms import (
     PermitSearchForm,
     RefundSearchForm,
 )
+from parking_permits.models import ParkingPermit, ParkingPermitSearchDocument
 from parking_permits.models.order import OrderPaymentType
 from parking_permits.models.parking_permit import (
     ContractType,
@@ -102,6 +104,19 @@ class OrderSearchFormDistinctOrdersTestCase(TestCase):
             self.assertEqual(name, qs[idx].permits.first().parking_zone.name)
 
 
+class PermitSearchFormPageSizeTestCase(TestCase):
+    def test_page_size_is_applied(self):
+        for _i in range(3):
+            ParkingPermitFactory()
+
+        form = PermitSearchForm({"page": 1, "page_size": 2, "status": "ALL"})
+
+        self.assertTrue(form.is_valid())
+        paged = form.get_paged_queryset()
+        self.assertEqual(len(paged["objects"]), 2)
+        self.assertEqual(paged["page_info"]["num_pages"], 2)
+
+
 class PermitSearchFormTextSearch(TestCase):
     def test_search_permit_id(self):
         permit = ParkingPermitFactory(
@@ -319,6 +334,115 @@ class PermitSearchFormTextSearch(TestCase):
         self.assertEqual(qs.first(), permit)
 
 
+class PermitSearchDocumentTestCase(TestCase):
+    def _search(self, q, **data):
+        form = PermitSearchForm({"q": q, **data})
+        self.assertTrue(form.is_valid())
+        return set(form.get_queryset())
+
+    def _legacy_search(self, q, user_role=None):
+        fields = [
+            "vehicle__registration_number",
+            "temp_vehicles__vehicle__registration_number",
+        ]
+        if user_role != ParkingPermitGroups.INSPECTORS:
+            fields += [
+                "customer__first_name",
+                "customer__last_name",
+                "customer__national_id_number",
+            ]
+        query = Q()
+        for token in q.split()[: PermitSearchForm.MAX_TEXT_SEARCH_TOKENS]:
+            token_query = Q()
+            for field in fields:
+                token_query |= Q(**{f"{field}__icontains": token})
+            query &= token_query
+        if q.isdigit():
+            query |= Q(pk=q)
+        return set(ParkingPermit.objects.filter(query).distinct())
+
+    def test_search_results_match_join_based_search(self):
+        now = timezone.now()
+        seppo = CustomerFactory(
+            first_name="Seppo",
+            last_name="Taalasmaa",
+            national_id_number="020551-111A",
+        )
+        ParkingPermitFactory(
+            customer=seppo, vehicle=VehicleFactory(registration_number="YLH-371")
+        )
+        permit = ParkingPermitFactory(
+            customer=CustomerFactory(first_name="Ismo", last_name="Laitela"),
+            vehicle=VehicleFactory(registration_number="ABC-123"),
+        )
+        permit.temp_vehicles.add(
+            TemporaryVehicleFactory(
+                vehicle__registration_number="XYZ-371",
+                start_time=now,
+                end_time=now + timedelta(days=1),
+            )
+        )
+        ParkingPermitFactory(customer=seppo, vehicle=None)
+
+        for q in [
+            "seppo",
+            "Taalasmaa Seppo",
+            "371",
+            "ylh-371 seppo",
+            "xyz",
+            "020551-111a",
+            "ismo 371",
+            "aSeppo",
+            str(permit.pk),
+        ]:
+            with self.subTest(q=q):
+                self.assertEqual(self._search(q), self._legacy_search(q))
+                self.assertEqual(
+                    self._search(q, user_role=ParkingPermitGroups.INSPECTORS),
+                    self._legacy_search(q, user_role=ParkingPermitGroups.INSPECTORS),
+                )
+
+    def test_search_document_follows_related_changes(self):
+        customer = CustomerFactory(first_name="Seppo", last_name="Taalasmaa")
+        vehicle = VehicleFactory(registration_number="YLH-371")
+        permit = ParkingPermitFactory(customer=customer, vehicle=vehicle)
+
+        customer.first_name = "Ismo"
+        customer.save()
+        vehicle.registration_number = "ABC-123"
+        vehicle.save()
+
+        self.assertEqual(self._search("Ismo ABC-123"), {permit})
+        self.assertEqual(self._search("Seppo"), set())
+        self.assertEqual(self._search("YLH"), set())
+
+        permit.vehicle = VehicleFactory(registration_number="DEF-456")
+        permit.save()
+
+        self.assertEqual(self._search("def-456"), {permit})
+        self.assertEqual(self._search("abc-123"), set())
+
+    def test_search_document_follows_cleared_temporary_vehicles(self):
+        temp_vehicle = TemporaryVehicleFactory(vehicle__registration_number="XYZ-371")
+        permits = ParkingPermitFactory.create_batch(2)
+        for permit in permits:
+            permit.temp_vehicles.add(temp_vehicle)
+        self.assertEqual(self._search("xyz"), set(permits))
+
+        temp_vehicle.parkingpermit_set.clear()
+
+        self.assertEqual(self._search("xyz"), set())
+
+    def test_refresh_all_rebuilds_missing_documents(self):
+        permit = ParkingPermitFactory(
+            vehicle=VehicleFactory(registration_number="YLH-371")
+        )
+        ParkingPermitSearchDocument.objects.all().delete()
+
+        self.assertEqual(ParkingPermitSearchDocument.refresh_all(chunk_size=1), 1)
+        self.assertEqual(self._search("ylh"), {permit})
+
+
 class OrderSearchFormTextSearch(TestCase):
     def setUp(self):
         self.address = AddressFactory(street_name="Pihlajakatu", street_number="23")
@@ -0,0 +1,178 @@
+import json
+from unittest.mock import Mock, patch
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+import parking_permits.loaders
+from parking_permits.loaders import DataLoader, Loaders, get_loaders
+from parking_permits.models import ParkingPermit
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.vehicle import TemporaryVehicleFactory
+from users.tests.factories.user import GroupFactory, UserFactory
+
+permits_query = """
+    query Permits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {
+        permits(pageInput: $pageInput, searchParams: $searchParams) {
+            objects {
+                id
+                customer {
+                    firstName
+                    primaryAddress { streetName zone { name residentProducts { id } } }
+                    otherAddress { streetName zone { name } }
+                }
+                vehicle { registrationNumber powerType { identifier } }
+                activeTemporaryVehicle { vehicle { registrationNumber } }
+                address { streetName zone { name } }
+                parkingZone { name residentProducts { id } }
+            }
+        }
+    }
+"""
+
+
+class DataLoaderTestCase(SimpleTestCase):
+    def test_loads_enqueued_keys_in_one_batch(self):
+        batch_load = Mock(side_effect=lambda keys: {key: key * 10 for key in keys})
+        loader = DataLoader(batch_load)
+        loader.enqueue([1, 2, None, 2])
+
+        self.assertEqual(loader.load(1), 10)
+        self.assertEqual(loader.load(2), 20)
+        self.assertEqual(loader.load(3), 30)
+        self.assertIsNone(loader.load(None))
+        self.assertEqual(batch_load.call_count, 2)
+        batch_load.assert_any_call([1, 2])
+        batch_load.assert_any_call([3])
+
+    def test_missing_keys(self):
+        self.assertIsNone(DataLoader(lambda keys: {}).load(1))
+        self.assertEqual(DataLoader(lambda keys: {}, many=True).load(1), [])
+
+    def test_prime_and_clear(self):
+        batch_load = Mock(return_value={1: "loaded"})
+        loader = DataLoader(batch_load)
+        loader.prime(1, "primed")
+        self.assertEqual(loader.load(1), "primed")
+        batch_load.assert_not_called()
+
+        loader.clear(1)
+        self.assertEqual(loader.load(1), "loaded")
+
+    def test_on_load_receives_loaded_objects(self):
+        on_load = Mock()
+        loader = DataLoader(
+            lambda keys: {key: [key, key] for key in keys}, many=True, on_load=on_load
+        )
+        loader.load_many([1, 2])
+        on_load.assert_called_once_with([1, 1, 2, 2])
+
+    def test_get_loaders_builds_the_loaders_once(self):
+        info = Mock(context={})
+        with patch.object(
+            parking_permits.loaders, "Loaders", side_effect=Loaders
+        ) as loaders_class:
+            loaders = get_loaders(info)
+            self.assertIs(get_loaders(info), loaders)
+        loaders_class.assert_called_once_with()
+
+
+class PermitsQueryLoadersTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = Client()
+        cls.admin = UserFactory()
+        cls.admin.groups.add(GroupFactory(name="super_admin"))
+
+    def create_permits(self, count):
+        for _i in range(count):
+            permit = ParkingPermitFactory(
+                customer=CustomerFactory(first_name="John"),
+                status=ParkingPermitStatus.VALID,
+            )
+            today = timezone.localdate()
+            ProductFactory(
+                zone=permit.parking_zone,
+                start_date=today,
+                end_date=today + relativedelta(years=1),
+            )
+            permit.temp_vehicles.add(TemporaryVehicleFactory())
+
+    def execute_permits_query(self):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(self.admin, {}),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    reverse("parking_permits:admin-graphql"),
+                    {
+                        "query": permits_query,
+                        "variables": {
+                            "pageInput": {"page": 1, "pageSize": 50},
+                            "searchParams": {"q": "John", "status": "ALL"},
+                        },
+                    },
+                    content_type="application/json",
+                )
+        response_data = json.loads(response.content)
+        self.assertNotIn("errors", response_data)
+        return response_data["data"]["permits"]["objects"], len(context)
+
+    def test_query_count_does_not_grow_with_the_permit_count(self):
+        self.create_permits(2)
+        permits, few_permits_query_count = self.execute_permits_query()
+        self.assertEqual(len(permits), 2)
+
+        self.create_permits(8)
+        permits, many_permits_query_count = self.execute_permits_query()
+        self.assertEqual(len(permits), 10)
+        self.assertLessEqual(many_permits_query_count, few_permits_query_count)
+
+    def test_resolves_the_same_data_as_the_models(self):
+        self.create_permits(3)
+        permits, _query_count = self.execute_permits_query()
+
+        for permit_data in permits:
+            permit = ParkingPermit.objects.get(pk=permit_data["id"])
+            customer = permit.customer
+            self.assertEqual(
+                permit_data["customer"]["primaryAddress"]["zone"]["name"],
+                customer.primary_address._zone.name,
+            )
+            self.assertEqual(
+                permit_data["vehicle"]["powerType"]["identifier"],
+                permit.vehicle.power_type.identifier,
+            )
+            self.assertEqual(
+                permit_data["activeTemporaryVehicle"]["vehicle"]["registrationNumber"],
+                permit.active_temporary_vehicle.vehicle.registration_number,
+            )
+            self.assertEqual(
+                [
+                    product["id"]
+                    for product in permit_data["parkingZone"]["residentProducts"]
+                ],
+                [str(product.pk) for product in permit.parking_zone.resident_products],
+            )
+
+
+class LoadersTestCase(TestCase):
+    def test_load_related_uses_select_related_objects(self):
+        permit = ParkingPermitFactory()
+        permit = ParkingPermit.objects.select_related("customer").get(pk=permit.pk)
+        loaders = Loaders()
+        with self.assertNumQueries(0):
+            loaders.prepare_permits([permit])
+            customer = loaders.load_related(loaders.customer, permit, "customer")
+        self.assertEqual(customer, permit.customer)
@@ -1,3 +1,8 @@
+import base64
+import json
+from unittest import mock
+
+from django.db.models import F
 from django.test import TestCase
 
 from parking_permits.models import ParkingPermit
@@ -16,6 +21,8 @@ class QuerySetPaginatorTestCase(TestCase):
         page_input = {"page": 1}
         paginator = QuerySetPaginator(qs, page_input)
         self.assertEqual(paginator.object_list.count(), 10)
+        page_info = paginator.page_info
+        self.assertIsNotNone(page_info.pop("end_cursor"))
         expected_page_info = {
             "num_pages": 1,
             "next": None,
@@ -24,14 +31,17 @@ class QuerySetPaginatorTestCase(TestCase):
             "start_index": 1,
             "end_index": 10,
             "count": 10,
+            "count_is_estimate": False,
         }
-        self.assertEqual(paginator.page_info, expected_page_info)
+        self.assertEqual(page_info, expected_page_info)
 
     def test_paginator_with_custom_page_size(self):
         qs = ParkingPermit.objects.all()
         page_input = {"page": 2, "page_size": 3}
         paginator = QuerySetPaginator(qs, page_input)
         self.assertEqual(paginator.object_list.count(), 3)
+        page_info = paginator.page_info
+        self.assertIsNotNone(page_info.pop("end_cursor"))
         expected_page_info = {
             "num_pages": 4,
             "next": 3,
@@ -40,5 +50,91 @@ class QuerySetPaginatorTestCase(TestCase):
             "start_index": 4,
             "end_index": 6,
             "count": 10,
+            "count_is_estimate": False,
         }
-        self.assertEqual(paginator.page_info, expected_page_info)
+        self.assertEqual(page_info, expected_page_info)
+
+    def test_page_size_is_capped(self):
+        qs = ParkingPermit.objects.all()
+        with mock.patch.object(QuerySetPaginator, "max_page_size", 4):
+            paginator = QuerySetPaginator(qs, {"page": 1, "page_size": 1000})
+        self.assertEqual(paginator.page_size, 4)
+        self.assertEqual(len(paginator.object_list), 4)
+
+    def test_keyset_page_matches_offset_page(self):
+        qs = ParkingPermit.objects.order_by("status", "-start_time")
+        first_page = QuerySetPaginator(qs, {"page": 1, "page_size": 4})
+        end_cursor = first_page.page_info["end_cursor"]
+
+        offset_page = QuerySetPaginator(qs, {"page": 2, "page_size": 4})
+        keyset_page = QuerySetPaginator(
+            qs, {"page": 2, "page_size": 4, "after": end_cursor}
+        )
+
+        self.assertEqual(list(keyset_page.object_list), list(offset_page.object_list))
+        self.assertEqual(keyset_page.page_info["start_index"], 5)
+        self.assertEqual(keyset_page.page_info["next"], 3)
+
+    def test_cursor_of_other_page_falls_back_to_offset(self):
+        qs = ParkingPermit.objects.all()
+        first_page = QuerySetPaginator(qs, {"page": 1, "page_size": 4})
+        end_cursor = first_page.page_info["end_cursor"]
+
+        offset_page = QuerySetPaginator(qs, {"page": 3, "page_size": 4})
+        paginator = QuerySetPaginator(
+            qs, {"page": 3, "page_size": 4, "after": end_cursor}
+        )
+
+        self.assertEqual(list(paginator.object_list), list(offset_page.object_list))
+
+    def test_nullable_sort_key_is_not_used_for_keyset(self):
+        qs = ParkingPermit.objects.order_by("end_time")
+        paginator = QuerySetPaginator(qs, {"page": 1})
+        self.assertIsNone(paginator.page_info["end_cursor"])
+
+    @mock.patch("parking_permits.paginator.get_estimated_count", return_value=100000)
+    def test_paginator_uses_estimated_count_for_large_results(self, _):
+        qs = ParkingPermit.objects.all()
+        paginator = QuerySetPaginator(qs, {"page": 1, "page_size": 4})
+        self.assertEqual(paginator.page_info["count"], 100000)
+        self.assertTrue(paginator.page_info["count_is_estimate"])
+        self.assertEqual(paginator.page_info["next"], 2)
+
+        paginator = QuerySetPaginator(
+            qs, {"page": 1, "page_size": 4, "exact_count": True}
+        )
+        self.assertEqual(paginator.page_info["count"], 10)
+        self.assertFalse(paginator.page_info["count_is_estimate"])
+
+    def test_annotation_sort_key_falls_back_to_offset(self):
+        qs = ParkingPermit.objects.annotate(
+            _parking_zone_name=F("parking_zone__name")
+        ).order_by("-_parking_zone_name")
+        paginator = QuerySetPaginator(qs, {"page": 2, "page_size": 4})
+        self.assertEqual(list(paginator.object_list), list(qs[4:8]))
+        self.assertIsNone(paginator.page_info["end_cursor"])
+
+    def test_invalid_cursor_values_fall_back_to_offset(self):
+        qs = ParkingPermit.objects.order_by("-start_time")
+        offset_page = QuerySetPaginator(qs, {"page": 2, "page_size": 4})
+        first_page = QuerySetPaginator(qs, {"page": 1, "page_size": 4})
+        data = json.loads(base64.urlsafe_b64decode(first_page.page_info["end_cursor"]))
+        for values in [data["v"][:1], ["not a datetime", data["v"][1]], "x"]:
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({**data, "v": values}).encode()
+            ).decode()
+            paginator = QuerySetPaginator(
+                qs, {"page": 2, "page_size": 4, "after": cursor}
+            )
+            self.assertEqual(list(paginator.object_list), list(offset_page.object_list))
+
+    @mock.patch("parking_permits.paginator.get_estimated_count")
+    def test_last_page_is_counted_without_queries(self, get_estimated_count):
+        qs = ParkingPermit.objects.all()
+        paginator = QuerySetPaginator(qs, {"page": 3, "page_size": 4})
+        paginator.object_list = list(paginator.object_list)
+        with self.assertNumQueries(0):
+            page_info = paginator.page_info
+        self.assertEqual(page_info["count"], 10)
+        self.assertIsNone(page_info["next"])
+        get_estimated_count.assert_not_called()
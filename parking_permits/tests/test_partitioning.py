@@ -0,0 +1,111 @@
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from resilient_logger.models import ResilientLogEntry
+
+from parking_permits.models.parking_permit import ParkingPermitEvent
+from parking_permits.partitioning import PARTITIONED_TABLES, get_month_start
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+
+permit_events, resilient_log_entries, _audit_logs = PARTITIONED_TABLES
+
+
+def get_partition_rows(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {connection.ops.quote_name(name)}")
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PartitioningTestCase(TestCase):
+    def setUp(self):
+        self.old_month = get_month_start(timezone.now()) - relativedelta(years=3)
+        self.old_partition = permit_events.get_partition_name(self.old_month)
+
+    def create_old_event(self):
+        event = ParkingPermitEvent.objects.create(
+            parking_permit=ParkingPermitFactory(),
+            message="Permit created",
+            type=ParkingPermitEvent.EventType.CREATED,
+            key=ParkingPermitEvent.EventKey.CREATE_PERMIT,
+        )
+        ParkingPermitEvent.objects.filter(pk=event.pk).update(
+            created_at=self.old_month + relativedelta(days=3)
+        )
+        return event
+
+    def create_old_log_entry(self, is_sent):
+        entry = ResilientLogEntry.objects.create(message="test", is_sent=is_sent)
+        ResilientLogEntry.objects.filter(pk=entry.pk).update(
+            created_at=self.old_month + relativedelta(days=3)
+        )
+        return entry
+
+    def test_rows_are_moved_from_the_default_partition(self):
+        event = self.create_old_event()
+        self.assertIn(event.pk, get_partition_rows(permit_events.default_partition))
+
+        created = permit_events.ensure_partitions()
+
+        self.assertIn(self.old_partition, created)
+        self.assertEqual(get_partition_rows(self.old_partition), [event.pk])
+        self.assertNotIn(event.pk, get_partition_rows(permit_events.default_partition))
+        self.assertEqual(permit_events.ensure_partitions(), [])
+
+    @override_settings(PERMIT_EVENT_RETENTION_MONTHS=12)
+    def test_expired_partitions_are_dropped(self):
+        event = self.create_old_event()
+        permit_events.ensure_partitions()
+
+        self.assertEqual(
+            permit_events.drop_expired_partitions(dry_run=True), [self.old_partition]
+        )
+        self.assertTrue(ParkingPermitEvent.objects.filter(pk=event.pk).exists())
+
+        call_command("maintain_partitions")
+        self.assertFalse(ParkingPermitEvent.objects.filter(pk=event.pk).exists())
+        with connection.cursor() as cursor:
+            self.assertNotIn(self.old_month, permit_events.get_partitions(cursor))
+
+    @override_settings(PERMIT_EVENT_RETENTION_MONTHS=0)
+    def test_partitions_are_kept_without_retention(self):
+        self.create_old_event()
+        permit_events.ensure_partitions()
+        self.assertEqual(permit_events.drop_expired_partitions(), [])
+
+    @override_settings(AUDIT_LOG_RETENTION_MONTHS=12)
+    def test_partitions_with_unsent_log_entries_are_kept(self):
+        entry = self.create_old_log_entry(is_sent=False)
+        resilient_log_entries.ensure_partitions()
+
+        self.assertEqual(resilient_log_entries.drop_expired_partitions(), [])
+        self.assertTrue(ResilientLogEntry.objects.filter(pk=entry.pk).exists())
+
+        ResilientLogEntry.objects.filter(pk=entry.pk).update(is_sent=True)
+        self.assertEqual(
+            resilient_log_entries.drop_expired_partitions(),
+            [resilient_log_entries.get_partition_name(self.old_month)],
+        )
+        self.assertFalse(ResilientLogEntry.objects.filter(pk=entry.pk).exists())
+
+
+class PartitionedTableMigrationsTestCase(SimpleTestCase):
+    def test_partitioned_tables_of_other_apps_have_no_new_migrations(self):
+        # A new migration of these apps runs on the tables partitioned by
+        # 0080, whose primary key is (id, created_at) and whose ids come from
+        # a sequence. Check that it works on them before updating the
+        # expected migrations.
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaf_nodes = {
+            app_label: loader.graph.leaf_nodes(app_label)
+            for app_label in ("resilient_logger", "audit_logger")
+        }
+        self.assertEqual(
+            leaf_nodes,
+            {
+                "resilient_logger": [("resilient_logger", "0004_remove_explicit_id")],
+                "audit_logger": [("audit_logger", "0001_initial")],
+            },
+        )
@@ -0,0 +1,176 @@
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from graphql import specified_rules, validate
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits.graphql import get_admin_schema
+from parking_permits.persisted_queries import (
+    PersistedQueries,
+    PersistedQueryError,
+    get_query_hash,
+)
+from parking_permits.query_cost import QueryLimits, get_validation_rules
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from users.tests.factories.user import GroupFactory, UserFactory
+
+zones_query = "{ zones { name } }"
+
+
+def persisted_query_extensions(query_hash):
+    return {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+
+
+class PersistedQueriesTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.persisted_queries = PersistedQueries("test")
+
+    def test_unknown_hash_is_not_found(self):
+        with self.assertRaises(PersistedQueryError) as context:
+            self.persisted_queries.resolve_data(
+                {"extensions": persisted_query_extensions(get_query_hash(zones_query))}
+            )
+        self.assertEqual(context.exception.code, "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_query_sent_with_its_hash_is_stored(self):
+        extensions = persisted_query_extensions(get_query_hash(zones_query))
+        self.persisted_queries.resolve_data(
+            {"query": zones_query, "extensions": extensions}
+        )
+        data = self.persisted_queries.resolve_data({"extensions": extensions})
+        self.assertEqual(data["query"], zones_query)
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH=len(zones_query) - 1)
+    def test_long_query_is_not_stored(self):
+        query_hash = get_query_hash(zones_query)
+        data = self.persisted_queries.resolve_data(
+            {"query": zones_query, "extensions": persisted_query_extensions(query_hash)}
+        )
+        self.assertEqual(data["query"], zones_query)
+        self.assertIsNone(self.persisted_queries.get_query(query_hash))
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES=2)
+    def test_number_of_stored_queries_is_limited(self):
+        queries = ["{ zones { id } }", "{ zones { name } }", "{ zones { label } }"]
+        for query in [*queries, queries[0]]:
+            self.persisted_queries.save_query(get_query_hash(query), query)
+        self.assertEqual(
+            [self.persisted_queries.get_query(get_query_hash(q)) for q in queries],
+            [*queries[:2], None],
+        )
+
+    def test_hash_mismatch(self):
+        with self.assertRaises(PersistedQueryError) as context:
+            self.persisted_queries.resolve_data(
+                {
+                    "query": zones_query,
+                    "extensions": persisted_query_extensions("0" * 64),
+                }
+            )
+        self.assertEqual(context.exception.code, "BAD_USER_INPUT")
+        self.assertIsNone(self.persisted_queries.get_query("0" * 64))
+
+    def test_unsupported_version(self):
+        with self.assertRaises(PersistedQueryError) as context:
+            self.persisted_queries.resolve_data(
+                {"extensions": {"persistedQuery": {"version": 2, "sha256Hash": "x"}}}
+            )
+        self.assertEqual(context.exception.code, "PERSISTED_QUERY_NOT_SUPPORTED")
+
+    def test_manifest(self):
+        query_hash = get_query_hash(zones_query)
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest:
+            json.dump({query_hash: zones_query}, manifest)
+            manifest.flush()
+            with override_settings(GRAPHQL_PERSISTED_QUERIES_MANIFEST=manifest.name):
+                data = PersistedQueries("test").resolve_data(
+                    {"extensions": persisted_query_extensions(query_hash)}
+                )
+        self.assertEqual(data["query"], zones_query)
+
+    def test_documents_are_parsed_once(self):
+        document = self.persisted_queries.get_document(zones_query)
+        self.assertIs(self.persisted_queries.get_document(zones_query), document)
+
+    def test_least_recently_used_documents_are_evicted(self):
+        persisted_queries = PersistedQueries("test", max_documents=1)
+        document = persisted_queries.get_document(zones_query)
+        persisted_queries.get_document("{ zones { id } }")
+        self.assertIsNot(persisted_queries.get_document(zones_query), document)
+
+    def test_specification_rules_are_validated_once(self):
+        limits = QueryLimits(max_depth=1, max_cost=100)
+        document = self.persisted_queries.get_document(zones_query)
+        rules = [
+            *specified_rules,
+            *get_validation_rules(limits)({}, document, {}),
+        ]
+        with patch(
+            "parking_permits.persisted_queries.validate",
+            wraps=validate,
+        ) as validate_mock:
+            for _i in range(2):
+                errors = self.persisted_queries.validate_query(
+                    get_admin_schema(), document, rules
+                )
+                # the custom rules are run on every request
+                self.assertEqual(
+                    [error.message for error in errors],
+                    ["The query depth 2 exceeds the maximum depth 1."],
+                )
+        self.assertEqual(validate_mock.call_count, 3)
+
+    def test_invalid_documents_are_not_validated_again(self):
+        document = self.persisted_queries.get_document("{ zones { unknown } }")
+        for _i in range(2):
+            errors = self.persisted_queries.validate_query(get_admin_schema(), document)
+            self.assertEqual(len(errors), 1)
+
+
+class PersistedQueryViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = Client()
+        cls.admin = UserFactory()
+        cls.admin.groups.add(GroupFactory(name="super_admin"))
+        ParkingPermitFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def execute(self, data):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(self.admin, {}),
+        ):
+            response = self.client.post(
+                reverse("parking_permits:admin-graphql"),
+                data,
+                content_type="application/json",
+            )
+        return json.loads(response.content)
+
+    def test_automatic_persisted_query(self):
+        query = "{ permits(pageInput: {page: 1}) { objects { id } } }"
+        extensions = persisted_query_extensions(get_query_hash(query))
+
+        response_data = self.execute({"extensions": extensions})
+        self.assertEqual(
+            response_data["errors"][0]["extensions"]["code"],
+            "PERSISTED_QUERY_NOT_FOUND",
+        )
+
+        response_data = self.execute({"query": query, "extensions": extensions})
+        self.assertNotIn("errors", response_data)
+
+        response_data = self.execute({"extensions": extensions})
+        self.assertNotIn("errors", response_data)
+        self.assertEqual(len(response_data["data"]["permits"]["objects"]), 1)
+        self.assertEqual(response_data["extensions"]["queryCost"]["cost"], 11)
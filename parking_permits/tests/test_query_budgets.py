@@ -0,0 +1,1033 @@
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from ariadne import convert_camel_case_to_snake
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone as tz
+from helusers.authz import UserAuthorization
+from rest_framework_api_key.models import APIKey
+
+import parking_permits.decorators
+from parking_permits.graphql import get_admin_schema, get_schema
+from parking_permits.models import ParkingZone
+from parking_permits.models.order import OrderStatus
+from parking_permits.models.parking_permit import (
+    ContractType,
+    ParkingPermitEvent,
+    ParkingPermitStatus,
+)
+from parking_permits.models.product import ProductType
+from parking_permits.models.refund import RefundStatus
+from parking_permits.models.reporting import (
+    DailyRefundRollup,
+    DailyRevenueRollup,
+    PermitCountSnapshot,
+)
+from parking_permits.tests.factories import (
+    LowEmissionCriteriaFactory,
+    ParkingZoneFactory,
+)
+from parking_permits.tests.factories.address import AddressFactory
+from parking_permits.tests.factories.announcement import AnnouncementFactory
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.order import OrderFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.permit_extension_request import (
+    ParkingPermitExtensionRequestFactory,
+)
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.refund import RefundFactory
+from parking_permits.tests.query_budget import query_budget
+from users.tests.factories.user import GroupFactory, UserFactory
+
+# The operations are run with SEED_COUNT and then with twice as many
+# seeded rows, and the second run may not execute more queries than the
+# first one, so that a query per row fails the test with a report of the
+# repeated queries. MAX_OPERATION_QUERIES only catches runaway operations.
+SEED_COUNT = 3
+MAX_OPERATION_QUERIES = 100
+
+# The operations whose queries are not measured here. They call the
+# external services or handle a single permit or product of the request,
+# and are tested with the services mocked in the resolver and view tests.
+UNMEASURED_ADMIN_OPERATIONS = {
+    "customer": "fetches the customer from DVV",
+    "vehicle": "fetches the vehicle from Traficom",
+    "addressSearch": "searches the addresses from Kami",
+    "permitPrices": "prices the single permit of the input",
+    "permitPriceChangeList": "prices the changes of a single permit",
+    "getExtendedPriceList": "prices the extension of a single permit",
+    "createResidentPermit": "syncs the permit with Traficom and Parkkihubi",
+    "updateResidentPermit": "syncs the permit with Talpa and Parkkihubi",
+    "endPermit": "syncs the permit with Talpa and Parkkihubi",
+    "extendPermit": "creates the extension order in Talpa",
+    "addTemporaryVehicle": "fetches the vehicle from Traficom",
+    "removeTemporaryVehicle": "syncs the permit with Parkkihubi",
+    "createProduct": "creates the product in Talpa",
+    "updateProduct": "updates the product in Talpa",
+}
+UNMEASURED_CUSTOMER_OPERATIONS = {
+    "profile": "fetches the customer from Helsinki profile",
+    "getVehicleInformation": "fetches the vehicle from Traficom",
+    "getUpdateAddressPriceChanges": "prices the permits of the customer",
+    "getExtendedPriceList": "prices the extension of a single permit",
+    "createParkingPermit": "fetches the vehicle from Traficom",
+    "updateParkingPermit": "syncs the permits with Talpa",
+    "endParkingPermit": "syncs the permits with Talpa and Parkkihubi",
+    "extendParkingPermit": "creates the extension order in Talpa",
+    "createOrder": "creates the order in Talpa",
+    "changeAddress": "creates the orders in Talpa",
+    "updatePermitVehicle": "fetches the vehicle from Traficom",
+    "addTemporaryVehicle": "syncs the permit with Parkkihubi",
+    "removeTemporaryVehicle": "syncs the permit with Parkkihubi",
+}
+# the Talpa webhooks and the resolve endpoints handle a single order or
+# permit, and the export job downloads read a file
+UNMEASURED_VIEWS = {
+    "talpa-availability",
+    "talpa-product",
+    "talpa-price",
+    "talpa-right-of-purchase",
+    "payment-notify",
+    "order-notify",
+    "subscription-notify",
+    "gdpr_v1",
+    "export_pdf",
+    "export-job-download",
+    "graphql-metrics",
+}
+
+PAGE_INFO_FIELDS = "pageInfo { numPages page next prev count }"
+MUTATION_RESPONSE_FIELDS = "{ success }"
+
+ADMIN_OPERATIONS = {
+    "permits": f"""
+        query Permits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {{
+            permits(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{
+                    id
+                    status
+                    customer {{ firstName lastName }}
+                    vehicle {{ registrationNumber }}
+                    parkingZone {{ name }}
+                }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "limitedPermits": f"""
+        query LimitedPermits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {{
+            limitedPermits(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{
+                    id
+                    status
+                    vehicle {{ registrationNumber }}
+                    parkingZone {{ name }}
+                }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "permitDetail": """
+        query PermitDetail($permitId: ID!) {
+            permitDetail(permitId: $permitId) {
+                id
+                status
+                customer { firstName lastName }
+                vehicle { registrationNumber }
+                parkingZone { name }
+                changeLogs {
+                    id
+                    key
+                    createdAt
+                    createdBy
+                    relatedObject { __typename }
+                }
+            }
+        }
+    """,
+    "zones": """
+        query Zones {
+            zones { name label labelSv residentProducts { id unitPrice } }
+        }
+    """,
+    "zoneByLocation": """
+        query ZoneByLocation($location: [Float]!) {
+            zoneByLocation(location: $location) { name label }
+        }
+    """,
+    "customers": f"""
+        query Customers($pageInput: PageInput!, $searchParams: CustomerSearchParamsInput) {{
+            customers(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{ id firstName lastName nationalIdNumber }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "products": f"""
+        query Products($pageInput: PageInput!) {{
+            products(pageInput: $pageInput) {{
+                objects {{ id type unitPrice zone }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "product": """
+        query Product($productId: ID!) {
+            product(productId: $productId) { id type unitPrice zone }
+        }
+    """,
+    "deleteProduct": f"""
+        mutation DeleteProduct($productId: ID!) {{
+            deleteProduct(productId: $productId) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "refunds": f"""
+        query Refunds($pageInput: PageInput!, $searchParams: RefundSearchParamsInput) {{
+            refunds(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{ id name amount status }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "refund": """
+        query Refund($refundId: ID!) {
+            refund(refundId: $refundId) {
+                id
+                name
+                amount
+                refundOrders { id }
+                refundPermits { id }
+            }
+        }
+    """,
+    "updateRefund": f"""
+        mutation UpdateRefund($refundId: ID!, $refund: RefundInput!) {{
+            updateRefund(refundId: $refundId, refund: $refund) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "requestForApproval": """
+        mutation RequestForApproval($ids: [ID]!) {
+            requestForApproval(ids: $ids)
+        }
+    """,
+    "acceptRefunds": """
+        mutation AcceptRefunds($ids: [ID]!) {
+            acceptRefunds(ids: $ids)
+        }
+    """,
+    "orders": f"""
+        query Orders($pageInput: PageInput!, $searchParams: OrderSearchParamsInput) {{
+            orders(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{ id paidTime customer {{ firstName lastName }} }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "financialRollups": """
+        query FinancialRollups($startDate: String!, $endDate: String!) {
+            financialRollups(startDate: $startDate, endDate: $endDate) {
+                revenue { date parkingZoneName orderCount totalPaymentPrice }
+                refunds { date status refundCount totalAmount }
+            }
+        }
+    """,
+    "exportJob": """
+        query ExportJob($jobId: ID!) {
+            exportJob(jobId: $jobId) { id status downloadUrl }
+        }
+    """,
+    "createExportJob": """
+        mutation CreateExportJob($fileFormat: String!, $dataType: String!, $params: JSON) {
+            createExportJob(fileFormat: $fileFormat, dataType: $dataType, params: $params) {
+                id
+                status
+            }
+        }
+    """,
+    "addresses": f"""
+        query Addresses($pageInput: PageInput!, $searchParams: AddressSearchParamsInput) {{
+            addresses(pageInput: $pageInput, searchParams: $searchParams) {{
+                objects {{ id streetName streetNumber postalCode }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "address": """
+        query Address($addressId: ID!) {
+            address(addressId: $addressId) { id streetName zone { name } }
+        }
+    """,
+    "createAddress": f"""
+        mutation CreateAddress($address: AddressInput!) {{
+            createAddress(address: $address) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "updateAddress": f"""
+        mutation UpdateAddress($addressId: ID!, $address: AddressInput!) {{
+            updateAddress(addressId: $addressId, address: $address) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "deleteAddress": f"""
+        mutation DeleteAddress($addressId: ID!) {{
+            deleteAddress(addressId: $addressId) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "lowEmissionCriteria": f"""
+        query LowEmissionCriteria($pageInput: PageInput!) {{
+            lowEmissionCriteria(pageInput: $pageInput) {{
+                objects {{ id nedcMaxEmissionLimit startDate endDate }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "lowEmissionCriterion": """
+        query LowEmissionCriterion($criterionId: ID!) {
+            lowEmissionCriterion(criterionId: $criterionId) { id startDate }
+        }
+    """,
+    "createLowEmissionCriterion": f"""
+        mutation CreateLowEmissionCriterion($criterion: LowEmissionCriterionInput!) {{
+            createLowEmissionCriterion(criterion: $criterion) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "updateLowEmissionCriterion": f"""
+        mutation UpdateLowEmissionCriterion(
+            $criterionId: ID!, $criterion: LowEmissionCriterionInput!
+        ) {{
+            updateLowEmissionCriterion(criterionId: $criterionId, criterion: $criterion)
+                {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "deleteLowEmissionCriterion": f"""
+        mutation DeleteLowEmissionCriterion($criterionId: ID!) {{
+            deleteLowEmissionCriterion(criterionId: $criterionId)
+                {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+    "announcements": f"""
+        query Announcements($pageInput: PageInput!) {{
+            announcements(pageInput: $pageInput) {{
+                objects {{ id subjectEn parkingZones {{ name }} }}
+                {PAGE_INFO_FIELDS}
+            }}
+        }}
+    """,
+    "announcement": """
+        query Announcement($announcementId: ID!) {
+            announcement(announcementId: $announcementId) {
+                id
+                subjectEn
+                parkingZones { name }
+            }
+        }
+    """,
+    "createAnnouncement": f"""
+        mutation CreateAnnouncement($announcement: AnnouncementInput!) {{
+            createAnnouncement(announcement: $announcement) {MUTATION_RESPONSE_FIELDS}
+        }}
+    """,
+}
+
+CUSTOMER_OPERATIONS = {
+    "getPermits": """
+        query GetPermits {
+            getPermits {
+                id
+                status
+                primaryVehicle
+                vehicle { registrationNumber }
+                parkingZone { name }
+                products { unitPrice quantity }
+            }
+        }
+    """,
+    "updateLanguage": """
+        mutation UpdateLanguage($lang: String!) {
+            updateLanguage(lang: $lang) { id language }
+        }
+    """,
+    "deleteParkingPermit": """
+        mutation DeleteParkingPermit($permitId: ID!) {
+            deleteParkingPermit(permitId: $permitId)
+        }
+    """,
+}
+
+
+def get_root_fields(schema):
+    return {
+        name
+        for root_type in (schema.query_type, schema.mutation_type)
+        for name in root_type.fields
+        # the fields of the federation
+        if not name.startswith("_")
+    }
+
+
+class QueryCountTestMixin:
+    def get_authentication_patch(self, user):
+        return patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(user, {}),
+        )
+
+    def run_seeded(self, seed, run, count, max_queries):
+        """Seeds count rows and runs the operation in a transaction that
+        is rolled back, and returns the query budget of the run."""
+        with transaction.atomic():
+            args = seed(count)
+            with query_budget(max_queries) as budget:
+                run(*args)
+            transaction.set_rollback(True)
+        return budget
+
+    def assert_queries_do_not_grow(self, seed, run):
+        """Runs the operation with the arguments returned by seed(count),
+        first to fill the caches of the process and then with SEED_COUNT
+        and twice as many seeded rows, and fails with a report of the
+        queries if the second run executes more queries."""
+        self.run_seeded(seed, run, 1, MAX_OPERATION_QUERIES)
+        budget = self.run_seeded(seed, run, SEED_COUNT, MAX_OPERATION_QUERIES)
+        self.run_seeded(seed, run, 2 * SEED_COUNT, len(budget.queries))
+
+
+class GraphQLQueryCountTestMixin(QueryCountTestMixin):
+    url_name = None
+    operations = None
+
+    def execute(self, operation, variables):
+        with self.get_authentication_patch(self.user):
+            response = self.client.post(
+                reverse(self.url_name),
+                {"query": self.operations[operation], "variables": variables},
+                content_type="application/json",
+            )
+        response_data = json.loads(response.content)
+        self.assertNotIn("errors", response_data)
+        return response_data["data"][operation]
+
+    def assert_operation_queries_do_not_grow(self, operation, seed, check=None):
+        def run(variables):
+            result = self.execute(operation, variables)
+            if check:
+                check(result)
+
+        self.assert_queries_do_not_grow(seed, run)
+
+
+class AdminOperationQueryCountTestCase(GraphQLQueryCountTestMixin, TestCase):
+    url_name = "parking_permits:admin-graphql"
+    operations = ADMIN_OPERATIONS
+    page_input = {"page": 1}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.user.groups.add(GroupFactory(name="super_admin"))
+        cls.customer = CustomerFactory(first_name="John")
+        cls.zone = ParkingZoneFactory()
+        cls.permit = ParkingPermitFactory(customer=cls.customer, parking_zone=cls.zone)
+
+    def seed_permits(self, count):
+        ParkingPermitFactory.create_batch(count, customer=self.customer)
+
+    def test_permits(self):
+        def seed(count):
+            self.seed_permits(count)
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {"q": "John", "status": "ALL"},
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("permits", seed)
+
+    def test_limited_permits(self):
+        def seed(count):
+            self.seed_permits(count)
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {"q": "John", "status": "ALL"},
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("limitedPermits", seed)
+
+    def test_permit_detail(self):
+        def seed(count):
+            for ext_request in ParkingPermitExtensionRequestFactory.create_batch(
+                count, permit=self.permit
+            ):
+                ParkingPermitEvent.objects.create(
+                    parking_permit=self.permit,
+                    message="Permit extension #%(ext_request_id)s created by admin",
+                    context={"ext_request_id": ext_request.pk},
+                    created_by=UserFactory(),
+                    related_object=ext_request,
+                    type=ParkingPermitEvent.EventType.UPDATED,
+                    key=ParkingPermitEvent.EventKey.CREATE_ADMIN_PERMIT_EXTENSION_REQUEST,
+                )
+            return ({"permitId": self.permit.pk},)
+
+        def check(result):
+            self.assertTrue(result["changeLogs"])
+
+        self.assert_operation_queries_do_not_grow("permitDetail", seed, check)
+
+    def test_zones(self):
+        def seed(count):
+            today = tz.localdate()
+            for zone in ParkingZoneFactory.create_batch(count):
+                ProductFactory(
+                    zone=zone,
+                    type=ProductType.RESIDENT,
+                    start_date=today - timedelta(days=30),
+                    end_date=today + timedelta(days=365),
+                )
+            return ({},)
+
+        self.assert_operation_queries_do_not_grow("zones", seed)
+
+    def test_zone_by_location(self):
+        def seed(count):
+            ParkingZoneFactory.create_batch(count)
+            return ({"location": list(self.zone.location.centroid.coords)},)
+
+        self.assert_operation_queries_do_not_grow("zoneByLocation", seed)
+
+    def test_customers(self):
+        def seed(count):
+            CustomerFactory.create_batch(count, first_name="John")
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {"name": "John", "nationalIdNumber": ""},
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("customers", seed)
+
+    def test_products(self):
+        def seed(count):
+            ProductFactory.create_batch(count)
+            return ({"pageInput": self.page_input},)
+
+        self.assert_operation_queries_do_not_grow("products", seed)
+
+    def test_product(self):
+        def seed(count):
+            products = ProductFactory.create_batch(count)
+            return ({"productId": products[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("product", seed)
+
+    def test_delete_product(self):
+        def seed(count):
+            products = ProductFactory.create_batch(count)
+            return ({"productId": products[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("deleteProduct", seed)
+
+    def seed_refunds(self, count, status=RefundStatus.OPEN):
+        refunds = RefundFactory.create_batch(count, name="John Doe", status=status)
+        for refund in refunds:
+            refund.orders.add(OrderFactory(customer=CustomerFactory()))
+        return refunds
+
+    def test_refunds(self):
+        def seed(count):
+            self.seed_refunds(count)
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {
+                        "q": "John",
+                        "startDate": "",
+                        "endDate": "",
+                        "status": "ALL",
+                        "paymentTypes": "",
+                    },
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("refunds", seed)
+
+    def test_refund(self):
+        def seed(count):
+            refund = self.seed_refunds(1)[0]
+            for __ in range(count):
+                order = OrderFactory(customer=self.customer)
+                refund.orders.add(order)
+                refund.permits.add(ParkingPermitFactory(customer=self.customer))
+            return ({"refundId": refund.pk},)
+
+        self.assert_operation_queries_do_not_grow("refund", seed)
+
+    def test_update_refund(self):
+        def seed(count):
+            refunds = self.seed_refunds(count)
+            return (
+                {
+                    "refundId": refunds[0].pk,
+                    "refund": {"name": "John Doe", "iban": "FI5399965432932146"},
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("updateRefund", seed)
+
+    def test_request_for_approval(self):
+        def seed(count):
+            refunds = self.seed_refunds(count)
+            return ({"ids": [refund.pk for refund in refunds]},)
+
+        self.assert_operation_queries_do_not_grow("requestForApproval", seed)
+
+    def test_accept_refunds(self):
+        def seed(count):
+            refunds = self.seed_refunds(count, status=RefundStatus.REQUEST_FOR_APPROVAL)
+            return ({"ids": [refund.pk for refund in refunds]},)
+
+        self.assert_operation_queries_do_not_grow("acceptRefunds", seed)
+
+    def test_orders(self):
+        def seed(count):
+            for __ in range(count):
+                order = OrderFactory(
+                    customer=CustomerFactory(first_name="John"),
+                    status=OrderStatus.CONFIRMED,
+                )
+                order.permits.add(ParkingPermitFactory(customer=order.customer))
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {
+                        "q": "John",
+                        "startDate": "",
+                        "endDate": "",
+                        "contractTypes": "",
+                        "paymentTypes": "",
+                        "priceDiscounts": "",
+                        "parkingZone": "",
+                    },
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("orders", seed)
+
+    def test_financial_rollups(self):
+        def seed(count):
+            now = tz.now()
+            start_date = date(2024, 1, 1)
+            for day in range(count):
+                DailyRevenueRollup.objects.create(
+                    date=start_date + timedelta(days=day),
+                    parking_zone_name=self.zone.name,
+                    product_type=ProductType.RESIDENT,
+                    vat="0.2550",
+                    order_count=1,
+                    item_count=1,
+                    total_payment_price="30.00",
+                    refreshed_at=now,
+                )
+                DailyRefundRollup.objects.create(
+                    date=start_date + timedelta(days=day),
+                    status=RefundStatus.OPEN,
+                    vat="0.2550",
+                    refund_count=1,
+                    total_amount="30.00",
+                    refreshed_at=now,
+                )
+            return ({"startDate": "2024-01-01", "endDate": "2024-12-31"},)
+
+        def check(result):
+            self.assertTrue(result["revenue"])
+            self.assertTrue(result["refunds"])
+
+        self.assert_operation_queries_do_not_grow("financialRollups", seed, check)
+
+    def export_job_variables(self, search):
+        return {
+            "fileFormat": "csv",
+            "dataType": "permits",
+            "params": {"q": search, "status": "ALL"},
+        }
+
+    def test_export_job(self):
+        def seed(count):
+            for i in range(count):
+                job = self.execute(
+                    "createExportJob", self.export_job_variables(f"John {i}")
+                )
+            return ({"jobId": job["id"]},)
+
+        self.assert_operation_queries_do_not_grow("exportJob", seed)
+
+    def test_create_export_job(self):
+        def seed(count):
+            self.seed_permits(count)
+            return (self.export_job_variables("John"),)
+
+        self.assert_operation_queries_do_not_grow("createExportJob", seed)
+
+    def test_addresses(self):
+        def seed(count):
+            AddressFactory.create_batch(count, street_name="Mannerheimintie")
+            return (
+                {
+                    "pageInput": self.page_input,
+                    "searchParams": {
+                        "streetName": "Mannerheimintie",
+                        "streetNumber": "",
+                        "postalCode": "",
+                        "parkingZone": "",
+                    },
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("addresses", seed)
+
+    def test_address(self):
+        def seed(count):
+            addresses = AddressFactory.create_batch(count)
+            return ({"addressId": addresses[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("address", seed)
+
+    def get_address_input(self, street_number):
+        location = self.zone.location.centroid
+        return {
+            "streetName": "Testikatu",
+            "streetNameSv": "Testgatan",
+            "streetNumber": str(street_number),
+            "postalCode": "00100",
+            "city": "Helsinki",
+            "citySv": "Helsingfors",
+            "location": [location.x, location.y],
+        }
+
+    def test_create_address(self):
+        def seed(count):
+            AddressFactory.create_batch(count)
+            return ({"address": self.get_address_input(count)},)
+
+        self.assert_operation_queries_do_not_grow("createAddress", seed)
+
+    def test_update_address(self):
+        def seed(count):
+            addresses = AddressFactory.create_batch(count)
+            return (
+                {
+                    "addressId": addresses[0].pk,
+                    "address": self.get_address_input(count),
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("updateAddress", seed)
+
+    def test_delete_address(self):
+        def seed(count):
+            addresses = AddressFactory.create_batch(count)
+            return ({"addressId": addresses[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("deleteAddress", seed)
+
+    def test_low_emission_criteria(self):
+        def seed(count):
+            LowEmissionCriteriaFactory.create_batch(count)
+            return ({"pageInput": self.page_input},)
+
+        self.assert_operation_queries_do_not_grow("lowEmissionCriteria", seed)
+
+    def test_low_emission_criterion(self):
+        def seed(count):
+            criteria = LowEmissionCriteriaFactory.create_batch(count)
+            return ({"criterionId": criteria[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("lowEmissionCriterion", seed)
+
+    def get_criterion_input(self):
+        return {
+            "nedcMaxEmissionLimit": 37,
+            "wltpMaxEmissionLimit": 50,
+            "euroMinClassLimit": 6,
+            "startDate": "2030-01-01",
+            "endDate": "2030-12-31",
+        }
+
+    def test_create_low_emission_criterion(self):
+        def seed(count):
+            LowEmissionCriteriaFactory.create_batch(count)
+            return ({"criterion": self.get_criterion_input()},)
+
+        self.assert_operation_queries_do_not_grow("createLowEmissionCriterion", seed)
+
+    def test_update_low_emission_criterion(self):
+        def seed(count):
+            criteria = LowEmissionCriteriaFactory.create_batch(count)
+            return (
+                {
+                    "criterionId": criteria[0].pk,
+                    "criterion": self.get_criterion_input(),
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("updateLowEmissionCriterion", seed)
+
+    def test_delete_low_emission_criterion(self):
+        def seed(count):
+            criteria = LowEmissionCriteriaFactory.create_batch(count)
+            return ({"criterionId": criteria[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("deleteLowEmissionCriterion", seed)
+
+    def seed_announcements(self, count):
+        zones = ParkingZoneFactory.create_batch(count)
+        announcements = AnnouncementFactory.create_batch(count, created_by=self.user)
+        for announcement in announcements:
+            announcement._parking_zones.set(zones)
+        return announcements
+
+    def test_announcements(self):
+        def seed(count):
+            self.seed_announcements(count)
+            return ({"pageInput": self.page_input},)
+
+        self.assert_operation_queries_do_not_grow("announcements", seed)
+
+    def test_announcement(self):
+        def seed(count):
+            announcements = self.seed_announcements(count)
+            return ({"announcementId": announcements[0].pk},)
+
+        self.assert_operation_queries_do_not_grow("announcement", seed)
+
+    def test_create_announcement(self):
+        def seed(count):
+            zones = ParkingZoneFactory.create_batch(count)
+            language_fields = {
+                f"{field}{language}": f"{field} {language}"
+                for field in ("subject", "content")
+                for language in ("Fi", "Sv", "En")
+            }
+            return (
+                {
+                    "announcement": {
+                        **language_fields,
+                        "parkingZones": [zone.name for zone in zones],
+                    }
+                },
+            )
+
+        self.assert_operation_queries_do_not_grow("createAnnouncement", seed)
+
+
+class CustomerOperationQueryCountTestCase(GraphQLQueryCountTestMixin, TestCase):
+    url_name = "parking_permits:graphql"
+    operations = CUSTOMER_OPERATIONS
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = CustomerFactory()
+        cls.user = cls.customer.user
+        today = tz.localdate()
+        cls.zone = ParkingZoneFactory()
+        ProductFactory(
+            zone=cls.zone,
+            type=ProductType.RESIDENT,
+            start_date=today - timedelta(days=30),
+            end_date=today + timedelta(days=365),
+        )
+        # a customer has at most a primary and a secondary permit
+        for primary_vehicle in (True, False):
+            ParkingPermitFactory(
+                customer=cls.customer,
+                status=ParkingPermitStatus.VALID,
+                contract_type=ContractType.OPEN_ENDED,
+                primary_vehicle=primary_vehicle,
+                parking_zone=cls.zone,
+                address=cls.customer.primary_address,
+            )
+
+    def seed_other_permits(self, count):
+        ParkingPermitFactory.create_batch(
+            count, status=ParkingPermitStatus.VALID, parking_zone=self.zone
+        )
+
+    def test_get_permits(self):
+        def seed(count):
+            self.seed_other_permits(count)
+            return ({},)
+
+        def check(result):
+            self.assertEqual(len(result), 2)
+
+        self.assert_operation_queries_do_not_grow("getPermits", seed, check)
+
+    def test_update_language(self):
+        def seed(count):
+            self.seed_other_permits(count)
+            return ({"lang": "sv"},)
+
+        self.assert_operation_queries_do_not_grow("updateLanguage", seed)
+
+    def test_delete_parking_permit(self):
+        def seed(count):
+            self.seed_other_permits(count)
+            permit = ParkingPermitFactory(
+                customer=self.customer,
+                status=ParkingPermitStatus.DRAFT,
+                primary_vehicle=False,
+                parking_zone=self.zone,
+            )
+            return ({"permitId": permit.pk},)
+
+        self.assert_operation_queries_do_not_grow("deleteParkingPermit", seed)
+
+
+class ViewQueryCountTestCase(QueryCountTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.user.groups.add(GroupFactory(name="super_admin"))
+        cls.api_key = APIKey.objects.create_key(name="reporting")[1]
+
+    def get(self, url, data=None, **kwargs):
+        with self.get_authentication_patch(self.user):
+            response = self.client.get(url, data, **kwargs)
+            self.assertEqual(response.status_code, 200)
+            if response.streaming:
+                # the rows of a streaming response are fetched as it is read
+                b"".join(response.streaming_content)
+        return response
+
+    def test_product_list(self):
+        def seed(count):
+            ProductFactory.create_batch(count)
+            return (reverse("parking_permits:product-list"),)
+
+        self.assert_queries_do_not_grow(seed, self.get)
+
+    def test_product_details(self):
+        def seed(count):
+            products = ProductFactory.create_batch(count)
+            return (reverse("parking_permits:product-details", args=[products[0].pk]),)
+
+        self.assert_queries_do_not_grow(seed, self.get)
+
+    def test_permit_count_snapshot_list(self):
+        def seed(count):
+            for day in range(count):
+                PermitCountSnapshot.objects.create(
+                    permit_count=day,
+                    date=date(2024, 1, 1) + timedelta(days=day),
+                    parking_zone_name="A",
+                    parking_zone_description="Kallio",
+                    parking_zone_description_sv="Berghäll",
+                    low_emission=False,
+                    primary_vehicle=True,
+                    contract_type=ContractType.OPEN_ENDED,
+                )
+            return (reverse("parking_permits:permit-count-snapshot-list"),)
+
+        def run(url):
+            self.get(url, headers={"Authorization": f"Api-Key {self.api_key}"})
+
+        self.assert_queries_do_not_grow(seed, run)
+
+    def test_csv_export(self):
+        customer = CustomerFactory(first_name="John")
+        seeds = {
+            "permits": lambda count: ParkingPermitFactory.create_batch(
+                count, customer=customer
+            ),
+            "orders": lambda count: [
+                OrderFactory(customer=customer).permits.add(
+                    ParkingPermitFactory(customer=customer)
+                )
+                for __ in range(count)
+            ],
+            "refunds": lambda count: RefundFactory.create_batch(count, name="John"),
+            "products": lambda count: ProductFactory.create_batch(count),
+        }
+        for data_type, seed_rows in seeds.items():
+            with self.subTest(data_type=data_type):
+
+                def seed(count, data_type=data_type, seed_rows=seed_rows):
+                    seed_rows(count)
+                    return (
+                        reverse("parking_permits:export", args=[data_type]),
+                        {"q": "John", "status": "ALL"},
+                    )
+
+                self.assert_queries_do_not_grow(seed, self.get)
+
+
+class OperationCoverageTestCase(SimpleTestCase):
+    def assert_operations_are_measured(self, schema, operations, unmeasured, test_case):
+        self.assertEqual(get_root_fields(schema), operations.keys() | unmeasured.keys())
+        self.assertFalse(operations.keys() & unmeasured.keys())
+        for operation in operations:
+            self.assertTrue(
+                hasattr(test_case, f"test_{convert_camel_case_to_snake(operation)}"),
+                f"{operation} has no query count test",
+            )
+
+    def test_admin_operations_are_measured(self):
+        self.assert_operations_are_measured(
+            get_admin_schema(),
+            ADMIN_OPERATIONS,
+            UNMEASURED_ADMIN_OPERATIONS,
+            AdminOperationQueryCountTestCase,
+        )
+
+    def test_customer_operations_are_measured(self):
+        self.assert_operations_are_measured(
+            get_schema(),
+            CUSTOMER_OPERATIONS,
+            UNMEASURED_CUSTOMER_OPERATIONS,
+            CustomerOperationQueryCountTestCase,
+        )
+
+    def test_views_are_measured(self):
+        from parking_permits.urls import urlpatterns
+
+        measured_views = {
+            "product-list",
+            "product-details",
+            "permit-count-snapshot-list",
+            "export",
+        }
+        view_names = {pattern.name for pattern in urlpatterns} - {
+            "graphql",
+            "admin-graphql",
+        }
+        self.assertEqual(view_names, measured_views | UNMEASURED_VIEWS)
+        for name in measured_views - {"export"}:
+            test_name = f"test_{name.replace('-', '_')}"
+            self.assertTrue(hasattr(ViewQueryCountTestCase, test_name), name)
+
+
+class QueryBudgetTestCase(TestCase):
+    def test_report_groups_repeated_queries(self):
+        budget = query_budget(1)
+        with self.assertRaises(AssertionError) as cm:
+            with budget:
+                for _i in range(3):
+                    list(ParkingZone.objects.filter(pk=1))
+
+        report = str(cm.exception)
+        self.assertIn("3 queries executed, the budget is 1 (1 distinct)", report)
+        self.assertIn("3x SELECT", report)
+        self.assertIn("test_query_budgets.py", report)
+
+    def test_within_budget(self):
+        with query_budget(1) as budget:
+            list(ParkingZone.objects.all())
+        self.assertEqual(len(budget.queries), 1)
@@ -0,0 +1,163 @@
+import json
+from unittest.mock import patch
+
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+from graphql import parse, validate
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits.graphql import get_admin_schema
+from parking_permits.paginator import QuerySetPaginator
+from parking_permits.query_cost import (
+    ADMIN_QUERY_LIMITS,
+    QueryLimits,
+    get_validation_rules,
+)
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from users.tests.factories.user import GroupFactory, UserFactory
+
+
+def analyze(query, limits, variables=None):
+    document = parse(query)
+    context = {}
+    errors = validate(
+        get_admin_schema(),
+        document,
+        get_validation_rules(limits)(context, document, {"variables": variables}),
+    )
+    return [error.message for error in errors], context.get("query_cost")
+
+
+class QueryCostAnalysisTestCase(SimpleTestCase):
+    limits = QueryLimits(
+        max_depth=4,
+        max_cost=100,
+        field_weights={"Query.customer": 10},
+        list_sizes={"Query.zones": 5},
+    )
+
+    def test_list_fields_are_scaled_by_the_page_size(self):
+        query = """
+            query Permits($pageInput: PageInput!) {
+                permits(pageInput: $pageInput) {
+                    objects { id customer { firstName } }
+                    pageInfo { page }
+                }
+            }
+        """
+        _errors, query_cost = analyze(query, self.limits, {"pageInput": {"page": 1}})
+        # permits + pageInfo + 10 * (objects + customer)
+        self.assertEqual(query_cost["cost"], 22)
+        self.assertEqual(query_cost["depth"], 4)
+
+        _errors, query_cost = analyze(
+            query, self.limits, {"pageInput": {"page": 1, "pageSize": 3}}
+        )
+        self.assertEqual(query_cost["cost"], 8)
+
+    def test_page_size_literal(self):
+        _errors, query_cost = analyze(
+            "{ permits(pageInput: {page: 1, pageSize: 2}) { objects { id } } }",
+            self.limits,
+        )
+        self.assertEqual(query_cost["cost"], 3)
+
+    def test_field_weights_and_list_sizes(self):
+        _errors, query_cost = analyze(
+            """
+            {
+                zones { name residentProducts { id } }
+                customer(query: {nationalIdNumber: "x"}) { firstName }
+            }
+            """,
+            self.limits,
+        )
+        # 5 * (zones + 10 * residentProducts) + customer
+        self.assertEqual(query_cost["cost"], 5 * (1 + 10) + 10)
+
+    def test_fragments_are_expanded(self):
+        _errors, query_cost = analyze(
+            """
+            query { zones { ...Zone } }
+            fragment Zone on ZoneNode { name residentProducts { id } }
+            """,
+            self.limits,
+        )
+        self.assertEqual(query_cost["cost"], 5 * (1 + 10))
+
+    def test_rejects_too_deep_and_too_costly_queries(self):
+        errors, _query_cost = analyze(
+            """
+            {
+                permits(pageInput: {page: 1}) {
+                    objects { customer { primaryAddress { zone { name } } } }
+                }
+            }
+            """,
+            self.limits,
+        )
+        self.assertEqual(errors, ["The query depth 6 exceeds the maximum depth 4."])
+
+        errors, _query_cost = analyze(
+            "{ permits(pageInput: {page: 1, pageSize: 100}) { objects { id } } }",
+            self.limits,
+        )
+        self.assertEqual(errors, ["The query cost 101 exceeds the maximum cost 100."])
+
+    def test_page_size_is_capped_like_in_the_paginator(self):
+        _errors, query_cost = analyze(
+            "{ permits(pageInput: {page: 1, pageSize: 100000}) { objects { id } } }",
+            self.limits,
+        )
+        self.assertEqual(query_cost["cost"], QuerySetPaginator.max_page_size + 1)
+
+    def test_introspection_is_not_counted(self):
+        errors, query_cost = analyze(
+            "{ __schema { types { fields { type { ofType { ofType { name } } } } } } }",
+            self.limits,
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(query_cost["cost"], 0)
+
+
+class QueryCostViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = Client()
+        cls.admin = UserFactory()
+        cls.admin.groups.add(GroupFactory(name="super_admin"))
+        ParkingPermitFactory()
+
+    def execute(self, query):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(self.admin, {}),
+        ):
+            response = self.client.post(
+                reverse("parking_permits:admin-graphql"),
+                {"query": query},
+                content_type="application/json",
+            )
+        return json.loads(response.content)
+
+    def test_cost_is_returned_in_the_extensions(self):
+        response_data = self.execute(
+            "{ permits(pageInput: {page: 1}) { objects { id } } }"
+        )
+        self.assertNotIn("errors", response_data)
+        self.assertEqual(response_data["extensions"]["queryCost"]["cost"], 11)
+
+    def test_over_budget_query_is_not_executed(self):
+        with (
+            patch.object(ADMIN_QUERY_LIMITS, "max_cost", 100),
+            patch("parking_permits.admin_resolvers.get_permits") as get_permits_mock,
+        ):
+            response_data = self.execute(
+                "{ permits(pageInput: {page: 1, pageSize: 100}) { objects { id } } }"
+            )
+        get_permits_mock.assert_not_called()
+        self.assertNotIn("data", response_data)
+        self.assertIn("exceeds the maximum cost", response_data["errors"][0]["message"])
+        self.assertEqual(response_data["extensions"]["queryCost"]["cost"], 101)
@@ -0,0 +1,160 @@
+import io
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from parking_permits.cron import (
+    get_ending_permits,
+    get_expiring_permits,
+    get_permits_to_sync,
+)
+from parking_permits.forms import (
+    CustomerSearchForm,
+    OrderSearchForm,
+    PermitSearchForm,
+    RefundSearchForm,
+)
+from parking_permits.models import Customer, Order, ParkingPermit, Refund
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.zone import ParkingZoneFactory
+from parking_permits.tests.query_plans import (
+    QueryPlanAssertionsMixin,
+    get_full_scan_cost,
+)
+from users.models import ParkingPermitGroups
+
+# enough customers, with about 1.15 permits each, that the planner picks the
+# same paths as for the production tables without any planner settings
+SEED_CUSTOMERS = 10000
+# the share of the cost of reading the queried table in full that a query
+# may cost: a query served from an index reads a small part of the table
+MAX_FULL_SCAN_COST_SHARE = 0.1
+
+
+def get_form_queryset(form_class, data):
+    form = form_class(data)
+    assert form.is_valid(), form.errors
+    return form.get_queryset()
+
+
+@pytest.mark.query_plans
+class QueryPlanBaselineTestCase(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        zone = ParkingZoneFactory()
+        ProductFactory(
+            zone=zone,
+            start_date=date.today() - timedelta(days=5 * 365),
+            end_date=date.today() + timedelta(days=365),
+        )
+        # the command analyzes the tables after loading the data
+        call_command(
+            "generate_synthetic_data",
+            customers=SEED_CUSTOMERS,
+            seed=1,
+            stdout=io.StringIO(),
+        )
+        cls.permit = (
+            ParkingPermit.objects.filter(vehicle__isnull=False)
+            .select_related("customer", "vehicle")
+            .order_by("pk")
+            .first()
+        )
+        cls.max_costs = {
+            model: get_full_scan_cost(model) * MAX_FULL_SCAN_COST_SHARE
+            for model in (Customer, Order, ParkingPermit, Refund)
+        }
+
+    def test_permit_text_search(self):
+        q = f"{self.permit.customer.last_name} {self.permit.vehicle.registration_number}"
+        qs = get_form_queryset(PermitSearchForm, {"q": q})
+        self.assert_query_plan(
+            qs.order_by(),
+            no_full_scan=[
+                "parking_permits_parkingpermit",
+                "parking_permits_parkingpermitsearchdocument",
+            ],
+            indexes=["permit_search_customer_trgm"],
+            max_cost=self.max_costs[ParkingPermit],
+        )
+
+    def test_permit_text_search_with_inspector_role(self):
+        qs = get_form_queryset(
+            PermitSearchForm,
+            {
+                "q": self.permit.vehicle.registration_number,
+                "user_role": ParkingPermitGroups.INSPECTORS,
+            },
+        )
+        self.assert_query_plan(
+            qs.order_by(),
+            no_full_scan=[
+                "parking_permits_parkingpermit",
+                "parking_permits_parkingpermitsearchdocument",
+            ],
+            indexes=["permit_search_vehicle_trgm"],
+            max_cost=self.max_costs[ParkingPermit],
+        )
+
+    def test_order_search_by_date(self):
+        today = timezone.localdate()
+        qs = get_form_queryset(
+            OrderSearchForm, {"start_date": today, "end_date": today}
+        )
+        self.assert_query_plan(
+            qs,
+            no_full_scan=["parking_permits_order"],
+            indexes=["order_created_at_idx"],
+            max_cost=self.max_costs[Order],
+        )
+
+    def test_refund_search_by_date(self):
+        today = timezone.localdate()
+        qs = get_form_queryset(
+            RefundSearchForm, {"start_date": today, "end_date": today}
+        )
+        self.assert_query_plan(
+            qs.order_by(),
+            no_full_scan=["parking_permits_refund"],
+            indexes=["refund_created_at_idx"],
+            max_cost=self.max_costs[Refund],
+        )
+
+    def test_customer_search_by_national_id_number(self):
+        qs = get_form_queryset(
+            CustomerSearchForm,
+            {"national_id_number": self.permit.customer.national_id_number},
+        )
+        self.assert_query_plan(
+            qs.order_by(),
+            no_full_scan=["parking_permits_customer"],
+            indexes=["parking_permits_customer_national_id_number"],
+            max_cost=self.max_costs[Customer],
+        )
+
+    def test_cron_ending_permits(self):
+        self.assert_query_plan(
+            get_ending_permits(timezone.localtime()),
+            no_full_scan=["parking_permits_parkingpermit"],
+            indexes=["permit_status_end_time_idx"],
+            max_cost=self.max_costs[ParkingPermit],
+        )
+
+    def test_cron_expiring_permits(self):
+        self.assert_query_plan(
+            get_expiring_permits(date.today() + timedelta(days=1)),
+            no_full_scan=["parking_permits_parkingpermit"],
+            indexes=["permit_status_end_time_idx"],
+            max_cost=self.max_costs[ParkingPermit],
+        )
+
+    def test_cron_permits_to_sync(self):
+        self.assert_query_plan(
+            get_permits_to_sync(),
+            no_full_scan=["parking_permits_parkingpermit"],
+            indexes=["permit_unsynced_status_idx"],
+            max_cost=self.max_costs[ParkingPermit],
+        )
@@ -1,6 +1,7 @@
 import itertools
 import math
 from datetime import date, datetime, time
+from decimal import Decimal
 
 from dateutil.relativedelta import relativedelta
 from django.core.management import call_command
@@ -12,11 +13,23 @@ from freezegun import freeze_time
 from rest_framework.test import APITestCase
 from rest_framework_api_key.models import APIKey
 
+from parking_permits.models.order import OrderStatus
 from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
-from parking_permits.models.reporting import PermitCountSnapshot
+from parking_permits.models.product import ProductType
+from parking_permits.models.refund import RefundStatus
+from parking_permits.models.reporting import (
+    DailyRefundRollup,
+    DailyRevenueRollup,
+    FinancialRollupRefresh,
+    PermitCountSnapshot,
+    refresh_financial_rollups,
+)
 from parking_permits.tests.factories.address import AddressFactory
 from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.order import OrderFactory, OrderItemFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.refund import RefundFactory
 from parking_permits.tests.factories.vehicle import (
     VehicleFactory,
     VehiclePowerTypeFactory,
@@ -235,6 +248,118 @@ class PermitCountSnapshotTestCase(TestCase):
             self.assertTrue(exists)
 
 
+class FinancialRollupTestCase(TestCase):
+    def setUp(self):
+        self.zone = ParkingZoneFactory(name="A")
+        self.product = ProductFactory(zone=self.zone, type=ProductType.RESIDENT)
+
+    def create_paid_order_item(self, paid_time, **kwargs):
+        order = OrderFactory(status=OrderStatus.CONFIRMED, paid_time=paid_time)
+        return OrderItemFactory(order=order, product=self.product, **kwargs)
+
+    def test_revenue_is_rolled_up_by_day_zone_product_type_and_vat(self):
+        paid_time = timezone.make_aware(datetime(2025, 3, 10, 12))
+        self.create_paid_order_item(
+            paid_time, payment_unit_price=Decimal(30), quantity=2
+        )
+        self.create_paid_order_item(
+            paid_time, payment_unit_price=Decimal(45), quantity=1
+        )
+        self.create_paid_order_item(
+            paid_time,
+            payment_unit_price=Decimal(20),
+            quantity=1,
+            vat=Decimal("0.24"),
+        )
+        OrderItemFactory(
+            order=OrderFactory(status=OrderStatus.DRAFT),
+            product=self.product,
+        )
+
+        refresh_financial_rollups()
+
+        self.assertEqual(DailyRevenueRollup.objects.count(), 2)
+        rollup = DailyRevenueRollup.objects.get(vat=Decimal("0.255"))
+        self.assertEqual(rollup.date, date(2025, 3, 10))
+        self.assertEqual(rollup.parking_zone_name, "A")
+        self.assertEqual(rollup.product_type, ProductType.RESIDENT)
+        self.assertEqual(rollup.order_count, 2)
+        self.assertEqual(rollup.item_count, 2)
+        self.assertEqual(rollup.total_payment_price, Decimal(105))
+
+    def test_refunds_are_rolled_up_by_day_status_and_vat(self):
+        with freeze_time(timezone.make_aware(datetime(2025, 3, 10, 12))):
+            RefundFactory(amount=Decimal(50), status=RefundStatus.OPEN)
+            RefundFactory(amount=Decimal(25), status=RefundStatus.OPEN)
+            RefundFactory(amount=Decimal(10), status=RefundStatus.ACCEPTED)
+
+        refresh_financial_rollups()
+
+        self.assertEqual(DailyRefundRollup.objects.count(), 2)
+        rollup = DailyRefundRollup.objects.get(status=RefundStatus.OPEN)
+        self.assertEqual(rollup.date, date(2025, 3, 10))
+        self.assertEqual(rollup.refund_count, 2)
+        self.assertEqual(rollup.total_amount, Decimal(75))
+
+    def test_refresh_only_rebuilds_changed_dates(self):
+        first_paid_time = timezone.make_aware(datetime(2025, 3, 10, 12))
+        second_paid_time = timezone.make_aware(datetime(2025, 3, 11, 12))
+        self.create_paid_order_item(first_paid_time)
+        with freeze_time(first_paid_time + relativedelta(hours=1)):
+            refresh_financial_rollups()
+
+        with freeze_time(second_paid_time):
+            self.create_paid_order_item(second_paid_time)
+            refreshed_dates = refresh_financial_rollups()
+
+        self.assertEqual(refreshed_dates, [date(2025, 3, 11)])
+        self.assertEqual(DailyRevenueRollup.objects.count(), 2)
+
+    def test_refresh_picks_up_changes_committed_after_the_previous_refresh(self):
+        refresh_time = timezone.make_aware(datetime(2025, 3, 10, 12))
+        with freeze_time(refresh_time):
+            refresh_financial_rollups()
+        self.assertEqual(FinancialRollupRefresh.objects.get().started_at, refresh_time)
+
+        # an order saved just before the refresh started, in a transaction
+        # that committed after the refresh had read the changes
+        with freeze_time(refresh_time - relativedelta(minutes=1)):
+            self.create_paid_order_item(refresh_time)
+
+        with freeze_time(refresh_time + relativedelta(days=1)):
+            refreshed_dates = refresh_financial_rollups()
+
+        self.assertEqual(refreshed_dates, [date(2025, 3, 10)])
+        self.assertEqual(
+            FinancialRollupRefresh.objects.get().started_at,
+            refresh_time + relativedelta(days=1),
+        )
+
+    def test_refresh_picks_up_cancelled_orders(self):
+        paid_time = timezone.make_aware(datetime(2025, 3, 10, 12))
+        with freeze_time(paid_time):
+            order_item = self.create_paid_order_item(paid_time)
+            refresh_financial_rollups()
+        self.assertEqual(DailyRevenueRollup.objects.count(), 1)
+
+        with freeze_time(paid_time + relativedelta(days=1)):
+            order_item.order.status = OrderStatus.CANCELLED
+            order_item.order.save()
+            refresh_financial_rollups()
+
+        self.assertEqual(DailyRevenueRollup.objects.count(), 0)
+
+    def test_refresh_financial_rollups_command_full_rebuild(self):
+        paid_time = timezone.make_aware(datetime(2025, 3, 10, 12))
+        self.create_paid_order_item(paid_time)
+        refresh_financial_rollups()
+        DailyRevenueRollup.objects.update(order_count=100)
+
+        call_command("refresh_financial_rollups", full=True)
+
+        self.assertEqual(DailyRevenueRollup.objects.get().order_count, 1)
+
+
 class PermitCountSnapshotViewTestCase(APITestCase):
     url = reverse("parking_permits:permit-count-snapshot-list")
 
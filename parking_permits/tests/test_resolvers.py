@@ -46,7 +46,7 @@ def _mock_talpa():
 
 def _mock_jwt(user):
     return mock.patch(
-        "helusers.oidc.RequestJWTAuthentication.authenticate",
+        "parking_permits.decorators.RequestJWTAuthentication.authenticate",
         return_value=Auth(user=user),
     )
 
@@ -0,0 +1,155 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.db import connections
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from helusers.authz import UserAuthorization
+from resilient_logger.models import ResilientLogEntry
+
+import parking_permits.decorators
+from audit_logger.utils import generate_model_id_string_from_instance
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.models.product import ProductType
+from parking_permits.services.http import get_session
+from parking_permits.tests.factories import ParkingZoneFactory
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.vehicle import LowEmissionCriteriaFactory
+from users.models import User
+
+GET_PERMITS_QUERY = """
+    query GetPermits {
+        getPermits { id }
+    }
+"""
+
+
+def authenticate(request):
+    user = User.objects.get(uuid=request.headers["Authorization"])
+    return UserAuthorization(user, {})
+
+
+class ThreadedRequestsTestCase(TransactionTestCase):
+    """Serves concurrent requests of different customers in threads, as the
+    gthread workers do, and checks that nothing leaks between them."""
+
+    threads = 8
+    requests_per_customer = 5
+
+    def setUp(self):
+        today = timezone.localdate()
+        zone = ParkingZoneFactory()
+        ProductFactory(
+            zone=zone,
+            type=ProductType.RESIDENT,
+            start_date=today - timedelta(days=360),
+            end_date=today + timedelta(days=360),
+        )
+        LowEmissionCriteriaFactory()
+        self.permit_ids = {}
+        for _i in range(self.threads):
+            customer = CustomerFactory()
+            permits = ParkingPermitFactory.create_batch(
+                2,
+                customer=customer,
+                parking_zone=zone,
+                status=ParkingPermitStatus.VALID,
+            )
+            self.permit_ids[customer.user] = {str(permit.pk) for permit in permits}
+
+    def get_permits(self, user, request_id):
+        try:
+            response = Client().post(
+                reverse("parking_permits:graphql"),
+                {"query": GET_PERMITS_QUERY},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=str(user.uuid),
+                HTTP_X_REQUEST_ID=request_id,
+            )
+            return json.loads(response.content)
+        finally:
+            connections.close_all()
+
+    def test_concurrent_requests_are_isolated(self):
+        requests = [
+            (user, f"{user.pk}-{i}")
+            for i in range(self.requests_per_customer)
+            for user in self.permit_ids
+        ]
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            side_effect=authenticate,
+        ):
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                responses = list(
+                    executor.map(lambda args: self.get_permits(*args), requests)
+                )
+
+        for (user, _request_id), response in zip(requests, responses, strict=True):
+            self.assertNotIn("errors", response)
+            self.assertEqual(
+                {permit["id"] for permit in response["data"]["getPermits"]},
+                self.permit_ids[user],
+            )
+
+        actors = {
+            request_id: generate_model_id_string_from_instance(user)
+            for user, request_id in requests
+        }
+        entries = ResilientLogEntry.objects.filter(
+            message="User retrieved parking permits."
+        )
+        self.assertEqual(entries.count(), len(requests))
+        for entry in entries:
+            self.assertEqual(
+                entry.context["actor"]["value"], actors[entry.context["request_id"]]
+            )
+
+
+class SessionTestCase(SimpleTestCase):
+    def test_sessions_are_not_shared_between_threads(self):
+        self.assertIs(get_session(), get_session())
+        self.assertIsNot(get_session(), get_session("traficom"))
+
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(get_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], get_session())
+
+    def test_sessions_do_not_keep_cookies(self):
+        received_cookies = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                received_cookies.append(self.headers.get("Cookie"))
+                self.send_response(200)
+                self.send_header("Set-Cookie", "sessionid=1; Path=/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/"
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(
+                    executor.map(lambda _i: get_session("cookies").get(url), range(20))
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(received_cookies, [None] * 20)
+        self.assertEqual(len(get_session("cookies").cookies), 0)
@@ -0,0 +1,161 @@
+import json
+from unittest.mock import Mock, patch
+
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from helusers.authz import UserAuthorization
+
+import parking_permits.decorators
+from parking_permits import tracing
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from users.tests.factories.user import GroupFactory, UserFactory
+
+permits_query = """
+    query Permits($pageInput: PageInput!, $searchParams: PermitSearchParamsInput) {
+        permits(pageInput: $pageInput, searchParams: $searchParams) {
+            objects { id customer { firstName } }
+        }
+    }
+"""
+
+
+class GraphQLTracingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = Client()
+        cls.admin = UserFactory()
+        cls.admin.groups.add(GroupFactory(name="super_admin"))
+        for _i in range(3):
+            ParkingPermitFactory(
+                customer=CustomerFactory(first_name="John"),
+                status=ParkingPermitStatus.VALID,
+            )
+
+    def setUp(self):
+        tracing.metrics.clear()
+
+    def execute_permits_query(self):
+        with patch.object(
+            parking_permits.decorators.RequestJWTAuthentication,
+            "authenticate",
+            return_value=UserAuthorization(self.admin, {}),
+        ):
+            response = self.client.post(
+                reverse("parking_permits:admin-graphql"),
+                {
+                    "query": permits_query,
+                    "variables": {
+                        "pageInput": {"page": 1},
+                        "searchParams": {"q": "John", "status": "ALL"},
+                    },
+                },
+                content_type="application/json",
+            )
+        self.assertNotIn("errors", json.loads(response.content))
+
+    @override_settings(GRAPHQL_TRACING_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_logged_and_counted(self):
+        with self.assertLogs("graphql_tracing") as logs:
+            self.execute_permits_query()
+
+        trace = logs.records[0].graphql_trace
+        self.assertEqual(trace["schema"], "admin-graphql")
+        self.assertEqual(trace["operation"], "Permits")
+        self.assertGreater(trace["sql_count"], 0)
+        self.assertEqual(trace["resolvers"]["PermitNode.id"]["count"], 3)
+        self.assertGreater(trace["resolvers"]["Query.permits"]["sql_count"], 0)
+
+        (operation,) = tracing.metrics.operations.values()
+        self.assertEqual(operation.count, 1)
+        self.assertEqual(operation.sql_count, trace["sql_count"])
+        self.assertIn(
+            ("admin-graphql", "Permits", "PermitNode.customer"),
+            tracing.metrics.resolvers,
+        )
+
+    @override_settings(GRAPHQL_TRACING_SAMPLE_RATE=0.0)
+    def test_requests_are_not_traced_without_sampling(self):
+        self.execute_permits_query()
+        self.assertEqual(tracing.metrics.operations, {})
+
+    @override_settings(
+        GRAPHQL_TRACING_SAMPLE_RATE=1.0, GRAPHQL_TRACING_METRICS_TOKEN="secret"
+    )
+    def test_metrics_view(self):
+        self.execute_permits_query()
+        url = reverse("parking_permits:graphql-metrics")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(
+            'graphql_operation_count{schema="admin-graphql",operation="Permits"} 1',
+            content,
+        )
+        self.assertIn(
+            'graphql_resolver_sql_queries_total{schema="admin-graphql",'
+            'operation="Permits",field="Query.permits"}',
+            content,
+        )
+        self.assertIn("db_log_records_dropped_total", content)
+
+
+class MetricsViewTestCase(SimpleTestCase):
+    @override_settings(GRAPHQL_TRACING_METRICS_TOKEN="")
+    def test_metrics_are_not_served_without_token(self):
+        url = reverse("parking_permits:graphql-metrics")
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(GRAPHQL_TRACING_METRICS_TOKEN="secret")
+    def test_metrics_require_the_token(self):
+        url = reverse("parking_permits:graphql-metrics")
+        for authorization, status_code in [
+            ("", 403),
+            ("Bearer secreT", 403),
+            ("Bearer secret", 200),
+        ]:
+            response = self.client.get(url, HTTP_AUTHORIZATION=authorization)
+            self.assertEqual(response.status_code, status_code)
+
+
+class TracingMetricsTestCase(SimpleTestCase):
+    def test_operations_over_the_limit_are_counted_together(self):
+        metrics = tracing.TracingMetrics(max_operations=2)
+        for operation in ["Permits", "Orders", "Random1", "Random2", "Permits"]:
+            trace = tracing.OperationTrace("admin-graphql")
+            trace.operation = operation
+            trace.resolvers["Query.permits"].count = 1
+            trace.finish()
+            metrics.add(trace)
+
+        self.assertEqual(
+            {key: timings.count for key, timings in metrics.operations.items()},
+            {
+                ("admin-graphql", "Permits"): 2,
+                ("admin-graphql", "Orders"): 1,
+                ("admin-graphql", "other"): 2,
+            },
+        )
+        self.assertEqual(len(metrics.resolvers), 3)
+
+
+class HttpTracingTestCase(SimpleTestCase):
+    def test_outbound_requests_are_timed_for_the_active_trace(self):
+        trace = tracing.OperationTrace("graphql")
+        trace._resolver_stack.append(trace.resolvers["profile"])
+        session_send = Mock()
+        with patch.object(tracing, "_session_send", session_send):
+            tracing._traced_session_send(Mock(), Mock())
+            tracing._local.trace = trace
+            try:
+                tracing._traced_session_send(Mock(), Mock())
+            finally:
+                tracing._local.trace = None
+
+        self.assertEqual(session_send.call_count, 2)
+        self.assertEqual(trace.total.http_count, 1)
+        self.assertEqual(trace.resolvers["profile"].http_count, 1)
@@ -0,0 +1,258 @@
+"""Sampled per-operation and per-resolver tracing of the GraphQL views.
+
+A sampled request records the wall time, SQL query count and time and
+outbound HTTP time of the operation and of each resolved field of the
+schema, named Type.field, so that the items of a list and the aliases of
+a field add up to one field. The trace is logged to the "graphql_tracing"
+logger and added to the metrics of the process served by `metrics_view`.
+The operation names are chosen by the clients, so the metrics count at
+most MAX_OPERATIONS of them and the rest under OTHER_OPERATION.
+"""
+
+import hmac
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from ariadne.types import Extension
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.views.decorators.http import require_GET
+
+from parking_permits import db_logging
+
+logger = logging.getLogger("graphql_tracing")
+
+_local = threading.local()
+
+# the number of the distinct operations the metrics are kept of
+MAX_OPERATIONS = 200
+OTHER_OPERATION = "other"
+
+
+def get_active_trace():
+    return getattr(_local, "trace", None)
+
+
+class Timings:
+    __slots__ = ("count", "time", "sql_count", "sql_time", "http_count", "http_time")
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.http_count = 0
+        self.http_time = 0.0
+
+    def add(self, other):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "time_ms": round(self.time * 1000, 3),
+            "sql_count": self.sql_count,
+            "sql_time_ms": round(self.sql_time * 1000, 3),
+            "http_count": self.http_count,
+            "http_time_ms": round(self.http_time * 1000, 3),
+        }
+
+
+class OperationTrace:
+    def __init__(self, schema):
+        self.schema = schema
+        self.operation = None
+        self.total = Timings()
+        self.resolvers = defaultdict(Timings)
+        self._resolver_stack = []
+        self._started = time.perf_counter()
+
+    def _current_timings(self):
+        return [self.total, *self._resolver_stack[-1:]]
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            for timings in self._current_timings():
+                timings.sql_count += 1
+                timings.sql_time += duration
+
+    def record_http(self, duration):
+        for timings in self._current_timings():
+            timings.http_count += 1
+            timings.http_time += duration
+
+    def resolve(self, next_, obj, info, **kwargs):
+        if self.operation is None:
+            self.operation = info.operation.name.value if info.operation.name else ""
+        timings = self.resolvers[f"{info.parent_type.name}.{info.field_name}"]
+        self._resolver_stack.append(timings)
+        start = time.perf_counter()
+        try:
+            return next_(obj, info, **kwargs)
+        finally:
+            timings.count += 1
+            timings.time += time.perf_counter() - start
+            self._resolver_stack.pop()
+
+    def finish(self):
+        self.total.count = 1
+        self.total.time = time.perf_counter() - self._started
+
+    def as_dict(self):
+        return {
+            "schema": self.schema,
+            "operation": self.operation,
+            **self.total.as_dict(),
+            "resolvers": {
+                field: timings.as_dict() for field, timings in self.resolvers.items()
+            },
+        }
+
+
+class TracingMetrics:
+    """Totals of the sampled traces of this process."""
+
+    def __init__(self, max_operations=MAX_OPERATIONS):
+        self.max_operations = max_operations
+        self._lock = threading.Lock()
+        self.operations = defaultdict(Timings)
+        self.resolvers = defaultdict(Timings)
+
+    def add(self, trace):
+        with self._lock:
+            operation_key = (trace.schema, trace.operation or "")
+            if (
+                operation_key not in self.operations
+                and len(self.operations) >= self.max_operations
+            ):
+                operation_key = (trace.schema, OTHER_OPERATION)
+            self.operations[operation_key].add(trace.total)
+            for field, timings in trace.resolvers.items():
+                self.resolvers[(*operation_key, field)].add(timings)
+
+    def clear(self):
+        with self._lock:
+            self.operations.clear()
+            self.resolvers.clear()
+
+    def render(self):
+        """Renders the totals in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            for prefix, totals, label_names in (
+                ("graphql_operation", self.operations, ("schema", "operation")),
+                (
+                    "graphql_resolver",
+                    self.resolvers,
+                    ("schema", "operation", "field"),
+                ),
+            ):
+                for name, attr in (
+                    ("count", "count"),
+                    ("seconds_total", "time"),
+                    ("sql_queries_total", "sql_count"),
+                    ("sql_seconds_total", "sql_time"),
+                    ("http_requests_total", "http_count"),
+                    ("http_seconds_total", "http_time"),
+                ):
+                    metric = f"{prefix}_{name}"
+                    lines.append(f"# TYPE {metric} counter")
+                    for key, timings in sorted(totals.items()):
+                        labels = ",".join(
+                            f'{label}="{_escape_label(value)}"'
+                            for label, value in zip(label_names, key)
+                        )
+                        lines.append(f"{metric}{{{labels}}} {getattr(timings, attr)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = TracingMetrics()
+
+
+class GraphQLTracingExtension(Extension):
+    def __init__(self):
+        self.trace = None
+        self._wrapper = None
+
+    def request_started(self, context):
+        request = context["request"]
+        resolver_match = getattr(request, "resolver_match", None)
+        self.trace = OperationTrace(
+            resolver_match.url_name if resolver_match else request.path
+        )
+        self._wrapper = connection.execute_wrapper(self.trace.record_query)
+        self._wrapper.__enter__()
+        _local.trace = self.trace
+
+    def request_finished(self, context):
+        _local.trace = None
+        self._wrapper.__exit__(None, None, None)
+        self.trace.finish()
+        metrics.add(self.trace)
+        logger.info(
+            "GraphQL operation traced", extra={"graphql_trace": self.trace.as_dict()}
+        )
+
+    def resolve(self, next_, obj, info, **kwargs):
+        if info.field_name.startswith("__"):
+            return next_(obj, info, **kwargs)
+        return self.trace.resolve(next_, obj, info, **kwargs)
+
+
+def get_tracing_extensions(request, context):
+    """Returns the tracing extension for the sampled share of requests."""
+    sample_rate = settings.GRAPHQL_TRACING_SAMPLE_RATE
+    if sample_rate > 0 and random.random() < sample_rate:
+        return [GraphQLTracingExtension]
+    return []
+
+
+_session_send = requests.Session.send
+
+
+def _traced_session_send(self, request, **kwargs):
+    trace = get_active_trace()
+    if trace is None:
+        return _session_send(self, request, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _session_send(self, request, **kwargs)
+    finally:
+        trace.record_http(time.perf_counter() - start)
+
+
+def install_http_tracing():
+    """Times the outbound requests made with the requests library, which
+    all the integrations use, while a trace is active."""
+    requests.Session.send = _traced_session_send
+
+
+@require_GET
+def metrics_view(request):
+    """Serves the metrics of the process answering the request only, the
+    other worker processes keep totals of their own."""
+    token = settings.GRAPHQL_TRACING_METRICS_TOKEN
+    if not token:
+        # the metrics are not served without a token
+        return HttpResponseNotFound()
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render() + db_logging.render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,11 +1,12 @@
 from django.urls import path
 
-from parking_permits import graphql, views
+from parking_permits import graphql, tracing, views
 
 app_name = "parking_permits"
 urlpatterns = [
     path("graphql/", graphql.view, name="graphql"),
     path("admin-graphql/", graphql.admin_view, name="admin-graphql"),
+    path("graphql-metrics/", tracing.metrics_view, name="graphql-metrics"),
     path(
         "api/talpa/product/",
         views.ProductList.as_view(),
@@ -63,4 +64,9 @@ urlpatterns = [
     ),
     path("export/<str:data_type>", views.csv_export, name="export"),
     path("export_pdf", views.pdf_export, name="export_pdf"),
+    path(
+        "export_jobs/<str:token>",
+        views.export_job_download,
+        name="export-job-download",
+    ),
 ]
@@ -1,5 +1,6 @@
 import csv
 import datetime
+import itertools
 import json
 import logging
 import time
@@ -11,10 +12,12 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.db import transaction
 from django.http import (
+    FileResponse,
     Http404,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseNotFound,
+    StreamingHttpResponse,
 )
 from django.utils import timezone as tz
 from django.utils.dateparse import parse_datetime
@@ -39,14 +42,8 @@ from .exceptions import (
     OrderValidationError,
     SubscriptionValidationError,
 )
-from .exporters import DataExporter, PdfExporter
-from .forms import (
-    OrderSearchForm,
-    PdfExportForm,
-    PermitSearchForm,
-    ProductSearchForm,
-    RefundSearchForm,
-)
+from .export_jobs import get_export_job_for_download
+from .forms import CSV_EXPORT_FORM_MAPPING, PdfExportForm
 from .models import Customer, Order, OrderItem, Product
 from .models.common import SourceSystem
 from .models.order import (
@@ -126,7 +123,7 @@ def not_found_response(message):
 
 
 class ProductList(mixins.ListModelMixin, generics.GenericAPIView):
-    queryset = Product.objects.all()
+    queryset = Product.objects.select_related("zone")
     serializer_class = ProductSerializer
 
     @swagger_auto_schema(
@@ -144,7 +141,7 @@ class ProductList(mixins.ListModelMixin, generics.GenericAPIView):
 
 
 class ProductDetail(mixins.RetrieveModelMixin, generics.GenericAPIView):
-    queryset = Product.objects.all()
+    queryset = Product.objects.select_related("zone")
     serializer_class = ProductSerializer
 
     @swagger_auto_schema(
@@ -986,15 +983,18 @@ class ParkingPermitsGDPRAPIView(ParkingPermitGDPRAPIView):
             return False
 
 
+class EchoBuffer:
+    """File-like object that returns the written value instead of
+    storing it, used for streaming the csv writer output."""
+
+    def write(self, value):
+        return value
+
+
 @require_preparators
 @require_safe
 def csv_export(request, data_type):
-    form_class = {
-        "permits": PermitSearchForm,
-        "refunds": RefundSearchForm,
-        "orders": OrderSearchForm,
-        "products": ProductSearchForm,
-    }.get(data_type)
+    form_class = CSV_EXPORT_FORM_MAPPING.get(data_type)
     if not form_class:
         raise Http404
 
@@ -1005,21 +1005,24 @@ def csv_export(request, data_type):
     if not form.is_valid():
         return HttpResponseBadRequest()
 
-    response = HttpResponse(
-        content_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{data_type}.csv"'},
-    )
+    filename = f"{data_type}.csv"
 
     # Needs to be at least preparators in order to download full permits data
     # with customer information.
     if data_type == "permits" and not request.user.is_preparators:
         data_type = "limited_permits"
 
+    # the exporters load fpdf, which the other views don't need
+    from .exporters import DataExporter
+
     data_exporter = DataExporter(data_type, form.get_queryset())
-    writer = csv.writer(response)
-    writer.writerow(data_exporter.get_headers())
-    writer.writerows(data_exporter.get_rows())
-    return response
+    writer = csv.writer(EchoBuffer())
+    rows = itertools.chain([data_exporter.get_headers()], data_exporter.iter_rows())
+    return StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @require_preparators
@@ -1029,6 +1032,8 @@ def pdf_export(request):
     if not form.is_valid():
         return HttpResponseBadRequest()
 
+    from .exporters import PdfExporter
+
     pdf_exporter = PdfExporter(
         form.cleaned_data["data_type"],
         form.cleaned_data["object_id"],
@@ -1047,6 +1052,19 @@ def pdf_export(request):
     return response
 
 
+@require_safe
+def export_job_download(request, token):
+    # The signed, expiring token in the url authorizes the download.
+    job = get_export_job_for_download(token)
+    if not job:
+        return HttpResponseNotFound()
+    return FileResponse(
+        job.file_path.open("rb"),
+        as_attachment=True,
+        filename=job.download_file_name,
+    )
+
+
 class PermitCountSnapshotView(mixins.ListModelMixin, generics.GenericAPIView):
     queryset = PermitCountSnapshot.objects.all().order_by("date")
     serializer_class = PermitCountSnapshotSerializer
@@ -20,6 +20,12 @@ env = environ.Env(
     CSRF_TRUSTED_ORIGINS=(list, ["https://*.hel.fi", "https://*.hel.ninja"]),
     DATABASE_URL=(str, "sqlite:////tmp/my-tmp-sqlite.db"),
     DATABASE_PASSWORD=(str, ""),
+    DATABASE_CONN_MAX_AGE=(int, 60),
+    DATABASE_CONN_HEALTH_CHECKS=(bool, True),
+    DATABASE_POOL=(bool, False),
+    DATABASE_POOL_MIN_SIZE=(int, 1),
+    DATABASE_POOL_MAX_SIZE=(int, 4),
+    DATABASE_POOL_TIMEOUT=(float, 10.0),
     TALPA_NAMESPACE=(str, "asukaspysakointi"),
     TALPA_API_KEY=(str, ""),
     TALPA_MERCHANT_EXPERIENCE_API=(
@@ -49,6 +55,7 @@ env = environ.Env(
     TOKEN_AUTH_API_AUTHORIZATION_FIELD=(list, []),
     HELUSERS_BACK_CHANNEL_LOGOUT_ENABLED=(bool, False),
     HELUSERS_USER_MIGRATE_ENABLED=(bool, False),
+    OIDC_JWKS_REFRESH_INTERVAL=(int, 60 * 60),
     GDPR_API_QUERY_SCOPE=(str, ""),
     GDPR_API_DELETE_SCOPE=(str, ""),
     PARKKIHUBI_DOMAIN=(str, ""),
@@ -97,6 +104,28 @@ env = environ.Env(
     AUDIT_LOG_ES_USERNAME=(str, ""),
     AUDIT_LOG_ES_PASSWORD=(str, ""),
     AUDIT_LOG_ES_INDEX=(str, ""),
+    AUDIT_LOG_BATCH_SIZE=(int, 100),
+    AUDIT_LOG_FLUSH_INTERVAL=(float, 2.0),
+    AUDIT_LOG_SPILL_DIR=(str, "/tmp/parking-permits-audit-log"),
+    AUDIT_LOG_RETENTION_MONTHS=(int, 2),
+    DB_LOG_QUEUE_SIZE=(int, 10000),
+    DB_LOG_BATCH_SIZE=(int, 100),
+    DB_LOG_FLUSH_INTERVAL=(float, 1.0),
+    DB_LOG_WINDOW=(float, 60.0),
+    DB_LOG_MAX_RECORDS_PER_WINDOW=(int, 1000),
+    PERMIT_EVENT_RETENTION_MONTHS=(int, 0),
+    EXPORT_JOB_STORAGE_DIR=(str, "/tmp/parking-permits-exports"),
+    EXPORT_JOB_RETENTION_HOURS=(int, 24),
+    EXPORT_JOB_RUNNING_TIMEOUT_MINUTES=(int, 30),
+    EXPORT_JOB_DOWNLOAD_URL_MAX_AGE_SECONDS=(int, 300),
+    GRAPHQL_TRACING_SAMPLE_RATE=(float, 0.0),
+    GRAPHQL_TRACING_METRICS_TOKEN=(str, ""),
+    GRAPHQL_PERSISTED_QUERIES_MANIFEST=(str, ""),
+    GRAPHQL_PERSISTED_QUERIES_TIMEOUT=(int, 7 * 24 * 60 * 60),
+    GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH=(int, 20000),
+    GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES=(int, 1000),
+    GRAPHQL_ASYNC=(bool, False),
+    GRAPHQL_ASYNC_HTTP_TIMEOUT=(float, 30.0),
 )
 
 if path.exists(".env"):
@@ -182,11 +211,28 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "project.wsgi.application"
 
-DATABASES = {"default": dj_database_url.parse(env("DATABASE_URL"))}
+# Persistent connections, checked before reuse in each request
+DATABASES = {
+    "default": dj_database_url.parse(
+        env("DATABASE_URL"),
+        conn_max_age=env("DATABASE_CONN_MAX_AGE"),
+        conn_health_checks=env("DATABASE_CONN_HEALTH_CHECKS"),
+    )
+}
 
 if env("DATABASE_PASSWORD"):
     DATABASES["default"]["PASSWORD"] = env("DATABASE_PASSWORD")
 
+# Alternatively a psycopg connection pool per worker process, sized for
+# the threads of a worker. The pooled connections aren't persistent.
+if env("DATABASE_POOL"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": env("DATABASE_POOL_MIN_SIZE"),
+        "max_size": env("DATABASE_POOL_MAX_SIZE"),
+        "timeout": env("DATABASE_POOL_TIMEOUT"),
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",  # noqa: E501
@@ -287,6 +333,8 @@ OIDC_API_TOKEN_AUTH = {
 }
 HELUSERS_BACK_CHANNEL_LOGOUT_ENABLED = env("HELUSERS_BACK_CHANNEL_LOGOUT_ENABLED")
 HELUSERS_USER_MIGRATE_ENABLED = env("HELUSERS_USER_MIGRATE_ENABLED")
+# Seconds after which the cached OIDC key sets are refreshed in the background
+OIDC_JWKS_REFRESH_INTERVAL = env("OIDC_JWKS_REFRESH_INTERVAL")
 
 MAX_ALLOWED_USER_PERMIT = 2
 LOGGING = {
@@ -305,7 +353,12 @@ LOGGING = {
     "handlers": {
         "db_log": {
             "level": "DEBUG",
-            "class": "django_db_logger.db_log_handler.DatabaseLogHandler",
+            "()": "parking_permits.db_logging.QueuedDatabaseLogHandler",
+            "queue_size": env("DB_LOG_QUEUE_SIZE"),
+            "batch_size": env("DB_LOG_BATCH_SIZE"),
+            "flush_interval": env("DB_LOG_FLUSH_INTERVAL"),
+            "window": env("DB_LOG_WINDOW"),
+            "max_records_per_window": env("DB_LOG_MAX_RECORDS_PER_WINDOW"),
         },
         "console": {
             "level": "INFO",
@@ -315,7 +368,10 @@ LOGGING = {
         },
         "audit_log": {
             "level": "DEBUG",
-            "class": "audit_logger.db_log_handler.AuditLogHandler",
+            "class": "audit_logger.db_log_handler.BufferedAuditLogHandler",
+            "max_batch_size": env("AUDIT_LOG_BATCH_SIZE"),
+            "flush_interval": env("AUDIT_LOG_FLUSH_INTERVAL"),
+            "spill_dir": env("AUDIT_LOG_SPILL_DIR"),
         },
     },
     "loggers": {
@@ -323,6 +379,11 @@ LOGGING = {
         "django": {"handlers": ["console"], "level": "INFO", "propagate": False},
         "helusers": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
         "audit": {"handlers": ["audit_log"], "level": "DEBUG", "propagate": False},
+        "graphql_tracing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -335,6 +396,10 @@ CRONJOBS = [
         "parking_permits.cron.automatic_expiration_remind_notification_of_permits",
     ),
     ("*/15 * * * *", "parking_permits.cron.handle_announcement_emails"),
+    ("*/10 * * * *", "parking_permits.cron.automatic_refresh_of_financial_rollups"),
+    ("* * * * *", "parking_permits.cron.automatic_processing_of_export_jobs"),
+    ("15 * * * *", "parking_permits.cron.automatic_removal_of_expired_export_jobs"),
+    ("30 2 * * *", "parking_permits.cron.automatic_maintenance_of_partitions"),
 ]
 
 # GDPR API
@@ -351,6 +416,40 @@ DVV_SOSONIMI = env("DVV_SOSONIMI")
 DVV_LOPPUKAYTTAJA = env("DVV_LOPPUKAYTTAJA")
 DVV_UPDATE_USER_PROFILE_DATA = env("DVV_UPDATE_USER_PROFILE_DATA")
 
+# Export jobs
+EXPORT_JOB_STORAGE_DIR = env("EXPORT_JOB_STORAGE_DIR")
+EXPORT_JOB_RETENTION_HOURS = env("EXPORT_JOB_RETENTION_HOURS")
+# minutes after which a running job is taken for one left behind by a dead
+# worker, failed and no longer returned for the same export
+EXPORT_JOB_RUNNING_TIMEOUT_MINUTES = env("EXPORT_JOB_RUNNING_TIMEOUT_MINUTES")
+EXPORT_JOB_DOWNLOAD_URL_MAX_AGE_SECONDS = env("EXPORT_JOB_DOWNLOAD_URL_MAX_AGE_SECONDS")
+
+# Months the monthly partitions of the audit logs and the permit events
+# are kept, before the current month. 0 keeps the partitions forever.
+AUDIT_LOG_RETENTION_MONTHS = env("AUDIT_LOG_RETENTION_MONTHS")
+PERMIT_EVENT_RETENTION_MONTHS = env("PERMIT_EVENT_RETENTION_MONTHS")
+
+# GraphQL tracing, the share of requests traced and the bearer token
+# required by the metrics endpoint
+GRAPHQL_TRACING_SAMPLE_RATE = env("GRAPHQL_TRACING_SAMPLE_RATE")
+GRAPHQL_TRACING_METRICS_TOKEN = env("GRAPHQL_TRACING_METRICS_TOKEN")
+
+# GraphQL persisted queries, a JSON file mapping the SHA-256 hashes of
+# the queries registered at deploy time to the queries, and the cache
+# timeout, the maximum length and the maximum number per timeout of the
+# queries registered by the clients
+GRAPHQL_PERSISTED_QUERIES_MANIFEST = env("GRAPHQL_PERSISTED_QUERIES_MANIFEST")
+GRAPHQL_PERSISTED_QUERIES_TIMEOUT = env("GRAPHQL_PERSISTED_QUERIES_TIMEOUT")
+GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH = env("GRAPHQL_PERSISTED_QUERIES_MAX_LENGTH")
+GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES = env("GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES")
+
+# Serve the GraphQL endpoints with the async views, which run the resolvers
+# of the I/O-bound operations as coroutines. Set by project.asgi.
+GRAPHQL_ASYNC = env("GRAPHQL_ASYNC")
+# seconds the async resolvers wait for an external service, so that a hung
+# service doesn't accumulate the requests waiting for it
+GRAPHQL_ASYNC_HTTP_TIMEOUT = env("GRAPHQL_ASYNC_HTTP_TIMEOUT")
+
 # Email configuration
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS")
 EMAIL_HOST = env("EMAIL_HOST")
@@ -392,7 +491,8 @@ RESILIENT_LOGGER = {
     "batch_limit": 5000,
     "chunk_size": 500,
     "submit_unsent_entries": True,
-    "clear_sent_entries": True,
+    # the sent entries are removed by dropping the expired partitions
+    "clear_sent_entries": not AUDIT_LOG_RETENTION_MONTHS,
 }
 
 # Debug
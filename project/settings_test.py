@@ -12,3 +12,10 @@ LANGUAGE_CODE = "en"
 DEBUG_SKIP_PARKKIHUBI_SYNC = True
 HELSINKI_ADDRESS_CHECK = True
 TALPA_WEBHOOK_WAIT_BUFFER_SECONDS = 0
+
+# Write the audit logs immediately
+LOGGING["handlers"]["audit_log"]["max_batch_size"] = 1  # noqa: F405
+LOGGING["handlers"]["audit_log"]["flush_interval"] = 0  # noqa: F405
+
+# Write the db logs immediately
+LOGGING["handlers"]["db_log"]["flush_interval"] = 0  # noqa: F405
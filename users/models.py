@@ -1,4 +1,5 @@
 from django.contrib.gis.db import models
+from django.utils.functional import cached_property
 from helusers.models import AbstractUser
 
 
@@ -11,52 +12,55 @@ class ParkingPermitGroups(models.TextChoices):
     INSPECTORS = "inspectors"
 
 
+# Each group has the roles of the groups after it, e.g. customer service
+# users are also preparators and inspectors
+GRANTING_GROUPS = {
+    group: frozenset(list(ParkingPermitGroups)[: index + 1])
+    for index, group in enumerate(ParkingPermitGroups)
+}
+
+
 class User(AbstractUser):
+    @cached_property
+    def roles(self):
+        """The names of the parking permit groups of the user, loaded once
+        per instance and cleared when the groups of the user change."""
+        return frozenset(
+            self.groups.filter(name__in=ParkingPermitGroups.values).values_list(
+                "name", flat=True
+            )
+        )
+
+    def clear_roles(self):
+        self.__dict__.pop("roles", None)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.clear_roles()
+
+    def has_role(self, group):
+        return not self.roles.isdisjoint(GRANTING_GROUPS[group])
+
     @property
     def is_super_admin(self):
-        return self.groups.filter(name=ParkingPermitGroups.SUPER_ADMIN).exists()
+        return self.has_role(ParkingPermitGroups.SUPER_ADMIN)
 
     @property
     def is_sanctions_and_refunds(self):
-        return (
-            self.groups.filter(name=ParkingPermitGroups.SANCTIONS_AND_REFUNDS).exists()
-            or self.is_super_admin
-        )
+        return self.has_role(ParkingPermitGroups.SANCTIONS_AND_REFUNDS)
 
     @property
     def is_sanctions(self):
-        return (
-            self.groups.filter(name=ParkingPermitGroups.SANCTIONS).exists()
-            or self.is_sanctions_and_refunds
-            or self.is_super_admin
-        )
+        return self.has_role(ParkingPermitGroups.SANCTIONS)
 
     @property
     def is_customer_service(self):
-        return (
-            self.groups.filter(name=ParkingPermitGroups.CUSTOMER_SERVICE).exists()
-            or self.is_sanctions
-            or self.is_sanctions_and_refunds
-            or self.is_super_admin
-        )
+        return self.has_role(ParkingPermitGroups.CUSTOMER_SERVICE)
 
     @property
     def is_preparators(self):
-        return (
-            self.groups.filter(name=ParkingPermitGroups.PREPARATORS).exists()
-            or self.is_customer_service
-            or self.is_sanctions
-            or self.is_sanctions_and_refunds
-            or self.is_super_admin
-        )
+        return self.has_role(ParkingPermitGroups.PREPARATORS)
 
     @property
     def is_inspectors(self):
-        return (
-            self.groups.filter(name=ParkingPermitGroups.INSPECTORS).exists()
-            or self.is_preparators
-            or self.is_customer_service
-            or self.is_sanctions
-            or self.is_sanctions_and_refunds
-            or self.is_super_admin
-        )
+        return self.has_role(ParkingPermitGroups.INSPECTORS)
@@ -0,0 +1,14 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from users.models import User
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def clear_user_roles(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    # the instances of the users of a group can't be reached, they reload
+    # the roles on the next request
+    if not reverse:
+        instance.clear_roles()
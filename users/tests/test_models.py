@@ -83,3 +83,34 @@ class UserModelTestCase(TestCase):
         assert user.is_customer_service is False
         assert user.is_preparators is False
         assert user.is_inspectors is False
+
+
+class UserRolesTestCase(TestCase):
+    def setUp(self):
+        self.customer_service = GroupFactory(name=ParkingPermitGroups.CUSTOMER_SERVICE)
+        self.user = UserFactory()
+        self.user.groups.add(self.customer_service, GroupFactory())
+
+    def test_roles_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            assert self.user.roles == {ParkingPermitGroups.CUSTOMER_SERVICE}
+            assert self.user.is_inspectors is True
+            assert self.user.is_preparators is True
+            assert self.user.is_customer_service is True
+            assert self.user.is_sanctions is False
+            assert self.user.is_sanctions_and_refunds is False
+            assert self.user.is_super_admin is False
+
+    def test_roles_are_cleared_when_the_groups_change(self):
+        assert self.user.is_super_admin is False
+        self.user.groups.add(GroupFactory(name=ParkingPermitGroups.SUPER_ADMIN))
+        assert self.user.is_super_admin is True
+        self.user.groups.clear()
+        assert self.user.is_inspectors is False
+
+    def test_roles_are_cleared_on_refresh(self):
+        assert self.user.is_customer_service is True
+        self.customer_service.user_set.remove(self.user)
+        assert self.user.is_customer_service is True
+        self.user.refresh_from_db()
+        assert self.user.is_customer_service is False